@@ -6,6 +6,7 @@ from fastapi import FastAPI
 from core.config import settings
 from core.db.unit_of_work import uow
 from core.services import BillingService, ConfigService, ServerService, UserService
+from core.services.manager_clients import manager_clients
 
 from . import exception_handlers
 from .dependencies import parse  # noqa: F401 - historical public import
@@ -45,6 +46,7 @@ async def lifespan(_app: FastAPI):
             poller.cancel()
             with suppress(asyncio.CancelledError):
                 await poller
+        await manager_clients.aclose()
 
 
 app = FastAPI(lifespan=lifespan)
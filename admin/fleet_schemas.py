@@ -232,3 +232,14 @@ class AdminServerActionRequest(BaseModel):
         if self.capacity is not None and self.max_configs is not None:
             raise ValueError("use either capacity or max_configs")
         return self
+
+
+class AdminFleetDriftAuditRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    reason: str = Field(default="fleet drift audit", min_length=3, max_length=500)
+
+    @field_validator("reason")
+    @classmethod
+    def normalize_reason(cls, value: str) -> str:
+        return " ".join(value.split())
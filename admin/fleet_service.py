@@ -6,36 +6,54 @@ import json
 import logging
 import random
 from collections import Counter
+from collections.abc import AsyncIterator
 from dataclasses import asdict, dataclass, is_dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Any, Callable
 
 from fastapi import Request
-from sqlalchemy import delete, func, or_, select
+from sqlalchemy import and_, case, delete, func, or_, select, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 
 import core.db as db
 from core.config import settings
 from core.db.models import (
     AdminAction,
+    AdminActionEntry,
     AdminAuditEvent,
     AdminUser,
     Server,
     VPN_Config,
     VPNServerStatus,
+    VPNServerStatusRollup,
 )
 from core.db.unit_of_work import uow
 from core.domain import AdminActionStatus, ServerLifecycleState, VPNState
 from core.exceptions import APIGatewayError, InvalidOperationError, ServerNotFoundError
 from core.services.api_gateway import APIGateway
+from core.services.fleet_drift_audit import (
+    FLEET_DRIFT_AUDIT_KIND,
+    drift_audit_result,
+    drift_audit_summary,
+    enqueue_fleet_drift_audit,
+)
 from core.services.fleet_placement import (
     managed_config_condition,
     manager_readiness_decision,
 )
+from core.services.manager_breakers import manager_circuits
+from core.services.manager_clients import manager_clients
+from core.services.status_rollups import (
+    RESOLUTIONS,
+    bucket_floor,
+    history_resolution,
+)
 from core.services.vpn_drift import VPNDriftService
 
 from .fleet_schemas import (
+    AdminFleetDriftAuditRequest,
     AdminServerActionRequest,
     AdminServerCreate,
     AdminServerUpdate,
@@ -44,6 +62,9 @@ from .security import AdminPrincipal, add_audit_event
 
 logger = logging.getLogger(__name__)
 
+# Entries a drift stream reads per query.
+_DRIFT_STREAM_PAGE = 100
+
 
 class FleetIdempotencyConflict(InvalidOperationError):
     pass
@@ -120,11 +141,13 @@ class AdminFleetService:
         *,
         gateway_factory: Callable[..., APIGateway] | None = None,
         drift_service: VPNDriftService | None = None,
+        enqueue_drift_audit: Callable[[str], None] | None = None,
     ) -> None:
         self._gateway_factory = gateway_factory or APIGateway
         self._drift_service = drift_service or VPNDriftService(
             uow, gateway_factory=self._gateway_factory
         )
+        self._enqueue_drift_audit = enqueue_drift_audit or enqueue_fleet_drift_audit
 
     async def list_servers(
         self,
@@ -156,44 +179,21 @@ class AdminFleetService:
             conditions.append(Server.location == location)
         if provider:
             conditions.append(Server.provider == provider)
+        if health_state:
+            conditions.append(self._health_condition(health_state))
 
         async with db.async_session() as session:
-            if health_state:
-                rows = (
-                    await session.scalars(
-                        select(Server).where(*conditions).order_by(Server.id)
-                    )
-                ).all()
-                all_items = [await self._server_payload(session, row) for row in rows]
-                unhealthy = {"unhealthy", "unreachable", "instance_mismatch"}
-                items = [
-                    item
-                    for item in all_items
-                    if (
-                        item["health"] in unhealthy
-                        if health_state == "unhealthy"
-                        else item["health"] == health_state
-                    )
-                ]
-                return {
-                    "items": items[offset : offset + limit],
-                    "total": len(items),
-                    "limit": limit,
-                    "offset": offset,
-                }
             total = await session.scalar(
                 select(func.count(Server.id)).where(*conditions)
             )
-            rows = (
-                await session.scalars(
-                    select(Server)
-                    .where(*conditions)
-                    .order_by(Server.id)
-                    .offset(offset)
-                    .limit(limit)
-                )
-            ).all()
-            items = [await self._server_payload(session, row) for row in rows]
+            items = await self._server_payloads(
+                session,
+                select(Server)
+                .where(*conditions)
+                .order_by(Server.id)
+                .offset(offset)
+                .limit(limit),
+            )
         return {
             "items": items,
             "total": int(total or 0),
@@ -223,29 +223,63 @@ class AdminFleetService:
         kind: str | None,
         limit: int,
         offset: int,
+        period_from: datetime | None = None,
+        period_to: datetime | None = None,
+        resolution: str = "auto",
     ) -> dict[str, Any] | None:
+        """Raw snapshots or rollup buckets of one server, newest first.
+
+        ``auto`` lists raw snapshots unless a range start is given, and then
+        picks the finest resolution that is still retained for the range and
+        spans it in a bounded number of points.
+        """
+
+        if resolution == "auto":
+            if period_from is None or kind:
+                resolution = "raw"
+            else:
+                now = _utcnow()
+                resolution = history_resolution(period_from, period_to or now, now=now)
         async with db.async_session() as session:
             if await session.get(Server, server_id) is None:
                 return None
-            conditions = [VPNServerStatus.server_id == server_id]
-            if kind:
-                conditions.append(VPNServerStatus.kind == kind)
+            if resolution == "raw":
+                model, order = VPNServerStatus, VPNServerStatus.collected_at
+                conditions = [VPNServerStatus.server_id == server_id]
+                if kind:
+                    conditions.append(VPNServerStatus.kind == kind)
+                if period_from is not None:
+                    conditions.append(VPNServerStatus.collected_at >= period_from)
+                record = self._status_record
+            else:
+                model, order = VPNServerStatusRollup, VPNServerStatusRollup.bucket_start
+                conditions = [
+                    VPNServerStatusRollup.server_id == server_id,
+                    VPNServerStatusRollup.resolution == resolution,
+                ]
+                if period_from is not None:
+                    # The bucket holding the range start is partly inside it.
+                    conditions.append(
+                        order >= bucket_floor(period_from, RESOLUTIONS[resolution])
+                    )
+                record = self._rollup_record
+            if period_to is not None:
+                conditions.append(order < period_to)
             total = await session.scalar(
-                select(func.count(VPNServerStatus.id)).where(*conditions)
+                select(func.count(model.id)).where(*conditions)
             )
             rows = (
                 await session.scalars(
-                    select(VPNServerStatus)
+                    select(model)
                     .where(*conditions)
-                    .order_by(
-                        VPNServerStatus.collected_at.desc(), VPNServerStatus.id.desc()
-                    )
+                    .order_by(order.desc(), model.id.desc())
                     .offset(offset)
                     .limit(limit)
                 )
             ).all()
             return {
-                "items": [self._status_record(row) for row in rows],
+                "resolution": resolution,
+                "items": [record(row) for row in rows],
                 "total": int(total or 0),
                 "limit": limit,
                 "offset": offset,
@@ -299,7 +333,10 @@ class AdminFleetService:
 
         Remote reads are safe to retry with a new idempotency key. Marking an
         abandoned action terminal prevents a browser replay from waiting on a
-        request that disappeared during a process crash.
+        request that disappeared during a process crash. Leased actions (fleet
+        drift audits) are taken over by the billing worker's recovery job;
+        they are only failed here once their lease has been expired for a
+        whole window, that is when no worker is left to take them.
         """
 
         cutoff = _utcnow().timestamp() - settings.admin_action_stale_seconds
@@ -315,8 +352,14 @@ class AdminFleetService:
                                 AdminActionStatus.RUNNING.value,
                             )
                         ),
-                        AdminAction.started_at.is_not(None),
-                        AdminAction.started_at < cutoff_at,
+                        or_(
+                            and_(
+                                AdminAction.lease_expires_at.is_(None),
+                                AdminAction.started_at.is_not(None),
+                                AdminAction.started_at < cutoff_at,
+                            ),
+                            AdminAction.lease_expires_at < cutoff_at,
+                        ),
                     )
                     .with_for_update(skip_locked=True)
                 )
@@ -330,6 +373,8 @@ class AdminFleetService:
                     "Action did not finish before its execution lease expired"
                 )
                 action.completed_at = now
+                action.lease_token = None
+                action.lease_expires_at = None
                 session.add(
                     AdminAuditEvent(
                         actor_user_id=action.actor_user_id,
@@ -423,6 +468,128 @@ class AdminFleetService:
             except TimeoutError:
                 continue
 
+    async def start_drift_audit(
+        self,
+        *,
+        request: Request,
+        principal: AdminPrincipal,
+        client_key: str,
+        command: AdminFleetDriftAuditRequest,
+    ) -> dict[str, Any]:
+        """Stage a fleet drift audit and queue it for the billing worker.
+
+        The action stays ``pending`` until a worker leases it. Every
+        non-retired server at staging time is a target; each finished server
+        becomes an entry that ``stream_drift_audit`` (from any admin worker)
+        shows while slower Managers are still being read.
+        """
+
+        async with db.async_session() as session, session.begin():
+            action, replayed = await self._stage_action(
+                session,
+                server_id=None,
+                principal=principal,
+                client_key=client_key,
+                kind=FLEET_DRIFT_AUDIT_KIND,
+                expected_version=None,
+                reason=command.reason,
+                payload={},
+            )
+            if replayed:
+                return await self._action_payload(session, action, replayed=True)
+            targets = (
+                await session.execute(
+                    select(Server.id, Server.name)
+                    .where(Server.lifecycle_state != ServerLifecycleState.RETIRED.value)
+                    .order_by(Server.id)
+                )
+            ).all()
+            action.status = AdminActionStatus.PENDING.value
+            action.payload = {"targets": [[row.id, row.name] for row in targets]}
+            action.result = drift_audit_summary(len(targets))
+            # A pick-up deadline: the worker's recovery job queues the audit
+            # again if no worker has leased it by then.
+            action.lease_expires_at = _utcnow() + timedelta(
+                seconds=settings.admin_fleet_drift_audit_lease_seconds
+            )
+            add_audit_event(
+                session,
+                request,
+                action="fleet.audit_drift",
+                actor_user_id=principal.user_id,
+                target_type="fleet",
+                details={
+                    "admin_action_id": action.action_id,
+                    "reason": command.reason,
+                    "servers_total": len(targets),
+                },
+            )
+            await session.flush()
+            payload = await self._action_payload(session, action)
+
+        try:
+            await asyncio.to_thread(self._enqueue_drift_audit, payload["action_id"])
+        except Exception:
+            # The action is durable; the recovery job queues it after the
+            # pick-up deadline.
+            logger.exception(
+                "Failed to queue fleet drift audit %s", payload["action_id"]
+            )
+        return payload
+
+    async def stream_drift_audit(
+        self,
+        action_id: str,
+        *,
+        after: int = 0,
+    ) -> AsyncIterator[tuple[str, int | None, dict[str, Any]]]:
+        """Yield ``(event, sequence, data)`` for servers finished after ``after``.
+
+        Per-server entries come in completion order and end with a ``done``
+        event carrying the action's totals. Each poll reads only the entries
+        past the last sequence sent.
+        """
+
+        while True:
+            async with db.async_session() as session:
+                action = (
+                    await session.execute(
+                        select(
+                            AdminAction.id, AdminAction.status, AdminAction.result
+                        ).where(
+                            AdminAction.action_id == action_id,
+                            AdminAction.kind == FLEET_DRIFT_AUDIT_KIND,
+                        )
+                    )
+                ).one_or_none()
+                if action is None:
+                    return
+                # The status is read first: entries of a finished audit are
+                # all committed before its status changes.
+                entries = (
+                    await session.execute(
+                        select(AdminActionEntry.sequence, AdminActionEntry.data)
+                        .where(
+                            AdminActionEntry.admin_action_id == action.id,
+                            AdminActionEntry.sequence > after,
+                        )
+                        .order_by(AdminActionEntry.sequence)
+                        .limit(_DRIFT_STREAM_PAGE)
+                    )
+                ).all()
+            for sequence, data in entries:
+                after = sequence
+                yield "server", sequence, {"sequence": sequence, **data}
+            if len(entries) == _DRIFT_STREAM_PAGE:
+                continue
+            if action.status in {
+                AdminActionStatus.SUCCEEDED.value,
+                AdminActionStatus.FAILED.value,
+            }:
+                yield "done", None, {"status": action.status, **action.result}
+                return
+            await asyncio.sleep(settings.admin_fleet_drift_stream_poll_seconds)
+
     async def _persist_polled_status(
         self,
         server_id: int,
@@ -450,7 +617,7 @@ class AdminFleetService:
             if observed_instance and server.manager_instance_id is None:
                 server.manager_instance_id = observed_instance
             await session.flush()
-            await self._prune_status_history(session, server_id)
+            await self._store_health(session, server, row)
 
     async def _persist_polled_status_failure(
         self,
@@ -465,17 +632,16 @@ class AdminFleetService:
                 or server.lifecycle_state == ServerLifecycleState.RETIRED.value
             ):
                 return
-            session.add(
-                VPNServerStatus(
-                    server_id=server_id,
-                    kind="status",
-                    success=False,
-                    snapshot={},
-                    error_code=error_code[:96],
-                )
+            row = VPNServerStatus(
+                server_id=server_id,
+                kind="status",
+                success=False,
+                snapshot={},
+                error_code=error_code[:96],
             )
+            session.add(row)
             await session.flush()
-            await self._prune_status_history(session, server_id)
+            await self._store_health(session, server, row)
 
     async def create_server(
         self,
@@ -542,9 +708,7 @@ class AdminFleetService:
                     field in supplied and supplied[field] != getattr(server, field)
                     for field in endpoint_fields
                 )
-                if endpoint_changed and await self._managed_config_count(
-                    session, server.id
-                ):
+                if endpoint_changed and server.managed_config_count:
                     raise InvalidOperationError(
                         "Drain all VPN configs before changing the Manager endpoint"
                     )
@@ -593,6 +757,9 @@ class AdminFleetService:
                 },
             )
             raise
+        if endpoint_changed:
+            await manager_clients.invalidate(server_id)
+            manager_circuits.forget(server_id)
         async with db.async_session() as session:
             persisted = await session.get(Server, server_id)
             assert persisted is not None
@@ -661,7 +828,7 @@ class AdminFleetService:
                 raise ServerNotFoundError(f"Server {server_id} not found")
             action, replayed = await self._stage_action(
                 session,
-                server=server,
+                server_id=server.id,
                 principal=principal,
                 client_key=client_key,
                 kind=canonical,
@@ -673,7 +840,7 @@ class AdminFleetService:
                 return await self._action_payload(session, action, replayed=True)
             self._check_version(server, command.expected_version)
             previous_version = server.version
-            managed_configs = await self._managed_config_count(session, server.id)
+            managed_configs = server.managed_config_count
             if canonical in {"activate", "enable_new_configs"} or (
                 canonical == "set_accepting" and command.accepts_new_configs is True
             ):
@@ -730,7 +897,7 @@ class AdminFleetService:
                     raise ServerNotFoundError(f"Server {server_id} not found")
                 action, replayed = await self._stage_action(
                     session,
-                    server=server,
+                    server_id=server.id,
                     principal=principal,
                     client_key=client_key,
                     kind=canonical,
@@ -836,13 +1003,14 @@ class AdminFleetService:
                 )
                 session.add(status_record)
                 await session.flush()
-                await self._prune_status_history(session, target.id)
             observed_instance = result.get("manager_instance_id")
             if observed_instance:
                 if server.manager_instance_id is None:
                     server.manager_instance_id = observed_instance
                 elif server.manager_instance_id != observed_instance:
                     instance_mismatch = True
+            if canonical == "refresh_status":
+                await self._store_health(session, server, status_record)
             action.status = AdminActionStatus.SUCCEEDED.value
             action.result = {
                 **result["result"],
@@ -867,7 +1035,7 @@ class AdminFleetService:
 
     async def _refresh_status(self, target: _ManagerTarget) -> dict[str, Any]:
         async with self._gateway_factory(
-            target.ip, target.port, target.api_key
+            target.ip, target.port, target.api_key, server_id=target.id
         ) as gateway:
             manager_status = await gateway.get_status()
         snapshot = _jsonable(manager_status)
@@ -889,7 +1057,7 @@ class AdminFleetService:
 
     async def _refresh_inventory(self, target: _ManagerTarget) -> dict[str, Any]:
         async with self._gateway_factory(
-            target.ip, target.port, target.api_key
+            target.ip, target.port, target.api_key, server_id=target.id
         ) as gateway:
             inventory = await gateway.get_client_inventory()
         if inventory is None:  # pragma: no cover - unconditional request invariant
@@ -921,31 +1089,7 @@ class AdminFleetService:
 
     async def _audit_drift(self, server_id: int) -> dict[str, Any]:
         report = await self._drift_service.audit_server(server_id)
-        findings = [
-            {
-                "config_id": item.config_id,
-                "name": item.name,
-                "code": item.reason,
-                "reason": item.reason,
-                "severity": item.severity,
-                "desired_state": item.desired_state,
-                "hub_actual_state": item.hub_actual_state,
-                "manager_state": item.manager_state,
-                "repairable": item.repairable,
-                "details": list(item.details),
-                "message": item.reason.replace("_", " "),
-            }
-            for item in report.findings
-        ]
-        result = {
-            "server_id": report.server_id,
-            "inventory_revision": report.inventory_revision,
-            "inventory_etag": report.inventory_etag,
-            "unchanged": report.unchanged,
-            "findings": findings,
-            "finding_count": len(findings),
-        }
-        return {"result": result}
+        return {"result": drift_audit_result(report)}
 
     async def _finish_remote_failure(
         self,
@@ -974,7 +1118,10 @@ class AdminFleetService:
                 )
                 session.add(failed_status)
                 await session.flush()
-                await self._prune_status_history(session, target.id)
+                if action.kind == "refresh_status":
+                    server = await session.get(Server, target.id)
+                    if server is not None:
+                        await self._store_health(session, server, failed_status)
             action.status = AdminActionStatus.FAILED.value
             action.error_code = error_code[:96]
             action.error_detail = "VPN Manager request failed"
@@ -1078,7 +1225,7 @@ class AdminFleetService:
     @staticmethod
     def _action_request_hash(
         *,
-        server_id: int,
+        server_id: int | None,
         kind: str,
         expected_version: int | None,
         reason: str,
@@ -1104,7 +1251,7 @@ class AdminFleetService:
         self,
         session,
         *,
-        server: Server,
+        server_id: int | None,
         principal: AdminPrincipal,
         client_key: str,
         kind: str,
@@ -1117,7 +1264,7 @@ class AdminFleetService:
             raise InvalidOperationError("Idempotency-Key must not be blank")
         key_hash = hashlib.sha256(normalized_key.encode()).hexdigest()
         request_hash = self._action_request_hash(
-            server_id=server.id,
+            server_id=server_id,
             kind=kind,
             expected_version=expected_version,
             reason=reason,
@@ -1136,7 +1283,7 @@ class AdminFleetService:
                 )
             return existing, True
         action = AdminAction(
-            server_id=server.id,
+            server_id=server_id,
             actor_user_id=principal.user_id,
             kind=kind,
             status=AdminActionStatus.RUNNING.value,
@@ -1268,58 +1415,132 @@ class AdminFleetService:
                 "Manager and OpenVPN data plane must be healthy before activation"
             )
 
+    async def _config_counts(self, session, server_id: int) -> dict[str, int]:
+        return (await self._config_counts_by_server(session, [server_id]))[server_id]
+
     @staticmethod
-    async def _managed_config_count(session, server_id: int) -> int:
-        value = await session.scalar(
-            select(func.count(VPN_Config.id)).where(
-                VPN_Config.server_id == server_id,
-                managed_config_condition(),
+    async def _config_counts_by_server(
+        session, server_ids: list[int]
+    ) -> dict[int, dict[str, int]]:
+        """Managed config counts for ``server_ids`` in one grouped query."""
+
+        counts = {
+            server_id: {
+                "configs_count": 0,
+                "active_configs": 0,
+                "suspended_configs": 0,
+                "pending_configs": 0,
+            }
+            for server_id in server_ids
+        }
+        if not server_ids:
+            return counts
+        rows = await session.execute(
+            select(
+                VPN_Config.server_id,
+                func.count(VPN_Config.id),
+                func.sum(
+                    case((VPN_Config.actual_state == VPNState.ACTIVE.value, 1), else_=0)
+                ),
+                func.sum(
+                    case(
+                        (VPN_Config.actual_state == VPNState.SUSPENDED.value, 1),
+                        else_=0,
+                    )
+                ),
+                func.sum(
+                    case(
+                        (VPN_Config.desired_state != VPN_Config.actual_state, 1),
+                        else_=0,
+                    )
+                ),
             )
+            .where(VPN_Config.server_id.in_(server_ids), managed_config_condition())
+            .group_by(VPN_Config.server_id)
         )
-        return int(value or 0)
+        for server_id, total, active, suspended, pending in rows:
+            counts[server_id] = {
+                "configs_count": int(total or 0),
+                "active_configs": int(active or 0),
+                "suspended_configs": int(suspended or 0),
+                "pending_configs": int(pending or 0),
+            }
+        return counts
 
     @staticmethod
-    async def _prune_status_history(session, server_id: int) -> None:
-        stale_ids = (
-            select(VPNServerStatus.id)
-            .where(VPNServerStatus.server_id == server_id)
-            .order_by(VPNServerStatus.collected_at.desc(), VPNServerStatus.id.desc())
-            .offset(settings.admin_fleet_status_retention_per_server)
-        )
-        await session.execute(
-            delete(VPNServerStatus).where(VPNServerStatus.id.in_(stale_ids))
+    def _latest_status_id(kind: str):
+        """Correlated ID of a server's newest snapshot of ``kind``.
+
+        Evaluated per selected server through the (server_id, collected_at)
+        index, like a lateral join, but portable to SQLite.
+        """
+
+        candidate = aliased(VPNServerStatus)
+        return (
+            select(candidate.id)
+            .where(candidate.server_id == Server.id, candidate.kind == kind)
+            .order_by(candidate.collected_at.desc(), candidate.id.desc())
+            .limit(1)
+            .correlate(Server)
+            .scalar_subquery()
         )
 
-    async def _config_counts(self, session, server_id: int) -> dict[str, int]:
+    async def _server_payloads(self, session, stmt) -> list[dict[str, Any]]:
+        """Payloads for the servers selected by ``stmt`` in two round-trips.
+
+        Servers come with their newest status and inventory snapshots joined
+        in; config counts follow in one grouped query for the whole page.
+        """
+
+        latest = aliased(VPNServerStatus)
+        latest_inventory = aliased(VPNServerStatus)
         rows = (
-            await session.scalars(
-                select(VPN_Config).where(
-                    VPN_Config.server_id == server_id,
-                    managed_config_condition(),
+            await session.execute(
+                stmt.add_columns(latest, latest_inventory)
+                .outerjoin_from(
+                    Server, latest, latest.id == self._latest_status_id("status")
+                )
+                .outerjoin_from(
+                    Server,
+                    latest_inventory,
+                    latest_inventory.id == self._latest_status_id("inventory"),
                 )
             )
         ).all()
-        return {
-            "configs_count": len(rows),
-            "active_configs": sum(
-                row.actual_state == VPNState.ACTIVE.value for row in rows
-            ),
-            "suspended_configs": sum(
-                row.actual_state == VPNState.SUSPENDED.value for row in rows
-            ),
-            "pending_configs": sum(
-                row.desired_state != row.actual_state for row in rows
-            ),
-        }
+        counts = await self._config_counts_by_server(
+            session, [server.id for server, _, _ in rows]
+        )
+        return [
+            self._build_server_payload(
+                server,
+                counts=counts[server.id],
+                latest=status,
+                latest_inventory=inventory,
+            )
+            for server, status, inventory in rows
+        ]
 
     async def _server_payload(
         self, session, server: Server, *, include_status: bool = False
     ) -> dict[str, Any]:
-        counts = await self._config_counts(session, server.id)
-        latest = await self._latest_status(session, server.id, kind="status")
-        latest_inventory = await self._latest_status(
-            session, server.id, kind="inventory"
+        (payload,) = await self._server_payloads(
+            session, select(Server).where(Server.id == server.id)
         )
+        if include_status:
+            latest = await self._latest_status(session, server.id, kind="status")
+            payload["latest_status"] = (
+                await self._status_payload(session, server, latest) if latest else None
+            )
+        return payload
+
+    def _build_server_payload(
+        self,
+        server: Server,
+        *,
+        counts: dict[str, int],
+        latest: VPNServerStatus | None,
+        latest_inventory: VPNServerStatus | None,
+    ) -> dict[str, Any]:
         latest_seen = max(
             (item for item in (latest, latest_inventory) if item is not None),
             key=lambda item: (item.collected_at, item.id),
@@ -1334,7 +1555,7 @@ class AdminFleetService:
                 server.max_configs - server.capacity_reserve - counts["configs_count"],
             )
         )
-        payload = {
+        return {
             "id": server.id,
             "name": server.name,
             "ip": server.ip,
@@ -1366,13 +1587,14 @@ class AdminFleetService:
                 if latest_inventory
                 else latest.inventory_revision if latest else None
             ),
+            # Breakers live in process memory: this is the admin worker's own
+            # view, not the reconciler's or the fleet's.
+            "manager_circuit": {
+                "scope": "admin_process",
+                **asdict(manager_circuits.snapshot(server.id)),
+            },
             **counts,
         }
-        if include_status:
-            payload["latest_status"] = (
-                await self._status_payload(session, server, latest) if latest else None
-            )
-        return payload
 
     async def _latest_status(self, session, server_id: int, *, kind: str | None = None):
         conditions = [VPNServerStatus.server_id == server_id]
@@ -1448,8 +1670,8 @@ class AdminFleetService:
             "snapshot": snapshot,
         }
 
-    @staticmethod
-    def _health(server: Server, latest: VPNServerStatus | None) -> str:
+    @classmethod
+    def _health(cls, server: Server, latest: VPNServerStatus | None) -> str:
         if server.lifecycle_state in {
             ServerLifecycleState.DISABLED.value,
             ServerLifecycleState.RETIRED.value,
@@ -1466,6 +1688,16 @@ class AdminFleetService:
             _utcnow() - collected_at.astimezone(timezone.utc)
         ).total_seconds() > settings.admin_fleet_status_stale_seconds:
             return "stale"
+        return cls._observed_health(server, latest)
+
+    @staticmethod
+    def _observed_health(server: Server, latest: VPNServerStatus | None) -> str:
+        """Health from one status snapshot, ignoring lifecycle and age."""
+
+        if latest is None:
+            return "unknown"
+        if not latest.success:
+            return "unreachable"
         if (
             latest.manager_instance_id
             and server.manager_instance_id
@@ -1481,6 +1713,66 @@ class AdminFleetService:
             return "unhealthy"
         return "healthy"
 
+    @classmethod
+    async def _store_health(
+        cls, session, server: Server, latest: VPNServerStatus
+    ) -> None:
+        """Record ``latest`` as the server's observed health.
+
+        Written with a Core UPDATE that keeps ``updated_at``: a poll is an
+        observation, not an edit of the server.
+        """
+
+        await session.execute(
+            update(Server)
+            .where(Server.id == server.id)
+            .values(
+                health_state=cls._observed_health(server, latest),
+                health_checked_at=_utcnow(),
+                updated_at=Server.updated_at,
+            )
+        )
+
+    @staticmethod
+    def _health_condition(health_state: str):
+        """SQL predicate matching :meth:`_health` through the stored columns.
+
+        Kept as plain comparisons on ``health_state``/``health_checked_at``
+        so the composite index can serve it.
+        """
+
+        inactive = (
+            ServerLifecycleState.DISABLED.value,
+            ServerLifecycleState.RETIRED.value,
+        )
+        if health_state in inactive:
+            return Server.lifecycle_state == health_state
+        cutoff = _utcnow() - timedelta(
+            seconds=settings.admin_fleet_status_stale_seconds
+        )
+        operational = Server.lifecycle_state.not_in(inactive)
+        fresh = Server.health_checked_at >= cutoff
+        if health_state == "stale":
+            return and_(
+                operational,
+                Server.health_state.in_(("instance_mismatch", "unhealthy", "healthy")),
+                Server.health_checked_at < cutoff,
+            )
+        if health_state in {"unknown", "unreachable"}:
+            return and_(operational, Server.health_state == health_state)
+        if health_state == "unhealthy":
+            return and_(
+                operational,
+                or_(
+                    Server.health_state == "unreachable",
+                    and_(
+                        Server.health_state.in_(("instance_mismatch", "unhealthy")),
+                        fresh,
+                    ),
+                ),
+            )
+        return and_(operational, Server.health_state == health_state, fresh)
+
     @staticmethod
     def _status_record(row: VPNServerStatus) -> dict[str, Any]:
         return {
@@ -1497,6 +1789,29 @@ class AdminFleetService:
             "collected_at": _jsonable(row.collected_at),
         }
 
+    @staticmethod
+    def _rollup_record(row: VPNServerStatusRollup) -> dict[str, Any]:
+        return {
+            "server_id": row.server_id,
+            "resolution": row.resolution,
+            "bucket_start": _jsonable(row.bucket_start),
+            "samples": row.samples,
+            "reachable_samples": row.reachable_samples,
+            "uptime_ratio": (
+                round(row.ready_samples / row.samples, 4) if row.samples else None
+            ),
+            "readiness_flaps": row.readiness_flaps,
+            "sessions_min": row.sessions_min,
+            "sessions_max": row.sessions_max,
+            "sessions_avg": (
+                round(row.sessions_sum / row.session_samples, 2)
+                if row.session_samples
+                else None
+            ),
+            "bytes_received": row.bytes_received,
+            "bytes_sent": row.bytes_sent,
+        }
+
     @staticmethod
     async def _action_payload(
         session, action: AdminAction, *, replayed: bool = False
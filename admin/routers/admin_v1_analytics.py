@@ -1,18 +1,22 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
+from decimal import Decimal
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from core.db.unit_of_work import uow
-from core.services.admin_queries import AdminAnalyticsQueryService
+from core.exceptions import InvalidOperationError
+from core.services.admin_queries import AdminAnalyticsQueryService, money, utc_iso
+from core.services.billing_forecast import MAX_FORECAST_PERIODS, BillingForecastService
 
 from ..fleet_service import AdminFleetService
 from ..security import AdminPermission, AdminPrincipal, require_permission
 
 router = APIRouter(prefix="/api/admin/v1", tags=["admin-v1-analytics"])
 analytics = AdminAnalyticsQueryService(uow)
+forecasts = BillingForecastService(uow)
 fleet = AdminFleetService()
 
 DashboardRead = Annotated[
@@ -115,3 +119,48 @@ async def finance_timeseries(
         "granularity": granularity,
         "timezone": timezone_name,
     }
+
+
+@router.get("/analytics/billing/forecast")
+async def billing_forecast(
+    _principal: FinanceRead,
+    periods: int = Query(default=24 * 30, ge=1, le=MAX_FORECAST_PERIODS),
+    per_config_cost: Decimal | None = Query(default=None, ge=0, le=1_000_000),
+    billing_interval: int | None = Query(default=None, ge=60, le=31 * 86_400),
+):
+    try:
+        forecast = await forecasts.forecast(
+            periods=periods,
+            per_config_cost=per_config_cost,
+            billing_period_seconds=billing_interval,
+        )
+    except InvalidOperationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+    return {
+        "tariff": {
+            "per_config_cost": money(forecast.per_config_cost),
+            "billing_interval": forecast.billing_period_seconds,
+        },
+        "generated_at": utc_iso(forecast.generated_at),
+        "active_users": forecast.active_users,
+        "active_configs": forecast.active_configs,
+        "total_charged": money(forecast.total_charged),
+        "total_suspended": forecast.total_suspended,
+        "items": [
+            {
+                "period": period.index,
+                "period_start": utc_iso(period.period_start),
+                "period_end": utc_iso(period.period_end),
+                "charged_users": period.charged_users,
+                "charged_configs": period.charged_configs,
+                "charged_amount": money(period.charged_amount),
+                "suspended_users": period.suspended_users,
+                "negative_balance_users": period.negative_balance_users,
+                "negative_balance_total": money(period.negative_balance_total),
+            }
+            for period in forecast.periods
+        ],
+    }
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import json
+from datetime import datetime, timezone
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 
 from ..fleet_schemas import (
+    AdminFleetDriftAuditRequest,
     AdminServerActionRequest,
     AdminServerCreate,
     AdminServerUpdate,
@@ -32,6 +36,14 @@ IdempotencyKey = Annotated[
 ]
 
 
+def _utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 def _project_server_finance(payload: dict, principal: AdminPrincipal) -> dict:
     if not {
         AdminPermission.FINANCE_READ,
@@ -81,6 +93,59 @@ async def list_servers(
     return payload
 
 
+@router.post("/drift-audits", status_code=status.HTTP_202_ACCEPTED)
+async def start_fleet_drift_audit(
+    data: AdminFleetDriftAuditRequest,
+    request: Request,
+    principal: ServersWrite,
+    idempotency_key: IdempotencyKey,
+):
+    return await fleet.start_drift_audit(
+        request=request,
+        principal=principal,
+        client_key=idempotency_key,
+        command=data,
+    )
+
+
+@router.get("/drift-audits/{action_id}/events")
+async def stream_fleet_drift_audit(
+    action_id: str,
+    _principal: ServersRead,
+    last_event_id: Annotated[
+        str | None, Header(alias="Last-Event-ID", max_length=16)
+    ] = None,
+):
+    """Server-sent events: one ``server`` event per audited server, then ``done``.
+
+    Event IDs are completion sequence numbers, so a reconnecting browser
+    resumes after the last server it received.
+    """
+
+    action = await fleet.get_action(action_id)
+    if action is None or action["kind"] != "fleet_audit_drift":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Drift audit not found"
+        )
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    async def events():
+        async for event, sequence, data in fleet.stream_drift_audit(
+            action_id, after=after
+        ):
+            lines = [f"event: {event}"]
+            if sequence is not None:
+                lines.append(f"id: {sequence}")
+            lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+            yield "\n".join(lines) + "\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("", status_code=status.HTTP_201_CREATED)
 async def create_server(
     data: AdminServerCreate,
@@ -127,11 +192,31 @@ async def get_server_status_history(
     server_id: int,
     _principal: ServersRead,
     kind: str | None = Query(default=None, pattern="^(status|inventory)$"),
+    period_from: datetime | None = Query(default=None, alias="from"),
+    period_to: datetime | None = Query(default=None, alias="to"),
+    resolution: str = Query(default="auto", pattern="^(auto|raw|5m|1h|1d)$"),
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0, le=1_000_000),
 ):
+    period_from, period_to = _utc(period_from), _utc(period_to)
+    if period_from and period_to and period_to <= period_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Status history period must be positive",
+        )
+    if kind and resolution not in {"auto", "raw"}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Snapshot kind applies only to raw status history",
+        )
     payload = await fleet.status_history(
-        server_id, kind=kind, limit=limit, offset=offset
+        server_id,
+        kind=kind,
+        limit=limit,
+        offset=offset,
+        period_from=period_from,
+        period_to=period_to,
+        resolution=resolution,
     )
     if payload is None:
         raise HTTPException(
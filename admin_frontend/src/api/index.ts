@@ -1,4 +1,4 @@
-import { normalizePage, queryString, request, resetCsrfToken } from './client'
+import { API_ROOT, normalizePage, queryString, request, resetCsrfToken } from './client'
 import {
   adaptAudit,
   adaptBillingRun,
@@ -127,6 +127,8 @@ export const serversApi = {
       body: { action, ...input },
       idempotencyKey,
     })),
+  startDriftAudit: async (reason: string) => adaptOperation(await request<unknown>('/servers/drift-audits', { method: 'POST', body: { reason }, idempotencyKey: crypto.randomUUID() })),
+  driftAuditEvents: (actionId: string) => new EventSource(`${API_ROOT}/servers/drift-audits/${encodeURIComponent(actionId)}/events`, { withCredentials: true }),
 }
 
 export const operationsApi = {
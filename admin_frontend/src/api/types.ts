@@ -115,6 +115,26 @@ export interface VpnOperation {
   attempts?: number
 }
 
+export interface FleetDriftAuditServer {
+  sequence: number
+  server_id: number
+  name: string
+  status: 'succeeded' | 'failed'
+  error_code?: string | null
+  finding_count: number
+  critical_count: number
+  findings: Array<{ config_id?: number | null; name: string; code?: string; severity?: string; message?: string }>
+}
+
+export interface FleetDriftAuditSummary {
+  status: string
+  servers_total: number
+  completed: number
+  failed: number
+  finding_count: number
+  critical_count: number
+}
+
 export interface ReferralNode {
   user_id: string | number
   username?: string | null
@@ -198,9 +218,19 @@ export interface Server {
   last_seen_at?: string | null
   inventory_revision?: string | null
   drift_count?: number
+  manager_circuit?: ManagerCircuit
   version?: number
 }
 
+export interface ManagerCircuit {
+  /** Breakers are per process; this is the serving admin worker's view. */
+  scope: 'admin_process'
+  state: 'closed' | 'open' | 'half_open'
+  consecutive_failures: number
+  open_seconds: number
+  retry_after_seconds: number | null
+}
+
 export interface ServerStatus {
   status?: string
   reachable?: boolean
@@ -24,5 +24,5 @@ export function OperationsPage() {
     { key: 'updated', header: 'Обновлена', render: (row) => formatDateTime(row.updated_at) },
     { key: 'error', header: 'Ошибка', render: (row) => row.error || '—' },
   ]
-  return <><PageHeader eyebrow="Очередь" title="VPN-операции" description="Provisioning, suspend, revoke, inventory и действия с серверами." /><section className="filter-bar filter-bar--simple"><div className="filter-controls"><label>Статус <select value={params.get('status') ?? ''} onChange={(event) => setFilter('status', event.target.value)}><option value="">Все</option><option value="pending">В очереди</option><option value="running">Выполняются</option><option value="succeeded">Завершены</option><option value="failed">Ошибки</option></select></label><label>Тип <select value={params.get('type') ?? ''} onChange={(event) => setFilter('type', event.target.value)}><option value="">Все операции</option><option value="provision">Provision</option><option value="suspend">Suspend</option><option value="unsuspend">Unsuspend</option><option value="revoke">Revoke</option><option value="refresh_inventory">Inventory</option><option value="audit_drift">Drift audit</option></select></label></div></section><section className="panel"><header className="panel__header"><div><h2>Журнал операций</h2><p>Автообновление каждые 15 секунд</p></div></header>{query.isLoading ? <PageLoading /> : query.isError ? <ErrorState error={query.error} retry={() => void query.refetch()} /> : query.data!.items.length ? <><DataTable label="VPN-операции" columns={columns} rows={query.data!.items} rowKey={(row) => row.id} /><Pagination offset={query.data!.offset} limit={query.data!.limit} total={query.data!.total} onChange={(nextOffset) => setParams(withParam(params, 'offset', nextOffset ? String(nextOffset) : ''))} /></> : <EmptyState title="Операций нет" description="Очередь и история операций пусты." />}</section></>
+  return <><PageHeader eyebrow="Очередь" title="VPN-операции" description="Provisioning, suspend, revoke, inventory и действия с серверами." /><section className="filter-bar filter-bar--simple"><div className="filter-controls"><label>Статус <select value={params.get('status') ?? ''} onChange={(event) => setFilter('status', event.target.value)}><option value="">Все</option><option value="pending">В очереди</option><option value="running">Выполняются</option><option value="succeeded">Завершены</option><option value="failed">Ошибки</option></select></label><label>Тип <select value={params.get('type') ?? ''} onChange={(event) => setFilter('type', event.target.value)}><option value="">Все операции</option><option value="provision">Provision</option><option value="suspend">Suspend</option><option value="unsuspend">Unsuspend</option><option value="revoke">Revoke</option><option value="refresh_inventory">Inventory</option><option value="audit_drift">Drift audit</option><option value="fleet_audit_drift">Fleet drift audit</option></select></label></div></section><section className="panel"><header className="panel__header"><div><h2>Журнал операций</h2><p>Автообновление каждые 15 секунд</p></div></header>{query.isLoading ? <PageLoading /> : query.isError ? <ErrorState error={query.error} retry={() => void query.refetch()} /> : query.data!.items.length ? <><DataTable label="VPN-операции" columns={columns} rows={query.data!.items} rowKey={(row) => row.id} /><Pagination offset={query.data!.offset} limit={query.data!.limit} total={query.data!.total} onChange={(nextOffset) => setParams(withParam(params, 'offset', nextOffset ? String(nextOffset) : ''))} /></> : <EmptyState title="Операций нет" description="Очередь и история операций пусты." />}</section></>
 }
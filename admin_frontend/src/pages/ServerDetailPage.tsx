@@ -167,6 +167,7 @@ export function ServerDetailPage() {
                 <Metric label="Сертификат до" value={formatDateTime(nodeStatus?.certificate_expires_at)} />
                 <Metric label="Manager version" value={nodeStatus?.manager_version || '—'} />
                 <Metric label="Inventory revision" value={nodeStatus?.inventory_revision || node.inventory_revision || '—'} />
+                <Metric label="Circuit breaker (admin-процесс)" value={<CircuitBadge circuit={node.manager_circuit} />} />
               </dl>
             </div>}
           </section>
@@ -266,6 +267,19 @@ function Gauge({ label, value }: { label: string; value?: number }) {
   return <div className="metric-gauge"><div className={`metric-gauge__ring metric-gauge__ring--${tone}`} style={{ '--progress': `${normalized * 3.6}deg` } as CSSProperties}><span>{value === undefined ? '—' : percent(normalized)}</span></div><strong>{label}</strong></div>
 }
 
+const circuitBadge: Record<string, [string, string]> = {
+  closed: ['healthy', 'Закрыт'],
+  half_open: ['degraded', 'Пробный запрос'],
+  open: ['unreachable', 'Открыт'],
+}
+
+function CircuitBadge({ circuit }: { circuit?: Server['manager_circuit'] }) {
+  if (!circuit) return <>—</>
+  const [tone, label] = circuitBadge[circuit.state] ?? ['unknown', circuit.state]
+  const retry = circuit.retry_after_seconds != null ? ` · повтор через ${Math.ceil(circuit.retry_after_seconds)} с` : ''
+  return <><StatusBadge value={tone} label={label} />{circuit.consecutive_failures > 0 && <small>{` ${formatNumber(circuit.consecutive_failures)} ошибок подряд${retry}`}</small>}</>
+}
+
 function Metric({ label, value }: { label: string; value: ReactNode }) {
   return <div><dt>{label}</dt><dd>{value}</dd></div>
 }
@@ -1,8 +1,8 @@
 import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query'
-import { ArrowRight, MapPin, Plus, Search, ServerCog } from 'lucide-react'
-import { useState, type FormEvent } from 'react'
+import { ArrowRight, GitCompareArrows, MapPin, Plus, Search, ServerCog } from 'lucide-react'
+import { useEffect, useState, type FormEvent } from 'react'
 import { Link, useSearchParams } from 'react-router-dom'
-import { serversApi, type ServerCreateInput } from '../api'
+import { serversApi, type FleetDriftAuditServer, type FleetDriftAuditSummary, type ServerCreateInput } from '../api'
 import { useAuth } from '../auth/AuthProvider'
 import { Modal } from '../components/Modal'
 import { PageHeader } from '../components/PageHeader'
@@ -18,13 +18,15 @@ export function ServersPage() {
   const [params, setParams] = useSearchParams()
   const [search, setSearch] = useState(params.get('q') ?? '')
   const [createOpen, setCreateOpen] = useState(false)
+  const [driftOpen, setDriftOpen] = useState(false)
   const offset = Number(params.get('offset') ?? 0)
   const filters = { q: params.get('q') ?? undefined, status: params.get('status') ?? undefined, location: params.get('location') ?? undefined, limit: 24, offset }
   const query = useQuery({ queryKey: ['servers', filters], queryFn: () => serversApi.list(filters), refetchInterval: 60_000, placeholderData: (previous) => previous })
   const setFilter = (key: string, value: string) => setParams(withParam(params, key, value, true))
   const submit = (event: FormEvent) => { event.preventDefault(); setFilter('q', search.trim()) }
   return <>
-    <PageHeader eyebrow="Инфраструктура" title="VPN-серверы" description="Capacity, health, inventory и безопасные операции управления." actions={canManage && <button className="button button--primary" type="button" onClick={() => setCreateOpen(true)}><Plus size={17} /> Добавить сервер</button>} />
+    <PageHeader eyebrow="Инфраструктура" title="VPN-серверы" description="Capacity, health, inventory и безопасные операции управления." actions={canManage && <><button className="button button--secondary" type="button" onClick={() => setDriftOpen(true)}><GitCompareArrows size={17} /> Drift по флоту</button><button className="button button--primary" type="button" onClick={() => setCreateOpen(true)}><Plus size={17} /> Добавить сервер</button></>} />
+    {driftOpen && <FleetDriftAuditPanel />}
     <section className="filter-bar"><form className="search-box" role="search" onSubmit={submit}><Search /><input aria-label="Поиск серверов" value={search} onChange={(event) => setSearch(event.target.value)} placeholder="Название, регион, IP или endpoint" /><button className="button button--primary button--small" type="submit">Найти</button></form><label className="inline-select">Состояние <select value={params.get('status') ?? ''} onChange={(event) => setFilter('status', event.target.value)}><option value="">Все серверы</option><option value="active">Активные</option><option value="draining">Drain</option><option value="disabled">Отключённые</option><option value="unhealthy">С ошибкой</option></select></label></section>
     {query.isLoading ? <PageLoading /> : query.isError ? <ErrorState error={query.error} retry={() => void query.refetch()} /> : query.data!.items.length ? <><section className="server-grid">{query.data!.items.map((server) => {
       const active = server.active_configs ?? server.configs_count ?? 0
@@ -36,6 +38,26 @@ export function ServersPage() {
   </>
 }
 
+function FleetDriftAuditPanel() {
+  const [actionId, setActionId] = useState<string>()
+  const [servers, setServers] = useState<FleetDriftAuditServer[]>([])
+  const [summary, setSummary] = useState<FleetDriftAuditSummary>()
+  const start = useMutation({ mutationFn: () => serversApi.startDriftAudit('fleet drift audit from admin console'), onSuccess: (operation) => { setServers([]); setSummary(undefined); setActionId(String(operation.id)) } })
+  useEffect(() => {
+    if (!actionId) return
+    const events = serversApi.driftAuditEvents(actionId)
+    events.addEventListener('server', (event) => {
+      const entry = JSON.parse((event as MessageEvent<string>).data) as FleetDriftAuditServer
+      setServers((current) => current.some((item) => item.sequence === entry.sequence) ? current : [...current, entry])
+    })
+    events.addEventListener('done', (event) => { setSummary(JSON.parse((event as MessageEvent<string>).data) as FleetDriftAuditSummary); events.close() })
+    return () => events.close()
+  }, [actionId])
+  // Critical findings (live clients unknown to the Hub) surface first, in arrival order.
+  const critical = servers.flatMap((server) => server.findings.filter((item) => item.severity === 'critical').map((item) => ({ server, item })))
+  return <section className="panel"><header className="panel__header"><div><h2>Drift-аудит флота</h2><p>{actionId ? `Проверено ${servers.length}${summary ? ` из ${summary.servers_total}` : ''} серверов, ошибок ${servers.filter((item) => item.status === 'failed').length}` : 'Параллельная проверка inventory всех серверов без автоматического исправления'}</p></div><button className="button button--primary button--small" type="button" disabled={start.isPending || (!!actionId && !summary)} onClick={() => start.mutate()}>{actionId && !summary ? 'Проверяем…' : 'Запустить'}</button></header>{start.isError && <div className="form-error" role="alert">{start.error instanceof Error ? start.error.message : 'Не удалось запустить аудит'}</div>}{critical.length > 0 && <div className="drift-list">{critical.map(({ server, item }) => <div key={`${server.server_id}-${item.name}`}><StatusBadge value={item.severity} /><span><strong>{server.name}: {item.name}</strong><small>{item.message}</small></span></div>)}</div>}{servers.length > 0 && <div className="drift-list">{servers.map((server) => <div key={server.sequence}><StatusBadge value={server.status === 'failed' ? 'failed' : server.finding_count ? 'warning' : 'healthy'} /><span><strong><Link to={`/servers/${server.server_id}`}>{server.name}</Link></strong><small>{server.status === 'failed' ? server.error_code : `Расхождений: ${server.finding_count}, критичных: ${server.critical_count}`}</small></span></div>)}</div>}</section>
+}
+
 function CreateServerDialog({ onClose }: { onClose: () => void }) {
   const queryClient = useQueryClient()
   const [validation, setValidation] = useState('')
@@ -0,0 +1,53 @@
+"""store the last audited Manager inventory per server
+
+Revision ID: a3f5c7e9b1d2
+Revises: c7d2e8f1a904
+Create Date: 2026-10-18 14:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "a3f5c7e9b1d2"
+down_revision: Union[str, None] = "c7d2e8f1a904"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vpn_inventory_snapshot",
+        sa.Column("server_id", sa.Integer(), nullable=False),
+        sa.Column("revision", sa.String(length=160), nullable=False),
+        sa.Column("etag", sa.String(length=255), nullable=True),
+        sa.Column("clients", sa.JSON(), nullable=False),
+        sa.Column("hub_configs", sa.JSON(), nullable=False),
+        sa.Column("findings", sa.JSON(), nullable=False),
+        sa.Column("hub_watermark", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("full_audit_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["server_id"], ["server.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("server_id"),
+    )
+    op.create_index(
+        "ix_vpn_config_server_id_updated_at",
+        "vpn_config",
+        ["server_id", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    # Snapshots are a cache: the next audit after an upgrade starts with a
+    # full comparison again.
+    op.drop_index("ix_vpn_config_server_id_updated_at", table_name="vpn_config")
+    op.drop_table("vpn_inventory_snapshot")
@@ -0,0 +1,84 @@
+"""add resumable user-ID shards to billing runs
+
+Revision ID: b5c8e2f4a610
+Revises: e9f1a2b3c4d5
+Create Date: 2026-10-18 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "b5c8e2f4a610"
+down_revision: Union[str, None] = "e9f1a2b3c4d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "billing_run_shard",
+        sa.Column("billing_run_id", sa.Integer(), nullable=False),
+        sa.Column("shard_index", sa.Integer(), nullable=False),
+        sa.Column("first_user_id", sa.Integer(), nullable=True),
+        sa.Column("last_user_id", sa.Integer(), nullable=True),
+        sa.Column(
+            "status",
+            sa.String(length=24),
+            nullable=False,
+            server_default="pending",
+        ),
+        sa.Column(
+            "charged_users", sa.Integer(), nullable=False, server_default="0"
+        ),
+        sa.Column(
+            "total_amount",
+            sa.Numeric(18, 2),
+            nullable=False,
+            server_default="0.00",
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.CheckConstraint(
+            "status IN ('pending', 'completed')",
+            name="ck_billing_run_shard_status",
+        ),
+        sa.CheckConstraint(
+            "first_user_id IS NULL OR last_user_id IS NULL "
+            "OR last_user_id >= first_user_id",
+            name="ck_billing_run_shard_valid_range",
+        ),
+        sa.ForeignKeyConstraint(
+            ["billing_run_id"], ["billing_run.id"], ondelete="RESTRICT"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "billing_run_id", "shard_index", name="uq_billing_run_shard_index"
+        ),
+    )
+    op.create_index(
+        "ix_billing_run_shard_run_status",
+        "billing_run_shard",
+        ["billing_run_id", "status"],
+    )
+
+
+def downgrade() -> None:
+    pending = op.get_bind().scalar(
+        sa.text("SELECT count(*) FROM billing_run_shard WHERE status = 'pending'")
+    )
+    if pending:
+        raise RuntimeError(
+            "Unsafe billing shard downgrade refused while a billing run is resuming"
+        )
+
+    op.drop_index("ix_billing_run_shard_run_status", table_name="billing_run_shard")
+    op.drop_table("billing_run_shard")
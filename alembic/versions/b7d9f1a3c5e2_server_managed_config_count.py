@@ -0,0 +1,60 @@
+"""maintain a managed-config counter on the server row
+
+Revision ID: b7d9f1a3c5e2
+Revises: e8a1c3f5b7d9
+Create Date: 2026-10-18 18:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "b7d9f1a3c5e2"
+down_revision: Union[str, None] = "e8a1c3f5b7d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("server") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "managed_config_count",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+    # Same predicate as core.db.models.config.managed_config_condition.
+    server = sa.table(
+        "server",
+        sa.column("id", sa.Integer()),
+        sa.column("managed_config_count", sa.Integer()),
+    )
+    config = sa.table(
+        "vpn_config",
+        sa.column("id", sa.Integer()),
+        sa.column("server_id", sa.Integer()),
+        sa.column("desired_state", sa.String()),
+        sa.column("actual_state", sa.String()),
+    )
+    managed = (
+        sa.select(sa.func.count(config.c.id))
+        .where(
+            config.c.server_id == server.c.id,
+            sa.or_(
+                config.c.desired_state != "revoked",
+                config.c.actual_state != "revoked",
+            ),
+        )
+        .scalar_subquery()
+    )
+    op.execute(server.update().values(managed_config_count=managed))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("server") as batch_op:
+        batch_op.drop_column("managed_config_count")
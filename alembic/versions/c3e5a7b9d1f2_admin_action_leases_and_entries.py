@@ -0,0 +1,128 @@
+"""lease worker-run admin actions and record their progress as entries
+
+Revision ID: c3e5a7b9d1f2
+Revises: f2a4c6e8b0d1
+Create Date: 2026-10-18 22:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "c3e5a7b9d1f2"
+down_revision: Union[str, None] = "f2a4c6e8b0d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("admin_action") as batch_op:
+        batch_op.add_column(sa.Column("lease_token", sa.String(36), nullable=True))
+        batch_op.add_column(
+            sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    op.create_table(
+        "admin_action_entry",
+        sa.Column("admin_action_id", sa.Integer(), nullable=False),
+        sa.Column("sequence", sa.Integer(), nullable=False),
+        sa.Column("server_id", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("finding_count", sa.Integer(), nullable=False),
+        sa.Column("critical_count", sa.Integer(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.CheckConstraint(
+            "status IN ('succeeded', 'failed')",
+            name="ck_admin_action_entry_status",
+        ),
+        sa.ForeignKeyConstraint(
+            ["admin_action_id"], ["admin_action.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["server_id"], ["server.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "admin_action_id", "sequence", name="uq_admin_action_entry_sequence"
+        ),
+        sa.UniqueConstraint(
+            "admin_action_id", "server_id", name="uq_admin_action_entry_server"
+        ),
+    )
+
+    # Move the per-server progress of earlier fleet audits out of the action
+    # result, which keeps only the totals from now on.
+    action = sa.table(
+        "admin_action",
+        sa.column("id", sa.Integer()),
+        sa.column("kind", sa.String()),
+        sa.column("result", sa.JSON()),
+    )
+    entry = sa.table(
+        "admin_action_entry",
+        sa.column("admin_action_id", sa.Integer()),
+        sa.column("sequence", sa.Integer()),
+        sa.column("server_id", sa.Integer()),
+        sa.column("status", sa.String()),
+        sa.column("finding_count", sa.Integer()),
+        sa.column("critical_count", sa.Integer()),
+        sa.column("data", sa.JSON()),
+    )
+    server = sa.table("server", sa.column("id", sa.Integer()))
+    connection = op.get_bind()
+    server_ids = set(connection.scalars(sa.select(server.c.id)))
+    audits = connection.execute(
+        sa.select(action.c.id, action.c.result).where(
+            action.c.kind == "fleet_audit_drift"
+        )
+    ).all()
+    for action_id, result in audits:
+        servers = (result or {}).pop("servers", None)
+        if servers is None:
+            continue
+        if servers:
+            connection.execute(
+                sa.insert(entry),
+                [
+                    {
+                        "admin_action_id": action_id,
+                        "sequence": item["sequence"],
+                        "server_id": (
+                            item["server_id"]
+                            if item.get("server_id") in server_ids
+                            else None
+                        ),
+                        "status": item["status"],
+                        "finding_count": item.get("finding_count", 0),
+                        "critical_count": item.get("critical_count", 0),
+                        "data": {
+                            key: value
+                            for key, value in item.items()
+                            if key != "sequence"
+                        },
+                    }
+                    for item in servers
+                ],
+            )
+        connection.execute(
+            sa.update(action).where(action.c.id == action_id).values(result=result)
+        )
+
+
+def downgrade() -> None:
+    # Entries are not folded back into the action results; the totals remain.
+    op.drop_table("admin_action_entry")
+    with op.batch_alter_table("admin_action") as batch_op:
+        batch_op.drop_column("attempts")
+        batch_op.drop_column("lease_expires_at")
+        batch_op.drop_column("lease_token")
@@ -0,0 +1,72 @@
+"""queue rejected provisions awaiting a reservation refund
+
+Revision ID: c7d2e8f1a904
+Revises: b5c8e2f4a610
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "c7d2e8f1a904"
+down_revision: Union[str, None] = "b5c8e2f4a610"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pending_config_refund",
+        sa.Column("operation_id", sa.String(length=36), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("operation_id"),
+    )
+    op.create_index(
+        "ix_ledger_entry_reference",
+        "ledger_entry",
+        ["reference_type", "reference_id"],
+    )
+    # Queue every rejected provision whose reservation has not been refunded
+    # yet; already compensated history is never visited again.
+    op.execute(
+        """
+        INSERT INTO pending_config_refund (operation_id)
+        SELECT DISTINCT vpn_operation.operation_id
+        FROM vpn_operation
+        JOIN ledger_entry AS reservation
+          ON reservation.reference_type = 'vpn_operation'
+         AND reservation.reference_id = vpn_operation.operation_id
+         AND reservation.kind = 'config_reservation'
+         AND reservation.amount < 0
+        WHERE vpn_operation.kind = 'provision'
+          AND vpn_operation.status = 'rejected'
+          AND NOT EXISTS (
+              SELECT 1 FROM ledger_entry AS refund
+              WHERE refund.idempotency_key
+                  = 'config-refund:' || reservation.idempotency_key
+          )
+        """
+    )
+
+
+def downgrade() -> None:
+    pending = op.get_bind().scalar(
+        sa.text("SELECT count(*) FROM pending_config_refund")
+    )
+    if pending:
+        raise RuntimeError(
+            "Unsafe refund queue downgrade refused while refunds are pending"
+        )
+
+    op.drop_index("ix_ledger_entry_reference", table_name="ledger_entry")
+    op.drop_table("pending_config_refund")
@@ -0,0 +1,116 @@
+"""store observed Manager health on the server row
+
+Revision ID: e8a1c3f5b7d9
+Revises: a3f5c7e9b1d2
+Create Date: 2026-10-18 16:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "e8a1c3f5b7d9"
+down_revision: Union[str, None] = "a3f5c7e9b1d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _observed_health(row) -> str:
+    # Mirrors AdminFleetService._observed_health at the time of writing.
+    if not row.success:
+        return "unreachable"
+    if (
+        row.manager_instance_id
+        and row.server_instance_id
+        and row.manager_instance_id != row.server_instance_id
+    ):
+        return "instance_mismatch"
+    snapshot = row.snapshot if isinstance(row.snapshot, dict) else {}
+    readiness = snapshot.get("readiness", {})
+    plane = snapshot.get("data_plane", {})
+    if readiness and not readiness.get("ready", False):
+        return "unhealthy"
+    if plane and plane.get("status") != "up":
+        return "unhealthy"
+    return "healthy"
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("server") as batch:
+        batch.add_column(
+            sa.Column(
+                "health_state",
+                sa.String(length=32),
+                nullable=False,
+                server_default="unknown",
+            )
+        )
+        batch.add_column(
+            sa.Column("health_checked_at", sa.DateTime(timezone=True), nullable=True)
+        )
+        batch.create_check_constraint(
+            "ck_server_health_state",
+            "health_state IN ('unknown', 'unreachable', 'instance_mismatch', "
+            "'unhealthy', 'healthy')",
+        )
+        batch.create_index(
+            "ix_server_health_state", ["health_state", "health_checked_at"]
+        )
+
+    # Backfill from each server's newest status snapshot so health filters
+    # are right before the next poll.
+    server = sa.table(
+        "server",
+        sa.column("id", sa.Integer()),
+        sa.column("manager_instance_id", sa.String()),
+        sa.column("health_state", sa.String()),
+        sa.column("health_checked_at", sa.DateTime(timezone=True)),
+    )
+    status = sa.table(
+        "vpn_server_status",
+        sa.column("id", sa.Integer()),
+        sa.column("server_id", sa.Integer()),
+        sa.column("kind", sa.String()),
+        sa.column("success", sa.Boolean()),
+        sa.column("snapshot", sa.JSON()),
+        sa.column("manager_instance_id", sa.String()),
+        sa.column("collected_at", sa.DateTime(timezone=True)),
+    )
+    newest = (
+        sa.select(status.c.id)
+        .where(status.c.server_id == server.c.id, status.c.kind == "status")
+        .order_by(status.c.collected_at.desc(), status.c.id.desc())
+        .limit(1)
+        .correlate(server)
+        .scalar_subquery()
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(
+            server.c.id,
+            server.c.manager_instance_id.label("server_instance_id"),
+            status.c.success,
+            status.c.snapshot,
+            status.c.manager_instance_id,
+            status.c.collected_at,
+        ).select_from(server.join(status, status.c.id == newest))
+    ).all()
+    for row in rows:
+        connection.execute(
+            sa.update(server)
+            .where(server.c.id == row.id)
+            .values(
+                health_state=_observed_health(row),
+                health_checked_at=row.collected_at,
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("server") as batch:
+        batch.drop_index("ix_server_health_state")
+        batch.drop_constraint("ck_server_health_state", type_="check")
+        batch.drop_column("health_checked_at")
+        batch.drop_column("health_state")
@@ -0,0 +1,63 @@
+"""downsample fleet status history into time-bounded rollups
+
+Revision ID: f2a4c6e8b0d1
+Revises: b7d9f1a3c5e2
+Create Date: 2026-10-18 20:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "f2a4c6e8b0d1"
+down_revision: Union[str, None] = "b7d9f1a3c5e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vpn_server_status_rollup",
+        sa.Column("server_id", sa.Integer(), nullable=False),
+        sa.Column("resolution", sa.String(length=8), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("reachable_samples", sa.Integer(), nullable=False),
+        sa.Column("ready_samples", sa.Integer(), nullable=False),
+        sa.Column("readiness_flaps", sa.Integer(), nullable=False),
+        sa.Column("session_samples", sa.Integer(), nullable=False),
+        sa.Column("sessions_sum", sa.BigInteger(), nullable=False),
+        sa.Column("sessions_min", sa.Integer(), nullable=True),
+        sa.Column("sessions_max", sa.Integer(), nullable=True),
+        sa.Column("bytes_received", sa.BigInteger(), nullable=False),
+        sa.Column("bytes_sent", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.CheckConstraint(
+            "resolution IN ('5m', '1h', '1d')",
+            name="ck_vpn_server_status_rollup_resolution",
+        ),
+        sa.ForeignKeyConstraint(["server_id"], ["server.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "server_id",
+            "resolution",
+            "bucket_start",
+            name="uq_vpn_server_status_rollup_bucket",
+        ),
+    )
+    op.create_index(
+        "ix_vpn_server_status_rollup_resolution_bucket",
+        "vpn_server_status_rollup",
+        ["resolution", "bucket_start"],
+    )
+
+
+def downgrade() -> None:
+    # Rollups are derived data; raw samples already pruned are not restored.
+    op.drop_index(
+        "ix_vpn_server_status_rollup_resolution_bucket",
+        table_name="vpn_server_status_rollup",
+    )
+    op.drop_table("vpn_server_status_rollup")
@@ -3,12 +3,29 @@ import logging
 import time
 from collections.abc import Awaitable, Callable
 
+from redis import Redis
+from rq import Queue, get_current_job
+
 from core.config import settings
 from core.db.unit_of_work import uow
-from core.observability import observe_background_job, observe_outbox_publish
-from core.services import BillingService
+from core.observability import (
+    observe_background_job,
+    observe_managed_config_count_repairs,
+    observe_status_rollup,
+)
+from core.services import (
+    BillingService,
+    FleetDriftAuditService,
+    ServerService,
+    StatusRollupService,
+)
+from core.services.fleet_drift_audit import enqueue_fleet_drift_audit
+from core.services.manager_clients import manager_clients
 from core.services.notifications import NotificationService
 
+from .job_runtime import current_runtime
+from .outbox_publisher import OutboxPublisher
+
 logger = logging.getLogger(__name__)
 
 REFERRAL_RECONCILE_BATCH_SIZE = 100
@@ -19,46 +36,66 @@ async def _charge_all_and_notify_async() -> bool:
         return False
 
     billing = BillingService(uow, per_config_cost=settings.per_config_cost)
-    await billing.charge_all()
+    # A crashed worker leaves its period running with pending shards; finish
+    # those before claiming the current period.
+    await billing.resume_billing_periods()
+    period_key = await billing.start_billing_period()
+    if period_key is not None:
+        _enqueue_billing_shard_helpers(period_key)
+        await billing.charge_billing_shards(period_key)
     await _publish_notification_outbox_async()
     return True
 
 
-async def _publish_notification_outbox_async(*, limit: int = 20) -> int:
-    """Move committed PostgreSQL outbox rows into Redis without loss."""
+async def _charge_billing_shards_async(period_key: str) -> bool:
+    if settings.maintenance_mode or not settings.billing_enabled:
+        return False
+
+    billing = BillingService(uow, per_config_cost=settings.per_config_cost)
+    await billing.charge_billing_shards(period_key)
+    return True
+
+
+def _enqueue_billing_shard_helpers(period_key: str) -> None:
+    """Let idle billing workers drain shards of the same period in parallel."""
+
+    helpers = settings.billing_shard_workers - 1
+    if helpers <= 0:
+        return
+    try:
+        queue = Queue("billing", connection=Redis.from_url(settings.redis_url))
+        for _index in range(helpers):
+            queue.enqueue(charge_billing_shards, period_key)
+    except Exception:
+        # The enqueuing job drains every shard itself; helpers only add speed.
+        logger.exception(
+            "Failed to enqueue parallel billing shard jobs",
+            extra={"period_key": period_key},
+        )
+
+
+async def _publish_notification_outbox_async(*, limit: int | None = None) -> int:
+    """Sweep committed PostgreSQL outbox rows into Redis without loss.
+
+    The continuous publisher normally drains the outbox as soon as rows
+    commit; this scheduled sweep is the safety net when it is not running.
+    """
 
     if not settings.notifications_enabled:
         return 0
 
-    notifications = NotificationService()
-    published = 0
-    async with uow() as repos:
-        billing_repo = repos["billing"]
-        items = await billing_repo.claim_notification_outbox(limit=limit)
-        for item in items:
-            try:
-                await notifications.enqueue(
-                    item.chat_id,
-                    item.text,
-                    notification_id=item.dedupe_key,
-                )
-            except Exception as exc:
-                observe_outbox_publish("error")
-                logger.exception(
-                    "Failed to publish billing notification outbox row",
-                    extra={"outbox_id": item.id},
-                )
-                await billing_repo.mark_notification_retry(
-                    item,
-                    f"{type(exc).__name__}: {exc}",
-                )
-            else:
-                # enqueue() returning False means the stable ID was already
-                # published before a prior process crashed; that is success.
-                await billing_repo.mark_notification_published(item)
-                observe_outbox_publish("published")
-                published += 1
-    return published
+    publisher = OutboxPublisher(uow, _notification_service())
+    if limit is not None:
+        return await publisher.publish_batch(limit)
+    return await publisher.drain()
+
+
+def _notification_service() -> NotificationService:
+    runtime = current_runtime()
+    if runtime is None:
+        return NotificationService()
+    # Keep one Redis connection pool on the worker's persistent loop.
+    return runtime.shared("notifications", NotificationService)
 
 
 async def _reconcile_vpn_operations_async() -> bool:
@@ -82,6 +119,64 @@ async def _reconcile_referral_rewards_async(
     return True
 
 
+async def _check_managed_config_counts_async() -> bool:
+    """Rebuild per-server managed-config counters that disagree with configs."""
+
+    if settings.maintenance_mode:
+        return False
+
+    drift = await ServerService(uow).check_managed_config_counts(repair=True)
+    for item in drift:
+        logger.warning(
+            "Repaired a server managed-config counter",
+            extra={
+                "server_id": item.server_id,
+                "stored": item.stored,
+                "counted": item.counted,
+            },
+        )
+    observe_managed_config_count_repairs(len(drift))
+    return True
+
+
+async def _roll_up_server_status_async() -> bool:
+    """Downsample fleet status samples and apply their time-bounded retention."""
+
+    if settings.maintenance_mode:
+        return False
+
+    result = await StatusRollupService(uow).roll_up()
+    for resolution in ("raw", *result.buckets):
+        observe_status_rollup(
+            resolution,
+            buckets=result.buckets.get(resolution, 0),
+            pruned=result.pruned[resolution],
+        )
+    return True
+
+
+async def _run_fleet_drift_audit_async(action_id: str) -> bool:
+    """Audit the servers of a staged fleet drift audit under its lease."""
+
+    return await FleetDriftAuditService(uow).run(action_id)
+
+
+async def _recover_fleet_drift_audits_async() -> int:
+    """Queue abandoned fleet drift audits again, or fail those out of attempts."""
+
+    action_ids = await FleetDriftAuditService(uow).recover_abandoned()
+    for action_id in action_ids:
+        enqueue_fleet_drift_audit(action_id)
+    return len(action_ids)
+
+
+async def _run_and_close_clients(function: Callable[[], Awaitable[object]]) -> object:
+    try:
+        return await function()
+    finally:
+        await manager_clients.aclose()
+
+
 def _run_observed_job(
     name: str,
     function: Callable[[], Awaitable[object]],
@@ -89,7 +184,16 @@ def _run_observed_job(
     started = time.monotonic()
     outcome = "error"
     try:
-        result = asyncio.run(function())
+        runtime = current_runtime()
+        if runtime is None:
+            result = asyncio.run(_run_and_close_clients(function))
+        else:
+            job = get_current_job()
+            result = runtime.run(
+                name,
+                function,
+                enqueued_at=job.enqueued_at if job is not None else None,
+            )
         outcome = "skipped" if result is False else "success"
         return result
     finally:
@@ -101,6 +205,14 @@ def charge_all_and_notify() -> None:
     _run_observed_job("billing", _charge_all_and_notify_async)
 
 
+def charge_billing_shards(period_key: str) -> None:
+    """Synchronously help drain the shards of a started period for RQ."""
+
+    _run_observed_job(
+        "billing_shards", lambda: _charge_billing_shards_async(period_key)
+    )
+
+
 def reconcile_vpn_operations() -> None:
     """Synchronously reconcile durable VPN operations for RQ."""
 
@@ -113,6 +225,32 @@ def reconcile_referral_rewards() -> None:
     _run_observed_job("referral_reconcile", _reconcile_referral_rewards_async)
 
 
+def check_managed_config_counts() -> None:
+    """Synchronously check per-server managed-config counters for RQ."""
+
+    _run_observed_job("config_count_check", _check_managed_config_counts_async)
+
+
+def roll_up_server_status() -> None:
+    """Synchronously roll up fleet status history for RQ."""
+
+    _run_observed_job("status_rollup", _roll_up_server_status_async)
+
+
+def run_fleet_drift_audit(action_id: str) -> None:
+    """Synchronously run a queued fleet drift audit for RQ."""
+
+    _run_observed_job(
+        "fleet_drift_audit", lambda: _run_fleet_drift_audit_async(action_id)
+    )
+
+
+def recover_fleet_drift_audits() -> None:
+    """Synchronously take over or fail abandoned fleet drift audits for RQ."""
+
+    _run_observed_job("fleet_drift_audit_recovery", _recover_fleet_drift_audits_async)
+
+
 def publish_notification_outbox() -> None:
     """Synchronously publish pending outbox rows for RQ."""
 
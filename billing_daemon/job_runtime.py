@@ -0,0 +1,144 @@
+"""Long-lived asyncio runtime shared by consecutive in-process RQ jobs.
+
+The default RQ worker forks a work horse and every job used to call
+``asyncio.run``, so the SQLAlchemy pool, the Redis client and any Manager
+connections were rebuilt for each job. A :class:`JobRuntime` keeps one event
+loop open for the life of the worker process; pools bound to that loop stay
+warm between jobs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.observability import observe_job_runtime
+from core.services.manager_clients import manager_clients
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_current: JobRuntime | None = None
+
+
+def current_runtime() -> JobRuntime | None:
+    """Return the runtime installed by the worker, if jobs run in-process."""
+
+    return _current
+
+
+class JobRuntime:
+    """One event loop plus shared, loop-bound clients reused across jobs."""
+
+    def __init__(self, engine: AsyncEngine | None = None) -> None:
+        if engine is None:
+            from core.db import engine
+        self._engine = engine
+        self._runner = asyncio.Runner()
+        self._resources: dict[str, object] = {}
+        self._checkouts = 0
+        self._connects = 0
+
+    def __enter__(self) -> JobRuntime:
+        global _current
+        if _current is not None:
+            raise RuntimeError("A job runtime is already installed")
+        event.listen(self._engine.sync_engine, "checkout", self._on_checkout)
+        event.listen(self._engine.sync_engine, "connect", self._on_connect)
+        _current = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        global _current
+        _current = None
+        try:
+            self._runner.run(self._aclose())
+        finally:
+            self._runner.close()
+            event.remove(self._engine.sync_engine, "checkout", self._on_checkout)
+            event.remove(self._engine.sync_engine, "connect", self._on_connect)
+
+    def run(
+        self,
+        name: str,
+        function: Callable[[], Awaitable[T]],
+        *,
+        enqueued_at: datetime | None = None,
+    ) -> T:
+        """Run one job on the persistent loop and report its pool usage.
+
+        A job interrupted by an RQ timeout is cancelled before the exception
+        propagates, so no half-finished task resumes during the next job.
+        """
+
+        checkouts, connects = self._checkouts, self._connects
+        queue_seconds = None
+        if enqueued_at is not None:
+            if enqueued_at.tzinfo is None:
+                enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+            queue_seconds = (datetime.now(timezone.utc) - enqueued_at).total_seconds()
+        loop = self._runner.get_loop()
+        task = loop.create_task(function())
+        started = time.monotonic()
+        try:
+            return loop.run_until_complete(task)
+        except BaseException:
+            if not task.done():
+                task.cancel()
+                try:
+                    loop.run_until_complete(task)
+                except BaseException:
+                    pass
+            raise
+        finally:
+            observe_job_runtime(
+                name,
+                checkouts=self._checkouts - checkouts,
+                connects=self._connects - connects,
+                run_seconds=time.monotonic() - started,
+                queue_seconds=queue_seconds,
+            )
+
+    def shared(self, key: str, factory: Callable[[], T]) -> T:
+        """Return a client created once on this loop and reused by later jobs."""
+
+        if key not in self._resources:
+            self._resources[key] = factory()
+        return self._resources[key]
+
+    @property
+    def pool_checkouts(self) -> int:
+        return self._checkouts
+
+    @property
+    def pool_connects(self) -> int:
+        return self._connects
+
+    async def _aclose(self) -> None:
+        for key, resource in self._resources.items():
+            close = getattr(resource, "aclose", None)
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception:
+                logger.exception(
+                    "Failed to close shared job resource", extra={"resource": key}
+                )
+        self._resources.clear()
+        await manager_clients.aclose()
+        await self._engine.dispose()
+
+    def _on_checkout(self, *_args) -> None:
+        self._checkouts += 1
+
+    def _on_connect(self, *_args) -> None:
+        self._connects += 1
@@ -0,0 +1,291 @@
+"""Continuously move committed notification outbox rows into Redis.
+
+``BillingRepo.add_notification_outbox`` issues ``pg_notify`` in the writer's
+transaction, so the publisher wakes as soon as a batch of notifications
+commits. It drains in adaptive batches: a full batch doubles the next one up to
+``NOTIFICATION_OUTBOX_BATCH_MAX``, a partial one halves it back toward
+``NOTIFICATION_OUTBOX_BATCH_MIN``. Without PostgreSQL (or when a wakeup is
+missed) it still sweeps every ``NOTIFICATION_OUTBOX_IDLE_SECONDS``, which also
+picks up retry backoffs and rows whose Redis visibility window expired. A LISTEN
+connection lost to a database restart or failover is re-established with
+backoff, and each new subscription triggers one catch-up drain.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager, AsyncExitStack, suppress
+from functools import partial
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from core.config import settings
+from core.db.repo.billing import NOTIFICATION_OUTBOX_CHANNEL
+from core.db.unit_of_work import Repositories, uow
+from core.observability import observe_outbox_listener, observe_outbox_publish
+from core.services.notifications import NotificationService
+
+logger = logging.getLogger(__name__)
+
+# Backoff between attempts to re-establish a lost LISTEN connection.
+LISTEN_RETRY_MIN_SECONDS = 1.0
+LISTEN_RETRY_MAX_SECONDS = 60.0
+# A silent network partition never fires asyncpg's termination callback, so
+# after every idle period the subscription must answer a probe within this.
+LISTEN_PROBE_TIMEOUT_SECONDS = 5.0
+
+
+class OutboxPublisher:
+    """Claim outbox pages and publish each one with a single Redis transaction."""
+
+    def __init__(
+        self,
+        unit_of_work: Callable[[], AbstractAsyncContextManager[Repositories]] = uow,
+        notifications: NotificationService | None = None,
+        *,
+        min_batch: int | None = None,
+        max_batch: int | None = None,
+    ) -> None:
+        self._uow = unit_of_work
+        self._notifications = notifications
+        self._min_batch = min_batch or settings.notification_outbox_batch_min
+        self._max_batch = max(
+            self._min_batch, max_batch or settings.notification_outbox_batch_max
+        )
+        self._batch = self._min_batch
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch
+
+    async def publish_batch(self, limit: int) -> int:
+        """Publish one claimed page; return how many rows it contained.
+
+        Rows already marked in Redis by a publisher that crashed before its
+        PostgreSQL commit count as published. If Redis fails, every row of the
+        page is scheduled for retry with its own backoff.
+        """
+
+        if not settings.notifications_enabled:
+            return 0
+        if self._notifications is None:
+            self._notifications = NotificationService()
+        async with self._uow() as repos:
+            billing_repo = repos["billing"]
+            items = await billing_repo.claim_notification_outbox(limit=limit)
+            if not items:
+                return 0
+            try:
+                await self._notifications.enqueue_many(
+                    [(item.dedupe_key, item.chat_id, item.text) for item in items]
+                )
+            except Exception as exc:
+                observe_outbox_publish("error", len(items))
+                logger.exception(
+                    "Failed to publish billing notification outbox batch",
+                    extra={"outbox_ids": [item.id for item in items]},
+                )
+                for item in items:
+                    await billing_repo.mark_notification_retry(
+                        item,
+                        f"{type(exc).__name__}: {exc}",
+                    )
+            else:
+                await billing_repo.mark_notifications_published(items)
+                observe_outbox_publish("published", len(items))
+            return len(items)
+
+    async def drain(self) -> int:
+        """Publish adaptive batches until a page comes back partially filled."""
+
+        drained = 0
+        while True:
+            limit = self._batch
+            published = await self.publish_batch(limit)
+            drained += published
+            if published < limit:
+                self._batch = max(self._min_batch, limit // 2)
+                return drained
+            self._batch = min(self._max_batch, limit * 2)
+
+    async def run(
+        self,
+        *,
+        engine: AsyncEngine | None = None,
+        stop: asyncio.Event | None = None,
+    ) -> None:
+        """Drain on every outbox commit wakeup until ``stop`` is set."""
+
+        stop = stop or asyncio.Event()
+        wakeup = asyncio.Event()
+        async with AsyncExitStack() as stack:
+            if engine is not None and engine.dialect.name == "postgresql":
+                await stack.enter_async_context(_OutboxListener(engine, wakeup))
+            while not stop.is_set():
+                wakeup.clear()
+                try:
+                    await self.drain()
+                except Exception:
+                    logger.exception("Notification outbox drain failed")
+                waiters = [
+                    asyncio.ensure_future(wakeup.wait()),
+                    asyncio.ensure_future(stop.wait()),
+                ]
+                try:
+                    await asyncio.wait(
+                        waiters,
+                        timeout=settings.notification_outbox_idle_seconds,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+
+    async def aclose(self) -> None:
+        if self._notifications is not None:
+            await self._notifications.aclose()
+
+
+class _OutboxListener:
+    """Keep one pooled asyncpg connection subscribed to the outbox channel.
+
+    The subscription is supervised by a background task. A connection that
+    ends (asyncpg's termination callback) or stops answering the idle probe
+    is logged, discarded from the pool and replaced with exponential backoff;
+    until then the publisher falls back to its periodic sweeps.
+    """
+
+    def __init__(self, engine: AsyncEngine, wakeup: asyncio.Event) -> None:
+        self._engine = engine
+        self._wakeup = wakeup
+        self._connection = None
+        self._driver = None
+        self._lost = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> _OutboxListener:
+        self._task = asyncio.create_task(self._supervise())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        await self._release(invalidate=False)
+
+    async def _supervise(self) -> None:
+        delay = LISTEN_RETRY_MIN_SECONDS
+        while True:
+            try:
+                await self._subscribe()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                observe_outbox_listener("failed")
+                logger.warning(
+                    "Outbox LISTEN connection failed; retrying in %.0fs",
+                    delay,
+                    exc_info=True,
+                )
+                await asyncio.sleep(delay)
+                delay = min(LISTEN_RETRY_MAX_SECONDS, delay * 2)
+                continue
+            delay = LISTEN_RETRY_MIN_SECONDS
+            observe_outbox_listener("connected")
+            # Notifications sent while unsubscribed are gone; drain once.
+            self._wakeup.set()
+            await self._wait_until_lost()
+            observe_outbox_listener("lost")
+            logger.warning("Outbox LISTEN connection lost; reconnecting")
+            await self._release(invalidate=True)
+
+    async def _subscribe(self) -> None:
+        self._lost.clear()
+        self._connection = await self._engine.connect()
+        try:
+            raw = await self._connection.get_raw_connection()
+            self._driver = raw.driver_connection
+            self._driver.add_termination_listener(self._terminated)
+            await self._driver.add_listener(NOTIFICATION_OUTBOX_CHANNEL, self._notify)
+        except BaseException:
+            await self._release(invalidate=True)
+            raise
+
+    async def _wait_until_lost(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._lost.wait(),
+                    timeout=settings.notification_outbox_idle_seconds,
+                )
+                return
+            except TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(
+                    self._driver.execute("SELECT 1"),
+                    timeout=LISTEN_PROBE_TIMEOUT_SECONDS,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                return
+
+    async def _release(self, *, invalidate: bool) -> None:
+        connection, driver = self._connection, self._driver
+        self._connection = self._driver = None
+        if connection is None:
+            return
+        try:
+            with suppress(Exception):
+                if invalidate:
+                    # A dead connection must not be handed back to the pool.
+                    await connection.invalidate()
+                elif driver is not None:
+                    driver.remove_termination_listener(self._terminated)
+                    await driver.remove_listener(
+                        NOTIFICATION_OUTBOX_CHANNEL, self._notify
+                    )
+        finally:
+            with suppress(Exception):
+                await connection.close()
+
+    def _notify(self, *_args) -> None:
+        self._wakeup.set()
+
+    def _terminated(self, *_args) -> None:
+        self._lost.set()
+
+
+async def run_outbox_publisher(stop: asyncio.Event | None = None) -> None:
+    """Run the publisher on a dedicated engine until ``stop`` is set."""
+
+    engine = create_async_engine(settings.database_url, echo=settings.sql_echo)
+    maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+    publisher = OutboxPublisher(partial(uow, maker))
+    try:
+        await publisher.run(engine=engine, stop=stop)
+    finally:
+        await publisher.aclose()
+        await engine.dispose()
+
+
+def start_outbox_publisher_thread() -> threading.Thread:
+    """Publish from a daemon thread next to the RQ worker's job loop.
+
+    The thread owns its event loop and database engine, so it never shares
+    loop-bound connections with jobs. Rows claimed when the process exits roll
+    back and are republished; Redis dedupe markers keep that exactly-once.
+    """
+
+    thread = threading.Thread(
+        target=lambda: asyncio.run(run_outbox_publisher()),
+        name="notification-outbox-publisher",
+        daemon=True,
+    )
+    thread.start()
+    return thread
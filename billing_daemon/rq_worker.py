@@ -1,13 +1,33 @@
 from redis import Redis
-from rq import Queue, Worker
+from rq import Queue, SimpleWorker, Worker
 
 from core.config import settings
 
+from .job_runtime import JobRuntime
+from .outbox_publisher import start_outbox_publisher_thread
+
+
+class PersistentAsyncWorker(SimpleWorker):
+    """Run jobs in-process on one event loop that outlives each job.
+
+    Database, Redis and Manager pools bound to that loop stay warm between
+    jobs instead of being rebuilt by a forked work horse every time.
+    """
+
+    def work(self, *args, **kwargs):
+        with JobRuntime():
+            return super().work(*args, **kwargs)
+
 
 def run_worker() -> None:
     redis_conn = Redis.from_url(settings.redis_url)
     queue = Queue("billing", connection=redis_conn)
-    worker = Worker([queue], connection=redis_conn)
+    worker_class = (
+        PersistentAsyncWorker if settings.billing_worker_persistent_loop else Worker
+    )
+    worker = worker_class([queue], connection=redis_conn)
+    if settings.notification_outbox_publisher_enabled:
+        start_outbox_publisher_thread()
     worker.work(logging_level="INFO")
 
 
@@ -8,12 +8,18 @@ from core.config import settings
 
 from .billing_tasks import (
     charge_all_and_notify,
+    check_managed_config_counts,
     publish_notification_outbox,
     reconcile_referral_rewards,
     reconcile_vpn_operations,
+    recover_fleet_drift_audits,
+    roll_up_server_status,
 )
 
 REFERRAL_RECONCILE_INTERVAL = 300
+CONFIG_COUNT_CHECK_INTERVAL = 3600
+STATUS_ROLLUP_INTERVAL = 300
+FLEET_DRIFT_AUDIT_RECOVERY_INTERVAL = 60
 SCHEDULER_POLL_INTERVAL = 30
 
 
@@ -69,6 +75,45 @@ def main() -> None:
             repeat=None,
         )
 
+    if "check_managed_config_counts_job" not in scheduler:
+        now = datetime.now(timezone.utc)
+        next_count_check = (
+            int(now.timestamp()) // CONFIG_COUNT_CHECK_INTERVAL + 1
+        ) * CONFIG_COUNT_CHECK_INTERVAL
+        scheduler.schedule(
+            scheduled_time=datetime.fromtimestamp(next_count_check, tz=timezone.utc),
+            func=check_managed_config_counts,
+            id="check_managed_config_counts_job",
+            interval=CONFIG_COUNT_CHECK_INTERVAL,
+            repeat=None,
+        )
+
+    if "roll_up_server_status_job" not in scheduler:
+        now = datetime.now(timezone.utc)
+        next_rollup = (
+            int(now.timestamp()) // STATUS_ROLLUP_INTERVAL + 1
+        ) * STATUS_ROLLUP_INTERVAL
+        scheduler.schedule(
+            scheduled_time=datetime.fromtimestamp(next_rollup, tz=timezone.utc),
+            func=roll_up_server_status,
+            id="roll_up_server_status_job",
+            interval=STATUS_ROLLUP_INTERVAL,
+            repeat=None,
+        )
+
+    if "recover_fleet_drift_audits_job" not in scheduler:
+        now = datetime.now(timezone.utc)
+        next_recovery = (
+            int(now.timestamp()) // FLEET_DRIFT_AUDIT_RECOVERY_INTERVAL + 1
+        ) * FLEET_DRIFT_AUDIT_RECOVERY_INTERVAL
+        scheduler.schedule(
+            scheduled_time=datetime.fromtimestamp(next_recovery, tz=timezone.utc),
+            func=recover_fleet_drift_audits,
+            id="recover_fleet_drift_audits_job",
+            interval=FLEET_DRIFT_AUDIT_RECOVERY_INTERVAL,
+            repeat=None,
+        )
+
     if "publish_notification_outbox_job" not in scheduler:
         publish_interval = 30
         now = datetime.now(timezone.utc)
@@ -6,7 +6,13 @@ from aiogram.types import BotCommand, BotCommandScopeDefault
 
 from core.config import settings
 from core.db.unit_of_work import uow
-from core.services import BillingService, ConfigService, ServerService, UserService
+from core.services import (
+    BillingService,
+    ConfigService,
+    PlacementEngine,
+    ServerService,
+    UserService,
+)
 
 router = Router()
 router.message.filter(F.chat.type == ChatType.PRIVATE)
@@ -16,6 +22,7 @@ user_service = UserService(uow)
 server_service = ServerService(uow)
 config_service = ConfigService(uow)
 billing_service = BillingService(uow, per_config_cost=settings.per_config_cost)
+placement_engine = PlacementEngine(uow)
 
 AVAILABLE_AMOUNTS = [100, 200, 300, 500]
 
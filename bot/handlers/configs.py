@@ -36,6 +36,7 @@ from .base import (
     billing_service,
     config_service,
     get_or_create_user,
+    placement_engine,
     router,
     server_service,
 )
@@ -43,6 +44,7 @@ from .base import (
 __all__ = [
     "cmd_configs",
     "cmd_create_config",
+    "choose_location",
     "choose_server",
     "got_name",
     "show_config",
@@ -186,8 +188,8 @@ async def _begin_create_config(
         )
         return
 
-    servers = await server_service.list(available_only=True)
-    if not servers:
+    locations = await placement_engine.locations()
+    if not locations:
         if telegram_action_audit is not None:
             telegram_action_audit.record(
                 "vpn.config_create_start",
@@ -200,18 +202,17 @@ async def _begin_create_config(
         )
         return
 
+    # Buttons carry an index into this list: locations are free text and
+    # callback data is limited to 64 bytes.
+    await state.update_data(locations=locations)
     buttons = [
-        [
-            InlineKeyboardButton(
-                text=" ".join([server.location, server.name]),
-                callback_data=f"server:{server.id}",
-            )
-        ]
-        for server in servers
+        [InlineKeyboardButton(text=location, callback_data=f"loc:{index}")]
+        for index, location in enumerate(locations, start=1)
     ]
     await target.answer(
         "➕ <b>Новая конфигурация</b>\n\n"
-        "Выберите ближайший сервер.\n\n"
+        "Выберите ближайшее расположение — бот сам подберёт наименее "
+        "загруженный сервер.\n\n"
         f"Создание — <b>{format_money(settings.config_creation_cost)} ₽</b>.\n"
         "Стоимость VPN — "
         f"<b>около {format_whole_money(estimate_monthly_cost(settings.per_config_cost, settings.billing_interval))} ₽ "
@@ -291,6 +292,63 @@ async def _callback_id(
         return None
 
 
+async def _ask_config_name(callback: CallbackQuery, state: FSMContext) -> None:
+    await callback.message.answer(
+        "📝 <b>Введите название конфигурации</b>\n\n"
+        "Например: <i>Мой телефон</i> или <i>Ноутбук</i>. Это название будет "
+        "видно только вам, его можно изменить позже.",
+        reply_markup=cancel_keyboard(),
+    )
+    await state.set_state(CreateConfig.entering_name)
+    await safe_callback_answer(callback)
+
+
+@router.callback_query(F.data.startswith("loc:"))
+async def choose_location(
+    callback: CallbackQuery,
+    state: FSMContext,
+    telegram_action_audit: TelegramActionAuditContext | None = None,
+) -> None:
+    index = await _callback_id(callback, "loc:")
+    locations = (await state.get_data()).get("locations") or []
+    if index is not None and index > len(locations):
+        await safe_callback_answer(
+            callback,
+            "Кнопка устарела. Откройте раздел заново.",
+            show_alert=True,
+        )
+        index = None
+    if index is None:
+        if telegram_action_audit is not None:
+            telegram_action_audit.record(
+                "vpn.config_server_select",
+                result="invalid",
+                metadata={"reason_code": "invalid_callback"},
+            )
+        return
+    location = locations[index - 1]
+    if location not in await placement_engine.locations():
+        if telegram_action_audit is not None:
+            telegram_action_audit.record(
+                "vpn.config_server_select",
+                result="unavailable",
+                metadata={"reason_code": "location_unavailable"},
+            )
+        await safe_callback_answer(
+            callback,
+            "Здесь больше нет свободных серверов. Выберите другое расположение.",
+            show_alert=True,
+        )
+        return
+
+    # The server is picked when the name arrives, from the freshest load.
+    await state.update_data(location=location, server_id=None)
+    await _ask_config_name(callback, state)
+    if telegram_action_audit is not None:
+        telegram_action_audit.record("vpn.config_server_select")
+
+
+# Server buttons sent before automatic placement still work.
 @router.callback_query(F.data.startswith("server:"))
 async def choose_server(
     callback: CallbackQuery,
@@ -327,14 +385,7 @@ async def choose_server(
         return
 
     await state.update_data(server_id=server_id)
-    await callback.message.answer(
-        "📝 <b>Введите название конфигурации</b>\n\n"
-        "Например: <i>Мой телефон</i> или <i>Ноутбук</i>. Это название будет "
-        "видно только вам, его можно изменить позже.",
-        reply_markup=cancel_keyboard(),
-    )
-    await state.set_state(CreateConfig.entering_name)
-    await safe_callback_answer(callback)
+    await _ask_config_name(callback, state)
     if telegram_action_audit is not None:
         telegram_action_audit.record(
             "vpn.config_server_select",
@@ -370,6 +421,25 @@ async def got_name(
 ) -> None:
     data = await state.get_data()
     server_id = data.get("server_id")
+    location = data.get("location")
+    if not server_id and location:
+        server_id = await placement_engine.choose(location)
+        if server_id is None:
+            if telegram_action_audit is not None:
+                telegram_action_audit.record(
+                    "vpn.config_create_submit",
+                    result="unavailable",
+                    metadata={"reason_code": "no_available_server"},
+                )
+            await message.answer(
+                "Свободных серверов в этом расположении не осталось. Начните "
+                "создание заново и выберите другое.",
+                reply_markup=main_menu_keyboard(),
+            )
+            await state.clear()
+            return
+        # A retried update must provision on the node chosen the first time.
+        await state.update_data(server_id=server_id)
     if not server_id:
         if telegram_action_audit is not None:
             telegram_action_audit.record(
@@ -424,6 +494,9 @@ async def got_name(
         # retry this exact update without charging or provisioning twice.
         raise
     except ServiceError:
+        if location:
+            # Most likely the node filled up or closed since the map loaded.
+            placement_engine.discard(server_id)
         if telegram_action_audit is not None:
             telegram_action_audit.record(
                 "vpn.config_create_submit",
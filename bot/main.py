@@ -9,6 +9,7 @@ from aiogram.fsm.storage.redis import RedisStorage
 
 from core.config import settings
 from core.db.unit_of_work import uow
+from core.services.manager_clients import manager_clients
 from core.services.telegram_updates import TelegramUpdateService
 
 from .handlers import router, setup_bot_commands
@@ -83,6 +84,7 @@ async def main():
         try:
             await dp.emit_shutdown(bot=bot, **workflow_data)
         finally:
+            await manager_clients.aclose()
             await bot.session.close()
 
 
@@ -13,6 +13,20 @@ class Settings(BaseSettings):
     per_config_cost: Decimal = Field(default=Decimal("1.00"), ge=0)
     config_creation_cost: Decimal = Field(default=Decimal("10.00"), ge=0)
     billing_interval: int = Field(default=3600, ge=60)
+    # Set-based periodic charging holds user locks for a few statements rather
+    # than one savepoint per owner. Disable to fall back to per-user movements.
+    billing_bulk_charge_enabled: bool = True
+    # A period is charged in committed user-ID range shards. Extra RQ jobs let
+    # several billing workers drain the shards of one period concurrently.
+    billing_shard_size: int = Field(default=5_000, ge=1, le=1_000_000)
+    billing_shard_workers: int = Field(default=1, ge=1, le=32)
+    # Suspensions planned by a billing shard run concurrently, never more than
+    # the per-server cap against a single VPN Manager.
+    billing_suspend_concurrency: int = Field(default=16, ge=1, le=256)
+    billing_suspend_per_server_concurrency: int = Field(default=4, ge=1, le=64)
+    # RQ jobs share one long-lived event loop and its warm connection pools;
+    # disable to fall back to a forked work horse per job.
+    billing_worker_persistent_loop: bool = True
     admin_username: str = ""
     admin_password_hash: str = ""
     admin_session_ttl_seconds: int = Field(default=28_800, ge=900, le=604_800)
@@ -29,12 +43,21 @@ class Settings(BaseSettings):
     admin_login_rate_limit_window_seconds: int = Field(default=300, ge=60, le=3600)
     admin_action_stale_seconds: int = Field(default=300, ge=120, le=3600)
     admin_fleet_status_stale_seconds: int = Field(default=300, ge=30, le=86_400)
-    admin_fleet_status_retention_per_server: int = Field(
-        default=1_000, ge=10, le=100_000
-    )
+    # Raw status samples are downsampled into 5-minute, hourly and daily
+    # rollups; every resolution is then kept for a bounded time.
+    admin_fleet_status_raw_retention_hours: int = Field(default=48, ge=1, le=720)
+    admin_fleet_status_5m_retention_days: int = Field(default=14, ge=1, le=365)
+    admin_fleet_status_hourly_retention_days: int = Field(default=90, ge=1, le=3_650)
+    admin_fleet_status_daily_retention_days: int = Field(default=730, ge=1, le=3_650)
     admin_fleet_poll_enabled: bool = True
     admin_fleet_poll_interval_seconds: int = Field(default=60, ge=30, le=3_600)
     admin_fleet_poll_concurrency: int = Field(default=4, ge=1, le=32)
+    # Fleet-wide drift audits run on the billing worker under a renewed lease
+    # on their admin action; per-server progress rows are streamed from the
+    # database, so any admin worker can serve the stream.
+    admin_fleet_drift_audit_concurrency: int = Field(default=8, ge=1, le=64)
+    admin_fleet_drift_audit_lease_seconds: int = Field(default=60, ge=15, le=900)
+    admin_fleet_drift_stream_poll_seconds: float = Field(default=1.0, gt=0, le=30)
     telegram_pay_token: str = ""
     redis_url: str = "redis://localhost:6379/0"
 
@@ -48,6 +71,12 @@ class Settings(BaseSettings):
     notification_max_attempts: int = Field(default=10, ge=1, le=100)
     notification_visibility_timeout: int = Field(default=120, ge=30, le=3600)
     notification_dedupe_ttl_seconds: int = Field(default=86_400, ge=3600, le=604_800)
+    # rq_worker runs a LISTEN/NOTIFY-driven outbox publisher that drains in
+    # adaptive batches; the idle sweep catches retries and missed wakeups.
+    notification_outbox_publisher_enabled: bool = True
+    notification_outbox_batch_min: int = Field(default=20, ge=1, le=1_000)
+    notification_outbox_batch_max: int = Field(default=500, ge=1, le=5_000)
+    notification_outbox_idle_seconds: int = Field(default=30, ge=1, le=3_600)
     payment_intent_ttl_seconds: int = Field(default=3600, ge=60, le=86_400)
     # Referral rewards are issued as non-withdrawable service balance only for
     # newly credited provider payments. Rates use basis points so policy values
@@ -58,7 +87,19 @@ class Settings(BaseSettings):
     referral_program_version: str = Field(
         default="v1-5pct-1pct", min_length=1, max_length=32
     )
+    # Catch-up settles this many claimed payments per transaction, with one
+    # bulk write per table instead of one savepoint per reward level.
+    referral_reconcile_batch_size: int = Field(default=100, ge=1, le=1_000)
     vpn_operation_max_attempts: int = Field(default=20, ge=1, le=1000)
+    # The reconciler runs a page of due operations concurrently, never more
+    # than the per-server cap against one VPN Manager, so an unreachable node
+    # only holds its own slots while healthy servers keep converging.
+    vpn_reconcile_concurrency: int = Field(default=16, ge=1, le=256)
+    vpn_reconcile_per_server_concurrency: int = Field(default=4, ge=1, le=64)
+    # Completions of operations that finish close together are committed in
+    # one transaction: up to the batch size, or after the delay at the latest.
+    vpn_reconcile_commit_batch_size: int = Field(default=32, ge=1, le=500)
+    vpn_reconcile_commit_delay_ms: int = Field(default=20, ge=0, le=1_000)
     # Manager transport remains HTTP by default for backwards compatibility.
     # When TLS is enabled, an explicit CA is optional (system trust is used),
     # while the client certificate/key pair enables mutual TLS.
@@ -68,7 +109,46 @@ class Settings(BaseSettings):
     vpn_manager_ca_cert_path: str = ""
     vpn_manager_client_cert_path: str = ""
     vpn_manager_client_key_path: str = ""
+    # Manager clients are pooled per server and endpoint revision, so calls
+    # reuse keep-alive connections instead of reconnecting and renegotiating
+    # TLS. HTTP/2 additionally needs the optional ``h2`` package.
+    vpn_manager_client_pool_enabled: bool = True
+    vpn_manager_pool_max_connections: int = Field(default=8, ge=1, le=100)
+    vpn_manager_pool_keepalive_seconds: float = Field(default=60.0, gt=0, le=3600)
+    vpn_manager_http2: bool = False
+    # A per-server circuit breaker opens after consecutive transport failures
+    # or retryable Manager errors, fails fast while open and lets a single
+    # probe through when the (doubling) open window ends.
+    vpn_manager_breaker_enabled: bool = True
+    vpn_manager_breaker_failure_threshold: int = Field(default=5, ge=1, le=100)
+    vpn_manager_breaker_open_seconds: float = Field(default=15.0, gt=0, le=3600)
+    vpn_manager_breaker_max_open_seconds: float = Field(default=300.0, gt=0, le=86_400)
+    # Every attempt to one Manager takes a token from a per-server bucket and
+    # one of a bounded number of in-flight slots (0 disables either limit).
+    # Identical concurrent GETs are coalesced into a single request.
+    vpn_manager_rate_limit_per_second: float = Field(default=20.0, ge=0, le=10_000)
+    vpn_manager_rate_limit_burst: int = Field(default=40, ge=1, le=10_000)
+    vpn_manager_max_concurrent_requests: int = Field(default=8, ge=0, le=1000)
+    vpn_manager_coalesce_reads: bool = True
+    # Suspends, unsuspends and revokes of one Manager are sent in bulk when
+    # it advertises ``bulk_mutations`` in GET /status (cached for the TTL).
+    vpn_manager_bulk_mutations_enabled: bool = True
+    vpn_manager_bulk_max_items: int = Field(default=200, ge=1, le=1000)
+    vpn_manager_capabilities_ttl_seconds: float = Field(default=300.0, gt=0, le=86_400)
+    # Downloaded .ovpn profiles are cached per config and provision
+    # operation, Fernet-encrypted, within a byte budget and TTL.
+    vpn_config_cache_enabled: bool = True
+    vpn_config_cache_max_bytes: int = Field(default=16_777_216, ge=0, le=1 << 31)
+    vpn_config_cache_ttl_seconds: float = Field(default=3600.0, gt=0, le=604_800)
+    # New configs are placed from an in-process map of eligible servers,
+    # reloaded with one query at most this often.
+    vpn_placement_refresh_seconds: float = Field(default=15.0, gt=0, le=3600)
     vpn_drift_repair_enabled: bool = False
+    # Drift audits keep the last inventory per server, refetch it only when
+    # its ETag changes and reload configs changed since the previous audit
+    # (re-reading an overlap window); a full recompute runs periodically.
+    vpn_drift_full_audit_seconds: int = Field(default=3600, ge=0, le=604_800)
+    vpn_drift_hub_overlap_seconds: int = Field(default=300, ge=0, le=86_400)
     telegram_update_poll_timeout: int = Field(default=30, ge=1, le=50)
     telegram_update_batch_size: int = Field(default=100, ge=1, le=100)
     telegram_update_processor_count: int = Field(default=4, ge=1, le=16)
@@ -116,6 +196,16 @@ class Settings(BaseSettings):
             raise ValueError(
                 "Admin fleet status stale window must cover at least two poll intervals"
             )
+        if not (
+            self.admin_fleet_status_raw_retention_hours
+            <= 24 * self.admin_fleet_status_5m_retention_days
+            and self.admin_fleet_status_5m_retention_days
+            <= self.admin_fleet_status_hourly_retention_days
+            <= self.admin_fleet_status_daily_retention_days
+        ):
+            raise ValueError(
+                "Admin fleet status retention must not shrink as resolution coarsens"
+            )
         return self
 
     @model_validator(mode="after")
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-from sqlalchemy.orm import declarative_base, declared_attr
+from sqlalchemy.orm import Session, declarative_base, declared_attr
 
 from core.config import settings
 
@@ -12,9 +12,21 @@ engine = create_async_engine(
     future=True,
 )
 
+
+class HubSession(Session):
+    """Sync session behind the Hub's session factory.
+
+    Write-side ORM hooks are installed on this class by
+    :mod:`core.db.unit_of_work`, so sessions built elsewhere on a plain
+    :class:`~sqlalchemy.orm.Session` (scripts, ad-hoc test makers) do not
+    carry them.
+    """
+
+
 async_session = async_sessionmaker(
     bind=engine,
     expire_on_commit=False,
+    sync_session_class=HubSession,
 )
 
 
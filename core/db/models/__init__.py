@@ -1,33 +1,46 @@
 from .admin import AdminAuditEvent, AdminRole, AdminSession, AdminUser
-from .billing_run import BillingRun
+from .billing_run import BillingRun, BillingRunShard
 from .config import VPN_Config
 from .ledger import LedgerEntry, LedgerKind
 from .notification_outbox import NotificationOutbox
 from .payment import ProviderPayment
+from .pending_config_refund import PendingConfigRefund
 from .referral_reward import ReferralReward
-from .server import AdminAction, Server, VPNServerStatus
+from .server import (
+    AdminAction,
+    AdminActionEntry,
+    Server,
+    VPNServerStatus,
+    VPNServerStatusRollup,
+)
 from .telegram_update import TelegramUpdateInbox
 from .telegram_user_action import TelegramUserActionEvent
 from .user import User
+from .vpn_inventory import VPNInventorySnapshot
 from .vpn_operation import VPNOperation
 
 __all__ = [
     "AdminAuditEvent",
     "AdminAction",
+    "AdminActionEntry",
     "AdminRole",
     "AdminSession",
     "AdminUser",
     "BillingRun",
+    "BillingRunShard",
     "LedgerEntry",
     "LedgerKind",
     "NotificationOutbox",
+    "PendingConfigRefund",
     "ProviderPayment",
     "ReferralReward",
     "VPN_Config",
     "Server",
     "VPNServerStatus",
+    "VPNServerStatusRollup",
     "TelegramUpdateInbox",
     "TelegramUserActionEvent",
     "User",
+    "VPNInventorySnapshot",
     "VPNOperation",
 ]
@@ -3,7 +3,16 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import CheckConstraint, DateTime, Numeric, String, func
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from core.db import Base
@@ -45,3 +54,48 @@ class BillingRun(Base):
     completed_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+
+
+class BillingRunShard(Base):
+    """A user-ID range of a billing run that is charged and committed alone.
+
+    Open-ended bounds (``NULL``) make the shards of one run cover the whole
+    user-ID space, so owners created while a run is in progress are not missed.
+    """
+
+    __tablename__ = "billing_run_shard"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'completed')", name="ck_billing_run_shard_status"
+        ),
+        CheckConstraint(
+            "first_user_id IS NULL OR last_user_id IS NULL "
+            "OR last_user_id >= first_user_id",
+            name="ck_billing_run_shard_valid_range",
+        ),
+        UniqueConstraint(
+            "billing_run_id", "shard_index", name="uq_billing_run_shard_index"
+        ),
+        Index("ix_billing_run_shard_run_status", "billing_run_id", "status"),
+    )
+
+    billing_run_id: Mapped[int] = mapped_column(
+        ForeignKey("billing_run.id", ondelete="RESTRICT"), nullable=False
+    )
+    shard_index: Mapped[int] = mapped_column(nullable=False)
+    first_user_id: Mapped[int | None] = mapped_column(nullable=True)
+    last_user_id: Mapped[int | None] = mapped_column(nullable=True)
+    status: Mapped[str] = mapped_column(String(24), nullable=False, default="pending")
+    charged_users: Mapped[int] = mapped_column(nullable=False, default=0)
+    total_amount: Mapped[Decimal] = mapped_column(
+        Numeric(18, 2), nullable=False, default=Decimal("0.00")
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -1,7 +1,22 @@
+from collections import Counter
+from collections.abc import Mapping
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    event,
+    func,
+    inspect,
+    or_,
+    update,
+)
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
+from sqlalchemy.orm.attributes import set_committed_value
 
 from core.db import Base
 from core.domain import VPNState
@@ -11,6 +26,10 @@ from .user import User
 
 
 class VPN_Config(Base):
+    # Incremental drift audits reload only a server's recently changed rows.
+    __table_args__ = (
+        Index("ix_vpn_config_server_id_updated_at", "server_id", "updated_at"),
+    )
 
     name: Mapped[str] = mapped_column(
         String(128), unique=True, nullable=False, index=True
@@ -58,3 +77,110 @@ class VPN_Config(Base):
 
     def __repr__(self):
         return f"<VPN_Config(name={self.name}, server={self.server.name})>"
+
+
+def managed_config_condition():
+    """Return the SQL predicate for configs that may still exist on Manager.
+
+    A revoke intent must keep consuming capacity and must keep endpoint/retire
+    mutations fenced until Manager has actually converged to ``revoked``.
+    """
+
+    return or_(
+        VPN_Config.desired_state != VPNState.REVOKED.value,
+        VPN_Config.actual_state != VPNState.REVOKED.value,
+    )
+
+
+def is_managed_state(desired_state: str | None, actual_state: str | None) -> bool:
+    """Mirror :func:`managed_config_condition` for a pair of state values."""
+
+    return not (
+        desired_state == VPNState.REVOKED.value
+        and actual_state == VPNState.REVOKED.value
+    )
+
+
+def shift_managed_config_counts(session: Session, deltas: Mapping[int, int]) -> None:
+    """Apply managed-config count changes to their servers in this transaction.
+
+    Servers are updated in ID order so concurrent transactions touching the
+    same nodes queue instead of deadlocking. ``updated_at`` is kept, because
+    a config changing state is not an edit of the server.
+    """
+
+    table = Server.__table__
+    for server_id in sorted(key for key, delta in deltas.items() if key and delta):
+        count = session.connection().scalar(
+            update(table)
+            .where(table.c.id == server_id)
+            .values(
+                managed_config_count=table.c.managed_config_count + deltas[server_id],
+                updated_at=table.c.updated_at,
+            )
+            .returning(table.c.managed_config_count)
+        )
+        loaded = session.identity_map.get(
+            inspect(Server).identity_key_from_primary_key((server_id,))
+        )
+        if loaded is not None and count is not None:
+            set_committed_value(loaded, "managed_config_count", count)
+
+
+def _committed(config: VPN_Config, attribute: str):
+    history = inspect(config).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(config, attribute)
+
+
+def _server_id(config: VPN_Config) -> int | None:
+    if config.server_id is not None:
+        return config.server_id
+    return config.server.id if config.server is not None else None
+
+
+def install_managed_config_counter(session_class: type[Session]) -> None:
+    """Keep server counters in step with configs flushed by ``session_class``."""
+
+    if not event.contains(session_class, "before_flush", _count_flushed_configs):
+        event.listen(session_class, "before_flush", _count_flushed_configs)
+
+
+def _count_flushed_configs(session: Session, flush_context, instances) -> None:
+    """Keep server counters in step with configs written through the ORM.
+
+    Statement-level updates in ``ConfigRepo`` account for themselves.
+    """
+
+    deltas: Counter[int] = Counter()
+    for config in session.new:
+        if isinstance(config, VPN_Config) and is_managed_state(
+            config.desired_state, config.actual_state
+        ):
+            deltas[_server_id(config)] += 1
+    for config in session.deleted:
+        if isinstance(config, VPN_Config) and is_managed_state(
+            _committed(config, "desired_state"), _committed(config, "actual_state")
+        ):
+            deltas[_committed(config, "server_id")] -= 1
+    for config in session.dirty:
+        if not isinstance(config, VPN_Config) or not session.is_modified(config):
+            continue
+        before = (
+            _committed(config, "server_id"),
+            is_managed_state(
+                _committed(config, "desired_state"), _committed(config, "actual_state")
+            ),
+        )
+        after = (
+            _server_id(config),
+            is_managed_state(config.desired_state, config.actual_state),
+        )
+        if before != after:
+            deltas[before[0]] -= before[1]
+            deltas[after[0]] += after[1]
+    if deltas:
+        shift_managed_config_counts(session, deltas)
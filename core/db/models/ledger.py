@@ -9,6 +9,7 @@ from sqlalchemy import (
     CheckConstraint,
     DateTime,
     ForeignKey,
+    Index,
     Numeric,
     String,
     UniqueConstraint,
@@ -47,6 +48,7 @@ class LedgerEntry(Base):
     __table_args__ = (
         CheckConstraint("amount <> 0", name="ck_ledger_entry_nonzero_amount"),
         UniqueConstraint("idempotency_key", name="uq_ledger_entry_idempotency_key"),
+        Index("ix_ledger_entry_reference", "reference_type", "reference_id"),
     )
 
     user_id: Mapped[int] = mapped_column(
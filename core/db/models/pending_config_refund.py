@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.db import Base
+
+
+class PendingConfigRefund(Base):
+    """A rejected provision whose reservation refund has not been applied yet.
+
+    Rows are queued in the same transaction that marks the operation REJECTED
+    and deleted once the refund ledger entry commits, so each reconcile cycle
+    only touches new rejections instead of the whole reservation history.
+    """
+
+    __tablename__ = "pending_config_refund"
+
+    operation_id: Mapped[str] = mapped_column(String(36), nullable=False, unique=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+    )
@@ -6,6 +6,7 @@ from decimal import Decimal
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     CheckConstraint,
     DateTime,
@@ -49,6 +50,12 @@ class Server(Base):
             name="ck_server_positive_placement_weight",
         ),
         CheckConstraint("version >= 1", name="ck_server_positive_version"),
+        CheckConstraint(
+            "health_state IN ('unknown', 'unreachable', 'instance_mismatch', "
+            "'unhealthy', 'healthy')",
+            name="ck_server_health_state",
+        ),
+        Index("ix_server_health_state", "health_state", "health_checked_at"),
     )
 
     name: Mapped[str] = mapped_column(String(128))
@@ -85,6 +92,21 @@ class Server(Base):
     manager_instance_id: Mapped[str | None] = mapped_column(
         String(36), nullable=True, index=True
     )
+    # Health observed from the newest Manager status, before lifecycle and
+    # staleness are applied; kept current by every status write so fleet
+    # listings can filter and paginate on it in SQL.
+    health_state: Mapped[str] = mapped_column(
+        String(32), nullable=False, default="unknown", server_default="unknown"
+    )
+    health_checked_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Configs that may still exist on the Manager. Maintained in the same
+    # transactions that create, revoke and delete configs so placement checks
+    # do not scan the server's configs; see ``core.db.models.config``.
+    managed_config_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
     version: Mapped[int] = mapped_column(
         Integer, nullable=False, default=1, server_default="1"
     )
@@ -149,6 +171,51 @@ class VPNServerStatus(Base):
     server: Mapped[Server] = relationship(back_populates="status_history")
 
 
+class VPNServerStatusRollup(Base):
+    """Status samples of one server aggregated over a fixed UTC bucket.
+
+    Byte columns are counter deltas. Averages are kept as a sum and a sample
+    count so coarser buckets can be built from finer ones exactly.
+    """
+
+    __tablename__ = "vpn_server_status_rollup"
+    __table_args__ = (
+        CheckConstraint(
+            "resolution IN ('5m', '1h', '1d')",
+            name="ck_vpn_server_status_rollup_resolution",
+        ),
+        UniqueConstraint(
+            "server_id",
+            "resolution",
+            "bucket_start",
+            name="uq_vpn_server_status_rollup_bucket",
+        ),
+        Index(
+            "ix_vpn_server_status_rollup_resolution_bucket",
+            "resolution",
+            "bucket_start",
+        ),
+    )
+
+    server_id: Mapped[int] = mapped_column(
+        ForeignKey("server.id", ondelete="CASCADE"), nullable=False
+    )
+    resolution: Mapped[str] = mapped_column(String(8), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    samples: Mapped[int] = mapped_column(Integer, nullable=False)
+    reachable_samples: Mapped[int] = mapped_column(Integer, nullable=False)
+    ready_samples: Mapped[int] = mapped_column(Integer, nullable=False)
+    readiness_flaps: Mapped[int] = mapped_column(Integer, nullable=False)
+    session_samples: Mapped[int] = mapped_column(Integer, nullable=False)
+    sessions_sum: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    sessions_min: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    sessions_max: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    bytes_received: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    bytes_sent: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
 class AdminAction(Base):
     """Durable, idempotent record of an administrator fleet action."""
 
@@ -208,3 +275,53 @@ class AdminAction(Base):
     completed_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Actions run by a worker (fleet drift audits) are leased: the token
+    # fences the owner's writes and an expired lease lets another worker
+    # take the action over, or fail it once ``attempts`` are used up.
+    lease_token: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
+
+class AdminActionEntry(Base):
+    """Append-only, per-server progress record of a long-running admin action."""
+
+    __tablename__ = "admin_action_entry"
+    __table_args__ = (
+        UniqueConstraint(
+            "admin_action_id",
+            "sequence",
+            name="uq_admin_action_entry_sequence",
+        ),
+        UniqueConstraint(
+            "admin_action_id",
+            "server_id",
+            name="uq_admin_action_entry_server",
+        ),
+        CheckConstraint(
+            "status IN ('succeeded', 'failed')",
+            name="ck_admin_action_entry_status",
+        ),
+    )
+
+    admin_action_id: Mapped[int] = mapped_column(
+        ForeignKey("admin_action.id", ondelete="CASCADE"), nullable=False
+    )
+    sequence: Mapped[int] = mapped_column(Integer, nullable=False)
+    server_id: Mapped[int | None] = mapped_column(
+        ForeignKey("server.id", ondelete="SET NULL"), nullable=True
+    )
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    finding_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    critical_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    data: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+    )
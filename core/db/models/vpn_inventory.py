@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, ForeignKey, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.db import Base
+
+
+class VPNInventorySnapshot(Base):
+    """The last Manager inventory and drift findings audited for a server.
+
+    ``clients`` holds only what drift needs per Manager client, ``hub_configs``
+    the Hub config states compared with it and ``findings`` the result, all
+    keyed by client name. ``hub_watermark`` is the newest config
+    ``updated_at`` seen, so the next audit reloads only configs changed since.
+    """
+
+    __tablename__ = "vpn_inventory_snapshot"
+
+    server_id: Mapped[int] = mapped_column(
+        ForeignKey("server.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    revision: Mapped[str] = mapped_column(String(160), nullable=False)
+    etag: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    clients: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    hub_configs: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    findings: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    hub_watermark: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    full_audit_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
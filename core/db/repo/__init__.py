@@ -1,17 +1,23 @@
+from .admin_action import AdminActionRepo
 from .billing import BillingRepo
 from .config import ConfigRepo
 from .server import ServerRepo
+from .server_status import ServerStatusRepo
 from .telegram_update import TelegramUpdateRepo
 from .telegram_user_action import TelegramUserActionRepo
 from .user import UserRepo
+from .vpn_inventory import VPNInventoryRepo
 from .vpn_operation import VPNOperationRepo
 
 __all__ = [
+    "AdminActionRepo",
     "BillingRepo",
     "ConfigRepo",
     "ServerRepo",
+    "ServerStatusRepo",
     "TelegramUpdateRepo",
     "TelegramUserActionRepo",
     "UserRepo",
+    "VPNInventoryRepo",
     "VPNOperationRepo",
 ]
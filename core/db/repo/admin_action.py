@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Sequence
+
+from sqlalchemy import Row, case, func, insert, or_, select, update
+
+from core.db.models.server import AdminAction, AdminActionEntry
+from core.domain import AdminActionStatus
+
+from .base import BaseRepo
+
+_OPEN_STATUSES = (
+    AdminActionStatus.PENDING.value,
+    AdminActionStatus.RUNNING.value,
+)
+
+
+class AdminActionRepo(BaseRepo[AdminAction]):
+    model = AdminAction
+
+    async def claim(
+        self,
+        action_id: str,
+        *,
+        kind: str,
+        lease_token: str,
+        now: datetime,
+        lease_for: timedelta,
+        max_attempts: int,
+    ) -> AdminAction | None:
+        """Lease a queued action, or one whose previous owner's lease expired.
+
+        Every later write of the owner is fenced by ``lease_token``, so a
+        worker that lost its lease cannot finish the action of its successor.
+        """
+
+        stmt = (
+            update(self.model)
+            .where(
+                self.model.action_id == action_id,
+                self.model.kind == kind,
+                self.model.status.in_(_OPEN_STATUSES),
+                self.model.attempts < max_attempts,
+                or_(
+                    self.model.lease_token.is_(None),
+                    self.model.lease_expires_at <= now,
+                ),
+            )
+            .values(
+                status=AdminActionStatus.RUNNING.value,
+                attempts=self.model.attempts + 1,
+                lease_token=lease_token,
+                lease_expires_at=now + lease_for,
+            )
+            .execution_options(synchronize_session="fetch")
+            .returning(self.model)
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def renew(
+        self,
+        action_pk: int,
+        *,
+        lease_token: str,
+        now: datetime,
+        lease_for: timedelta,
+        result: dict[str, Any],
+    ) -> bool:
+        """Extend a held lease and publish the owner's running totals."""
+
+        stmt = (
+            update(self.model)
+            .where(*self._owned(action_pk, lease_token))
+            .values(lease_expires_at=now + lease_for, result=result)
+            .execution_options(synchronize_session=False)
+        )
+        return (await self.session.execute(stmt)).rowcount == 1
+
+    async def release(self, action_pk: int, *, lease_token: str, now: datetime) -> None:
+        """Give a held lease up at once so another worker can take over."""
+
+        await self.session.execute(
+            update(self.model)
+            .where(*self._owned(action_pk, lease_token))
+            .values(lease_token=None, lease_expires_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def lock_owned(self, action_pk: int, lease_token: str) -> AdminAction | None:
+        return await self.session.scalar(
+            select(self.model)
+            .where(*self._owned(action_pk, lease_token))
+            .with_for_update()
+        )
+
+    async def lock_expired(
+        self, *, kind: str, now: datetime, limit: int = 100
+    ) -> Sequence[AdminAction]:
+        """Open actions of ``kind`` whose lease or pick-up deadline has passed."""
+
+        stmt = (
+            select(self.model)
+            .where(
+                self.model.kind == kind,
+                self.model.status.in_(_OPEN_STATUSES),
+                self.model.lease_expires_at <= now,
+            )
+            .order_by(self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return (await self.session.scalars(stmt)).all()
+
+    async def add_entry(
+        self,
+        action_pk: int,
+        *,
+        lease_token: str,
+        sequence: int,
+        server_id: int | None,
+        status: str,
+        finding_count: int,
+        critical_count: int,
+        data: dict[str, Any],
+    ) -> bool:
+        """Append one progress entry while ``lease_token`` still owns the action.
+
+        The action row is only share-locked: the owner's entries never wait
+        for each other, while a takeover's claim waits for an in-flight
+        entry and then sees it.
+        """
+
+        owned = await self.session.scalar(
+            select(self.model.id)
+            .where(*self._owned(action_pk, lease_token))
+            .with_for_update(read=True)
+        )
+        if owned is None:
+            return False
+        await self.session.execute(
+            insert(AdminActionEntry).values(
+                admin_action_id=action_pk,
+                sequence=sequence,
+                server_id=server_id,
+                status=status,
+                finding_count=finding_count,
+                critical_count=critical_count,
+                data=data,
+            )
+        )
+        return True
+
+    async def entry_totals(self, action_pk: int) -> Row:
+        """``(completed, failed, finding_count, critical_count, last_sequence)``."""
+
+        entry = AdminActionEntry
+        stmt = select(
+            func.count(entry.id).label("completed"),
+            func.coalesce(
+                func.sum(
+                    case((entry.status == AdminActionStatus.FAILED.value, 1), else_=0)
+                ),
+                0,
+            ).label("failed"),
+            func.coalesce(func.sum(entry.finding_count), 0).label("finding_count"),
+            func.coalesce(func.sum(entry.critical_count), 0).label("critical_count"),
+            func.coalesce(func.max(entry.sequence), 0).label("last_sequence"),
+        ).where(entry.admin_action_id == action_pk)
+        return (await self.session.execute(stmt)).one()
+
+    async def entry_server_ids(self, action_pk: int) -> set[int]:
+        return set(
+            await self.session.scalars(
+                select(AdminActionEntry.server_id).where(
+                    AdminActionEntry.admin_action_id == action_pk,
+                    AdminActionEntry.server_id.is_not(None),
+                )
+            )
+        )
+
+    def _owned(self, action_pk: int, lease_token: str) -> tuple:
+        return (
+            self.model.id == action_pk,
+            self.model.status == AdminActionStatus.RUNNING.value,
+            self.model.lease_token == lease_token,
+        )
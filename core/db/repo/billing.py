@@ -3,18 +3,34 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
-from typing import Sequence
+from typing import Collection, Iterator, Sequence
 from uuid import uuid4
 
-from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy import (
+    BigInteger,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
 from core.config import settings
-from core.db.models.billing_run import BillingRun
+from core.db.models.billing_run import BillingRun, BillingRunShard
 from core.db.models.config import VPN_Config
 from core.db.models.ledger import LedgerEntry, LedgerKind
 from core.db.models.notification_outbox import NotificationOutbox
 from core.db.models.payment import ProviderPayment
+from core.db.models.pending_config_refund import PendingConfigRefund
 from core.db.models.referral_reward import ReferralReward
 from core.db.models.user import User
 from core.db.models.vpn_operation import VPNOperation
@@ -27,6 +43,14 @@ from core.exceptions import (
 )
 
 MONEY_QUANTUM = Decimal("0.01")
+# PostgreSQL LISTEN/NOTIFY channel that wakes the outbox publisher on commit.
+NOTIFICATION_OUTBOX_CHANNEL = "notification_outbox"
+# Rows per multi-row outbox INSERT; keeps bind parameters under driver limits.
+NOTIFICATION_OUTBOX_INSERT_BATCH = 1_000
+# Exact period-charge keys looked up per statement by the bulk charge engine.
+PERIOD_CHARGE_LOOKUP_BATCH = 1_000
+# ``(level, beneficiary, rate_bps, reward_amount)`` staged for one payment.
+_ReferralLevel = tuple[int, User, int, Decimal]
 
 
 def to_money(value: Decimal | int | float | str) -> Decimal:
@@ -63,6 +87,16 @@ class PaymentCreditResult:
     credited: bool
 
 
+@dataclass(frozen=True)
+class BalanceExhaustionBucket:
+    period: int
+    users: int
+    configs: int
+    charge: Decimal
+    negative_users: int
+    deficit: Decimal
+
+
 @dataclass(frozen=True)
 class ReferralRewardResult:
     user: User
@@ -552,22 +586,9 @@ class BillingRepo:
         if payment.currency != "RUB":
             raise InvalidOperationError("Referral rewards require a RUB payment")
         await self._validate_referral_source_payment(payment)
-        if len(level_rates_bps) != 2:
-            raise InvalidOperationError("Exactly two referral rates are required")
-        if any(
-            isinstance(rate, bool)
-            or not isinstance(rate, int)
-            or not 0 <= rate <= 1_000
-            for rate in level_rates_bps
-        ):
-            raise InvalidOperationError("Invalid referral reward rate")
-        if level_rates_bps[1] > level_rates_bps[0]:
-            raise InvalidOperationError("Level 2 referral rate cannot exceed level 1")
-        if sum(level_rates_bps) > 1_000:
-            raise InvalidOperationError("Combined referral rates cannot exceed 10%")
-        program_version = program_version.strip()
-        if not program_version or len(program_version) > 32:
-            raise InvalidOperationError("Invalid referral program version")
+        program_version = self._referral_program_version(
+            level_rates_bps, program_version
+        )
 
         source_user = await self.session.get(User, payment.user_id)
         if source_user is None:
@@ -576,45 +597,19 @@ class BillingRepo:
         # Resolve the full chain before issuing anything. If legacy/corrupt data
         # contains a self-reference or cycle, fail closed for the whole chain
         # without preventing the payer's already-captured money from being used.
-        chain: list[User] = []
-        seen_user_ids = {source_user.id}
-        current = source_user
-        for _level in (1, 2):
-            if current.referred_by_id is None:
-                break
-            if current.referred_by_id in seen_user_ids:
-                await self._settle_referral_payment(
-                    payment,
-                    status="invalid_chain",
-                    program_version=program_version,
-                )
-                return []
-            beneficiary = await self.session.get(User, current.referred_by_id)
-            if beneficiary is None:
-                await self._settle_referral_payment(
-                    payment,
-                    status="invalid_chain",
-                    program_version=program_version,
-                )
-                return []
-            chain.append(beneficiary)
-            seen_user_ids.add(beneficiary.id)
-            current = beneficiary
+        chain = await self._referral_chain(source_user)
+        if chain is None:
+            await self._settle_referral_payment(
+                payment,
+                status="invalid_chain",
+                program_version=program_version,
+            )
+            return []
 
         results: list[ReferralRewardResult] = []
-        for level, (beneficiary, rate_bps) in enumerate(
-            zip(chain, level_rates_bps, strict=False), start=1
+        for level, beneficiary, rate_bps, reward_amount in self._referral_levels(
+            payment, chain, level_rates_bps
         ):
-            if rate_bps == 0:
-                continue
-            reward_amount = to_money(
-                payment.amount * Decimal(rate_bps) / Decimal(10_000)
-            )
-            # Sub-cent rewards are not representable by the RUB ledger and must
-            # not produce zero-value audit rows.
-            if reward_amount == 0:
-                continue
-
             existing = await self._get_referral_reward(payment.id, level)
             if existing is not None:
                 results.append(
@@ -634,9 +629,6 @@ class BillingRepo:
                 if level == 1
                 else LedgerKind.REFERRAL_REWARD_L2
             )
-            idempotency_key = (
-                f"referral-reward:v1:provider-payment:{payment.id}:level:{level}"
-            )
             try:
                 # If a direct repo caller races despite the capture guard, the
                 # savepoint rolls back both balance/ledger and the audit insert
@@ -646,20 +638,17 @@ class BillingRepo:
                         user_id=beneficiary.id,
                         amount=reward_amount,
                         kind=kind,
-                        idempotency_key=idempotency_key,
+                        idempotency_key=self._referral_reward_key(payment.id, level),
                         allow_negative_balance=True,
                         reference_type="referral_reward",
                         reference_id=f"payment:{payment.id}:level:{level}",
-                        details={
-                            "source_payment_id": payment.id,
-                            "source_user_id": source_user.id,
-                            "beneficiary_user_id": beneficiary.id,
-                            "level": level,
-                            "rate_bps": rate_bps,
-                            "currency": payment.currency,
-                            "program_version": program_version,
-                            "retroactive": False,
-                        },
+                        details=self._referral_reward_details(
+                            payment,
+                            beneficiary=beneficiary,
+                            level=level,
+                            rate_bps=rate_bps,
+                            program_version=program_version,
+                        ),
                     )
                     reward = ReferralReward(
                         source_payment_id=payment.id,
@@ -709,42 +698,211 @@ class BillingRepo:
         )
         return results
 
-    async def claim_next_unsettled_referral_payment(
+    async def claim_unsettled_referral_payments(
         self,
-    ) -> ProviderPayment | None:
-        """Claim one credited payment that still needs referral settlement.
+        *,
+        limit: int,
+    ) -> Sequence[ProviderPayment]:
+        """Claim a page of credited payments that still need referral settlement.
+
+        Payers and both ancestor levels of a candidate page are resolved by one
+        self-join and locked in global user-ID order, the order live capture
+        and periodic billing use, before any payment row is locked. Users and
+        payments are both taken with ``SKIP LOCKED`` and only payments whose
+        whole chain is held are claimed, so the claim never waits. A page
+        another reconciler (or a capture) holds is skipped for the next one;
+        an empty result means nothing is claimable right now.
+        """
+
+        unsettled = (
+            ProviderPayment.status == "credited",
+            ProviderPayment.ledger_entry_id.is_not(None),
+            ProviderPayment.referral_settled_at.is_(None),
+        )
+        level_1 = aliased(User)
+        level_2 = aliased(User)
+        after: int | None = None
+        while True:
+            page = (
+                select(ProviderPayment.id, ProviderPayment.user_id)
+                .where(*unsettled)
+                .order_by(ProviderPayment.id)
+                .limit(limit)
+            )
+            if after is not None:
+                page = page.where(ProviderPayment.id > after)
+            candidates = (await self.session.execute(page)).all()
+            if not candidates:
+                return []
+
+            chains = {
+                payer_id: {payer_id, level_1_id, level_2_id} - {None}
+                for payer_id, level_1_id, level_2_id in await self.session.execute(
+                    select(User.id, level_1.id, level_2.id)
+                    .outerjoin(level_1, level_1.id == User.referred_by_id)
+                    .outerjoin(level_2, level_2.id == level_1.referred_by_id)
+                    .where(User.id.in_({user_id for _id, user_id in candidates}))
+                )
+            }
+            locked = {
+                user.id
+                for user in await self.session.scalars(
+                    select(User)
+                    .where(User.id.in_(set().union(*chains.values())))
+                    .order_by(User.id)
+                    .with_for_update(skip_locked=True)
+                    .execution_options(populate_existing=True)
+                )
+            }
+            claimable = [
+                payment_id
+                for payment_id, user_id in candidates
+                # A payer that no longer exists is claimed for quarantine.
+                if chains.get(user_id, set()) <= locked
+            ]
+            if claimable:
+                payments = (
+                    await self.session.scalars(
+                        select(ProviderPayment)
+                        .where(ProviderPayment.id.in_(claimable), *unsettled)
+                        .order_by(ProviderPayment.id)
+                        .with_for_update(skip_locked=True)
+                        .execution_options(populate_existing=True)
+                    )
+                ).all()
+                if payments:
+                    return payments
+            if len(candidates) < limit:
+                return []
+            after = candidates[-1][0]
 
-        The initial candidate read is intentionally unlocked. We first lock its
-        immutable user chain in global user-ID order and only then lock/recheck
-        the payment row. Concurrent reconcilers may briefly choose the same
-        candidate, but the second one observes its settlement marker and moves
-        on without issuing a duplicate reward.
+    async def apply_provider_referral_rewards_many(
+        self,
+        *,
+        payments: Sequence[ProviderPayment],
+        level_rates_bps: tuple[int, int],
+        program_version: str,
+    ) -> dict[int, list[ReferralRewardResult] | None]:
+        """Settle a claimed page of payments with bulk balance and ledger writes.
+
+        Writes exactly the rows :meth:`apply_provider_referral_rewards` would,
+        keyed by payment ID. Payments whose source accounting is inconsistent
+        map to ``None`` and stay unsettled for the caller to quarantine. A
+        payment that already owns a reward or ledger row, which only a partial
+        legacy write leaves behind, is replayed through the single-payment path
+        in a savepoint instead.
         """
 
-        candidate = await self.session.scalar(
-            select(ProviderPayment)
-            .where(
-                ProviderPayment.status == "credited",
-                ProviderPayment.ledger_entry_id.is_not(None),
-                ProviderPayment.referral_settled_at.is_(None),
+        program_version = self._referral_program_version(
+            level_rates_bps, program_version
+        )
+        if not payments:
+            return {}
+        # Warm the identity map so source validation below stays in memory.
+        (
+            await self.session.scalars(
+                select(LedgerEntry).where(
+                    LedgerEntry.id.in_(
+                        [payment.ledger_entry_id for payment in payments]
+                    )
+                )
             )
-            .order_by(ProviderPayment.id)
-            .limit(1)
+        ).all()
+        rewarded = set(
+            (
+                await self.session.scalars(
+                    select(ReferralReward.source_payment_id).where(
+                        ReferralReward.source_payment_id.in_(
+                            [payment.id for payment in payments]
+                        )
+                    )
+                )
+            ).all()
         )
-        if candidate is None:
-            return None
 
-        await self._lock_referral_payment_users(candidate.user_id)
-        return await self.session.scalar(
-            select(ProviderPayment)
-            .where(
-                ProviderPayment.id == candidate.id,
-                ProviderPayment.status == "credited",
-                ProviderPayment.ledger_entry_id.is_not(None),
-                ProviderPayment.referral_settled_at.is_(None),
+        results: dict[int, list[ReferralRewardResult] | None] = {}
+        statuses: dict[int, str] = {}
+        replay: list[ProviderPayment] = []
+        staged: dict[int, tuple[ProviderPayment, list[_ReferralLevel]]] = {}
+        for payment in payments:
+            if payment.id in rewarded:
+                replay.append(payment)
+                continue
+            source_user = await self.session.get(User, payment.user_id)
+            try:
+                if payment.currency != "RUB" or source_user is None:
+                    raise InvalidOperationError("Invalid referral source payment")
+                await self._validate_referral_source_payment(payment)
+            except InvalidOperationError:
+                results[payment.id] = None
+                continue
+            chain = await self._referral_chain(source_user)
+            if chain is None:
+                statuses[payment.id] = "invalid_chain"
+                results[payment.id] = []
+                continue
+            levels = list(self._referral_levels(payment, chain, level_rates_bps))
+            if not levels:
+                statuses[payment.id] = "zero_reward" if chain else "no_referrer"
+                results[payment.id] = []
+                continue
+            staged[payment.id] = (payment, levels)
+
+        if staged:
+            keys = {
+                self._referral_reward_key(payment_id, level): payment_id
+                for payment_id, (_payment, levels) in staged.items()
+                for level, *_rest in levels
+            }
+            collisions = await self.session.scalars(
+                select(LedgerEntry.idempotency_key).where(
+                    LedgerEntry.idempotency_key.in_(keys)
+                )
             )
-            .with_for_update()
-        )
+            for key in collisions.all():
+                if keys[key] in staged:
+                    replay.append(staged.pop(keys[key])[0])
+
+        for payment in sorted(replay, key=lambda payment: payment.id):
+            try:
+                async with self.session.begin_nested():
+                    results[payment.id] = await self.apply_provider_referral_rewards(
+                        payment=payment,
+                        level_rates_bps=level_rates_bps,
+                        program_version=program_version,
+                    )
+            except InvalidOperationError:
+                results[payment.id] = None
+
+        if staged:
+            await self._write_referral_rewards(
+                staged.values(), results=results, program_version=program_version
+            )
+            statuses.update((payment_id, "rewarded") for payment_id in staged)
+        if statuses:
+            settled_at = datetime.now(timezone.utc)
+            await self.session.execute(
+                update(ProviderPayment),
+                [
+                    {
+                        "id": payment_id,
+                        "referral_settled_at": settled_at,
+                        "referral_program_version": program_version,
+                        "referral_settlement_status": status,
+                    }
+                    for payment_id, status in statuses.items()
+                ],
+            )
+            for payment in payments:
+                status = statuses.get(payment.id)
+                if status is None:
+                    continue
+                set_committed_value(payment, "referral_settled_at", settled_at)
+                set_committed_value(
+                    payment, "referral_program_version", program_version
+                )
+                set_committed_value(payment, "referral_settlement_status", status)
+        return {payment.id: results[payment.id] for payment in payments}
 
     async def list_referral_entitlement_candidate_ids(
         self,
@@ -802,6 +960,88 @@ class BillingRepo:
         )
         return payment
 
+    async def project_balance_exhaustion(
+        self,
+        *,
+        cost_per_config: Decimal | int | float | str,
+        periods: int,
+    ) -> Sequence[BalanceExhaustionBucket]:
+        """Group owners of active configs by the period their balance runs out.
+
+        Read-only model of :meth:`charge_period`: every owner is charged
+        ``cost_per_config`` per active config each period and is suspended by
+        the first charge that leaves a non-positive balance. Owners still
+        funded after ``periods`` charges share the ``periods + 1`` bucket. The
+        arithmetic runs on integer kopecks in one grouped statement, so
+        PostgreSQL and SQLite agree exactly and no per-user rows are fetched.
+        """
+
+        cost_minor = int(to_money(cost_per_config) * 100)
+        if cost_minor < 0:
+            raise InvalidOperationError("Configuration cost cannot be negative")
+        active_counts = (
+            select(
+                VPN_Config.owner_id.label("owner_id"),
+                func.count(VPN_Config.id).label("config_count"),
+            )
+            .where(VPN_Config.actual_state == VPNState.ACTIVE.value)
+            .group_by(VPN_Config.owner_id)
+            .subquery()
+        )
+        balance_minor = cast(func.round(User.balance * 100), BigInteger)
+        charge_minor = active_counts.c.config_count * cost_minor
+        if cost_minor == 0:
+            exhausted_at = literal(periods + 1)
+        else:
+            exhausted_at = case(
+                (balance_minor <= 0, 1),
+                else_=(balance_minor + charge_minor - 1) // charge_minor,
+            )
+        owners = (
+            select(
+                case((exhausted_at > periods, periods + 1), else_=exhausted_at).label(
+                    "period"
+                ),
+                active_counts.c.config_count.label("configs"),
+                charge_minor.label("charge_minor"),
+                case(
+                    (
+                        and_(
+                            exhausted_at <= periods,
+                            balance_minor < exhausted_at * charge_minor,
+                        ),
+                        exhausted_at * charge_minor - balance_minor,
+                    ),
+                    else_=0,
+                ).label("deficit_minor"),
+            )
+            .join(active_counts, active_counts.c.owner_id == User.id)
+            .subquery()
+        )
+        rows = await self.session.execute(
+            select(
+                owners.c.period,
+                func.count(),
+                func.sum(owners.c.configs),
+                func.sum(owners.c.charge_minor),
+                func.sum(case((owners.c.deficit_minor > 0, 1), else_=0)),
+                func.sum(owners.c.deficit_minor),
+            )
+            .group_by(owners.c.period)
+            .order_by(owners.c.period)
+        )
+        return [
+            BalanceExhaustionBucket(
+                period=int(period),
+                users=int(users),
+                configs=int(configs),
+                charge=Decimal(int(charge)) / 100,
+                negative_users=int(negative_users),
+                deficit=Decimal(int(deficit)) / 100,
+            )
+            for period, users, configs, charge, negative_users, deficit in rows
+        ]
+
     async def charge_period(
         self,
         *,
@@ -809,7 +1049,14 @@ class BillingRepo:
         period_start: datetime,
         period_end: datetime,
         cost_per_config: Decimal | int | float | str,
+        bulk: bool = False,
     ) -> list[PeriodChargeResult]:
+        """Claim a billing period and charge every owner of an active config.
+
+        ``bulk`` selects the set-based engine, which keeps user locks for a
+        handful of statements instead of one savepoint per owner.
+        """
+
         cost = to_money(cost_per_config)
         if cost < 0:
             raise InvalidOperationError("Configuration cost cannot be negative")
@@ -837,44 +1084,145 @@ class BillingRepo:
             await self._complete_billing_run(run, charged_users=0, total=Decimal(0))
             return []
 
-        active_counts = await self.session.execute(
-            select(VPN_Config.owner_id, func.count(VPN_Config.id))
-            .where(VPN_Config.actual_state == VPNState.ACTIVE.value)
-            .group_by(VPN_Config.owner_id)
-            .order_by(VPN_Config.owner_id)
+        if bulk:
+            charged = await self._charge_active_owners_bulk(
+                run=run, period_key=period_key, cost=cost
+            )
+        else:
+            charged = await self._charge_active_owners(
+                run=run, period_key=period_key, cost=cost
+            )
+        total = sum((result.amount for result in charged), Decimal("0.00"))
+        await self._complete_billing_run(run, charged_users=len(charged), total=total)
+        return charged
+
+    async def start_billing_run(
+        self,
+        *,
+        period_key: str,
+        period_start: datetime,
+        period_end: datetime,
+        cost_per_config: Decimal | int | float | str,
+        shard_size: int,
+    ) -> tuple[BillingRun, bool]:
+        """Claim a billing period and record the user-ID shards that charge it.
+
+        The period is claimed exactly once, as in :meth:`charge_period`. A
+        replay validates the parameters and returns the existing run, whose
+        pending shards a crashed or parallel worker may continue.
+        """
+
+        cost = to_money(cost_per_config)
+        if cost < 0:
+            raise InvalidOperationError("Configuration cost cannot be negative")
+        if not period_key or len(period_key) > 80:
+            raise InvalidOperationError("Invalid billing period key")
+        if period_end <= period_start:
+            raise InvalidOperationError("Invalid billing period")
+        if isinstance(shard_size, bool) or not isinstance(shard_size, int):
+            raise InvalidOperationError("Invalid billing shard size")
+        if shard_size < 1:
+            raise InvalidOperationError("Invalid billing shard size")
+
+        run, claimed = await self._claim_billing_run(
+            period_key=period_key,
+            period_start=period_start,
+            period_end=period_end,
+            cost_per_config=cost,
         )
+        if not claimed:
+            self._validate_existing_run(
+                run,
+                period_start=period_start,
+                period_end=period_end,
+                cost_per_config=cost,
+            )
+            return run, False
 
-        charged: list[PeriodChargeResult] = []
-        total = Decimal("0.00")
-        for user_id, config_count in active_counts:
-            charge = to_money(cost * int(config_count))
-            if charge == 0:
-                continue
-            movement = await self.apply_balance_change(
-                user_id=user_id,
-                amount=-charge,
-                kind=LedgerKind.PERIODIC_CHARGE,
-                idempotency_key=f"billing:{period_key}:user:{user_id}",
-                allow_negative_balance=True,
-                reference_type="billing_run",
-                reference_id=str(run.id),
-                details={
-                    "period_key": period_key,
-                    "config_count": int(config_count),
-                    "cost_per_config": str(cost),
-                },
+        if cost == 0:
+            await self._complete_billing_run(run, charged_users=0, total=Decimal(0))
+            return run, True
+
+        first_owner_id, last_owner_id = (
+            await self.session.execute(
+                select(
+                    func.min(VPN_Config.owner_id), func.max(VPN_Config.owner_id)
+                ).where(VPN_Config.actual_state == VPNState.ACTIVE.value)
             )
-            if movement.applied:
-                charged.append(
-                    PeriodChargeResult(
-                        user=movement.user,
-                        amount=charge,
-                        ledger_entry=movement.ledger_entry,
-                    )
-                )
-                total += charge
+        ).one()
+        boundaries: list[int] = []
+        if first_owner_id is not None:
+            boundaries = list(range(first_owner_id, last_owner_id + 1, shard_size))
+        # The first and last shards are open-ended, so owners gaining an active
+        # config while the run is in progress are still charged exactly once.
+        shard_count = max(1, len(boundaries))
+        self.session.add_all(
+            BillingRunShard(
+                billing_run_id=run.id,
+                shard_index=index,
+                first_user_id=None if index == 0 else boundaries[index],
+                last_user_id=(
+                    None if index == shard_count - 1 else boundaries[index + 1] - 1
+                ),
+                status="pending",
+            )
+            for index in range(shard_count)
+        )
+        await self.session.flush()
+        return run, True
 
-        await self._complete_billing_run(run, charged_users=len(charged), total=total)
+    async def list_unfinished_billing_periods(self) -> Sequence[str]:
+        """Return periods whose shards a crashed worker may have left pending."""
+
+        period_keys = await self.session.scalars(
+            select(BillingRun.period_key)
+            .where(BillingRun.status == "running")
+            .order_by(BillingRun.period_start)
+        )
+        return period_keys.all()
+
+    async def claim_billing_shard(self, *, period_key: str) -> BillingRunShard | None:
+        """Lock the next pending shard of a period for this transaction.
+
+        The row lock is the lease: a crashed worker's transaction rolls back
+        and releases the shard, and ``SKIP LOCKED`` lets concurrent workers
+        take different shards of the same period.
+        """
+
+        return await self.session.scalar(
+            select(BillingRunShard)
+            .join(BillingRun, BillingRun.id == BillingRunShard.billing_run_id)
+            .where(
+                BillingRun.period_key == period_key,
+                BillingRunShard.status == "pending",
+            )
+            .order_by(BillingRunShard.shard_index)
+            .with_for_update(of=BillingRunShard, skip_locked=True)
+            .limit(1)
+        )
+
+    async def charge_billing_shard(
+        self, shard: BillingRunShard, *, bulk: bool = False
+    ) -> list[PeriodChargeResult]:
+        """Charge one claimed shard and record it in the same transaction."""
+
+        if shard.status != "pending":
+            raise InvalidOperationError("Billing shard is already completed")
+        run = await self.session.get(BillingRun, shard.billing_run_id)
+        if run is None:
+            raise InvalidOperationError("Billing shard references a missing run")
+
+        cost = to_money(run.cost_per_config)
+        engine = self._charge_active_owners_bulk if bulk else self._charge_active_owners
+        charged = await engine(
+            run=run, period_key=run.period_key, cost=cost, shard=shard
+        )
+        shard.status = "completed"
+        shard.charged_users = len(charged)
+        shard.total_amount = sum((result.amount for result in charged), Decimal("0.00"))
+        shard.completed_at = datetime.now(timezone.utc)
+        await self.session.flush()
+        await self._complete_drained_billing_run(run.id)
         return charged
 
     async def add_notification_outbox(
@@ -898,8 +1246,62 @@ class BillingRepo:
         )
         self.session.add(item)
         await self.session.flush()
+        await self._notify_outbox_publisher()
         return item
 
+    async def add_notification_outbox_many(
+        self,
+        rows: Sequence[tuple[str, int, str]],
+    ) -> int:
+        """Persist ``(dedupe_key, chat_id, text)`` rows with multi-row INSERTs.
+
+        Keys that already exist are skipped by ``ON CONFLICT (dedupe_key) DO
+        NOTHING``, so replaying a billing shard never duplicates a notice.
+        Returns the number of rows actually inserted.
+        """
+
+        for dedupe_key, _chat_id, text in rows:
+            if not dedupe_key or len(dedupe_key) > 160:
+                raise InvalidOperationError("Invalid notification idempotency key")
+            if not text:
+                raise InvalidOperationError("Notification text must not be empty")
+        if not rows:
+            return 0
+
+        dialect = self.session.get_bind().dialect.name
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        inserted = 0
+        for offset in range(0, len(rows), NOTIFICATION_OUTBOX_INSERT_BATCH):
+            batch = rows[offset : offset + NOTIFICATION_OUTBOX_INSERT_BATCH]
+            result = await self.session.execute(
+                dialect_insert(NotificationOutbox)
+                .values(
+                    [
+                        {
+                            "dedupe_key": dedupe_key,
+                            "chat_id": chat_id,
+                            "text": text,
+                            "status": "pending",
+                            "attempts": 0,
+                        }
+                        for dedupe_key, chat_id, text in batch
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=["dedupe_key"])
+            )
+            inserted += max(result.rowcount, 0)
+        await self._notify_outbox_publisher()
+        return inserted
+
+    async def _notify_outbox_publisher(self) -> None:
+        bind = self.session.get_bind()
+        if bind.dialect.name == "postgresql":
+            # Delivered only if the caller commits; PostgreSQL folds repeated
+            # identical notifications of one transaction into a single wakeup.
+            await self.session.execute(
+                select(func.pg_notify(NOTIFICATION_OUTBOX_CHANNEL, ""))
+            )
+
     async def claim_notification_outbox(
         self,
         *,
@@ -945,6 +1347,28 @@ class BillingRepo:
         item.last_error = None
         await self.session.flush()
 
+    async def mark_notifications_published(
+        self,
+        items: Sequence[NotificationOutbox],
+        *,
+        now: datetime | None = None,
+    ) -> None:
+        """Mark a claimed batch queued with one statement."""
+
+        if not items:
+            return
+        now = now or datetime.now(timezone.utc)
+        await self.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_([item.id for item in items]))
+            .values(status="queued", published_at=now, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        for item in items:
+            set_committed_value(item, "status", "queued")
+            set_committed_value(item, "published_at", now)
+            set_committed_value(item, "last_error", None)
+
     async def mark_notification_retry(
         self,
         item: NotificationOutbox,
@@ -1005,7 +1429,7 @@ class BillingRepo:
         return bool(result.rowcount)
 
     async def refund_rejected_config_reservations(
-        self, *, operation_id: str | None = None
+        self, *, operation_id: str | None = None, limit: int = 100
     ) -> int:
         """Compensate reservations whose durable provisioning was rejected.
 
@@ -1015,8 +1439,26 @@ class BillingRepo:
         linked to the immutable provision operation ID rather than to a config's
         mutable ``operation_id`` pointer, which is replaced by every later
         suspend/unsuspend/revoke transition.
+
+        Without ``operation_id`` only a page of the ``pending_config_refund``
+        queue is processed, so a reconcile cycle costs O(new rejections) rather
+        than a scan of every historical reservation.
         """
 
+        if operation_id is not None:
+            operation_ids = [operation_id]
+        else:
+            operation_ids = list(
+                await self.session.scalars(
+                    select(PendingConfigRefund.operation_id)
+                    .order_by(PendingConfigRefund.id)
+                    .with_for_update(skip_locked=True)
+                    .limit(limit)
+                )
+            )
+            if not operation_ids:
+                return 0
+
         stmt = (
             select(LedgerEntry)
             .join(
@@ -1029,13 +1471,12 @@ class BillingRepo:
                 LedgerEntry.amount < 0,
                 VPNOperation.kind == VPNOperationKind.PROVISION.value,
                 VPNOperation.status == VPNOperationStatus.REJECTED.value,
+                VPNOperation.operation_id.in_(operation_ids),
             )
             .order_by(LedgerEntry.id)
         )
-        if operation_id is not None:
-            stmt = stmt.where(VPNOperation.operation_id == operation_id)
 
-        reservations = await self.session.scalars(stmt)
+        reservations = (await self.session.scalars(stmt)).all()
         refunded = 0
         for reservation in reservations:
             result = await self.apply_balance_change(
@@ -1049,6 +1490,11 @@ class BillingRepo:
                 details={"reservation_key": reservation.idempotency_key},
             )
             refunded += int(result.applied)
+        await self.session.execute(
+            delete(PendingConfigRefund).where(
+                PendingConfigRefund.operation_id.in_(operation_ids)
+            )
+        )
         return refunded
 
     async def _claim_billing_run(
@@ -1116,6 +1562,195 @@ class BillingRepo:
         run.completed_at = datetime.now(timezone.utc)
         await self.session.flush()
 
+    async def _complete_drained_billing_run(self, run_id: int) -> None:
+        # Locking the run serializes the final check: of two workers finishing
+        # the last shards concurrently, the later one sees both committed.
+        run = await self.session.scalar(
+            select(BillingRun)
+            .where(BillingRun.id == run_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        if run is None or run.status == "completed":
+            return
+        pending, charged_users, total = (
+            await self.session.execute(
+                select(
+                    func.count(BillingRunShard.id).filter(
+                        BillingRunShard.status == "pending"
+                    ),
+                    func.coalesce(func.sum(BillingRunShard.charged_users), 0),
+                    func.coalesce(func.sum(BillingRunShard.total_amount), 0),
+                ).where(BillingRunShard.billing_run_id == run_id)
+            )
+        ).one()
+        if pending:
+            return
+        await self._complete_billing_run(
+            run, charged_users=int(charged_users), total=to_money(total)
+        )
+
+    async def _charge_active_owners(
+        self,
+        *,
+        run: BillingRun,
+        period_key: str,
+        cost: Decimal,
+        shard: BillingRunShard | None = None,
+    ) -> list[PeriodChargeResult]:
+        """Charge owners one balance movement at a time."""
+
+        active_counts = await self.session.execute(
+            select(VPN_Config.owner_id, func.count(VPN_Config.id))
+            .where(
+                VPN_Config.actual_state == VPNState.ACTIVE.value,
+                *self._shard_owner_filter(shard),
+            )
+            .group_by(VPN_Config.owner_id)
+            .order_by(VPN_Config.owner_id)
+        )
+
+        charged: list[PeriodChargeResult] = []
+        for user_id, config_count in active_counts:
+            charge = to_money(cost * int(config_count))
+            if charge == 0:
+                continue
+            movement = await self.apply_balance_change(
+                user_id=user_id,
+                amount=-charge,
+                kind=LedgerKind.PERIODIC_CHARGE,
+                idempotency_key=self._period_charge_key(period_key, user_id),
+                allow_negative_balance=True,
+                reference_type="billing_run",
+                reference_id=str(run.id),
+                details=self._period_charge_details(
+                    period_key, int(config_count), cost
+                ),
+            )
+            if movement.applied:
+                charged.append(
+                    PeriodChargeResult(
+                        user=movement.user,
+                        amount=charge,
+                        ledger_entry=movement.ledger_entry,
+                    )
+                )
+        return charged
+
+    async def _charge_active_owners_bulk(
+        self,
+        *,
+        run: BillingRun,
+        period_key: str,
+        cost: Decimal,
+        shard: BillingRunShard | None = None,
+    ) -> list[PeriodChargeResult]:
+        """Charge every owner with a constant number of set-based statements.
+
+        Produces exactly the rows of :meth:`_charge_active_owners`: the same
+        idempotency keys, details and a ``balance_after`` computed from the
+        locked balance. Locks are taken by one statement in ascending user-ID
+        order, the order provider captures use, so the paths cannot deadlock.
+        """
+
+        active_counts = (
+            select(
+                VPN_Config.owner_id.label("owner_id"),
+                func.count(VPN_Config.id).label("config_count"),
+            )
+            .where(
+                VPN_Config.actual_state == VPNState.ACTIVE.value,
+                *self._shard_owner_filter(shard),
+            )
+            .group_by(VPN_Config.owner_id)
+            .subquery()
+        )
+        owners = (
+            await self.session.execute(
+                select(User, active_counts.c.config_count)
+                .join(active_counts, active_counts.c.owner_id == User.id)
+                .order_by(User.id)
+                .with_for_update(of=User)
+                .execution_options(populate_existing=True)
+            )
+        ).all()
+        if not owners:
+            return []
+
+        kind = LedgerKind.PERIODIC_CHARGE.value
+        # Only the locked owners' exact keys are probed, through the unique
+        # index, so the lookup does not grow with the rest of the ledger.
+        keys = [self._period_charge_key(period_key, user.id) for user, _ in owners]
+        existing: dict[str, LedgerEntry] = {}
+        for offset in range(0, len(keys), PERIOD_CHARGE_LOOKUP_BATCH):
+            existing.update(
+                (entry.idempotency_key, entry)
+                for entry in await self.session.scalars(
+                    select(LedgerEntry).where(
+                        LedgerEntry.kind == kind,
+                        LedgerEntry.idempotency_key.in_(
+                            keys[offset : offset + PERIOD_CHARGE_LOOKUP_BATCH]
+                        ),
+                    )
+                )
+            )
+
+        planned: list[tuple[User, Decimal, Decimal]] = []
+        ledger_rows: list[dict] = []
+        for user, config_count in owners:
+            charge = to_money(cost * int(config_count))
+            if charge == 0:
+                continue
+            idempotency_key = self._period_charge_key(period_key, user.id)
+            entry = existing.get(idempotency_key)
+            if entry is not None:
+                self._validate_existing_entry(
+                    entry, user_id=user.id, amount=-charge, kind=kind
+                )
+                continue
+            balance_after = to_money(user.balance) - charge
+            planned.append((user, charge, balance_after))
+            ledger_rows.append(
+                {
+                    "user_id": user.id,
+                    "amount": -charge,
+                    "balance_after": balance_after,
+                    "kind": kind,
+                    "idempotency_key": idempotency_key,
+                    "reference_type": "billing_run",
+                    "reference_id": str(run.id),
+                    "details": self._period_charge_details(
+                        period_key, int(config_count), cost
+                    ),
+                }
+            )
+        if not planned:
+            return []
+
+        # Rows are locked above, so absolute balances cannot lose a concurrent
+        # update. Both statements are batched executemany/multi-row VALUES.
+        await self.session.execute(
+            update(User),
+            [
+                {"id": user.id, "balance": balance_after}
+                for user, _charge, balance_after in planned
+            ],
+        )
+        entries = await self.session.scalars(
+            insert(LedgerEntry).returning(LedgerEntry, sort_by_parameter_order=True),
+            ledger_rows,
+        )
+
+        charged: list[PeriodChargeResult] = []
+        for (user, charge, balance_after), entry in zip(
+            planned, entries.all(), strict=True
+        ):
+            set_committed_value(user, "balance", balance_after)
+            charged.append(
+                PeriodChargeResult(user=user, amount=charge, ledger_entry=entry)
+            )
+        return charged
+
     async def _lock_referral_payment_users(self, user_id: int) -> Sequence[User]:
         """Lock payer and at most two ancestors in global user-ID order."""
 
@@ -1145,6 +1780,199 @@ class BillingRepo:
         )
         return locked.all()
 
+    async def _write_referral_rewards(
+        self,
+        staged: Collection[tuple[ProviderPayment, list[_ReferralLevel]]],
+        *,
+        results: dict[int, list[ReferralRewardResult] | None],
+        program_version: str,
+    ) -> None:
+        """Credit staged reward levels with one statement per table."""
+
+        beneficiary_ids = {
+            beneficiary.id
+            for _payment, levels in staged
+            for _level, beneficiary, *_rest in levels
+        }
+        # Beneficiaries are locked by the claim; reload them in case a replayed
+        # payment moved (or a rolled-back savepoint expired) their balances.
+        users = {
+            user.id: user
+            for user in (
+                await self.session.scalars(
+                    select(User)
+                    .where(User.id.in_(beneficiary_ids))
+                    .execution_options(populate_existing=True)
+                )
+            ).all()
+        }
+        balances = {user_id: to_money(user.balance) for user_id, user in users.items()}
+
+        ledger_rows: list[dict] = []
+        reward_rows: list[dict] = []
+        for payment, levels in staged:
+            for level, beneficiary, rate_bps, reward_amount in levels:
+                balances[beneficiary.id] += reward_amount
+                ledger_rows.append(
+                    {
+                        "user_id": beneficiary.id,
+                        "amount": reward_amount,
+                        "balance_after": balances[beneficiary.id],
+                        "kind": (
+                            LedgerKind.REFERRAL_REWARD_L1.value
+                            if level == 1
+                            else LedgerKind.REFERRAL_REWARD_L2.value
+                        ),
+                        "idempotency_key": self._referral_reward_key(payment.id, level),
+                        "reference_type": "referral_reward",
+                        "reference_id": f"payment:{payment.id}:level:{level}",
+                        "details": self._referral_reward_details(
+                            payment,
+                            beneficiary=beneficiary,
+                            level=level,
+                            rate_bps=rate_bps,
+                            program_version=program_version,
+                        ),
+                    }
+                )
+                reward_rows.append(
+                    {
+                        "source_payment_id": payment.id,
+                        "source_user_id": payment.user_id,
+                        "beneficiary_user_id": beneficiary.id,
+                        "level": level,
+                        "rate_bps": rate_bps,
+                        "source_amount": payment.amount,
+                        "reward_amount": reward_amount,
+                        "currency": payment.currency,
+                        "program_version": program_version,
+                    }
+                )
+
+        await self.session.execute(
+            update(User),
+            [
+                {"id": user_id, "balance": balance}
+                for user_id, balance in balances.items()
+            ],
+        )
+        entries = (
+            await self.session.scalars(
+                insert(LedgerEntry).returning(
+                    LedgerEntry, sort_by_parameter_order=True
+                ),
+                ledger_rows,
+            )
+        ).all()
+        for row, entry in zip(reward_rows, entries, strict=True):
+            row["ledger_entry_id"] = entry.id
+        rewards = (
+            await self.session.scalars(
+                insert(ReferralReward).returning(
+                    ReferralReward, sort_by_parameter_order=True
+                ),
+                reward_rows,
+            )
+        ).all()
+        for user_id, balance in balances.items():
+            set_committed_value(users[user_id], "balance", balance)
+        for reward, entry in zip(rewards, entries, strict=True):
+            results.setdefault(reward.source_payment_id, []).append(
+                ReferralRewardResult(
+                    user=users[reward.beneficiary_user_id],
+                    reward=reward,
+                    ledger_entry=entry,
+                    applied=True,
+                )
+            )
+
+    async def _referral_chain(self, source_user: User) -> list[User] | None:
+        """Return up to two ancestors of ``source_user``; ``None`` if broken."""
+
+        chain: list[User] = []
+        seen_user_ids = {source_user.id}
+        current = source_user
+        for _level in (1, 2):
+            if current.referred_by_id is None:
+                break
+            if current.referred_by_id in seen_user_ids:
+                return None
+            beneficiary = await self.session.get(User, current.referred_by_id)
+            if beneficiary is None:
+                return None
+            chain.append(beneficiary)
+            seen_user_ids.add(beneficiary.id)
+            current = beneficiary
+        return chain
+
+    @staticmethod
+    def _referral_levels(
+        payment: ProviderPayment,
+        chain: Sequence[User],
+        level_rates_bps: tuple[int, int],
+    ) -> Iterator[_ReferralLevel]:
+        """Yield ``(level, beneficiary, rate_bps, reward_amount)`` to credit."""
+
+        for level, (beneficiary, rate_bps) in enumerate(
+            zip(chain, level_rates_bps, strict=False), start=1
+        ):
+            if rate_bps == 0:
+                continue
+            reward_amount = to_money(
+                payment.amount * Decimal(rate_bps) / Decimal(10_000)
+            )
+            # Sub-cent rewards are not representable by the RUB ledger and must
+            # not produce zero-value audit rows.
+            if reward_amount == 0:
+                continue
+            yield level, beneficiary, rate_bps, reward_amount
+
+    @staticmethod
+    def _referral_reward_key(payment_id: int, level: int) -> str:
+        return f"referral-reward:v1:provider-payment:{payment_id}:level:{level}"
+
+    @staticmethod
+    def _referral_reward_details(
+        payment: ProviderPayment,
+        *,
+        beneficiary: User,
+        level: int,
+        rate_bps: int,
+        program_version: str,
+    ) -> dict:
+        return {
+            "source_payment_id": payment.id,
+            "source_user_id": payment.user_id,
+            "beneficiary_user_id": beneficiary.id,
+            "level": level,
+            "rate_bps": rate_bps,
+            "currency": payment.currency,
+            "program_version": program_version,
+            "retroactive": False,
+        }
+
+    @staticmethod
+    def _referral_program_version(
+        level_rates_bps: tuple[int, int], program_version: str
+    ) -> str:
+        if len(level_rates_bps) != 2:
+            raise InvalidOperationError("Exactly two referral rates are required")
+        if any(
+            isinstance(rate, bool)
+            or not isinstance(rate, int)
+            or not 0 <= rate <= 1_000
+            for rate in level_rates_bps
+        ):
+            raise InvalidOperationError("Invalid referral reward rate")
+        if level_rates_bps[1] > level_rates_bps[0]:
+            raise InvalidOperationError("Level 2 referral rate cannot exceed level 1")
+        if sum(level_rates_bps) > 1_000:
+            raise InvalidOperationError("Combined referral rates cannot exceed 10%")
+        program_version = program_version.strip()
+        if not program_version or len(program_version) > 32:
+            raise InvalidOperationError("Invalid referral program version")
+        return program_version
+
     async def _settle_referral_payment(
         self,
         payment: ProviderPayment,
@@ -1290,6 +2118,31 @@ class BillingRepo:
             credited=False,
         )
 
+    @staticmethod
+    def _shard_owner_filter(shard: BillingRunShard | None) -> list:
+        if shard is None:
+            return []
+        conditions = []
+        if shard.first_user_id is not None:
+            conditions.append(VPN_Config.owner_id >= shard.first_user_id)
+        if shard.last_user_id is not None:
+            conditions.append(VPN_Config.owner_id <= shard.last_user_id)
+        return conditions
+
+    @staticmethod
+    def _period_charge_key(period_key: str, user_id: int | str) -> str:
+        return f"billing:{period_key}:user:{user_id}"
+
+    @staticmethod
+    def _period_charge_details(
+        period_key: str, config_count: int, cost: Decimal
+    ) -> dict:
+        return {
+            "period_key": period_key,
+            "config_count": config_count,
+            "cost_per_config": str(cost),
+        }
+
     @staticmethod
     def _validate_existing_entry(
         entry: LedgerEntry,
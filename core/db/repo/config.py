@@ -1,10 +1,17 @@
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Sequence
+from typing import Collection, Mapping, Sequence
 
-from sqlalchemy import delete, or_, select, update
+from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from core.db.models import VPN_Config
+from core.db.models.config import (
+    is_managed_state,
+    managed_config_condition,
+    shift_managed_config_counts,
+)
 from core.domain import VPNState
 
 from .base import BaseRepo
@@ -36,6 +43,38 @@ class ConfigRepo(BaseRepo[VPN_Config]):
         )
         return (await self.session.scalars(stmt)).all()
 
+    async def list_owners_for_update(
+        self, owner_ids: Collection[int]
+    ) -> Sequence[VPN_Config]:
+        """Lock the configs of many owners in one statement, in ID order."""
+
+        ids = sorted(set(owner_ids))
+        if not ids:
+            return []
+        stmt = (
+            select(self.model)
+            .where(self.model.owner_id.in_(ids))
+            .order_by(self.model.id)
+            .with_for_update()
+        )
+        return (await self.session.scalars(stmt)).all()
+
+    async def list_for_update(
+        self, config_ids: Collection[int]
+    ) -> Sequence[VPN_Config]:
+        """Lock many configs in one statement, in ID order."""
+
+        ids = sorted(set(config_ids))
+        if not ids:
+            return []
+        stmt = (
+            select(self.model)
+            .where(self.model.id.in_(ids))
+            .order_by(self.model.id)
+            .with_for_update()
+        )
+        return (await self.session.scalars(stmt)).all()
+
     async def get_active(self, owner_id: int = None) -> Sequence[VPN_Config]:
         """
         Get all active (not suspended) VPN configurations.
@@ -80,6 +119,11 @@ class ConfigRepo(BaseRepo[VPN_Config]):
         Returns:
             Updated VPN configuration or None if not found
         """
+        await self._count_transition(
+            [self.model.id == config_id],
+            desired_state=VPNState.SUSPENDED.value,
+            actual_state=VPNState.SUSPENDED.value,
+        )
         stmt = (
             update(self.model)
             .where(self.model.id == config_id)
@@ -107,6 +151,11 @@ class ConfigRepo(BaseRepo[VPN_Config]):
         Returns:
             Updated VPN configuration or None if not found
         """
+        await self._count_transition(
+            [self.model.id == config_id],
+            desired_state=VPNState.ACTIVE.value,
+            actual_state=VPNState.ACTIVE.value,
+        )
         stmt = (
             update(self.model)
             .where(self.model.id == config_id)
@@ -126,6 +175,11 @@ class ConfigRepo(BaseRepo[VPN_Config]):
 
     async def suspend_all(self, owner_id: int) -> int:
         """Suspend all active configs for a given user."""
+        await self._count_transition(
+            [self.model.owner_id == owner_id, self.model.suspended.is_(False)],
+            desired_state=VPNState.SUSPENDED.value,
+            actual_state=VPNState.SUSPENDED.value,
+        )
         stmt = (
             update(self.model)
             .where(self.model.owner_id == owner_id, self.model.suspended.is_(False))
@@ -144,6 +198,11 @@ class ConfigRepo(BaseRepo[VPN_Config]):
 
     async def unsuspend_all(self, owner_id: int) -> int:
         """Unsuspend all configs for a given user."""
+        await self._count_transition(
+            [self.model.owner_id == owner_id, self.model.suspended.is_(True)],
+            desired_state=VPNState.ACTIVE.value,
+            actual_state=VPNState.ACTIVE.value,
+        )
         stmt = (
             update(self.model)
             .where(self.model.owner_id == owner_id, self.model.suspended.is_(True))
@@ -203,6 +262,9 @@ class ConfigRepo(BaseRepo[VPN_Config]):
     ) -> VPN_Config | None:
         """Persist intent before calling the remote manager."""
 
+        await self._count_transition(
+            [self.model.id == config_id], desired_state=desired_state
+        )
         stmt = (
             update(self.model)
             .where(self.model.id == config_id)
@@ -216,6 +278,46 @@ class ConfigRepo(BaseRepo[VPN_Config]):
         )
         return (await self.session.execute(stmt)).scalar_one_or_none()
 
+    async def begin_transitions(
+        self,
+        transitions: Mapping[str, VPN_Config],
+        *,
+        desired_state: str,
+    ) -> None:
+        """Persist many locked configs' intents in one executemany statement.
+
+        ``transitions`` maps each new operation ID to its already locked
+        config; the loaded rows are refreshed to the written values.
+        """
+
+        if not transitions:
+            return
+        deltas: Counter[int] = Counter()
+        for cfg in transitions.values():
+            deltas[cfg.server_id] += is_managed_state(
+                desired_state, cfg.actual_state
+            ) - is_managed_state(cfg.desired_state, cfg.actual_state)
+        await self.session.run_sync(shift_managed_config_counts, deltas)
+        now = datetime.now(timezone.utc)
+        await self.session.execute(
+            update(self.model),
+            [
+                {
+                    "id": cfg.id,
+                    "desired_state": desired_state,
+                    "operation_id": operation_id,
+                    "last_error": None,
+                    "updated_at": now,
+                }
+                for operation_id, cfg in transitions.items()
+            ],
+        )
+        for operation_id, cfg in transitions.items():
+            set_committed_value(cfg, "desired_state", desired_state)
+            set_committed_value(cfg, "operation_id", operation_id)
+            set_committed_value(cfg, "last_error", None)
+            set_committed_value(cfg, "updated_at", now)
+
     async def set_desired_state(
         self,
         config_id: int,
@@ -224,6 +326,9 @@ class ConfigRepo(BaseRepo[VPN_Config]):
     ) -> VPN_Config | None:
         """Update entitlement without pretending that Manager already converged."""
 
+        await self._count_transition(
+            [self.model.id == config_id], desired_state=desired_state
+        )
         stmt = (
             update(self.model)
             .where(self.model.id == config_id)
@@ -256,24 +361,23 @@ class ConfigRepo(BaseRepo[VPN_Config]):
         elif actual_state == VPNState.ACTIVE.value:
             values.update(suspended=False, suspended_at=None)
 
-        stmt = (
-            update(self.model)
-            .where(
-                self.model.id == config_id,
-                self.model.operation_id == operation_id,
-            )
-            .values(**values)
-            .returning(self.model)
-        )
+        where = [
+            self.model.id == config_id,
+            self.model.operation_id == operation_id,
+        ]
+        await self._count_transition(where, actual_state=actual_state)
+        stmt = update(self.model).where(*where).values(**values).returning(self.model)
         return (await self.session.execute(stmt)).scalar_one_or_none()
 
     async def delete_if_operation(self, config_id: int, *, operation_id: str) -> int:
         """Delete only when the completing revoke still owns the config intent."""
 
-        stmt = delete(self.model).where(
+        where = [
             self.model.id == config_id,
             self.model.operation_id == operation_id,
-        )
+        ]
+        await self._count_transition(where, deleted=True)
+        stmt = delete(self.model).where(*where)
         result = await self.session.execute(stmt)
         return result.rowcount
 
@@ -289,18 +393,74 @@ class ConfigRepo(BaseRepo[VPN_Config]):
             "last_error": error[:4000],
             "updated_at": datetime.now(timezone.utc),
         }
+        where = [
+            self.model.id == config_id,
+            self.model.operation_id == operation_id,
+        ]
         if actual_state is not None:
             values["actual_state"] = actual_state
-        stmt = (
-            update(self.model)
-            .where(
-                self.model.id == config_id,
-                self.model.operation_id == operation_id,
+            await self._count_transition(where, actual_state=actual_state)
+        stmt = update(self.model).where(*where).values(**values).returning(self.model)
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def delete(self, **filters) -> int:
+        """Delete configs matching the filters and release their capacity."""
+
+        await self._count_transition(
+            [getattr(self.model, column) == value for column, value in filters.items()],
+            deleted=True,
+        )
+        return await super().delete(**filters)
+
+    async def _count_transition(
+        self,
+        where: Sequence,
+        *,
+        desired_state: str | None = None,
+        actual_state: str | None = None,
+        deleted: bool = False,
+    ) -> None:
+        """Lock the written rows whose managed status changes; shift counts.
+
+        Must run in the transaction of the write itself, with the same
+        predicate. Only rows the requested states move into or out of the
+        managed set are looked up and locked, so writes that keep every row
+        managed (suspend, unsuspend, most transitions) neither lock configs
+        nor touch the servers' counter rows.
+        """
+
+        revoked = VPNState.REVOKED.value
+        requested = [
+            state for state in (desired_state, actual_state) if state is not None
+        ]
+        managed = managed_config_condition()
+        if deleted:
+            changed, delta = managed, -1
+        elif not requested:
+            return
+        elif any(state != revoked for state in requested):
+            # The rows end up managed; only unmanaged ones are re-counted.
+            changed, delta = ~managed, 1
+        elif len(requested) == 2:
+            changed, delta = managed, -1
+        else:
+            # One column becomes revoked: a row leaves the managed set only
+            # when the other one already is.
+            other = (
+                self.model.actual_state
+                if desired_state is not None
+                else self.model.desired_state
             )
-            .values(**values)
-            .returning(self.model)
+            changed, delta = and_(managed, other == revoked), -1
+
+        server_ids = await self.session.scalars(
+            select(self.model.server_id).where(*where, changed).with_for_update()
         )
-        return (await self.session.execute(stmt)).scalar_one_or_none()
+        deltas: Counter[int] = Counter()
+        for server_id in server_ids:
+            deltas[server_id] += delta
+        if deltas:
+            await self.session.run_sync(shift_managed_config_counts, deltas)
 
     async def list_drifted(self, *, limit: int = 100) -> Sequence[VPN_Config]:
         """Return configurations whose desired state has not converged."""
@@ -320,6 +480,38 @@ class ConfigRepo(BaseRepo[VPN_Config]):
         )
         return (await self.session.scalars(stmt)).all()
 
+    async def list_drift_states(
+        self,
+        server_id: int,
+        *,
+        changed_since: datetime | None = None,
+    ) -> Sequence:
+        """Return the state columns drift compares, optionally only recent rows.
+
+        Rows are ``(id, name, desired_state, actual_state, updated_at)``.
+        """
+
+        stmt = select(
+            self.model.id,
+            self.model.name,
+            self.model.desired_state,
+            self.model.actual_state,
+            self.model.updated_at,
+        ).where(self.model.server_id == server_id)
+        if changed_since is not None:
+            stmt = stmt.where(self.model.updated_at >= changed_since)
+        return (await self.session.execute(stmt.order_by(self.model.id))).all()
+
+    async def count_for_server(self, server_id: int) -> int:
+        stmt = select(func.count(self.model.id)).where(
+            self.model.server_id == server_id
+        )
+        return int(await self.session.scalar(stmt) or 0)
+
+    async def ids_for_server(self, server_id: int) -> set[int]:
+        stmt = select(self.model.id).where(self.model.server_id == server_id)
+        return set((await self.session.scalars(stmt)).all())
+
     async def update_display_name(
         self, config_id: int, new_name: str
     ) -> VPN_Config | None:
@@ -1,8 +1,11 @@
 from typing import Sequence
 
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
 
-from core.db.models import Server, VPN_Config
+from core.db.models import Server, VPN_Config, VPNServerStatus
+from core.db.models.config import managed_config_condition
+from core.domain import ServerLifecycleState
 
 from .base import BaseRepo
 
@@ -11,11 +14,105 @@ class ServerRepo(BaseRepo[Server]):
     model = Server
 
     async def get_for_update(self, server_id: int) -> Server | None:
-        """Lock a Manager target while configs or endpoint changes are staged."""
+        """Lock a Manager target while configs or endpoint changes are staged.
+
+        The locked row replaces any copy already loaded in the session, so
+        capacity decisions read the committed ``managed_config_count``.
+        """
 
         return await self.session.scalar(
-            select(self.model).where(self.model.id == server_id).with_for_update()
+            select(self.model)
+            .where(self.model.id == server_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+
+    async def list_with_latest_status(
+        self, *, placeable_only: bool = False, **filters
+    ) -> Sequence[tuple[Server, VPNServerStatus | None]]:
+        """Return servers with their newest status sample in one query.
+
+        ``placeable_only`` keeps only active servers open for new configs;
+        readiness and capacity are still decided by the caller.
+        """
+
+        latest_id = (
+            select(VPNServerStatus.id)
+            .where(
+                VPNServerStatus.server_id == self.model.id,
+                VPNServerStatus.kind == "status",
+            )
+            .order_by(VPNServerStatus.collected_at.desc(), VPNServerStatus.id.desc())
+            .limit(1)
+            .correlate(self.model)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(self.model, VPNServerStatus)
+            .outerjoin_from(
+                self.model, VPNServerStatus, VPNServerStatus.id == latest_id
+            )
+            .where(
+                *(getattr(self.model, key) == value for key, value in filters.items())
+            )
+            .order_by(self.model.id)
+        )
+        if placeable_only:
+            stmt = stmt.where(
+                self.model.lifecycle_state == ServerLifecycleState.ACTIVE.value,
+                self.model.accepts_new_configs.is_(True),
+            )
+        return (await self.session.execute(stmt)).tuples().all()
+
+    async def managed_config_count_mismatches(self) -> Sequence:
+        """Return servers whose maintained counter disagrees with their configs.
+
+        Rows are ``(id, managed_config_count, counted)``.
+        """
+
+        counted = (
+            select(VPN_Config.server_id, func.count(VPN_Config.id).label("managed"))
+            .where(managed_config_condition())
+            .group_by(VPN_Config.server_id)
+            .subquery()
+        )
+        managed = func.coalesce(counted.c.managed, 0)
+        stmt = (
+            select(self.model.id, self.model.managed_config_count, managed)
+            .outerjoin(counted, counted.c.server_id == self.model.id)
+            .where(self.model.managed_config_count != managed)
+            .order_by(self.model.id)
+        )
+        return (await self.session.execute(stmt)).all()
+
+    async def recount_managed_configs(self, server_id: int) -> tuple[int, int] | None:
+        """Rebuild one server's counter under its lock; return (stored, counted).
+
+        Config writes shift the counter while holding the same row lock, so a
+        write still in flight lands on top of the rebuilt value.
+        """
+
+        server = await self.get_for_update(server_id)
+        if server is None:
+            return None
+        stored = server.managed_config_count
+        counted = int(
+            await self.session.scalar(
+                select(func.count(VPN_Config.id)).where(
+                    VPN_Config.server_id == server_id,
+                    managed_config_condition(),
+                )
+            )
+            or 0
         )
+        if counted != stored:
+            await self.session.execute(
+                update(self.model)
+                .where(self.model.id == server_id)
+                .values(managed_config_count=counted, updated_at=self.model.updated_at)
+            )
+            set_committed_value(server, "managed_config_count", counted)
+        return stored, counted
 
     async def search_by_name(self, query: str, limit: int = 20) -> Sequence[Server]:
         """
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Row, delete, exists, func, insert, select
+from sqlalchemy.orm import aliased
+
+from core.db.models.server import VPNServerStatus, VPNServerStatusRollup
+
+from .base import BaseRepo
+
+
+class ServerStatusRepo(BaseRepo[VPNServerStatus]):
+    model = VPNServerStatus
+
+    async def first_sample_at(self, since: datetime | None = None) -> datetime | None:
+        stmt = select(func.min(self.model.collected_at)).where(
+            self.model.kind == "status"
+        )
+        if since is not None:
+            stmt = stmt.where(self.model.collected_at >= since)
+        return await self.session.scalar(stmt)
+
+    async def samples(self, start: datetime, end: datetime) -> Sequence[Row]:
+        """Status samples collected in ``[start, end)``, oldest first per server.
+
+        Only the fields a rollup needs are extracted from the snapshot in SQL,
+        so the full JSON documents never leave the database.
+        """
+
+        snapshot = self.model.snapshot
+        stmt = (
+            select(
+                self.model.server_id,
+                self.model.collected_at,
+                self.model.success,
+                snapshot[("readiness", "ready")].as_boolean().label("ready"),
+                snapshot[("data_plane", "status")].as_string().label("plane_status"),
+                snapshot[("data_plane", "online_sessions")]
+                .as_integer()
+                .label("online_sessions"),
+                snapshot[("data_plane", "bytes_received")]
+                .as_numeric(20, 0)
+                .label("bytes_received"),
+                snapshot[("data_plane", "bytes_sent")]
+                .as_numeric(20, 0)
+                .label("bytes_sent"),
+            )
+            .where(
+                self.model.kind == "status",
+                self.model.collected_at >= start,
+                self.model.collected_at < end,
+            )
+            .order_by(self.model.server_id, self.model.collected_at, self.model.id)
+        )
+        return (await self.session.execute(stmt)).all()
+
+    async def last_rollup_start(self, resolution: str) -> datetime | None:
+        return await self.session.scalar(
+            select(func.max(VPNServerStatusRollup.bucket_start)).where(
+                VPNServerStatusRollup.resolution == resolution
+            )
+        )
+
+    async def first_rollup_start(
+        self, resolution: str, since: datetime | None = None
+    ) -> datetime | None:
+        stmt = select(func.min(VPNServerStatusRollup.bucket_start)).where(
+            VPNServerStatusRollup.resolution == resolution
+        )
+        if since is not None:
+            stmt = stmt.where(VPNServerStatusRollup.bucket_start >= since)
+        return await self.session.scalar(stmt)
+
+    async def rollups(
+        self,
+        resolution: str,
+        start: datetime,
+        end: datetime,
+    ) -> Sequence[VPNServerStatusRollup]:
+        stmt = (
+            select(VPNServerStatusRollup)
+            .where(
+                VPNServerStatusRollup.resolution == resolution,
+                VPNServerStatusRollup.bucket_start >= start,
+                VPNServerStatusRollup.bucket_start < end,
+            )
+            .order_by(
+                VPNServerStatusRollup.server_id, VPNServerStatusRollup.bucket_start
+            )
+        )
+        return (await self.session.scalars(stmt)).all()
+
+    async def replace_rollups(
+        self,
+        resolution: str,
+        start: datetime,
+        end: datetime,
+        rows: Sequence[dict[str, Any]],
+    ) -> None:
+        """Rewrite every ``resolution`` bucket in ``[start, end)``.
+
+        A rerun over the same window therefore converges instead of failing
+        on the bucket's unique key.
+        """
+
+        await self.session.execute(
+            delete(VPNServerStatusRollup).where(
+                VPNServerStatusRollup.resolution == resolution,
+                VPNServerStatusRollup.bucket_start >= start,
+                VPNServerStatusRollup.bucket_start < end,
+            )
+        )
+        if rows:
+            await self.session.execute(
+                insert(VPNServerStatusRollup),
+                [{**row, "resolution": resolution} for row in rows],
+            )
+
+    async def prune_samples(self, before: datetime) -> int:
+        """Delete raw snapshots older than ``before``.
+
+        A server's newest status and inventory snapshots are kept whatever
+        their age: fleet reads take health and inventory revision from them.
+        """
+
+        newer = aliased(VPNServerStatus)
+        result = await self.session.execute(
+            delete(self.model).where(
+                self.model.collected_at < before,
+                exists().where(
+                    newer.server_id == self.model.server_id,
+                    newer.kind == self.model.kind,
+                    newer.collected_at > self.model.collected_at,
+                ),
+            )
+        )
+        return result.rowcount or 0
+
+    async def prune_rollups(self, resolution: str, before: datetime) -> int:
+        result = await self.session.execute(
+            delete(VPNServerStatusRollup).where(
+                VPNServerStatusRollup.resolution == resolution,
+                VPNServerStatusRollup.bucket_start < before,
+            )
+        )
+        return result.rowcount or 0
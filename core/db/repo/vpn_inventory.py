@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from core.db.models.vpn_inventory import VPNInventorySnapshot
+
+from .base import BaseRepo
+
+
+class VPNInventoryRepo(BaseRepo[VPNInventorySnapshot]):
+    model = VPNInventorySnapshot
+
+    async def get_for_server(self, server_id: int) -> VPNInventorySnapshot | None:
+        stmt = select(self.model).where(self.model.server_id == server_id)
+        return await self.session.scalar(stmt)
+
+    async def save(self, server_id: int, **values) -> VPNInventorySnapshot:
+        """Create or update the server's snapshot with only the given columns.
+
+        Unchanged JSON columns are left out by callers, so a large inventory
+        is not rewritten when only Hub state moved.
+        """
+
+        # One upsert, so overlapping audits of a server (scheduled and
+        # admin-triggered) cannot both insert and trip the unique key.
+        dialect = self.session.get_bind().dialect.name
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        # NOT NULL is checked on the proposed row even when it then conflicts.
+        stmt = dialect_insert(self.model).values(
+            {"full_audit_at": func.now(), **values, "server_id": server_id}
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.server_id],
+            set_={**values, "updated_at": func.now()},
+        ).returning(self.model)
+        return await self.session.scalar(
+            stmt, execution_options={"populate_existing": True}
+        )
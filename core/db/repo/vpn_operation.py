@@ -3,10 +3,14 @@ from __future__ import annotations
 from datetime import datetime, timedelta, timezone
 from typing import Sequence
 
-from sqlalchemy import and_, case, or_, select, update
+from sqlalchemy import and_, case, exists, func, insert, or_, select, update
+from sqlalchemy.orm import contains_eager
 
+from core.db.models.config import VPN_Config
+from core.db.models.pending_config_refund import PendingConfigRefund
+from core.db.models.server import Server
 from core.db.models.vpn_operation import VPNOperation
-from core.domain import VPNOperationStatus
+from core.domain import VPNOperationKind, VPNOperationStatus
 
 from .base import BaseRepo
 
@@ -49,6 +53,20 @@ class VPNOperationRepo(BaseRepo[VPNOperation]):
             values["next_attempt_at"] = next_attempt_at
         return await self.add(self.model(**values))
 
+    async def create_many(self, rows: Sequence[dict]) -> None:
+        """Insert many pending operations with one multi-row statement.
+
+        Rows take the same keys as :meth:`create`; a missing
+        ``next_attempt_at`` falls back to the column default.
+        """
+
+        if not rows:
+            return
+        await self.session.execute(
+            insert(self.model),
+            [{"payload": {}, **row} for row in rows],
+        )
+
     async def claim(
         self,
         operation_id: str,
@@ -95,6 +113,92 @@ class VPNOperationRepo(BaseRepo[VPNOperation]):
         )
         return (await self.session.execute(stmt)).scalar_one_or_none()
 
+    async def claim_many(
+        self,
+        *,
+        lease_token: str,
+        now: datetime,
+        lease_for: timedelta,
+        limit: int = 100,
+        exclude_kinds: Sequence[str] | None = None,
+        operation_ids: Sequence[str] | None = None,
+    ) -> Sequence[tuple[VPNOperation, VPN_Config]]:
+        """Lease a fair page of due operations together with their context.
+
+        Due operations whose config has moved on to a newer intent, or no
+        longer exists, are superseded instead of leased, at most ``limit``
+        per call so a large superseded backlog drains over several passes.
+        The page is read with its configs and servers in one statement that
+        row-locks only the operations (``SKIP LOCKED``, so concurrent
+        reconcilers take disjoint pages and skip each other's superseding)
+        and leased with one more. Configs stay unlocked: all rows share
+        ``lease_token`` and completions are fenced per operation.
+        ``operation_ids`` restricts both the page and the superseding to
+        those operations.
+        """
+
+        due = self._due(now, exclude_kinds)
+        if operation_ids is not None:
+            due = and_(due, self.model.operation_id.in_(list(operation_ids)))
+
+        owns_config = exists().where(
+            VPN_Config.id == self.model.config_id,
+            VPN_Config.operation_id == self.model.operation_id,
+        )
+        superseded = (
+            await self.session.scalars(
+                select(self.model.id)
+                .where(due, ~owns_config)
+                .order_by(self.model.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        if superseded:
+            await self.session.execute(
+                update(self.model)
+                .where(self.model.id.in_(superseded))
+                .values(
+                    status=VPNOperationStatus.SUPERSEDED.value,
+                    lease_token=None,
+                    lease_until=None,
+                    updated_at=now,
+                    completed_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        page = (
+            await self.session.execute(
+                select(self.model.id, VPN_Config)
+                .join(VPN_Config, VPN_Config.id == self.model.config_id)
+                .join(VPN_Config.server)
+                .options(contains_eager(VPN_Config.server))
+                .where(due, VPN_Config.operation_id == self.model.operation_id)
+                .order_by(self._effective_due(), self.model.id)
+                .limit(limit)
+                .with_for_update(of=self.model, skip_locked=True)
+            )
+        ).all()
+        if not page:
+            return []
+        stmt = (
+            update(self.model)
+            .where(self.model.id.in_([row_id for row_id, _ in page]))
+            .values(
+                status=VPNOperationStatus.RUNNING.value,
+                attempts=self.model.attempts + 1,
+                lease_token=lease_token,
+                lease_until=now + lease_for,
+                last_error=None,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session="fetch")
+            .returning(self.model)
+        )
+        leased = {op.id: op for op in (await self.session.scalars(stmt)).all()}
+        return [(leased[row_id], cfg) for row_id, cfg in page if row_id in leased]
+
     async def mark_succeeded(
         self,
         operation_id: str,
@@ -143,6 +247,37 @@ class VPNOperationRepo(BaseRepo[VPNOperation]):
         )
         return (await self.session.execute(stmt)).scalar_one_or_none()
 
+    async def defer(
+        self,
+        operation_id: str,
+        reason: str,
+        *,
+        lease_token: str,
+        now: datetime,
+        next_attempt_at: datetime,
+    ) -> VPNOperation | None:
+        """Release a lease without counting the attempt (nothing was sent)."""
+
+        stmt = (
+            update(self.model)
+            .where(*self._owned_running(operation_id, lease_token))
+            .values(
+                status=case(
+                    (self.model.attempts > 1, VPNOperationStatus.FAILED.value),
+                    else_=VPNOperationStatus.PENDING.value,
+                ),
+                attempts=self.model.attempts - 1,
+                last_error=reason[:4000],
+                next_attempt_at=next_attempt_at,
+                lease_token=None,
+                lease_until=None,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session="fetch")
+            .returning(self.model)
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
     async def mark_rejected(
         self,
         operation_id: str,
@@ -165,7 +300,14 @@ class VPNOperationRepo(BaseRepo[VPNOperation]):
             .execution_options(synchronize_session="fetch")
             .returning(self.model)
         )
-        return (await self.session.execute(stmt)).scalar_one_or_none()
+        operation = (await self.session.execute(stmt)).scalar_one_or_none()
+        if operation is not None and operation.kind == VPNOperationKind.PROVISION.value:
+            # A definitive provision rejection may owe a reservation refund;
+            # queue it atomically with the status change.
+            await self.session.execute(
+                insert(PendingConfigRefund).values(operation_id=operation_id)
+            )
+        return operation
 
     async def mark_exhausted(
         self,
@@ -234,6 +376,42 @@ class VPNOperationRepo(BaseRepo[VPNOperation]):
         """
 
         now = now or datetime.now(timezone.utc)
+        stmt = select(self.model).where(self._due(now, exclude_kinds))
+        stmt = stmt.order_by(self._effective_due(), self.model.id).limit(limit)
+        return (await self.session.scalars(stmt)).all()
+
+    async def count_due_by_server(
+        self,
+        *,
+        now: datetime | None = None,
+        exclude_kinds: Sequence[str] | None = None,
+    ) -> dict[int, int]:
+        """Count due operations per server, including servers with none due."""
+
+        now = now or datetime.now(timezone.utc)
+        rows = await self.session.execute(
+            select(Server.id, func.count(self.model.id))
+            .outerjoin(
+                self.model,
+                and_(
+                    self.model.server_id == Server.id,
+                    self._due(now, exclude_kinds),
+                ),
+            )
+            .group_by(Server.id)
+        )
+        return {server_id: int(count) for server_id, count in rows}
+
+    def _effective_due(self):
+        return case(
+            (
+                self.model.status == VPNOperationStatus.RUNNING.value,
+                self.model.lease_until,
+            ),
+            else_=self.model.next_attempt_at,
+        )
+
+    def _due(self, now: datetime, exclude_kinds: Sequence[str] | None = None):
         due_pending = and_(
             self.model.status.in_(_CLAIMABLE_STATUSES),
             or_(
@@ -246,18 +424,10 @@ class VPNOperationRepo(BaseRepo[VPNOperation]):
             self.model.lease_until.is_not(None),
             self.model.lease_until <= now,
         )
-        effective_due = case(
-            (
-                self.model.status == VPNOperationStatus.RUNNING.value,
-                self.model.lease_until,
-            ),
-            else_=self.model.next_attempt_at,
-        )
-        stmt = select(self.model).where(or_(due_pending, stale_running))
+        due = or_(due_pending, stale_running)
         if exclude_kinds:
-            stmt = stmt.where(self.model.kind.not_in(tuple(exclude_kinds)))
-        stmt = stmt.order_by(effective_due, self.model.id).limit(limit)
-        return (await self.session.scalars(stmt)).all()
+            due = and_(due, self.model.kind.not_in(tuple(exclude_kinds)))
+        return due
 
     async def list_retryable(self, *, limit: int = 100) -> Sequence[VPNOperation]:
         """Compatibility alias for callers migrating to due-time reconciliation."""
@@ -280,6 +450,21 @@ class VPNOperationRepo(BaseRepo[VPNOperation]):
         )
         return (await self.session.scalars(stmt)).all()
 
+    async def latest_provision_id(self, config_id: int) -> str | None:
+        """Return the operation ID of the config's last succeeded provision."""
+
+        stmt = (
+            select(self.model.operation_id)
+            .where(
+                self.model.config_id == config_id,
+                self.model.kind == VPNOperationKind.PROVISION.value,
+                self.model.status == VPNOperationStatus.SUCCEEDED.value,
+            )
+            .order_by(self.model.id.desc())
+            .limit(1)
+        )
+        return await self.session.scalar(stmt)
+
     def _owned_running(self, operation_id: str, lease_token: str) -> tuple:
         return (
             self.model.operation_id == operation_id,
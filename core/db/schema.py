@@ -1,3 +1,3 @@
 """Schema contract shared by readiness and release validation."""
 
-EXPECTED_ALEMBIC_REVISION = "e9f1a2b3c4d5"
+EXPECTED_ALEMBIC_REVISION = "c3e5a7b9d1f2"
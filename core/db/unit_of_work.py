@@ -2,17 +2,25 @@ from collections.abc import Iterator, Mapping
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 
-from . import async_session
+from . import HubSession, async_session
+from .models.config import install_managed_config_counter
 from .repo import (
+    AdminActionRepo,
     BillingRepo,
     ConfigRepo,
     ServerRepo,
+    ServerStatusRepo,
     TelegramUpdateRepo,
     TelegramUserActionRepo,
     UserRepo,
+    VPNInventoryRepo,
     VPNOperationRepo,
 )
 
+# Every Unit of Work (and every other session of the Hub's factory) keeps the
+# per-server managed-config counters in step with ORM writes.
+install_managed_config_counter(HubSession)
+
 
 @dataclass(frozen=True, slots=True)
 class Repositories(Mapping[str, object]):
@@ -20,11 +28,14 @@ class Repositories(Mapping[str, object]):
 
     users: UserRepo
     servers: ServerRepo
+    server_statuses: ServerStatusRepo
     configs: ConfigRepo
     billing: BillingRepo
     vpn_operations: VPNOperationRepo
+    vpn_inventories: VPNInventoryRepo
     telegram_updates: TelegramUpdateRepo
     telegram_user_actions: TelegramUserActionRepo
+    admin_actions: AdminActionRepo
 
     def __getitem__(self, key: str):
         try:
@@ -37,27 +48,36 @@ class Repositories(Mapping[str, object]):
             (
                 "users",
                 "servers",
+                "server_statuses",
                 "configs",
                 "billing",
                 "vpn_operations",
+                "vpn_inventories",
                 "telegram_updates",
                 "telegram_user_actions",
+                "admin_actions",
             )
         )
 
     def __len__(self) -> int:
-        return 7
+        return 10
 
 
 @asynccontextmanager
-async def uow():
-    async with async_session() as session, session.begin():
+async def uow(session_factory=None):
+    """Open one transaction; ``session_factory`` overrides the shared engine."""
+
+    factory = session_factory or async_session
+    async with factory(sync_session_class=HubSession) as session, session.begin():
         yield Repositories(
             users=UserRepo(session),
             servers=ServerRepo(session),
+            server_statuses=ServerStatusRepo(session),
             configs=ConfigRepo(session),
             billing=BillingRepo(session),
             vpn_operations=VPNOperationRepo(session),
+            vpn_inventories=VPNInventoryRepo(session),
             telegram_updates=TelegramUpdateRepo(session),
             telegram_user_actions=TelegramUserActionRepo(session),
+            admin_actions=AdminActionRepo(session),
         )
@@ -43,6 +43,18 @@ class APITLSConfigurationError(APIConnectionError):
     """
 
 
+class APICircuitOpenError(APIConnectionError):
+    """Raised without contacting a Manager whose circuit breaker is open.
+
+    No request was sent, so callers defer the work for ``retry_after``
+    seconds instead of counting it as a failed attempt.
+    """
+
+    def __init__(self, message: str, *, retry_after: float, attempts: int = 0) -> None:
+        super().__init__(message, attempts=attempts)
+        self.retry_after = retry_after
+
+
 class APITransportError(APIConnectionError):
     """Raised after a transport or timeout failure cannot be retried."""
 
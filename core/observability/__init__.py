@@ -1,15 +1,35 @@
 from .statsd import (
     StatsDClient,
     observe_background_job,
+    observe_billing_suspensions,
+    observe_config_download_cache,
+    observe_job_runtime,
+    observe_managed_config_count_repairs,
+    observe_manager_circuit,
+    observe_manager_client_pool,
     observe_manager_request,
+    observe_manager_throttle,
+    observe_outbox_listener,
     observe_outbox_publish,
+    observe_status_rollup,
+    observe_vpn_reconcile,
     statsd,
 )
 
 __all__ = [
     "StatsDClient",
     "observe_background_job",
+    "observe_billing_suspensions",
+    "observe_config_download_cache",
+    "observe_job_runtime",
+    "observe_managed_config_count_repairs",
+    "observe_manager_circuit",
+    "observe_manager_client_pool",
     "observe_manager_request",
+    "observe_manager_throttle",
+    "observe_outbox_listener",
     "observe_outbox_publish",
+    "observe_status_rollup",
+    "observe_vpn_reconcile",
     "statsd",
 ]
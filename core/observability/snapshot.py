@@ -24,6 +24,7 @@ from core.domain import (
     VPNOperationStatus,
     VPNState,
 )
+from core.services.manager_breakers import manager_circuits
 
 from .manager_tls import (
     ManagerTLSStatus,
@@ -396,6 +397,16 @@ async def render_prometheus_metrics(
         "gauge",
         [({}, fleet_missing_status)],
     )
+    _family(
+        lines,
+        "vpn_hub_manager_circuits",
+        "Manager circuit breakers known to this process grouped by state.",
+        "gauge",
+        [
+            ({"state": state}, count)
+            for state, count in manager_circuits.state_counts().items()
+        ],
+    )
     _family(
         lines,
         "vpn_hub_fleet_oldest_status_age_seconds",
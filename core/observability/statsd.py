@@ -198,6 +198,50 @@ def observe_manager_request(
         return
 
 
+def observe_manager_client_pool(event: str) -> None:
+    try:
+        statsd.increment("manager.client_pool", tags={"event": event})
+    except Exception:
+        return
+
+
+def observe_manager_circuit(state: str) -> None:
+    try:
+        statsd.increment("manager.circuit_transitions", tags={"state": state})
+    except Exception:
+        return
+
+
+def observe_manager_throttle(event: str) -> None:
+    try:
+        statsd.increment("manager.throttle", tags={"event": event})
+    except Exception:
+        return
+
+
+def observe_config_download_cache(result: str) -> None:
+    try:
+        statsd.increment("config_download_cache", tags={"result": result})
+    except Exception:
+        return
+
+
+def observe_managed_config_count_repairs(count: int) -> None:
+    try:
+        statsd.increment("server.managed_config_count_repairs", count)
+    except Exception:
+        return
+
+
+def observe_status_rollup(resolution: str, *, buckets: int, pruned: int) -> None:
+    try:
+        tags = {"resolution": resolution}
+        statsd.increment("server.status_rollup_buckets", buckets, tags=tags)
+        statsd.increment("server.status_pruned", pruned, tags=tags)
+    except Exception:
+        return
+
+
 def observe_background_job(name: str, outcome: str, duration_seconds: float) -> None:
     try:
         tags = {"job": name, "outcome": outcome}
@@ -207,6 +251,25 @@ def observe_background_job(name: str, outcome: str, duration_seconds: float) ->
         return
 
 
+def observe_job_runtime(
+    name: str,
+    *,
+    checkouts: int,
+    connects: int,
+    run_seconds: float,
+    queue_seconds: float | None = None,
+) -> None:
+    try:
+        tags = {"job": name}
+        statsd.increment("background_job.pool_checkouts", checkouts, tags=tags)
+        statsd.increment("background_job.pool_connects", connects, tags=tags)
+        statsd.timing("background_job.loop_run_duration", run_seconds, tags=tags)
+        if queue_seconds is not None:
+            statsd.timing("background_job.queue_latency", queue_seconds, tags=tags)
+    except Exception:
+        return
+
+
 def observe_outbox_publish(outcome: str, value: int = 1) -> None:
     try:
         statsd.increment(
@@ -214,3 +277,44 @@ def observe_outbox_publish(outcome: str, value: int = 1) -> None:
         )
     except Exception:
         return
+
+
+def observe_outbox_listener(event: str) -> None:
+    try:
+        statsd.increment("notification_outbox.listener", tags={"event": event})
+    except Exception:
+        return
+
+
+def observe_vpn_reconcile(
+    server_id: int | None,
+    *,
+    outcomes: Mapping[str, int],
+    busy_seconds: float,
+    queue_depth: int | None,
+) -> None:
+    try:
+        tags = {"server_id": server_id if server_id is not None else "none"}
+        for outcome, count in outcomes.items():
+            statsd.increment(
+                "vpn_reconcile.operations", count, tags={**tags, "outcome": outcome}
+            )
+        if outcomes:
+            statsd.timing("vpn_reconcile.server_busy", busy_seconds, tags=tags)
+        if queue_depth is not None:
+            statsd.gauge("vpn_reconcile.queue_depth", queue_depth, tags=tags)
+    except Exception:
+        return
+
+
+def observe_billing_suspensions(
+    planned: int, suspended: int, duration_seconds: float
+) -> None:
+    try:
+        statsd.increment("billing.suspensions", planned, tags={"outcome": "planned"})
+        statsd.increment(
+            "billing.suspensions", suspended, tags={"outcome": "succeeded"}
+        )
+        statsd.timing("billing.charge_to_suspended", duration_seconds)
+    except Exception:
+        return
@@ -6,12 +6,20 @@ from .api_gateway import (
     ManagerFleetStatus,
 )
 from .billing import BillingService
+from .billing_forecast import (
+    BillingForecast,
+    BillingForecastPeriod,
+    BillingForecastService,
+)
 from .config import ConfigService
+from .fleet_drift_audit import FleetDriftAuditService
 from .models import Config, Server, User
 from .notifications import Notification, NotificationService
 from .payments import CryptoPaymentService, TelegramPayService
+from .placement import PlacementEngine
 from .referrals import ReferralOverview, ReferralService
-from .server import ServerService
+from .server import ManagedConfigCountDrift, ServerService
+from .status_rollups import StatusRollupResult, StatusRollupService
 from .telegram_updates import ClaimedTelegramUpdate, TelegramUpdateService
 from .telegram_user_actions import (
     TelegramActionAuditContext,
@@ -41,10 +49,18 @@ __all__ = [
     "ManagerClientState",
     "ManagerFleetStatus",
     "BillingService",
+    "BillingForecast",
+    "BillingForecastPeriod",
+    "BillingForecastService",
     "UserService",
     "AdminUserTimelineService",
+    "ManagedConfigCountDrift",
+    "PlacementEngine",
     "ServerService",
+    "StatusRollupResult",
+    "StatusRollupService",
     "ConfigService",
+    "FleetDriftAuditService",
     "TelegramPayService",
     "CryptoPaymentService",
     "NotificationService",
@@ -18,8 +18,10 @@ import httpx
 from core.config import settings
 from core.exceptions import (
     APIAuthenticationError,
+    APICircuitOpenError,
     APIConfigurationError,
     APIConflictError,
+    APIGatewayError,
     APIHTTPError,
     APINotFoundError,
     APIProtocolError,
@@ -31,10 +33,30 @@ from core.exceptions import (
     APITransportError,
 )
 from core.observability.statsd import observe_manager_request
+from core.services.manager_breakers import (
+    ManagerCircuitBreaker,
+    ManagerCircuitRegistry,
+    manager_circuits,
+)
+from core.services.manager_capabilities import (
+    ManagerCapabilityCache,
+    manager_capabilities,
+)
+from core.services.manager_clients import (
+    ManagerClientKey,
+    ManagerClientLease,
+    ManagerClientRegistry,
+    manager_clients,
+)
+from core.services.manager_throttle import ManagerRequestThrottle, manager_throttle
 
 _IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
 _RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Responses that suggest the Manager itself is unhealthy; 425/429 mean it is
+# up and shedding load, so they do not trip the circuit breaker.
+_BREAKER_FAILURE_STATUS_CODES = frozenset({408, 500, 502, 503, 504})
 _IDEMPOTENCY_HEADER = "Idempotency-Key"
+_COALESCIBLE_KWARGS = frozenset({"headers", "params"})
 
 Sleep = Callable[[float], Awaitable[None]]
 Random = Callable[[], float]
@@ -160,6 +182,24 @@ class ManagerFleetStatus:
     inventory: ManagerInventoryStatus
     data_plane: ManagerDataPlaneStatus
     pki: ManagerPKIStatus
+    capabilities: tuple[str, ...] = ()
+
+
+ManagerBulkAction = Literal["suspend", "unsuspend", "revoke"]
+_BULK_ACTIONS = frozenset({"suspend", "unsuspend", "revoke"})
+
+
+@dataclass(frozen=True, slots=True)
+class ManagerBulkItemResult:
+    """Per-client outcome of a bulk mutation, classified like a single call."""
+
+    name: str
+    status_code: int
+    error: APIGatewayError | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
 
 
 class APIGateway:
@@ -182,6 +222,11 @@ class APIGateway:
         ca_cert_path: str | None = None,
         client_cert_path: str | None = None,
         client_key_path: str | None = None,
+        server_id: int | None = None,
+        pool: ManagerClientRegistry | None = None,
+        circuits: ManagerCircuitRegistry | None = None,
+        throttle: ManagerRequestThrottle | None = None,
+        capabilities: ManagerCapabilityCache | None = None,
         sleep: Sleep = asyncio.sleep,
         random_value: Random = random.random,
     ) -> None:
@@ -202,6 +247,15 @@ class APIGateway:
             ca_cert_path: Optional private CA bundle for Manager verification
             client_cert_path: Optional Hub certificate for mutual TLS
             client_key_path: Private key paired with `client_cert_path`
+            server_id: Hub server id used to key and invalidate the pooled client
+            pool: Client registry; defaults to the process-wide one unless
+                `VPN_MANAGER_CLIENT_POOL_ENABLED` is false
+            circuits: Circuit breaker registry; defaults to the process-wide
+                one unless `VPN_MANAGER_BREAKER_ENABLED` is false
+            throttle: Per-server rate limiter and read coalescer; defaults
+                to the process-wide one
+            capabilities: Cache of advertised Manager features; defaults to
+                the process-wide one
             sleep: Injectable async sleep function (primarily for testing)
             random_value: Injectable source of a value in the [0, 1] range
         """
@@ -247,16 +301,45 @@ class APIGateway:
             client_cert_path = settings.vpn_manager_client_cert_path
         if client_key_path is None:
             client_key_path = settings.vpn_manager_client_key_path
-        self._tls_context = self._build_tls_context(
-            enabled=tls_enabled,
-            mtls_required=mtls_required,
-            ca_cert_path=ca_cert_path,
-            client_cert_path=client_cert_path,
-            client_key_path=client_key_path,
-        )
+        if pool is None and settings.vpn_manager_client_pool_enabled:
+            pool = manager_clients
+
+        def build_tls_context() -> ssl.SSLContext | None:
+            return self._build_tls_context(
+                enabled=tls_enabled,
+                mtls_required=mtls_required,
+                ca_cert_path=ca_cert_path,
+                client_cert_path=client_cert_path,
+                client_key_path=client_key_path,
+            )
+
+        if pool is None:
+            self._tls_context = build_tls_context()
+        else:
+            self._tls_context = pool.tls_context(
+                enabled=tls_enabled,
+                mtls_required=mtls_required,
+                paths=(ca_cert_path, client_cert_path, client_key_path),
+                build=build_tls_context,
+            )
 
         scheme = "https" if tls_enabled else "http"
         self._base_url = f"{scheme}://{host}:{validated_port}"
+        if circuits is None and settings.vpn_manager_breaker_enabled:
+            circuits = manager_circuits
+        server_key = server_id if server_id is not None else f"{host}:{validated_port}"
+        self._breaker: ManagerCircuitBreaker | None = (
+            circuits.get(server_key) if circuits is not None else None
+        )
+        self._throttle = throttle or manager_throttle
+        self._capabilities = capabilities or manager_capabilities
+        self._pool = pool
+        self._pool_key = ManagerClientKey(
+            server=server_key,
+            revision=ManagerClientKey.revision_for(self._base_url, validated_api_key),
+            options=(timeout, self._tls_context),
+        )
+        self._lease: ManagerClientLease | None = None
         self._headers = {"X-API-Key": validated_api_key}
         self._timeout = timeout
         self._retries = retries
@@ -396,7 +479,15 @@ class APIGateway:
             raise APIConfigurationError("VPN Manager max_backoff must be non-negative")
 
     async def __aenter__(self) -> "APIGateway":
-        await self._create_client()
+        if self._pool is None:
+            await self._create_client()
+        else:
+            self._lease = self._pool.acquire(
+                self._pool_key,
+                verify=self._tls_context or True,
+                factory=self._new_client,
+            )
+            self._client = self._lease.client
         return self
 
     async def __aexit__(
@@ -405,20 +496,28 @@ class APIGateway:
         exc: BaseException | None,
         tb: TracebackType | None,
     ) -> None:
-        client = self._client
-        self._client = None
-        if client:
+        client, lease = self._client, self._lease
+        self._client = self._lease = None
+        if lease is not None:
+            await cast(ManagerClientRegistry, self._pool).release(lease)
+        elif client:
             await client.aclose()
 
     async def _create_client(self) -> None:
         if self._client:
             await self._client.aclose()
-        self._client = httpx.AsyncClient(
+        self._client = self._new_client()
+
+    def _new_client(
+        self, transport: httpx.AsyncBaseTransport | None = None
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
             base_url=self._base_url,
             headers=self._headers,
             timeout=self._timeout,
             verify=self._tls_context or True,
             trust_env=False,
+            transport=transport,
         )
 
     async def _request(
@@ -429,13 +528,44 @@ class APIGateway:
         accepted_status_codes: Sequence[int] = (),
         **kwargs: Any,
     ) -> httpx.Response:
-        client = self._client
-        if client is None:
+        if self._client is None:
             raise APIConfigurationError(
                 "APIGateway must be entered as an async context manager"
             )
 
         method = method.upper()
+        if (
+            method == "GET"
+            and settings.vpn_manager_coalesce_reads
+            and kwargs.keys() <= _COALESCIBLE_KWARGS
+        ):
+            # Concurrent identical reads of one Manager share a single request.
+            key = (
+                self._pool_key.server,
+                self._pool_key.revision,
+                url,
+                self._frozen(kwargs.get("headers")),
+                self._frozen(kwargs.get("params")),
+                tuple(accepted_status_codes),
+            )
+            return await self._throttle.coalesce(
+                key,
+                lambda: self._send_with_retries(
+                    method, url, accepted_status_codes, **kwargs
+                ),
+            )
+        return await self._send_with_retries(
+            method, url, accepted_status_codes, **kwargs
+        )
+
+    async def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        accepted_status_codes: Sequence[int],
+        **kwargs: Any,
+    ) -> httpx.Response:
+        client = cast(httpx.AsyncClient, self._client)
         can_retry = self._can_retry(method, kwargs.get("headers"))
         max_attempts = self._retries + 1 if can_retry else 1
         operation = self._operation_label(method, url)
@@ -447,7 +577,11 @@ class APIGateway:
         try:
             for attempt in range(1, max_attempts + 1):
                 try:
-                    response = await client.request(method, url, **kwargs)
+                    response = await self._send(client, method, url, **kwargs)
+                except APICircuitOpenError as exc:
+                    outcome = "circuit_open"
+                    exc.attempts = attempt - 1
+                    raise
                 except httpx.RequestError as exc:
                     if attempt >= max_attempts:
                         outcome = "transport_error"
@@ -489,6 +623,38 @@ class APIGateway:
 
         raise RuntimeError("unreachable")  # pragma: no cover
 
+    async def _send(
+        self, client: httpx.AsyncClient, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response:
+        """Send one attempt within the server's rate limit and circuit breaker."""
+
+        breaker = self._breaker
+        if breaker is None:
+            async with self._throttle.slot(self._pool_key.server):
+                return await client.request(method, url, **kwargs)
+        # An open circuit fails fast before it can spend a rate-limit token.
+        breaker.acquire()
+        try:
+            async with self._throttle.slot(self._pool_key.server):
+                response = await client.request(method, url, **kwargs)
+        except httpx.RequestError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        if response.status_code in _BREAKER_FAILURE_STATUS_CODES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    @staticmethod
+    def _frozen(value: Mapping[str, Any] | None) -> tuple[tuple[str, str], ...]:
+        if not value:
+            return ()
+        return tuple(sorted((str(key), str(item)) for key, item in value.items()))
+
     @staticmethod
     def _operation_label(method: str, url: str) -> str:
         path = url.split("?", 1)[0].rstrip("/") or "/"
@@ -504,6 +670,9 @@ class APIGateway:
             return "client_state"
         if path.endswith("/config") and method == "GET":
             return "download_config"
+        if path.startswith("/clients/bulk/") and method == "POST":
+            action = path.rsplit("/", 1)[1]
+            return f"bulk_{action}" if action in _BULK_ACTIONS else "unknown"
         if path.endswith("/suspend") and method == "POST":
             return "suspend_client"
         if path.endswith("/unsuspend") and method == "POST":
@@ -847,6 +1016,16 @@ class APIGateway:
         pki = payload.get("pki")
         if not isinstance(pki, dict):
             raise APIProtocolError("VPN Manager status has invalid pki")
+        capabilities = payload.get("capabilities", [])
+        if (
+            not isinstance(capabilities, list)
+            or len(capabilities) > 64
+            or not all(
+                isinstance(item, str) and 0 < len(item) <= 64 for item in capabilities
+            )
+        ):
+            raise APIProtocolError("VPN Manager status has invalid capabilities")
+
         observed_at = cls._timestamp(payload.get("observed_at"), "observed_at")
         assert observed_at is not None
         return ManagerFleetStatus(
@@ -864,14 +1043,87 @@ class APIGateway:
                 ),
                 crl=cls._expiry_status(pki.get("crl"), "pki.crl"),
             ),
+            capabilities=tuple(sorted(set(capabilities))),
         )
 
+    @classmethod
+    def _bulk_results(
+        cls, payload: dict[str, object], names: Sequence[str]
+    ) -> dict[str, ManagerBulkItemResult]:
+        items = payload.get("results")
+        if not isinstance(items, list):
+            raise APIProtocolError("VPN Manager bulk response has invalid results")
+        results: dict[str, ManagerBulkItemResult] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                raise APIProtocolError("VPN Manager bulk result must be an object")
+            name = item.get("name")
+            status_code = item.get("status_code")
+            if not isinstance(name, str) or name in results:
+                raise APIProtocolError("VPN Manager bulk result has an invalid name")
+            if (
+                isinstance(status_code, bool)
+                or not isinstance(status_code, int)
+                or not 100 <= status_code <= 599
+            ):
+                raise APIProtocolError(
+                    "VPN Manager bulk result has an invalid status_code"
+                )
+            error = None
+            if not 200 <= status_code < 300:
+                error = cls._http_error(status_code, attempts=1, retryable=False)
+            results[name] = ManagerBulkItemResult(
+                name=name, status_code=status_code, error=error
+            )
+        if results.keys() != set(names):
+            raise APIProtocolError(
+                "VPN Manager bulk results do not match the requested clients"
+            )
+        return results
+
     async def get_status(self) -> ManagerFleetStatus:
         """Return Manager operational aggregates without client identities."""
 
         response = await self._request("GET", "/status")
         return self._fleet_status(self._json_object(response))
 
+    async def capabilities(self) -> frozenset[str]:
+        """Return the optional features this Manager advertises (cached)."""
+
+        key = (self._pool_key.server, self._pool_key.revision)
+        cached = self._capabilities.get(key)
+        if cached is None:
+            cached = frozenset((await self.get_status()).capabilities)
+            self._capabilities.put(key, cached)
+        return cached
+
+    async def bulk_mutate(
+        self,
+        action: ManagerBulkAction,
+        names: Sequence[str],
+        *,
+        operation_id: str | None = None,
+    ) -> dict[str, ManagerBulkItemResult]:
+        """Suspend, unsuspend or revoke many clients with one request.
+
+        Only Managers advertising ``bulk_mutations`` serve this route. The
+        request-level ``operation_id`` makes retries safe; each client's
+        outcome is returned with the error a single call would have raised.
+        """
+
+        if action not in _BULK_ACTIONS:
+            raise APIConfigurationError(f"Unsupported bulk action: {action}")
+        names = list(names)
+        if not names or len(set(names)) != len(names):
+            raise APIConfigurationError("Bulk client names must be unique")
+        response = await self._request(
+            "POST",
+            f"/clients/bulk/{action}",
+            json={"clients": names},
+            headers=self._idempotency_headers(operation_id),
+        )
+        return self._bulk_results(self._json_object(response), names)
+
     async def create_client(
         self,
         name: str,
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import logging
+import time
+from collections.abc import Sequence
 from datetime import datetime
 from decimal import Decimal
 from uuid import NAMESPACE_URL, uuid4, uuid5
 
 from core.config import settings
 from core.db.models.ledger import LedgerKind
-from core.db.repo.billing import to_money
+from core.db.repo.billing import PeriodChargeResult, to_money
+from core.db.unit_of_work import Repositories
 from core.domain import VPNOperationKind, VPNState
 from core.exceptions import (
     APIConfigurationError,
@@ -16,6 +19,7 @@ from core.exceptions import (
     InvalidOperationError,
     UserNotFoundError,
 )
+from core.observability.statsd import observe_billing_suspensions
 
 from .billing_contracts import PaymentIntent, PaymentReceipt
 from .models import Config, User
@@ -248,10 +252,11 @@ class ProviderPaymentOperations:
     async def reconcile_referral_rewards(self, *, limit: int = 100) -> int:
         """Settle missed provider rewards and repair retroactive entitlements.
 
-        Every payment is committed in its own Unit of Work, keeping locks short
-        while preserving the same atomic reward/ledger invariants as live
-        capture. Migration-issued rewards are also used to restore configs when
-        the resulting account balance is positive.
+        Payments are claimed in pages of ``referral_reconcile_batch_size`` and
+        each page is committed in its own Unit of Work with bulk reward and
+        ledger writes, preserving the same atomic invariants as live capture.
+        Migration-issued rewards are also used to restore configs when the
+        resulting account balance is positive.
         """
 
         if (
@@ -265,29 +270,56 @@ class ProviderPaymentOperations:
 
         settled = 0
         quarantined = 0
-        for _index in range(limit):
+        while settled + quarantined < limit:
             async with self._uow() as repos:
                 billing_repo = self._billing_repo(repos)
-                payment = await billing_repo.claim_next_unsettled_referral_payment()
-                if payment is None:
+                payments = await billing_repo.claim_unsettled_referral_payments(
+                    limit=min(
+                        settings.referral_reconcile_batch_size,
+                        limit - settled - quarantined,
+                    )
+                )
+                if not payments:
                     break
-                reward_results = await self._apply_referral_rewards_or_quarantine(
-                    billing_repo,
-                    payment,
+                outcomes = await billing_repo.apply_provider_referral_rewards_many(
+                    payments=payments,
+                    level_rates_bps=(
+                        settings.referral_level_1_rate_bps,
+                        settings.referral_level_2_rate_bps,
+                    ),
+                    program_version=settings.referral_program_version,
                 )
-                if payment.referral_settlement_status == "invalid_accounting":
-                    quarantined += 1
-                    continue
-                for reward_result in reward_results:
-                    if reward_result.user.balance <= 0:
+                owner_ids: list[int] = []
+                for payment in payments:
+                    reward_results = outcomes[payment.id]
+                    if reward_results is None:
+                        await billing_repo.quarantine_invalid_referral_accounting(
+                            payment_id=payment.id,
+                            program_version=settings.referral_program_version,
+                        )
+                        logger.error(
+                            "Referral payment accounting quarantined",
+                            extra={"provider_payment_row_id": payment.id},
+                        )
+                        quarantined += 1
                         continue
-                    await self._config_service.prepare_entitlement(
+                    owner_ids.extend(
+                        reward_result.user.id
+                        for reward_result in reward_results
+                        if reward_result.user.balance > 0
+                    )
+                    settled += 1
+                if owner_ids:
+                    await self._config_service.prepare_entitlements(
                         repos=repos,
-                        owner_id=reward_result.user.id,
+                        owner_ids=list(dict.fromkeys(owner_ids)),
                         desired_state=VPNState.ACTIVE.value,
                         kind=VPNOperationKind.UNSUSPEND.value,
                     )
-                settled += 1
+                if len(payments) < settings.referral_reconcile_batch_size:
+                    # A short page means the backlog is drained or the rest is
+                    # claimed by another reconciler.
+                    break
 
         # Backfilled rewards are written by Alembic rather than this service,
         # so their entitlement side effect is deliberately reconciled here.
@@ -395,52 +427,141 @@ class PeriodicBillingOperations:
         if settings.maintenance_mode or not settings.billing_enabled:
             return {}
 
+        effective_period_key = await self.start_billing_period(
+            period_key=period_key, at=at
+        )
+        if effective_period_key is None:
+            return {}
+        return await self.charge_billing_shards(effective_period_key)
+
+    async def start_billing_period(
+        self, *, period_key: str | None = None, at: datetime | None = None
+    ) -> str | None:
+        """Claim a period and its shards; return its key while work remains.
+
+        A replay of a period that is still running returns the same key so a
+        restarted worker resumes the shards a crashed one left pending.
+        """
+
+        if settings.maintenance_mode or not settings.billing_enabled:
+            return None
+
         start, end, default_key = self._billing_period(at or self._clock())
         effective_period_key = period_key or default_key
-        planned: list[str] = []
         async with self._uow() as repos:
-            billing_repo = self._billing_repo(repos)
-            results = await billing_repo.charge_period(
+            run, _claimed = await self._billing_repo(repos).start_billing_run(
                 period_key=effective_period_key,
                 period_start=start,
                 period_end=end,
                 cost_per_config=self._cost,
+                shard_size=settings.billing_shard_size,
             )
-            charged: dict[User, Decimal] = {}
-            notification_candidates = [] if settings.notifications_enabled else None
-            for result in results:
-                user = User.from_orm(result.user)
-                charged[user] = result.amount
-                if user.balance <= 0:
-                    planned.extend(
-                        await self._config_service.prepare_entitlement(
-                            repos=repos,
-                            owner_id=user.id,
-                            desired_state=VPNState.SUSPENDED.value,
-                            kind=VPNOperationKind.SUSPEND.value,
+            if run.status == "completed":
+                return None
+        return effective_period_key
+
+    async def resume_billing_periods(self) -> dict[User, Decimal]:
+        """Finish the pending shards of periods interrupted by a crash."""
+
+        if settings.maintenance_mode or not settings.billing_enabled:
+            return {}
+        async with self._uow() as repos:
+            period_keys = await self._billing_repo(
+                repos
+            ).list_unfinished_billing_periods()
+        charged: dict[User, Decimal] = {}
+        for period_key in period_keys:
+            charged.update(await self.charge_billing_shards(period_key))
+        return charged
+
+    async def charge_billing_shards(self, period_key: str) -> dict[User, Decimal]:
+        """Charge pending shards of a started period until none is left.
+
+        Every shard commits its charges, suspension intents and notification
+        outbox rows in its own Unit of Work, so a failure only rolls back that
+        shard and other workers can drain the same period concurrently.
+        """
+
+        charged: dict[User, Decimal] = {}
+        while not settings.maintenance_mode and settings.billing_enabled:
+            planned: list[str] = []
+            async with self._uow() as repos:
+                billing_repo = self._billing_repo(repos)
+                shard = await billing_repo.claim_billing_shard(period_key=period_key)
+                if shard is None:
+                    break
+                results = await billing_repo.charge_billing_shard(
+                    shard, bulk=settings.billing_bulk_charge_enabled
+                )
+                planned = await self._apply_period_charge_effects(
+                    repos, period_key, results, charged
+                )
+            charged_at = time.monotonic()
+            if planned:
+                await self._execute_period_suspensions(
+                    period_key, planned, charged_at=charged_at
+                )
+        return charged
+
+    async def _execute_period_suspensions(
+        self, period_key: str, planned: list[str], *, charged_at: float
+    ) -> int:
+        suspended = await self._config_service.execute_operations(
+            planned,
+            concurrency=settings.billing_suspend_concurrency,
+            per_server_concurrency=settings.billing_suspend_per_server_concurrency,
+        )
+        lag = time.monotonic() - charged_at
+        observe_billing_suspensions(len(planned), suspended, lag)
+        logger.info(
+            "Billing shard suspensions executed",
+            extra={
+                "period_key": period_key,
+                "planned": len(planned),
+                "suspended": suspended,
+                "charge_to_suspended_seconds": round(lag, 3),
+            },
+        )
+        return suspended
+
+    async def _apply_period_charge_effects(
+        self,
+        repos: Repositories,
+        period_key: str,
+        results: Sequence[PeriodChargeResult],
+        charged: dict[User, Decimal],
+    ) -> list[str]:
+        exhausted: list[int] = []
+        outbox_rows: list[tuple[str, int, str]] = []
+        for result in results:
+            user = User.from_orm(result.user)
+            charged[user] = result.amount
+            if user.balance <= 0:
+                exhausted.append(user.id)
+            if (
+                settings.notifications_enabled
+                and result.user.telegram_delivery_status == "active"
+            ):
+                # Rendered from the already locked rows; the whole shard's
+                # notices are then written with one multi-row INSERT.
+                text = self._billing_notification(user, result.amount)
+                if text is not None:
+                    outbox_rows.append(
+                        (
+                            f"billing-notification:{period_key}:user:{user.id}",
+                            user.tg_id,
+                            text,
                         )
                     )
-                if (
-                    notification_candidates is not None
-                    and result.user.telegram_delivery_status == "active"
-                ):
-                    notification_candidates.append((user, result.amount))
-
-            if notification_candidates is not None:
-                for user, charge in notification_candidates:
-                    text = self._billing_notification(user, charge)
-                    if text is not None:
-                        await billing_repo.add_notification_outbox(
-                            dedupe_key=(
-                                f"billing-notification:{effective_period_key}:"
-                                f"user:{user.id}"
-                            ),
-                            chat_id=user.tg_id,
-                            text=text,
-                        )
 
-        await self._config_service.execute_operations(planned)
-        return charged
+        planned = await self._config_service.prepare_entitlements(
+            repos=repos,
+            owner_ids=exhausted,
+            desired_state=VPNState.SUSPENDED.value,
+            kind=VPNOperationKind.SUSPEND.value,
+        )
+        await self._billing_repo(repos).add_notification_outbox_many(outbox_rows)
+        return planned
 
     async def reconcile_pending_config_operations(
         self, *, limit: int = 100
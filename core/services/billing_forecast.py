@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable
+
+from core.config import settings
+from core.db.repo.billing import to_money
+from core.exceptions import InvalidOperationError
+
+__all__ = ["BillingForecast", "BillingForecastPeriod", "BillingForecastService"]
+
+MAX_FORECAST_PERIODS = 8_760
+
+
+@dataclass(frozen=True)
+class BillingForecastPeriod:
+    """Projected outcome of one future periodic charge."""
+
+    index: int
+    period_start: datetime
+    period_end: datetime
+    charged_users: int
+    charged_configs: int
+    charged_amount: Decimal
+    suspended_users: int
+    negative_balance_users: int
+    negative_balance_total: Decimal
+
+
+@dataclass(frozen=True)
+class BillingForecast:
+    """What-if projection of periodic billing under one tariff."""
+
+    per_config_cost: Decimal
+    billing_period_seconds: int
+    generated_at: datetime
+    active_users: int
+    active_configs: int
+    periods: tuple[BillingForecastPeriod, ...]
+
+    @property
+    def total_charged(self) -> Decimal:
+        return sum((period.charged_amount for period in self.periods), Decimal("0"))
+
+    @property
+    def total_suspended(self) -> int:
+        return sum(period.suspended_users for period in self.periods)
+
+
+class BillingForecastService:
+    """Read-only projection of charges, debts and suspensions.
+
+    Changing ``PER_CONFIG_COST`` or ``BILLING_INTERVAL`` previously had to be
+    rehearsed on a copy of production data. The forecast replays the charge
+    rule of :meth:`BillingRepo.charge_period` against current balances and
+    active config counts without locking or writing anything. It assumes no
+    top-ups, new configs or manual reactivations during the horizon.
+    """
+
+    def __init__(
+        self,
+        uow: Callable,
+        *,
+        clock: Callable[[], datetime] | None = None,
+    ) -> None:
+        self._uow = uow
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+
+    async def forecast(
+        self,
+        *,
+        periods: int,
+        per_config_cost: Decimal | int | float | str | None = None,
+        billing_period_seconds: int | None = None,
+    ) -> BillingForecast:
+        if (
+            isinstance(periods, bool)
+            or not isinstance(periods, int)
+            or not 1 <= periods <= MAX_FORECAST_PERIODS
+        ):
+            raise InvalidOperationError("Invalid forecast horizon")
+        cost = to_money(
+            settings.per_config_cost if per_config_cost is None else per_config_cost
+        )
+        if cost < 0:
+            raise InvalidOperationError("Configuration cost cannot be negative")
+        period_seconds = billing_period_seconds or settings.billing_interval
+        if period_seconds < 60:
+            raise InvalidOperationError("Billing period must be at least 60 seconds")
+
+        generated_at = self._clock()
+        async with self._uow() as repos:
+            buckets = await repos["billing"].project_balance_exhaustion(
+                cost_per_config=cost, periods=periods
+            )
+
+        # Bucket ``k`` holds owners charged in periods 1..k and suspended by
+        # charge ``k``; suffix sums turn that into per-period totals.
+        exhausted = {bucket.period: bucket for bucket in buckets}
+        charged_users = sum(bucket.users for bucket in buckets)
+        charged_configs = sum(bucket.configs for bucket in buckets)
+        charged_amount = sum((bucket.charge for bucket in buckets), Decimal("0"))
+        negative_users = 0
+        negative_total = Decimal("0")
+        first_start = self._next_period_start(generated_at, period_seconds)
+        step = timedelta(seconds=period_seconds)
+
+        projected: list[BillingForecastPeriod] = []
+        for index in range(1, periods + 1):
+            bucket = exhausted.get(index)
+            suspended = bucket.users if bucket is not None else 0
+            if bucket is not None:
+                negative_users += bucket.negative_users
+                negative_total -= bucket.deficit
+            start = first_start + step * (index - 1)
+            projected.append(
+                BillingForecastPeriod(
+                    index=index,
+                    period_start=start,
+                    period_end=start + step,
+                    charged_users=charged_users,
+                    charged_configs=charged_configs,
+                    charged_amount=charged_amount,
+                    suspended_users=suspended,
+                    negative_balance_users=negative_users,
+                    negative_balance_total=negative_total,
+                )
+            )
+            if bucket is not None:
+                charged_users -= bucket.users
+                charged_configs -= bucket.configs
+                charged_amount -= bucket.charge
+
+        return BillingForecast(
+            per_config_cost=cost,
+            billing_period_seconds=period_seconds,
+            generated_at=generated_at,
+            active_users=sum(bucket.users for bucket in buckets),
+            active_configs=sum(bucket.configs for bucket in buckets),
+            periods=tuple(projected),
+        )
+
+    @staticmethod
+    def _next_period_start(value: datetime, period_seconds: int) -> datetime:
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        epoch = int(value.timestamp())
+        return datetime.fromtimestamp(
+            epoch - epoch % period_seconds + period_seconds, tz=timezone.utc
+        )
@@ -63,10 +63,12 @@ class ConfigService(
             raise InvalidOperationError("VPN provisioning is temporarily disabled")
 
     @staticmethod
-    def _create_gateway(ip: str, port: int, api_key: str):
+    def _create_gateway(
+        ip: str, port: int, api_key: str, *, server_id: int | None = None
+    ):
         """Resolve the legacy patch point each time a Manager is contacted."""
 
-        return APIGateway(ip, port, api_key)
+        return APIGateway(ip, port, api_key, server_id=server_id)
 
     def _now(self) -> datetime:
         return self._as_utc(self._clock())
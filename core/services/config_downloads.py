@@ -0,0 +1,101 @@
+"""Process-wide cache of downloaded client profiles.
+
+A client's ``.ovpn`` file only changes when the config is provisioned again,
+yet every download used to cost a Manager round-trip. Profiles are cached
+per config and the succeeded provision operation that created them, so a new
+provision never serves the previous file. Profiles carry private keys: they
+are held Fernet-encrypted with ``ENCRYPTION_KEY``, expire after
+``VPN_CONFIG_CACHE_TTL_SECONDS`` and the least recently used entries are
+evicted beyond ``VPN_CONFIG_CACHE_MAX_BYTES``. Callers only serve an entry
+while the config is provisioned and not being revoked, so a revoke finished
+by another process is honoured too; local revokes and provisions drop it.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from core.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    operation_id: str
+    expires_at: float
+    token: bytes
+
+
+class ConfigDownloadCache:
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def get(self, config_id: int, operation_id: str) -> bytes | None:
+        if not settings.vpn_config_cache_enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(config_id)
+            if entry is None:
+                return None
+            if entry.operation_id != operation_id or entry.expires_at <= self._clock():
+                self._drop(config_id)
+                return None
+            self._entries.move_to_end(config_id)
+        try:
+            return self._fernet().decrypt(entry.token)
+        except InvalidToken:
+            # ENCRYPTION_KEY changed under a running process.
+            self.forget(config_id)
+            return None
+
+    def put(self, config_id: int, operation_id: str, content: bytes) -> None:
+        if not settings.vpn_config_cache_enabled:
+            return
+        token = self._fernet().encrypt(content)
+        budget = settings.vpn_config_cache_max_bytes
+        if len(token) > budget:
+            return
+        entry = _Entry(
+            operation_id=operation_id,
+            expires_at=self._clock() + settings.vpn_config_cache_ttl_seconds,
+            token=token,
+        )
+        with self._lock:
+            self._drop(config_id)
+            self._entries[config_id] = entry
+            self._size += len(token)
+            while self._size > budget:
+                self._drop(next(iter(self._entries)))
+
+    def forget(self, config_id: int) -> None:
+        with self._lock:
+            self._drop(config_id)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _drop(self, config_id: int) -> None:
+        entry = self._entries.pop(config_id, None)
+        if entry is not None:
+            self._size -= len(entry.token)
+
+    @staticmethod
+    def _fernet() -> Fernet:
+        return Fernet(settings.encryption_key)
+
+
+config_downloads = ConfigDownloadCache()
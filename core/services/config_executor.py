@@ -2,22 +2,29 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import random
+import time
 import uuid
-from collections.abc import Sequence
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
 from datetime import timedelta
 from inspect import Parameter, signature
+from typing import cast
 
 from core.config import settings
 from core.domain import VPNOperationKind, VPNOperationStatus, VPNState
 from core.exceptions import (
+    APICircuitOpenError,
     APIConfigurationError,
     APIConflictError,
     APIConnectionError,
+    APIGatewayError,
     APINotFoundError,
     APIRequestRejectedError,
-    ConfigNotFoundError,
     InvalidOperationError,
 )
+from core.observability import observe_vpn_reconcile
 
 from ._config_shared import (
     _ACTIVATING_KINDS,
@@ -25,9 +32,138 @@ from ._config_shared import (
     _TARGET_BY_KIND,
     _ConfigContext,
 )
+from .config_downloads import config_downloads
+from .manager_capabilities import BULK_MUTATIONS
 
 logger = logging.getLogger("core.services.config")
 
+CompletionResult = tuple[str, str | None]
+DEFERRED_CIRCUIT_OPEN = "deferred:circuit_open"
+
+_BULK_ACTION_BY_KIND = {
+    VPNOperationKind.SUSPEND.value: "suspend",
+    VPNOperationKind.UNSUSPEND.value: "unsuspend",
+    VPNOperationKind.REVOKE.value: "revoke",
+}
+# A new provision replaces the client's profile; a revoke retires it.
+_PROFILE_CHANGING_KINDS = {
+    VPNOperationKind.PROVISION.value,
+    VPNOperationKind.REVOKE.value,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class _Completion:
+    """A Manager outcome waiting to be recorded for a leased operation."""
+
+    context: _ConfigContext
+    target_state: str | None = None
+    error: Exception | None = None
+    rejected: bool = False
+
+
+class _CompletionGroup:
+    """Group-commit completions of operations executing concurrently.
+
+    A submitted completion waits until ``max_batch`` are queued, every
+    operation currently holding an execution slot is also waiting, or
+    ``max_delay`` seconds pass; the queued completions are then committed in
+    one transaction. If that transaction fails, each completion is retried in
+    its own, so one bad row cannot strand the leases of the others.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[Sequence[_Completion]], Awaitable[list[CompletionResult]]],
+        *,
+        max_batch: int,
+        max_delay: float,
+    ) -> None:
+        self._commit = commit
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._pending: list[tuple[_Completion, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+        self._members = 0
+        self._waiting = 0
+
+    def join(self) -> None:
+        self._members += 1
+
+    def leave(self) -> None:
+        self._members -= 1
+        self._maybe_flush()
+
+    async def submit(self, completion: _Completion) -> CompletionResult:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((completion, future))
+        self._waiting += 1
+        try:
+            # Check on the next loop iteration so operations that are already
+            # runnable can join this group before it commits.
+            asyncio.get_running_loop().call_soon(self._maybe_flush)
+            if self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self._max_delay, self._flush
+                )
+            # The commit runs in its own task; cancelling this waiter must not
+            # abandon a completion that others share a transaction with.
+            return await asyncio.shield(future)
+        finally:
+            self._waiting -= 1
+
+    def _maybe_flush(self) -> None:
+        if self._pending and (
+            len(self._pending) >= self._max_batch or self._waiting >= self._members
+        ):
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _run(self, batch: list[tuple[_Completion, asyncio.Future]]) -> None:
+        try:
+            results = await self._commit([completion for completion, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], exc=exc)
+                return
+            logger.exception(
+                "Grouped VPN completion failed; committing individually",
+                extra={
+                    "operation_ids": [
+                        completion.context.operation_id for completion, _ in batch
+                    ]
+                },
+            )
+            for item in batch:
+                await self._run([item])
+            return
+        for (_, future), result in zip(batch, results, strict=True):
+            self._resolve(future, result=result)
+
+    @staticmethod
+    def _resolve(
+        future: asyncio.Future,
+        *,
+        result: CompletionResult | None = None,
+        exc: Exception | None = None,
+    ) -> None:
+        if future.done():
+            return
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
 
 class ConfigLeasedExecutorMixin:
     """Claim, execute, fence, and retry durable VPN Manager operations."""
@@ -45,69 +181,411 @@ class ConfigLeasedExecutorMixin:
             kwargs["operation_id"] = operation_id
         return await method(*args, **kwargs)
 
-    async def reconcile(self, *, limit: int = 100) -> dict[int, str]:
-        """Fairly claim and execute a page of due durable operations."""
+    async def reconcile(
+        self,
+        *,
+        limit: int = 100,
+        concurrency: int | None = None,
+        per_server_concurrency: int | None = None,
+    ) -> dict[int, str]:
+        """Fairly claim and execute a page of due durable operations.
+
+        The whole page is leased in one transaction with its config and
+        server context (:meth:`VPNOperationRepo.claim_many`); operations whose
+        config moved on are superseded there. The page fans out across
+        servers: at most ``concurrency`` operations run at once and at most
+        ``per_server_concurrency`` against one VPN Manager, so an unreachable
+        node only stalls its own slots. Operations whose Manager circuit is
+        open are deferred without consuming an attempt. Completions of
+        operations finishing close together are committed as one group.
+        Per-server outcomes, busy time and due-queue depth are reported to
+        StatsD.
+        """
 
         if limit <= 0:
             raise ValueError("Reconciliation limit must be positive")
+        concurrency = concurrency or settings.vpn_reconcile_concurrency
+        per_server_concurrency = (
+            per_server_concurrency or settings.vpn_reconcile_per_server_concurrency
+        )
+        if concurrency < 1 or per_server_concurrency < 1:
+            raise ValueError("Reconciliation concurrency must be positive")
         excluded_kinds: tuple[str, ...] = ()
         if settings.maintenance_mode or not settings.provisioning_enabled:
             excluded_kinds = tuple(_ACTIVATING_KINDS)
+        now = self._now()
+        lease_token = str(uuid.uuid4())
         async with self._uow() as repos:
-            due = await repos["vpn_operations"].list_due(
-                now=self._now(),
+            queue_depth = await repos["vpn_operations"].count_due_by_server(
+                now=now,
+                exclude_kinds=excluded_kinds,
+            )
+            claimed = await repos["vpn_operations"].claim_many(
+                lease_token=lease_token,
+                now=now,
+                lease_for=self._lease_for,
                 limit=limit,
                 exclude_kinds=excluded_kinds,
             )
-            operations = [(op.operation_id, op.config_id) for op in due]
+            contexts = [
+                self._claimed_context(operation, cfg, lease_token)
+                for operation, cfg in claimed
+            ]
 
+        overall = asyncio.Semaphore(concurrency)
+        per_server: dict[int | None, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(per_server_concurrency)
+        )
+        outcomes: dict[int | None, Counter[str]] = defaultdict(Counter)
+        busy: dict[int | None, float] = defaultdict(float)
         results: dict[int, str] = {}
-        for operation_id, config_id in operations:
-            if config_id is None:
-                continue
-            try:
-                results[config_id] = await self._execute(operation_id)
-            except Exception as exc:
-                logger.exception(
-                    "VPN reconciliation failed",
-                    extra={
-                        "config_id": config_id,
-                        "operation_id": operation_id,
-                    },
-                )
-                results[config_id] = f"failed:{type(exc).__name__}"
-        return results
+        completions = _CompletionGroup(
+            self._complete_group,
+            max_batch=settings.vpn_reconcile_commit_batch_size,
+            max_delay=settings.vpn_reconcile_commit_delay_ms / 1000,
+        )
+
+        async def run(context: _ConfigContext) -> None:
+            server_id = context.server_id
+            # Wait for the server's slot first so a saturated Manager does not
+            # hold global slots that other servers could use.
+            async with per_server[server_id], overall:
+                started = time.monotonic()
+                completions.join()
+                try:
+                    status = await self._run_claimed(context, completions)
+                except APICircuitOpenError:
+                    status = DEFERRED_CIRCUIT_OPEN
+                except Exception as exc:
+                    logger.exception(
+                        "VPN reconciliation failed",
+                        extra={
+                            "config_id": context.config_id,
+                            "operation_id": context.operation_id,
+                            "server_id": server_id,
+                        },
+                    )
+                    status = f"failed:{type(exc).__name__}"
+                finally:
+                    completions.leave()
+                busy[server_id] += time.monotonic() - started
+            results[context.config_id] = status
+            outcomes[server_id][status.split(":", 1)[0]] += 1
+
+        await asyncio.gather(*(run(context) for context in contexts))
+        for server_id in set(outcomes) | set(queue_depth):
+            observe_vpn_reconcile(
+                server_id,
+                outcomes=outcomes.get(server_id, {}),
+                busy_seconds=busy.get(server_id, 0.0),
+                queue_depth=queue_depth.get(server_id),
+            )
+        return {context.config_id: results[context.config_id] for context in contexts}
 
     async def execute_operations(
         self,
         operation_ids: Sequence[str],
         *,
         owner_id: int | None = None,
+        concurrency: int = 1,
+        per_server_concurrency: int | None = None,
     ) -> int:
-        """Best-effort execution after durable intents have committed."""
+        """Best-effort execution after durable intents have committed.
 
+        With ``concurrency`` above one the operations fan out as concurrent
+        tasks, and ``per_server_concurrency`` caps how many of them talk to
+        the same VPN Manager at once. Suspends, unsuspends and revokes for a
+        Manager that advertises bulk mutations are sent in bulk requests
+        first (:meth:`_execute_bulk`); everything else takes one call each.
+        """
+
+        if concurrency < 1:
+            raise ValueError("Execution concurrency must be positive")
         completed = 0
-        for operation_id in operation_ids:
+        if settings.vpn_manager_bulk_mutations_enabled and len(operation_ids) > 1:
+            completed, operation_ids = await self._execute_bulk(
+                operation_ids, concurrency=concurrency
+            )
+        if concurrency == 1 or len(operation_ids) <= 1:
+            for operation_id in operation_ids:
+                completed += await self._execute_best_effort(
+                    operation_id, owner_id=owner_id
+                )
+            return completed
+
+        async with self._uow() as repos:
+            operations = await repos["vpn_operations"].list_by_operation_ids(
+                operation_ids
+            )
+            server_by_operation = {op.operation_id: op.server_id for op in operations}
+
+        overall = asyncio.Semaphore(concurrency)
+        per_server: dict[int | None, asyncio.Semaphore] = {}
+        for server_id in set(server_by_operation.values()):
+            per_server[server_id] = asyncio.Semaphore(
+                per_server_concurrency or concurrency
+            )
+
+        async def run(operation_id: str) -> int:
+            server_limit = per_server.get(server_by_operation.get(operation_id))
+            if server_limit is None:
+                return 0
+            async with server_limit, overall:
+                return await self._execute_best_effort(operation_id, owner_id=owner_id)
+
+        results = await asyncio.gather(
+            *(run(operation_id) for operation_id in dict.fromkeys(operation_ids))
+        )
+        return completed + sum(results)
+
+    async def _execute_bulk(
+        self, operation_ids: Sequence[str], *, concurrency: int
+    ) -> tuple[int, list[str]]:
+        """Run bulk-capable operations per server; return what is left over.
+
+        Servers with at least two suspend/unsuspend/revoke operations are
+        asked for their capabilities first. Only when the Manager advertises
+        bulk mutations are the operations leased and sent in chunks of
+        ``VPN_MANAGER_BULK_MAX_ITEMS``. Every other operation, and any the
+        lease skipped (superseded, not due, paused by maintenance), is
+        returned for the per-client path.
+        """
+
+        requested = list(dict.fromkeys(operation_ids))
+        async with self._uow() as repos:
+            operations = await repos["vpn_operations"].list_by_operation_ids(requested)
+            by_server: dict[int, list[str]] = defaultdict(list)
+            for operation in operations:
+                if operation.kind in _BULK_ACTION_BY_KIND and operation.server_id:
+                    by_server[operation.server_id].append(operation.operation_id)
+            servers = {
+                server_id: await repos["servers"].get(id=server_id)
+                for server_id, ids in by_server.items()
+                if len(ids) > 1
+            }
+
+        overall = asyncio.Semaphore(concurrency)
+
+        async def run(server, ids: list[str]) -> tuple[int, set[str]]:
+            async with overall:
+                try:
+                    return await self._execute_server_bulk(server, ids)
+                except Exception:
+                    logger.exception(
+                        "Bulk VPN entitlement side effect failed; durable intents "
+                        "retained",
+                        extra={"server_id": server.id, "operation_ids": ids},
+                    )
+                    return 0, set()
+
+        results = await asyncio.gather(
+            *(
+                run(server, by_server[server_id])
+                for server_id, server in servers.items()
+                if server is not None
+            )
+        )
+        handled = set().union(*(ids for _, ids in results))
+        return (
+            sum(completed for completed, _ in results),
+            [operation_id for operation_id in requested if operation_id not in handled],
+        )
+
+    async def _execute_server_bulk(
+        self, server, operation_ids: list[str]
+    ) -> tuple[int, set[str]]:
+        async with self._create_gateway(
+            server.ip, server.port, server.api_key, server_id=server.id
+        ) as api:
+            capabilities = getattr(api, "capabilities", None)
+            if capabilities is None:
+                return 0, set()
             try:
-                status = await self._execute(operation_id)
-            except Exception:
-                logger.exception(
-                    "VPN entitlement side effect failed; durable intent retained",
-                    extra={"operation_id": operation_id, "owner_id": owner_id},
+                supported = BULK_MUTATIONS in await capabilities()
+            except APIGatewayError:
+                supported = False
+            if not supported:
+                return 0, set()
+
+            excluded_kinds: tuple[str, ...] = ()
+            if settings.maintenance_mode or not settings.provisioning_enabled:
+                excluded_kinds = tuple(_ACTIVATING_KINDS)
+            lease_token = str(uuid.uuid4())
+            async with self._uow() as repos:
+                claimed = await repos["vpn_operations"].claim_many(
+                    lease_token=lease_token,
+                    now=self._now(),
+                    lease_for=self._lease_for,
+                    limit=len(operation_ids),
+                    exclude_kinds=excluded_kinds,
+                    operation_ids=operation_ids,
+                )
+                contexts = [
+                    self._claimed_context(operation, cfg, lease_token)
+                    for operation, cfg in claimed
+                ]
+
+            by_kind: dict[str, list[_ConfigContext]] = defaultdict(list)
+            for context in contexts:
+                by_kind[context.kind].append(context)
+            chunk_size = settings.vpn_manager_bulk_max_items
+            completed = 0
+            for kind, group in by_kind.items():
+                for start in range(0, len(group), chunk_size):
+                    completed += await self._run_bulk_chunk(
+                        api, kind, group[start : start + chunk_size]
+                    )
+        return completed, {context.operation_id for context in contexts}
+
+    async def _run_bulk_chunk(
+        self, api, kind: str, chunk: Sequence[_ConfigContext]
+    ) -> int:
+        """Send one bulk request and record each item against its own lease."""
+
+        # A retry of the same set of operations reuses the idempotency key.
+        batch_id = str(
+            uuid.uuid5(
+                uuid.NAMESPACE_URL,
+                "vpn-operation-batch:"
+                + ",".join(sorted(context.operation_id for context in chunk)),
+            )
+        )
+        try:
+            results = await api.bulk_mutate(
+                _BULK_ACTION_BY_KIND[kind],
+                [context.name for context in chunk],
+                operation_id=batch_id,
+            )
+        except asyncio.CancelledError:
+            cancelled = APIConnectionError("VPN operation was cancelled")
+            await asyncio.shield(
+                self._commit_completions(
+                    [_Completion(context, error=cancelled) for context in chunk]
                 )
-            else:
+            )
+            raise
+        except APIRequestRejectedError:
+            # The batch itself was refused, e.g. by a Manager that advertises
+            # the route but cannot serve it; let per-client calls decide.
+            logger.warning(
+                "VPN Manager rejected a bulk request; falling back to per-client "
+                "calls",
+                exc_info=True,
+                extra={"server_id": chunk[0].server_id, "batch_id": batch_id},
+            )
+            completed = 0
+            for context in chunk:
+                try:
+                    status = await self._run_claimed(context)
+                except Exception:
+                    logger.exception(
+                        "VPN entitlement side effect failed; durable intent retained",
+                        extra={"operation_id": context.operation_id},
+                    )
+                    continue
                 completed += int(status == VPNOperationStatus.SUCCEEDED.value)
+            return completed
+        except Exception as exc:
+            completions = [
+                _Completion(
+                    context,
+                    error=exc,
+                    rejected=isinstance(exc, APIConfigurationError),
+                )
+                for context in chunk
+            ]
+        else:
+            completions = []
+            for context in chunk:
+                error = results[context.name].error
+                if error is None or (
+                    kind == VPNOperationKind.REVOKE.value
+                    and isinstance(error, APINotFoundError)
+                ):
+                    completions.append(
+                        _Completion(context, target_state=_TARGET_BY_KIND[kind])
+                    )
+                else:
+                    completions.append(
+                        _Completion(
+                            context,
+                            error=error,
+                            rejected=isinstance(error, APIRequestRejectedError),
+                        )
+                    )
+
+        completed = 0
+        outcomes = await self._commit_completions(completions)
+        for context, outcome in zip(chunk, outcomes, strict=True):
+            if outcome is None:
+                continue
+            status, follow_up = outcome
+            await self._execute_follow_up(follow_up, context)
+            completed += int(status == VPNOperationStatus.SUCCEEDED.value)
         return completed
 
+    async def _commit_completions(
+        self, completions: Sequence[_Completion]
+    ) -> list[CompletionResult | None]:
+        """Record completions in one transaction, or one each if that fails."""
+
+        try:
+            return list(await self._complete_group(completions))
+        except Exception:
+            if len(completions) == 1:
+                raise
+            logger.exception(
+                "Grouped VPN completion failed; committing individually",
+                extra={
+                    "operation_ids": [item.context.operation_id for item in completions]
+                },
+            )
+        results: list[CompletionResult | None] = []
+        for item in completions:
+            try:
+                results.extend(await self._complete_group([item]))
+            except Exception:
+                logger.exception(
+                    "VPN completion failed; lease will expire and be retried",
+                    extra={"operation_id": item.context.operation_id},
+                )
+                results.append(None)
+        return results
+
+    async def _execute_best_effort(
+        self, operation_id: str, *, owner_id: int | None = None
+    ) -> int:
+        try:
+            status = await self._execute(operation_id)
+        except Exception:
+            logger.exception(
+                "VPN entitlement side effect failed; durable intent retained",
+                extra={"operation_id": operation_id, "owner_id": owner_id},
+            )
+            return 0
+        return int(status == VPNOperationStatus.SUCCEEDED.value)
+
     async def _execute(self, operation_id: str) -> str:
         context, status = await self._claim_context(operation_id)
         if context is None:
             return status
+        return await self._run_claimed(context)
+
+    async def _run_claimed(
+        self,
+        context: _ConfigContext,
+        completions: _CompletionGroup | None = None,
+    ) -> str:
+        """Drive one leased operation against its Manager and record the result.
+
+        With ``completions`` the result is committed in a group with other
+        operations of the same reconcile page instead of its own transaction.
+        """
 
         target_state = _TARGET_BY_KIND.get(context.kind)
         if target_state is None:  # defensive: persisted operations are untrusted data
             exc = InvalidOperationError(f"Unknown VPN operation: {context.kind}")
-            await self._mark_failure(context, exc, rejected=True)
+            await self._record_failure(context, exc, True, completions)
             raise exc
 
         try:
@@ -115,6 +593,7 @@ class ConfigLeasedExecutorMixin:
                 context.server_ip,
                 context.server_port,
                 context.server_api_key,
+                server_id=context.server_id,
             ) as api:
                 if context.kind == VPNOperationKind.PROVISION.value:
                     try:
@@ -183,19 +662,39 @@ class ConfigLeasedExecutorMixin:
             )
             raise
         except APIConfigurationError as exc:
-            await self._mark_failure(context, exc, rejected=True)
+            await self._record_failure(context, exc, True, completions)
             raise
         except APIRequestRejectedError as exc:
-            await self._mark_failure(context, exc, rejected=True)
+            await self._record_failure(context, exc, True, completions)
             raise
         except APIConnectionError as exc:
-            await self._mark_failure(context, exc, rejected=False)
+            await self._record_failure(context, exc, False, completions)
             raise
         except Exception as exc:
-            await self._mark_failure(context, exc, rejected=False)
+            await self._record_failure(context, exc, False, completions)
             raise
 
-        return await self._complete_success(context, target_state)
+        if completions is None:
+            return await self._complete_success(context, target_state)
+        status, follow_up = await completions.submit(
+            _Completion(context, target_state=target_state)
+        )
+        await self._execute_follow_up(follow_up, context)
+        return status
+
+    async def _record_failure(
+        self,
+        context: _ConfigContext,
+        exc: Exception,
+        rejected: bool,
+        completions: _CompletionGroup | None,
+    ) -> str:
+        if completions is None:
+            return await self._mark_failure(context, exc, rejected=rejected)
+        status, _ = await completions.submit(
+            _Completion(context, error=exc, rejected=rejected)
+        )
+        return status
 
     async def _claim_context(
         self,
@@ -235,78 +734,103 @@ class ConfigLeasedExecutorMixin:
             if claimed is None:
                 return None, operation.status
             return (
-                _ConfigContext(
-                    config_id=cfg.id,
-                    name=claimed.config_name,
-                    owner_id=cfg.owner_id,
-                    server_id=cfg.server_id,
-                    server_ip=cfg.server.ip,
-                    server_port=cfg.server.port,
-                    server_api_key=cfg.server.api_key,
-                    operation_id=claimed.operation_id,
-                    kind=claimed.kind,
-                    payload=claimed.payload,
-                    lease_token=lease_token,
-                    attempts=claimed.attempts,
-                ),
+                self._claimed_context(claimed, cfg, lease_token),
                 VPNOperationStatus.RUNNING.value,
             )
 
+    @staticmethod
+    def _claimed_context(operation, cfg, lease_token: str) -> _ConfigContext:
+        return _ConfigContext(
+            config_id=cfg.id,
+            name=operation.config_name,
+            owner_id=cfg.owner_id,
+            server_id=cfg.server_id,
+            server_ip=cfg.server.ip,
+            server_port=cfg.server.port,
+            server_api_key=cfg.server.api_key,
+            operation_id=operation.operation_id,
+            kind=operation.kind,
+            payload=operation.payload,
+            lease_token=lease_token,
+            attempts=operation.attempts,
+        )
+
     async def _complete_success(
         self,
         context: _ConfigContext,
         target_state: str,
     ) -> str:
         now = self._now()
-        follow_up: str | None = None
         async with self._uow() as repos:
             cfg = await repos["configs"].get_for_update(context.config_id)
-            completed = await repos["vpn_operations"].mark_succeeded(
-                context.operation_id,
-                lease_token=self._required_lease(context),
-                now=now,
+            status, follow_up = await self._complete_success_locked(
+                repos, context, target_state, cfg, now=now
             )
-            if completed is None:
-                return VPNOperationStatus.SUPERSEDED.value
-            if cfg is None or cfg.operation_id != context.operation_id:
-                return VPNOperationStatus.SUCCEEDED.value
+        await self._execute_follow_up(follow_up, context)
+        return status
 
-            if target_state == VPNState.REVOKED.value:
-                await repos["configs"].delete_if_operation(
-                    context.config_id,
-                    operation_id=context.operation_id,
-                )
-            else:
-                cfg = await repos["configs"].complete_transition(
-                    context.config_id,
-                    operation_id=context.operation_id,
-                    actual_state=target_state,
-                )
-                if cfg and cfg.desired_state != target_state:
-                    follow_kind = _KIND_BY_TARGET.get(cfg.desired_state)
-                    if follow_kind:
-                        follow_up = await self._plan_transition_locked(
-                            repos,
-                            cfg,
-                            desired_state=cfg.desired_state,
-                            kind=follow_kind,
-                            now=now,
-                        )
+    async def _complete_success_locked(
+        self,
+        repos,
+        context: _ConfigContext,
+        target_state: str,
+        cfg,
+        *,
+        now,
+    ) -> tuple[str, str | None]:
+        completed = await repos["vpn_operations"].mark_succeeded(
+            context.operation_id,
+            lease_token=self._required_lease(context),
+            now=now,
+        )
+        if completed is None:
+            return VPNOperationStatus.SUPERSEDED.value, None
+        if cfg is None or cfg.operation_id != context.operation_id:
+            return VPNOperationStatus.SUCCEEDED.value, None
 
-        if follow_up:
-            try:
-                await self._execute(follow_up)
-            except Exception:
-                # The predecessor succeeded. The follow-up remains durable and
-                # must not be misreported as a failed provision to billing.
-                logger.exception(
-                    "Follow-up VPN entitlement remains pending",
-                    extra={
-                        "operation_id": follow_up,
-                        "predecessor_operation_id": context.operation_id,
-                    },
-                )
-        return VPNOperationStatus.SUCCEEDED.value
+        follow_up: str | None = None
+        if context.kind in _PROFILE_CHANGING_KINDS:
+            config_downloads.forget(context.config_id)
+        if target_state == VPNState.REVOKED.value:
+            await repos["configs"].delete_if_operation(
+                context.config_id,
+                operation_id=context.operation_id,
+            )
+        else:
+            cfg = await repos["configs"].complete_transition(
+                context.config_id,
+                operation_id=context.operation_id,
+                actual_state=target_state,
+            )
+            if cfg and cfg.desired_state != target_state:
+                follow_kind = _KIND_BY_TARGET.get(cfg.desired_state)
+                if follow_kind:
+                    follow_up = await self._plan_transition_locked(
+                        repos,
+                        cfg,
+                        desired_state=cfg.desired_state,
+                        kind=follow_kind,
+                        now=now,
+                    )
+        return VPNOperationStatus.SUCCEEDED.value, follow_up
+
+    async def _execute_follow_up(
+        self, follow_up: str | None, context: _ConfigContext
+    ) -> None:
+        if not follow_up:
+            return
+        try:
+            await self._execute(follow_up)
+        except Exception:
+            # The predecessor succeeded. The follow-up remains durable and
+            # must not be misreported as a failed provision to billing.
+            logger.exception(
+                "Follow-up VPN entitlement remains pending",
+                extra={
+                    "operation_id": follow_up,
+                    "predecessor_operation_id": context.operation_id,
+                },
+            )
 
     async def _mark_failure(
         self,
@@ -316,75 +840,116 @@ class ConfigLeasedExecutorMixin:
         rejected: bool,
     ) -> str:
         now = self._now()
+        async with self._uow() as repos:
+            cfg = await repos["configs"].get_for_update(context.config_id)
+            return await self._mark_failure_locked(
+                repos, context, exc, cfg, rejected=rejected, now=now
+            )
+
+    async def _mark_failure_locked(
+        self,
+        repos,
+        context: _ConfigContext,
+        exc: Exception,
+        cfg,
+        *,
+        rejected: bool,
+        now,
+    ) -> str:
         message = f"{type(exc).__name__}: {exc}"
+        if isinstance(exc, APICircuitOpenError):
+            # Nothing reached the Manager: hand the attempt back and spread
+            # the retries so a recovering node is not hit by the whole backlog.
+            delay = exc.retry_after * (1 + random.random())
+            operation = await repos["vpn_operations"].defer(
+                context.operation_id,
+                message,
+                lease_token=self._required_lease(context),
+                now=now,
+                next_attempt_at=now + timedelta(seconds=delay),
+            )
+            if operation is None:
+                return VPNOperationStatus.SUPERSEDED.value
+            return DEFERRED_CIRCUIT_OPEN
         failed_state = (
             VPNState.FAILED.value
             if rejected and context.kind == VPNOperationKind.PROVISION.value
             else None
         )
-        async with self._uow() as repos:
-            cfg = await repos["configs"].get_for_update(context.config_id)
-            if rejected:
-                operation = await repos["vpn_operations"].mark_rejected(
-                    context.operation_id,
-                    message,
-                    lease_token=self._required_lease(context),
-                    now=now,
-                )
-                status = VPNOperationStatus.REJECTED.value
-            elif context.attempts >= settings.vpn_operation_max_attempts:
-                operation = await repos["vpn_operations"].mark_exhausted(
-                    context.operation_id,
-                    message,
-                    lease_token=self._required_lease(context),
-                    now=now,
-                )
-                status = VPNOperationStatus.EXHAUSTED.value
-            else:
-                next_attempt = now + timedelta(
-                    seconds=self._retry_delay(context.attempts)
-                )
-                operation = await repos["vpn_operations"].mark_failed(
-                    context.operation_id,
-                    message,
-                    lease_token=self._required_lease(context),
-                    now=now,
-                    next_attempt_at=next_attempt,
-                )
-                status = VPNOperationStatus.FAILED.value
-            if operation is None:
-                return VPNOperationStatus.SUPERSEDED.value
-            if cfg is not None and cfg.operation_id == context.operation_id:
-                await repos["configs"].fail_transition(
-                    context.config_id,
-                    operation_id=context.operation_id,
-                    error=message,
-                    actual_state=failed_state,
-                )
-            return status
+        if rejected:
+            operation = await repos["vpn_operations"].mark_rejected(
+                context.operation_id,
+                message,
+                lease_token=self._required_lease(context),
+                now=now,
+            )
+            status = VPNOperationStatus.REJECTED.value
+        elif context.attempts >= settings.vpn_operation_max_attempts:
+            operation = await repos["vpn_operations"].mark_exhausted(
+                context.operation_id,
+                message,
+                lease_token=self._required_lease(context),
+                now=now,
+            )
+            status = VPNOperationStatus.EXHAUSTED.value
+        else:
+            next_attempt = now + timedelta(seconds=self._retry_delay(context.attempts))
+            operation = await repos["vpn_operations"].mark_failed(
+                context.operation_id,
+                message,
+                lease_token=self._required_lease(context),
+                now=now,
+                next_attempt_at=next_attempt,
+            )
+            status = VPNOperationStatus.FAILED.value
+        if operation is None:
+            return VPNOperationStatus.SUPERSEDED.value
+        if cfg is not None and cfg.operation_id == context.operation_id:
+            await repos["configs"].fail_transition(
+                context.config_id,
+                operation_id=context.operation_id,
+                error=message,
+                actual_state=failed_state,
+            )
+        return status
+
+    async def _complete_group(
+        self, group: Sequence[_Completion]
+    ) -> list[tuple[str, str | None]]:
+        """Commit many completions with one config lock and one transaction."""
 
-    async def _load_config_context(self, config_id: int) -> _ConfigContext:
+        now = self._now()
         async with self._uow() as repos:
-            cfg = await repos["configs"].get(id=config_id, joined_load=["server"])
-            if not cfg:
-                raise ConfigNotFoundError(f"Config with ID {config_id} not found")
-            operation = None
-            if cfg.operation_id:
-                operation = await repos["vpn_operations"].get(
-                    operation_id=cfg.operation_id
+            configs = {
+                cfg.id: cfg
+                for cfg in await repos["configs"].list_for_update(
+                    [item.context.config_id for item in group]
                 )
-            return _ConfigContext(
-                config_id=cfg.id,
-                name=cfg.name,
-                owner_id=cfg.owner_id,
-                server_id=cfg.server_id,
-                server_ip=cfg.server.ip,
-                server_port=cfg.server.port,
-                server_api_key=cfg.server.api_key,
-                operation_id=cfg.operation_id or str(uuid.uuid4()),
-                kind=operation.kind if operation else "read",
-                payload=operation.payload if operation else {},
-            )
+            }
+            results: list[tuple[str, str | None]] = []
+            for item in group:
+                cfg = configs.get(item.context.config_id)
+                if item.error is None:
+                    results.append(
+                        await self._complete_success_locked(
+                            repos,
+                            item.context,
+                            cast(str, item.target_state),
+                            cfg,
+                            now=now,
+                        )
+                    )
+                else:
+                    status = await self._mark_failure_locked(
+                        repos,
+                        item.context,
+                        item.error,
+                        cfg,
+                        rejected=item.rejected,
+                        now=now,
+                    )
+                    results.append((status, None))
+            return results
 
     def _retry_delay(self, attempts: int) -> int:
         exponent = min(max(attempts - 1, 0), 30)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 import uuid
-from collections.abc import Mapping, Sequence
+from collections.abc import Collection, Mapping, Sequence
 from datetime import datetime
 
 from core.config import settings
@@ -12,24 +12,79 @@ from core.exceptions import (
     InvalidOperationError,
     ServerNotFoundError,
 )
+from core.observability import observe_config_download_cache
 
-from ._config_shared import _KIND_BY_TARGET, _NON_TERMINAL_STATUSES
+from ._config_shared import _KIND_BY_TARGET, _NON_TERMINAL_STATUSES, _ConfigContext
+from .config_downloads import config_downloads
 from .models import Config
 
 logger = logging.getLogger("core.services.config")
 
+# Entitlement flips that may skip the per-config transition rules: no
+# prerequisite provision, failure or revocation can be involved.
+_BATCHABLE_KINDS = {VPNOperationKind.SUSPEND.value, VPNOperationKind.UNSUSPEND.value}
+_BATCHABLE_STATES = {VPNState.ACTIVE.value, VPNState.SUSPENDED.value}
+# Only a provisioned profile is stable enough to cache.
+_DOWNLOADABLE_STATES = _BATCHABLE_STATES
+
 
 class ConfigQueriesEntitlementsMixin:
     """Read configs and publish durable entitlement transitions."""
 
     async def download_config(self, config_id: int) -> bytes:
-        context = await self._load_config_context(config_id)
+        """Return the client's ``.ovpn`` bytes, cached while the profile holds.
+
+        Cached bytes are keyed by the succeeded provision operation and only
+        served while the config is provisioned and not being revoked, so a
+        repeat download needs no Manager round-trip.
+        """
+
+        context, provision_id = await self._load_download_context(config_id)
+        if provision_id is None:
+            config_downloads.forget(config_id)
+        else:
+            cached = config_downloads.get(config_id, provision_id)
+            if cached is not None:
+                observe_config_download_cache("hit")
+                return cached
         async with self._create_gateway(
             context.server_ip,
             context.server_port,
             context.server_api_key,
+            server_id=context.server_id,
         ) as api:
-            return await api.download_config(context.name)
+            content = await api.download_config(context.name)
+        if provision_id is not None:
+            config_downloads.put(config_id, provision_id, content)
+        observe_config_download_cache("miss")
+        return content
+
+    async def _load_download_context(
+        self, config_id: int
+    ) -> tuple[_ConfigContext, str | None]:
+        async with self._uow() as repos:
+            cfg = await repos["configs"].get(id=config_id, joined_load=["server"])
+            if not cfg:
+                raise ConfigNotFoundError(f"Config with ID {config_id} not found")
+            provision_id = None
+            if (
+                cfg.desired_state != VPNState.REVOKED.value
+                and cfg.actual_state in _DOWNLOADABLE_STATES
+            ):
+                provision_id = await repos["vpn_operations"].latest_provision_id(cfg.id)
+            context = _ConfigContext(
+                config_id=cfg.id,
+                name=cfg.name,
+                owner_id=cfg.owner_id,
+                server_id=cfg.server_id,
+                server_ip=cfg.server.ip,
+                server_port=cfg.server.port,
+                server_api_key=cfg.server.api_key,
+                operation_id=cfg.operation_id or str(uuid.uuid4()),
+                kind="read",
+                payload={},
+            )
+        return context, provision_id
 
     async def revoke_config(self, config_id: int) -> None:
         operation_id = await self._start_transition(
@@ -37,6 +92,7 @@ class ConfigQueriesEntitlementsMixin:
             desired_state=VPNState.REVOKED.value,
             kind=VPNOperationKind.REVOKE.value,
         )
+        config_downloads.forget(config_id)
         if operation_id:
             await self._execute(operation_id)
 
@@ -160,7 +216,7 @@ class ConfigQueriesEntitlementsMixin:
             if not server:
                 raise ServerNotFoundError(f"Server {server_id} not found")
             ip, port, api_key = server.ip, server.port, server.api_key
-        async with self._create_gateway(ip, port, api_key) as api:
+        async with self._create_gateway(ip, port, api_key, server_id=server_id) as api:
             return await api.list_blocked()
 
     async def _apply_entitlement(
@@ -191,9 +247,41 @@ class ConfigQueriesEntitlementsMixin:
     ) -> list[str]:
         """Stage every owner's latest intent in the caller's transaction."""
 
+        return await self.prepare_entitlements(
+            repos=repos,
+            owner_ids=[owner_id],
+            desired_state=desired_state,
+            kind=kind,
+        )
+
+    async def prepare_entitlements(
+        self,
+        *,
+        repos,
+        owner_ids: Collection[int],
+        desired_state: str,
+        kind: str,
+    ) -> list[str]:
+        """Stage the latest intent of many owners' configs as one set.
+
+        All configs are locked by one ID-ordered statement and their current
+        operations are loaded by one more. Plain ACTIVE <-> SUSPENDED flips
+        are then written with two bulk statements; every other lifecycle
+        shape goes through the per-config transition rules.
+        """
+
         now = self._now()
         planned: list[str] = []
-        configs = await repos["configs"].list_owner_for_update(owner_id)
+        configs = await repos["configs"].list_owners_for_update(owner_ids)
+        if not configs:
+            return planned
+        current_by_id = {
+            op.operation_id: op
+            for op in await repos["vpn_operations"].list_by_operation_ids(
+                [cfg.operation_id for cfg in configs if cfg.operation_id]
+            )
+        }
+        simple: dict[str, object] = {}
         for cfg in configs:
             # Balance-based entitlement changes may only toggle the ordinary
             # ACTIVE <-> SUSPENDED lifecycle. They must never resurrect a
@@ -209,10 +297,20 @@ class ConfigQueriesEntitlementsMixin:
                 VPNState.SUSPENDED.value,
             }:
                 continue
+            current = current_by_id.get(cfg.operation_id)
+            if (
+                kind in _BATCHABLE_KINDS
+                and not (current and current.status in _NON_TERMINAL_STATUSES)
+                and cfg.actual_state in _BATCHABLE_STATES
+                and cfg.actual_state != desired_state
+            ):
+                simple[str(uuid.uuid4())] = cfg
+                continue
             try:
-                operation_id = await self._plan_transition_locked(
+                operation_id = await self._plan_transition_from(
                     repos,
                     cfg,
+                    current,
                     desired_state=desired_state,
                     kind=kind,
                     now=now,
@@ -222,7 +320,7 @@ class ConfigQueriesEntitlementsMixin:
                     "VPN config cannot accept batch entitlement",
                     extra={
                         "config_id": cfg.id,
-                        "owner_id": owner_id,
+                        "owner_id": cfg.owner_id,
                         "desired_state": desired_state,
                     },
                     exc_info=True,
@@ -230,6 +328,23 @@ class ConfigQueriesEntitlementsMixin:
                 continue
             if operation_id and operation_id not in planned:
                 planned.append(operation_id)
+
+        await repos["configs"].begin_transitions(simple, desired_state=desired_state)
+        await repos["vpn_operations"].create_many(
+            [
+                {
+                    "operation_id": operation_id,
+                    "config_id": cfg.id,
+                    "config_name": cfg.name,
+                    "server_id": cfg.server_id,
+                    "owner_id": cfg.owner_id,
+                    "kind": kind,
+                    "next_attempt_at": now,
+                }
+                for operation_id, cfg in simple.items()
+            ]
+        )
+        planned.extend(simple)
         return planned
 
     async def prepare_drift_repairs(
@@ -334,6 +449,27 @@ class ConfigQueriesEntitlementsMixin:
         current = None
         if cfg.operation_id:
             current = await repos["vpn_operations"].get(operation_id=cfg.operation_id)
+        return await self._plan_transition_from(
+            repos,
+            cfg,
+            current,
+            desired_state=desired_state,
+            kind=kind,
+            now=now,
+            force=force,
+        )
+
+    async def _plan_transition_from(
+        self,
+        repos,
+        cfg,
+        current,
+        *,
+        desired_state: str,
+        kind: str,
+        now: datetime,
+        force: bool = False,
+    ) -> str | None:
         current_non_terminal = bool(
             current and current.status in _NON_TERMINAL_STATUSES
         )
@@ -0,0 +1,321 @@
+"""Fleet-wide drift audits run by the billing worker.
+
+The admin API stages a ``fleet_audit_drift`` action with its target servers
+and queues it; a worker leases the action and audits the servers with
+bounded concurrency. Each finished server becomes one append-only
+``admin_action_entry`` row with the next sequence number, so a stream reads
+only what it has not seen yet. The action's ``result`` only carries totals,
+refreshed with every lease renewal and at the end.
+
+A worker that dies or is stopped leaves an expired (or released) lease. The
+recovery job queues such an audit again; the next owner skips the servers
+that already have entries. An audit whose attempts are used up is failed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from redis import Redis
+from rq import Queue
+from sqlalchemy import Row
+
+from core.config import settings
+from core.db.models import AdminAction, AdminAuditEvent
+from core.db.unit_of_work import Repositories
+from core.domain import AdminActionStatus
+
+from .api_gateway import APIGateway
+from .vpn_drift import VPNDriftReport, VPNDriftService
+
+logger = logging.getLogger(__name__)
+
+FLEET_DRIFT_AUDIT_KIND = "fleet_audit_drift"
+FLEET_DRIFT_AUDIT_MAX_ATTEMPTS = 3
+# A job past its RQ timeout is cancelled and releases its lease; the
+# recovery job queues the remaining servers again.
+FLEET_DRIFT_AUDIT_JOB_TIMEOUT = 1800
+# Referenced by name: the admin image does not ship the billing daemon.
+_RUN_TASK = "billing_daemon.billing_tasks.run_fleet_drift_audit"
+
+
+class _LeaseLost(Exception):
+    """Another worker now owns the audit; this one must stop writing."""
+
+
+def enqueue_fleet_drift_audit(action_id: str) -> None:
+    """Queue a staged audit for the billing worker (a blocking Redis call)."""
+
+    queue = Queue("billing", connection=Redis.from_url(settings.redis_url))
+    queue.enqueue(_RUN_TASK, action_id, job_timeout=FLEET_DRIFT_AUDIT_JOB_TIMEOUT)
+
+
+def drift_audit_result(report: VPNDriftReport) -> dict[str, Any]:
+    """JSON form of one server's drift report, as admin actions store it."""
+
+    findings = [
+        {
+            "config_id": item.config_id,
+            "name": item.name,
+            "code": item.reason,
+            "reason": item.reason,
+            "severity": item.severity,
+            "desired_state": item.desired_state,
+            "hub_actual_state": item.hub_actual_state,
+            "manager_state": item.manager_state,
+            "repairable": item.repairable,
+            "details": list(item.details),
+            "message": item.reason.replace("_", " "),
+        }
+        for item in report.findings
+    ]
+    return {
+        "server_id": report.server_id,
+        "inventory_revision": report.inventory_revision,
+        "inventory_etag": report.inventory_etag,
+        "unchanged": report.unchanged,
+        "findings": findings,
+        "finding_count": len(findings),
+    }
+
+
+def drift_audit_summary(
+    servers_total: int, totals: Row | None = None
+) -> dict[str, Any]:
+    """Totals kept in the action's ``result``; ``totals`` from ``entry_totals``."""
+
+    return {
+        "servers_total": servers_total,
+        "completed": int(totals.completed) if totals else 0,
+        "failed": int(totals.failed) if totals else 0,
+        "finding_count": int(totals.finding_count) if totals else 0,
+        "critical_count": int(totals.critical_count) if totals else 0,
+    }
+
+
+class FleetDriftAuditService:
+    """Run queued fleet drift audits under a renewable lease."""
+
+    def __init__(
+        self,
+        uow: Callable,
+        *,
+        drift_service: VPNDriftService | None = None,
+        gateway_factory: Callable[..., APIGateway] | None = None,
+        clock: Callable[[], datetime] | None = None,
+    ) -> None:
+        self._uow = uow
+        self._drift_service = drift_service or VPNDriftService(
+            uow, gateway_factory=gateway_factory
+        )
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+
+    async def run(self, action_id: str) -> bool:
+        """Lease the audit and audit every server it has no entry for yet.
+
+        Returns ``False`` when the audit is not claimable (finished, owned by
+        a live worker, out of attempts) or the lease was lost midway.
+        """
+
+        lease_for = self._lease_for()
+        lease_token = str(uuid.uuid4())
+        async with self._uow() as repos:
+            action = await repos.admin_actions.claim(
+                action_id,
+                kind=FLEET_DRIFT_AUDIT_KIND,
+                lease_token=lease_token,
+                now=self._clock(),
+                lease_for=lease_for,
+                max_attempts=FLEET_DRIFT_AUDIT_MAX_ATTEMPTS,
+            )
+            if action is None:
+                return False
+            action_pk = action.id
+            targets = [tuple(target) for target in action.payload.get("targets", [])]
+            audited = await repos.admin_actions.entry_server_ids(action_pk)
+            sequence = (await repos.admin_actions.entry_totals(action_pk)).last_sequence
+
+        semaphore = asyncio.Semaphore(settings.admin_fleet_drift_audit_concurrency)
+        # Entries commit one at a time in sequence order, so a stream that
+        # has read sequence N never misses a smaller one committed later.
+        record_lock = asyncio.Lock()
+
+        async def audit(server_id: int, name: str) -> None:
+            nonlocal sequence
+            async with semaphore:
+                entry = await self._audit_entry(server_id, name)
+            async with record_lock:
+                async with self._uow() as repos:
+                    recorded = await repos.admin_actions.add_entry(
+                        action_pk,
+                        lease_token=lease_token,
+                        sequence=sequence + 1,
+                        server_id=server_id,
+                        status=entry["status"],
+                        finding_count=entry["finding_count"],
+                        critical_count=entry["critical_count"],
+                        data=entry,
+                    )
+                if not recorded:
+                    raise _LeaseLost
+                sequence += 1
+
+        async def keep_lease() -> None:
+            while True:
+                await asyncio.sleep(lease_for.total_seconds() / 3)
+                async with self._uow() as repos:
+                    totals = await repos.admin_actions.entry_totals(action_pk)
+                    renewed = await repos.admin_actions.renew(
+                        action_pk,
+                        lease_token=lease_token,
+                        now=self._clock(),
+                        lease_for=lease_for,
+                        result=drift_audit_summary(len(targets), totals),
+                    )
+                if not renewed:
+                    raise _LeaseLost
+
+        audits = [
+            asyncio.ensure_future(audit(server_id, name))
+            for server_id, name in targets
+            if server_id not in audited
+        ]
+        lease = asyncio.ensure_future(keep_lease())
+        try:
+            everything = asyncio.gather(*audits)
+            await asyncio.wait((everything, lease), return_when=asyncio.FIRST_COMPLETED)
+            if lease.done():
+                lease.result()
+            everything.result()
+        except _LeaseLost:
+            logger.warning("Fleet drift audit %s lost its lease", action_id)
+            return False
+        except asyncio.CancelledError:
+            await asyncio.shield(self._release(action_pk, lease_token))
+            raise
+        except Exception as exc:
+            await self._finish(action_pk, lease_token, error_code=type(exc).__name__)
+            logger.exception("Fleet drift audit %s failed", action_id)
+            return True
+        finally:
+            for task in (*audits, lease):
+                task.cancel()
+            await asyncio.gather(*audits, lease, return_exceptions=True)
+        await self._finish(action_pk, lease_token)
+        return True
+
+    async def recover_abandoned(self) -> list[str]:
+        """Fail expired audits out of attempts; return the rest to queue again.
+
+        Each returned audit gets a fresh pick-up deadline, so the next sweep
+        does not queue it a second time while its job is still waiting.
+        """
+
+        now = self._clock()
+        requeue: list[str] = []
+        async with self._uow() as repos:
+            for action in await repos.admin_actions.lock_expired(
+                kind=FLEET_DRIFT_AUDIT_KIND, now=now
+            ):
+                if action.attempts >= FLEET_DRIFT_AUDIT_MAX_ATTEMPTS:
+                    await self._close(
+                        repos, action, error_code="stale_action_recovered"
+                    )
+                    continue
+                action.lease_token = None
+                action.lease_expires_at = now + self._lease_for()
+                requeue.append(action.action_id)
+        return requeue
+
+    async def _audit_entry(self, server_id: int, name: str) -> dict[str, Any]:
+        try:
+            result = drift_audit_result(
+                await self._drift_service.audit_server(server_id)
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            return {
+                "server_id": server_id,
+                "name": name,
+                "status": AdminActionStatus.FAILED.value,
+                "error_code": type(exc).__name__[:96],
+                "finding_count": 0,
+                "critical_count": 0,
+                "findings": [],
+            }
+        return {
+            "name": name,
+            "status": AdminActionStatus.SUCCEEDED.value,
+            "error_code": None,
+            **result,
+            "critical_count": sum(
+                item["severity"] == "critical" for item in result["findings"]
+            ),
+        }
+
+    async def _release(self, action_pk: int, lease_token: str) -> None:
+        async with self._uow() as repos:
+            await repos.admin_actions.release(
+                action_pk, lease_token=lease_token, now=self._clock()
+            )
+
+    async def _finish(
+        self,
+        action_pk: int,
+        lease_token: str,
+        *,
+        error_code: str | None = None,
+    ) -> None:
+        async with self._uow() as repos:
+            action = await repos.admin_actions.lock_owned(action_pk, lease_token)
+            if action is not None:
+                await self._close(repos, action, error_code=error_code)
+
+    async def _close(
+        self,
+        repos: Repositories,
+        action: AdminAction,
+        *,
+        error_code: str | None,
+    ) -> None:
+        totals = await repos.admin_actions.entry_totals(action.id)
+        action.result = drift_audit_summary(
+            len(action.payload.get("targets", [])), totals
+        )
+        if error_code is None:
+            action.status = AdminActionStatus.SUCCEEDED.value
+        else:
+            action.status = AdminActionStatus.FAILED.value
+            action.error_code = error_code[:96]
+            action.error_detail = "Fleet drift audit did not finish"
+        action.completed_at = self._clock()
+        action.lease_token = None
+        action.lease_expires_at = None
+        repos.admin_actions.session.add(
+            AdminAuditEvent(
+                actor_user_id=action.actor_user_id,
+                action=(
+                    "fleet.audit_drift.completed"
+                    if error_code is None
+                    else "fleet.audit_drift.failed"
+                ),
+                target_type="fleet",
+                request_id=f"fleet-drift:{action.action_id}",
+                correlation_id=f"fleet-drift:{action.action_id}",
+                details={
+                    "admin_action_id": action.action_id,
+                    "error_code": action.error_code,
+                    **action.result,
+                },
+            )
+        )
+
+    @staticmethod
+    def _lease_for() -> timedelta:
+        return timedelta(seconds=settings.admin_fleet_drift_audit_lease_seconds)
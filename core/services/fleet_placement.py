@@ -3,12 +3,13 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
-from sqlalchemy import or_, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
-from core.db.models import VPN_Config, VPNServerStatus
-from core.domain import ServerLifecycleState, VPNState
+from core.db.models import VPNServerStatus
+from core.db.models.config import is_managed_state, managed_config_condition
+from core.domain import ServerLifecycleState
 
 
 @dataclass(frozen=True, slots=True)
@@ -19,25 +20,12 @@ class PlacementDecision:
     reason: str | None = None
 
 
-def managed_config_condition():
-    """Return the SQL predicate for configs that may still exist on Manager.
-
-    A revoke intent must keep consuming capacity and must keep endpoint/retire
-    mutations fenced until Manager has actually converged to ``revoked``.
-    """
-
-    return or_(
-        VPN_Config.desired_state != VPNState.REVOKED.value,
-        VPN_Config.actual_state != VPNState.REVOKED.value,
-    )
-
-
 def is_managed_config(config: object) -> bool:
     """Mirror :func:`managed_config_condition` for already-loaded rows."""
 
-    return not (
-        getattr(config, "desired_state", None) == VPNState.REVOKED.value
-        and getattr(config, "actual_state", None) == VPNState.REVOKED.value
+    return is_managed_state(
+        getattr(config, "desired_state", None),
+        getattr(config, "actual_state", None),
     )
 
 
@@ -0,0 +1,177 @@
+"""Per-Manager circuit breakers shared by every gateway in the process.
+
+Without a breaker, every operation aimed at an unreachable Manager ran the
+full retry ladder before giving up, and hundreds of due operations did so at
+once. A breaker counts consecutive transport failures and retryable server
+errors per server. Once ``VPN_MANAGER_BREAKER_FAILURE_THRESHOLD`` is reached
+it opens: requests fail fast with :class:`APICircuitOpenError` and the
+reconciler defers their operations without consuming an attempt. When the
+open window ends, a single probe request is let through (half-open). Success
+closes the breaker; failure reopens it with a doubled window, capped by
+``VPN_MANAGER_BREAKER_MAX_OPEN_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Literal
+
+from core.config import settings
+from core.exceptions import APICircuitOpenError
+from core.observability.statsd import observe_manager_circuit
+
+CircuitState = Literal["closed", "open", "half_open"]
+CIRCUIT_STATES: tuple[CircuitState, ...] = ("closed", "open", "half_open")
+
+
+@dataclass(frozen=True, slots=True)
+class ManagerCircuitSnapshot:
+    state: CircuitState
+    consecutive_failures: int
+    open_seconds: float
+    retry_after_seconds: float | None
+
+
+class ManagerCircuitBreaker:
+    """Closed/open/half-open state machine for one Manager."""
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        open_seconds: float,
+        max_open_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._base_open_seconds = open_seconds
+        self._max_open_seconds = max(open_seconds, max_open_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state: CircuitState = "closed"
+        self._failures = 0
+        self._open_seconds = open_seconds
+        self._opened_at = 0.0
+        self._probing = False
+
+    def acquire(self) -> None:
+        """Admit one request or raise :class:`APICircuitOpenError`."""
+
+        with self._lock:
+            if self._state == "closed":
+                return
+            if self._state == "open":
+                remaining = self._opened_at + self._open_seconds - self._clock()
+                if remaining > 0:
+                    raise APICircuitOpenError(
+                        "VPN Manager circuit is open", retry_after=remaining
+                    )
+                self._transition("half_open")
+            if self._probing:
+                raise APICircuitOpenError(
+                    "VPN Manager circuit is probing recovery",
+                    retry_after=self._base_open_seconds,
+                )
+            self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._open_seconds = self._base_open_seconds
+            if self._state != "closed":
+                self._transition("closed")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open":
+                self._probing = False
+                self._open_seconds = min(self._open_seconds * 2, self._max_open_seconds)
+                self._open()
+            elif self._state == "closed" and self._failures >= self._failure_threshold:
+                self._open()
+
+    def release(self) -> None:
+        """Free the probe slot of a request that ended without a verdict."""
+
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self) -> ManagerCircuitSnapshot:
+        with self._lock:
+            retry_after = None
+            if self._state == "open":
+                retry_after = max(
+                    0.0, self._opened_at + self._open_seconds - self._clock()
+                )
+            return ManagerCircuitSnapshot(
+                state=self._state,
+                consecutive_failures=self._failures,
+                open_seconds=self._open_seconds,
+                retry_after_seconds=retry_after,
+            )
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._transition("open")
+
+    def _transition(self, state: CircuitState) -> None:
+        self._state = state
+        observe_manager_circuit(state)
+
+
+class ManagerCircuitRegistry:
+    """One breaker per server id (or ``host:port`` for ad-hoc gateways)."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: dict[int | str, ManagerCircuitBreaker] = {}
+
+    def get(self, server: int | str) -> ManagerCircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(server)
+            if breaker is None:
+                breaker = self._breakers[server] = ManagerCircuitBreaker(
+                    failure_threshold=settings.vpn_manager_breaker_failure_threshold,
+                    open_seconds=settings.vpn_manager_breaker_open_seconds,
+                    max_open_seconds=settings.vpn_manager_breaker_max_open_seconds,
+                    clock=self._clock,
+                )
+            return breaker
+
+    def snapshot(self, server: int | str) -> ManagerCircuitSnapshot:
+        with self._lock:
+            breaker = self._breakers.get(server)
+        if breaker is None:
+            return ManagerCircuitSnapshot(
+                state="closed",
+                consecutive_failures=0,
+                open_seconds=settings.vpn_manager_breaker_open_seconds,
+                retry_after_seconds=None,
+            )
+        return breaker.snapshot()
+
+    def state_counts(self) -> dict[CircuitState, int]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        counts = Counter(breaker.snapshot().state for breaker in breakers)
+        return {state: counts[state] for state in CIRCUIT_STATES}
+
+    def forget(self, server: int | str) -> None:
+        """Drop a server's breaker, e.g. after its endpoint changed."""
+
+        with self._lock:
+            self._breakers.pop(server, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+manager_circuits = ManagerCircuitRegistry()
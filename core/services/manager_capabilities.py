@@ -0,0 +1,49 @@
+"""Process-wide cache of the optional features each Manager advertises.
+
+Managers list optional API features in ``GET /status`` under
+``capabilities``. Callers that pick between an optional route and the
+per-client fallback should not fetch the status document for every batch, so
+the advertised set is cached per server and endpoint revision for
+``VPN_MANAGER_CAPABILITIES_TTL_SECONDS``. A new endpoint or API key produces
+a new revision and is probed again.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Hashable
+
+from core.config import settings
+
+BULK_MUTATIONS = "bulk_mutations"
+
+
+class ManagerCapabilityCache:
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, tuple[float, frozenset[str]]] = {}
+
+    def get(self, key: Hashable) -> frozenset[str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, capabilities = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            return capabilities
+
+    def put(self, key: Hashable, capabilities: frozenset[str]) -> None:
+        expires_at = self._clock() + settings.vpn_manager_capabilities_ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, capabilities)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+manager_capabilities = ManagerCapabilityCache()
@@ -0,0 +1,336 @@
+"""Process-wide pool of long-lived VPN Manager HTTP clients.
+
+Every Manager call used to build a fresh ``httpx.AsyncClient`` with a new
+``ssl.SSLContext``, so each request paid a TCP connect, a full TLS handshake
+and a CA/mTLS chain read from disk. :data:`manager_clients` keeps one client
+per server, endpoint revision and event loop; its keep-alive connections carry
+later requests without a new handshake. TLS contexts are cached per
+certificate path and modification time, so rotated material is picked up on
+the next gateway without a restart.
+
+A client is keyed by the server id (or ``host:port`` for ad-hoc gateways) and
+a digest of its base URL and API key. Workers build gateways from freshly
+loaded server rows, so an endpoint or key change produces a new revision and
+retires the previous client of that server even in processes that never saw
+``ServerService.update``; the admin process also invalidates explicitly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import os
+import ssl
+import threading
+import weakref
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from core.config import settings
+from core.observability.statsd import observe_manager_client_pool
+
+logger = logging.getLogger(__name__)
+
+_TLS_CONTEXT_CACHE_SIZE = 16
+
+ClientFactory = Callable[[httpx.AsyncBaseTransport], httpx.AsyncClient]
+
+
+@dataclass(frozen=True, slots=True)
+class ManagerClientKey:
+    """Identity of one pooled client; ``options`` must be hashable."""
+
+    server: int | str
+    revision: str
+    options: Hashable = None
+
+    @staticmethod
+    def revision_for(base_url: str, api_key: str) -> str:
+        digest = hashlib.sha256(f"{base_url}\0{api_key}".encode())
+        return digest.hexdigest()[:16]
+
+
+@dataclass(frozen=True, slots=True)
+class ManagerClientPoolStats:
+    hits: int
+    misses: int
+    connects: int
+    tls_handshakes: int
+    evictions: int
+    clients: int
+
+
+@dataclass(slots=True)
+class ManagerClientLease:
+    """A borrowed client; release it through the registry, never close it."""
+
+    key: ManagerClientKey
+    client: httpx.AsyncClient
+    loop: asyncio.AbstractEventLoop
+    leases: int = 0
+    retired: bool = False
+
+
+@dataclass(slots=True)
+class _Counters:
+    hits: int = 0
+    misses: int = 0
+    connects: int = 0
+    tls_handshakes: int = 0
+    evictions: int = 0
+    tls_contexts: dict[tuple, ssl.SSLContext] = field(default_factory=dict)
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """Count new TCP connections and TLS handshakes via httpcore traces."""
+
+    def __init__(
+        self,
+        inner: httpx.AsyncBaseTransport,
+        on_event: Callable[[str], None],
+    ) -> None:
+        self._inner = inner
+        self._on_event = on_event
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        previous = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            self._on_event(event_name)
+            if previous is not None:
+                await previous(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class ManagerClientRegistry:
+    """Lend long-lived Manager clients bound to the running event loop."""
+
+    def __init__(
+        self,
+        *,
+        transport_factory: (
+            Callable[[ssl.SSLContext | bool], httpx.AsyncBaseTransport] | None
+        ) = None,
+    ) -> None:
+        self._transport_factory = transport_factory or self._default_transport
+        self._lock = threading.Lock()
+        self._pools: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[ManagerClientKey, ManagerClientLease]
+        ] = weakref.WeakKeyDictionary()
+        self._counters = _Counters()
+        self._http2_warned = False
+
+    def stats(self) -> ManagerClientPoolStats:
+        with self._lock:
+            counters = self._counters
+            return ManagerClientPoolStats(
+                hits=counters.hits,
+                misses=counters.misses,
+                connects=counters.connects,
+                tls_handshakes=counters.tls_handshakes,
+                evictions=counters.evictions,
+                clients=sum(len(pool) for pool in self._pools.values()),
+            )
+
+    def tls_context(
+        self,
+        *,
+        enabled: bool,
+        mtls_required: bool,
+        paths: tuple[str | None, str | None, str | None],
+        build: Callable[[], ssl.SSLContext | None],
+    ) -> ssl.SSLContext | None:
+        """Return the cached context for CA/cert/key paths, rebuilding on change.
+
+        Failures are not cached, so a secret mounted after start-up is used by
+        the next gateway.
+        """
+
+        key = (
+            enabled,
+            mtls_required,
+            *((path, _mtime_ns(path)) for path in paths),
+        )
+        with self._lock:
+            context = self._counters.tls_contexts.get(key)
+        if context is not None:
+            return context
+        context = build()
+        if context is None:
+            return None
+        with self._lock:
+            contexts = self._counters.tls_contexts
+            contexts[key] = context
+            while len(contexts) > _TLS_CONTEXT_CACHE_SIZE:
+                contexts.pop(next(iter(contexts)))
+        return context
+
+    def acquire(
+        self,
+        key: ManagerClientKey,
+        *,
+        verify: ssl.SSLContext | bool,
+        factory: ClientFactory,
+    ) -> ManagerClientLease:
+        """Borrow the loop's client for ``key``, creating it on a miss.
+
+        Clients of the same server with another revision are retired: they
+        close once their last in-flight lease is released.
+        """
+
+        loop = asyncio.get_running_loop()
+        stale: list[ManagerClientLease] = []
+        with self._lock:
+            pool = self._pools.setdefault(loop, {})
+            lease = pool.get(key)
+            if lease is None:
+                stale = [
+                    self._retire(pool, other)
+                    for other in list(pool)
+                    if other.server == key.server and other.revision != key.revision
+                ]
+            hit = lease is not None
+            if hit:
+                self._counters.hits += 1
+            else:
+                self._counters.misses += 1
+        if lease is None:
+            transport = _CountingTransport(
+                self._transport_factory(verify), self._on_trace
+            )
+            lease = ManagerClientLease(key=key, client=factory(transport), loop=loop)
+            with self._lock:
+                pool[key] = lease
+        lease.leases += 1
+        for retired in stale:
+            self._close_if_idle(retired)
+        observe_manager_client_pool("hit" if hit else "miss")
+        return lease
+
+    async def release(self, lease: ManagerClientLease) -> None:
+        lease.leases -= 1
+        if lease.retired and lease.leases <= 0:
+            await lease.client.aclose()
+
+    async def invalidate(self, server: int | str) -> int:
+        """Retire every client of ``server``; return how many were dropped."""
+
+        with self._lock:
+            retired = [
+                self._retire(pool, key)
+                for pool in self._pools.values()
+                for key in [key for key in pool if key.server == server]
+            ]
+        for lease in retired:
+            await self._aclose_if_idle(lease)
+        return len(retired)
+
+    async def aclose(self) -> None:
+        """Close every idle client owned by the running loop."""
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.pop(loop, {})
+            leases = list(pool.values())
+            for lease in leases:
+                lease.retired = True
+        for lease in leases:
+            await self._aclose_if_idle(lease)
+
+    def reset(self) -> None:
+        """Forget all clients and cached TLS contexts (tests and forks)."""
+
+        with self._lock:
+            self._pools = weakref.WeakKeyDictionary()
+            self._counters = _Counters()
+
+    def _retire(
+        self,
+        pool: dict[ManagerClientKey, ManagerClientLease],
+        key: ManagerClientKey,
+    ) -> ManagerClientLease:
+        lease = pool.pop(key)
+        lease.retired = True
+        self._counters.evictions += 1
+        observe_manager_client_pool("evicted")
+        return lease
+
+    async def _aclose_if_idle(self, lease: ManagerClientLease) -> None:
+        if lease.leases > 0:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:  # pragma: no cover - invalidate is always awaited
+            running = None
+        if lease.loop is running:
+            await lease.client.aclose()
+        else:
+            self._close_if_idle(lease)
+
+    @staticmethod
+    def _close_if_idle(lease: ManagerClientLease) -> None:
+        """Schedule an idle retired client's close on its own loop."""
+
+        if lease.leases > 0 or lease.loop.is_closed():
+            return
+        try:
+            lease.loop.call_soon_threadsafe(
+                lambda: lease.loop.create_task(lease.client.aclose())
+            )
+        except RuntimeError:  # pragma: no cover - loop closed concurrently
+            return
+
+    def _on_trace(self, event_name: str) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self._counters.connects += 1
+            observe_manager_client_pool("connect")
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self._counters.tls_handshakes += 1
+            observe_manager_client_pool("tls_handshake")
+
+    def _default_transport(
+        self, verify: ssl.SSLContext | bool
+    ) -> httpx.AsyncBaseTransport:
+        http2 = settings.vpn_manager_http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            if not self._http2_warned:
+                self._http2_warned = True
+                logger.warning(
+                    "VPN_MANAGER_HTTP2 is enabled but the h2 package is not "
+                    "installed; using HTTP/1.1 keep-alive"
+                )
+            http2 = False
+        return httpx.AsyncHTTPTransport(
+            verify=verify,
+            http2=http2,
+            trust_env=False,
+            limits=httpx.Limits(
+                max_connections=settings.vpn_manager_pool_max_connections,
+                max_keepalive_connections=settings.vpn_manager_pool_max_connections,
+                keepalive_expiry=settings.vpn_manager_pool_keepalive_seconds,
+            ),
+        )
+
+
+def _mtime_ns(path: str | None) -> int | None:
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+manager_clients = ManagerClientRegistry()
@@ -0,0 +1,178 @@
+"""Per-Manager request shaping shared by every gateway in the process.
+
+Bot downloads, reconciler retries, the fleet poller and drift audits used to
+reach a Manager independently, with nothing bounding the combined load. Each
+server now gets a token bucket (``VPN_MANAGER_RATE_LIMIT_PER_SECOND`` with a
+``VPN_MANAGER_RATE_LIMIT_BURST``) and a cap on in-flight requests per event
+loop (``VPN_MANAGER_MAX_CONCURRENT_REQUESTS``). Both apply to every attempt,
+so retries are shaped too, while backoff sleeps hold no slot.
+
+Identical concurrent reads are coalesced: while a GET for the same server,
+endpoint revision, path and headers is in flight, later callers await its
+result instead of sending their own request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+from core.config import settings
+from core.observability.statsd import observe_manager_throttle
+
+T = TypeVar("T")
+
+Sleep = Callable[[float], Awaitable[None]]
+
+
+class _TokenBucket:
+    """Thread-safe token bucket that hands out reservations in FIFO order."""
+
+    def __init__(self, *, rate: float, burst: int, clock: Callable[[], float]) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """Take one token; return how long to wait before it may be used."""
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+
+class _LeaderCancelled(Exception):
+    """The coalesced request was cancelled; followers must send their own."""
+
+
+class ManagerRequestThrottle:
+    """Rate-limit, cap and coalesce Manager requests per server."""
+
+    def __init__(
+        self,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Sleep = asyncio.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: dict[int | str, _TokenBucket] = {}
+        self._loops: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoopState
+        ] = weakref.WeakKeyDictionary()
+
+    @asynccontextmanager
+    async def slot(self, server: int | str) -> AsyncIterator[None]:
+        """Hold one of the server's request slots and a rate-limit token."""
+
+        semaphore = self._loop_state().semaphore(server)
+        if semaphore is not None and semaphore.locked():
+            observe_manager_throttle("queued")
+        async with semaphore or _no_limit():
+            delay = self._reserve(server)
+            if delay > 0:
+                observe_manager_throttle("rate_limited")
+                await self._sleep(delay)
+            yield
+
+    async def coalesce(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``call`` once for concurrent callers with an equal ``key``."""
+
+        inflight = self._loop_state().inflight
+        while True:
+            shared = inflight.get(key)
+            if shared is None:
+                break
+            observe_manager_throttle("coalesced")
+            try:
+                return await asyncio.shield(shared)
+            except _LeaderCancelled:
+                continue
+
+        shared = asyncio.get_running_loop().create_future()
+        inflight[key] = shared
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            shared.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as exc:
+            shared.set_exception(exc)
+            raise
+        else:
+            shared.set_result(result)
+            return result
+        finally:
+            if inflight.get(key) is shared:
+                del inflight[key]
+            # Mark the exception retrieved when nobody else was waiting.
+            if shared.done() and not shared.cancelled():
+                shared.exception()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._loops = weakref.WeakKeyDictionary()
+
+    def _reserve(self, server: int | str) -> float:
+        rate = settings.vpn_manager_rate_limit_per_second
+        if rate <= 0:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(server)
+            if bucket is None:
+                bucket = self._buckets[server] = _TokenBucket(
+                    rate=rate,
+                    burst=settings.vpn_manager_rate_limit_burst,
+                    clock=self._clock,
+                )
+        return bucket.reserve()
+
+    def _loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.get(loop)
+            if state is None:
+                state = self._loops[loop] = _LoopState()
+            return state
+
+
+class _LoopState:
+    """Loop-bound primitives: asyncio objects cannot cross event loops."""
+
+    def __init__(self) -> None:
+        self.inflight: dict[Hashable, asyncio.Future] = {}
+        self._semaphores: dict[int | str, asyncio.Semaphore] = {}
+
+    def semaphore(self, server: int | str) -> asyncio.Semaphore | None:
+        limit = settings.vpn_manager_max_concurrent_requests
+        if limit <= 0:
+            return None
+        semaphore = self._semaphores.get(server)
+        if semaphore is None:
+            semaphore = self._semaphores[server] = asyncio.Semaphore(limit)
+        return semaphore
+
+
+@asynccontextmanager
+async def _no_limit() -> AsyncIterator[None]:
+    yield
+
+
+manager_throttle = ManagerRequestThrottle()
@@ -21,6 +21,7 @@ class Server:
     provider: str | None = None
     public_endpoint: str | None = None
     manager_instance_id: str | None = None
+    managed_config_count: int = 0
     version: int = 1
     updated_at: datetime | None = None
 
@@ -43,6 +44,7 @@ class Server:
             provider=getattr(obj, "provider", None),
             public_endpoint=getattr(obj, "public_endpoint", None),
             manager_instance_id=getattr(obj, "manager_instance_id", None),
+            managed_config_count=getattr(obj, "managed_config_count", 0),
             version=getattr(obj, "version", 1),
             updated_at=getattr(obj, "updated_at", None),
         )
@@ -58,6 +58,7 @@ class NotificationService:
         *,
         key: str = "notifications",
     ) -> None:
+        self._owns_redis = redis_client is None
         self._redis = redis_client or redis.from_url(
             settings.redis_url,
             decode_responses=True,
@@ -69,6 +70,12 @@ class NotificationService:
         self._failed_key = f"{key}:failed"
         self._listener_token: str | None = None
 
+    async def aclose(self) -> None:
+        """Release the connection pool this service created for itself."""
+
+        if self._owns_redis:
+            await self._redis.aclose()
+
     async def enqueue(
         self,
         chat_id: int,
@@ -116,6 +123,65 @@ class NotificationService:
                 except WatchError:
                     continue
 
+    async def enqueue_many(
+        self,
+        items: Sequence[tuple[str, int, str]],
+    ) -> list[bool]:
+        """Publish ``(notification_id, chat_id, text)`` rows in one transaction.
+
+        One optimistic WATCH/MULTI covers the whole batch: markers and pushes
+        of every row not yet enqueued commit together, so a crashed publisher
+        cannot leave a marker without its message. Returns, per row, whether it
+        was pushed now (``False`` means an earlier publish already did).
+        """
+
+        if not items:
+            return []
+        markers = []
+        for notification_id, _chat_id, _text in items:
+            if not notification_id or len(notification_id) > 160:
+                raise ValueError("invalid notification ID")
+            markers.append(f"{self._key}:enqueued:{notification_id}")
+        if len(set(markers)) != len(markers):
+            raise ValueError("duplicate notification ID in batch")
+
+        created_at = time.time()
+        while True:
+            async with self._redis.pipeline(transaction=True) as pipeline:
+                try:
+                    await pipeline.watch(*markers)
+                    existing = await pipeline.mget(markers)
+                    fresh = [value is None for value in existing]
+                    if not any(fresh):
+                        await pipeline.unwatch()
+                        return fresh
+                    pipeline.multi()
+                    payloads = []
+                    for (notification_id, chat_id, text), marker, is_fresh in zip(
+                        items, markers, fresh
+                    ):
+                        if not is_fresh:
+                            continue
+                        pipeline.set(
+                            marker,
+                            "1",
+                            ex=settings.notification_dedupe_ttl_seconds,
+                        )
+                        payloads.append(
+                            self._serialize(
+                                notification_id=notification_id,
+                                notification=Notification(chat_id=chat_id, text=text),
+                                attempts=0,
+                                created_at=created_at,
+                                available_at=0,
+                            )
+                        )
+                    pipeline.rpush(self._key, *payloads)
+                    await pipeline.execute()
+                    return fresh
+                except WatchError:
+                    continue
+
     @asynccontextmanager
     async def listener_lock(self) -> AsyncIterator[bool]:
         """Elect one notification consumer, including during rolling restarts."""
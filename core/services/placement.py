@@ -0,0 +1,153 @@
+"""Process-wide map of the servers that can take a new config.
+
+Offering or choosing a server used to check every node's configs and status
+on each request. The engine loads the eligible servers with one query
+(lifecycle, Manager readiness and remaining capacity, exactly as
+:func:`placement_decision` judges them), reuses that map for
+``VPN_PLACEMENT_REFRESH_SECONDS`` and picks a node per location by weighted
+least load: the lowest count of managed configs per unit of
+``placement_weight``. Each pick is counted locally until the next reload, so
+a burst spreads across nodes instead of piling onto the emptiest one.
+
+A pick is advisory. ``prepare_config`` re-checks the locked server, and a
+caller whose placement was refused drops the node with :meth:`discard`
+until the map is reloaded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from core.config import settings
+
+from .fleet_placement import placement_decision
+
+
+@dataclass(slots=True)
+class _Candidate:
+    server_id: int
+    weight: float
+    load: int
+    remaining: int | None
+    ready_until: float
+
+
+class PlacementEngine:
+    def __init__(
+        self, uow: Callable, *, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._uow = uow
+        self._clock = clock
+        self._lock = asyncio.Lock()
+        self._locations: dict[str, list[_Candidate]] = {}
+        self._expires_at = float("-inf")
+
+    async def locations(self) -> list[str]:
+        """Return the locations that currently have an eligible server."""
+
+        await self._ensure_fresh()
+        now = self._clock()
+        return sorted(
+            location
+            for location, candidates in self._locations.items()
+            if any(self._eligible(candidate, now) for candidate in candidates)
+        )
+
+    async def choose(self, location: str | None = None) -> int | None:
+        """Pick the least loaded eligible server, optionally in one location."""
+
+        await self._ensure_fresh()
+        now = self._clock()
+        if location is None:
+            candidates = [
+                candidate
+                for location_candidates in self._locations.values()
+                for candidate in location_candidates
+            ]
+        else:
+            candidates = self._locations.get(location, [])
+        eligible = [
+            candidate for candidate in candidates if self._eligible(candidate, now)
+        ]
+        if not eligible:
+            return None
+        best = min(
+            eligible,
+            key=lambda candidate: (
+                candidate.load / candidate.weight,
+                candidate.server_id,
+            ),
+        )
+        best.load += 1
+        if best.remaining is not None:
+            best.remaining -= 1
+        return best.server_id
+
+    def discard(self, server_id: int) -> None:
+        """Stop offering a server that refused a placement until the next reload."""
+
+        for candidates in self._locations.values():
+            candidates[:] = [
+                candidate
+                for candidate in candidates
+                if candidate.server_id != server_id
+            ]
+
+    def reset(self) -> None:
+        self._locations = {}
+        self._expires_at = float("-inf")
+
+    async def refresh(self) -> None:
+        """Reload the eligible servers and their load with one query."""
+
+        async with self._uow() as repos:
+            rows = await repos["servers"].list_with_latest_status(placeable_only=True)
+        now = datetime.now(timezone.utc)
+        started = self._clock()
+        locations: dict[str, list[_Candidate]] = {}
+        for server, latest in rows:
+            managed = server.managed_config_count
+            if not placement_decision(server, managed, latest, now=now).allowed:
+                continue
+            collected_at = latest.collected_at
+            if collected_at.tzinfo is None:
+                collected_at = collected_at.replace(tzinfo=timezone.utc)
+            fresh_for = (
+                settings.admin_fleet_status_stale_seconds
+                - (now - collected_at).total_seconds()
+            )
+            maximum = server.max_configs
+            locations.setdefault(server.location, []).append(
+                _Candidate(
+                    server_id=server.id,
+                    weight=float(server.placement_weight),
+                    load=managed,
+                    remaining=(
+                        None
+                        if maximum is None
+                        else maximum - server.capacity_reserve - managed
+                    ),
+                    ready_until=started + fresh_for,
+                )
+            )
+        self._locations = locations
+        self._expires_at = started + settings.vpn_placement_refresh_seconds
+
+    async def _ensure_fresh(self) -> None:
+        if self._expires_at > self._clock():
+            return
+        async with self._lock:
+            # Concurrent callers share the reload of the one that got here first.
+            if self._expires_at <= self._clock():
+                await self.refresh()
+
+    @staticmethod
+    def _eligible(candidate: _Candidate, now: float) -> bool:
+        # A status sample that aged out while cached no longer proves readiness.
+        return candidate.ready_until > now and (
+            candidate.remaining is None or candidate.remaining > 0
+        )
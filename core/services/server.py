@@ -1,19 +1,27 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from decimal import Decimal
 from typing import Callable, Sequence
 
 from core.domain import ServerLifecycleState
 from core.exceptions import InvalidOperationError
 
-from .fleet_placement import (
-    is_managed_config,
-    latest_server_status,
-    placement_decision,
-)
+from .fleet_placement import latest_server_status, placement_decision
+from .manager_breakers import manager_circuits
+from .manager_clients import manager_clients
 from .models import Server
 
 
+@dataclass(frozen=True, slots=True)
+class ManagedConfigCountDrift:
+    """A server whose maintained managed-config counter was wrong."""
+
+    server_id: int
+    stored: int
+    counted: int
+
+
 class ServerService:
     """Operations on VPN **servers**."""
 
@@ -42,24 +50,24 @@ class ServerService:
             filters["host"] = host
 
         async with self._uow() as repos:
-            # Availability filtering must happen before pagination, because a
-            # disabled or full node must never appear as a provision target.
-            fetch_limit = None if available_only else limit
-            fetch_offset = 0 if available_only else offset
-            servers = await repos["servers"].list(
-                limit=fetch_limit, offset=fetch_offset, **filters
-            )
             if available_only:
-                available = []
-                for server in servers:
-                    rows = await repos["configs"].list(server_id=server.id)
-                    managed = sum(is_managed_config(row) for row in rows)
-                    latest = await latest_server_status(
-                        repos["servers"].session, server.id
+                # Availability filtering must happen before pagination, because
+                # a disabled or full node must never appear as a provision
+                # target. Servers and their newest status load in one query.
+                rows = await repos["servers"].list_with_latest_status(
+                    placeable_only=True, **filters
+                )
+                servers = [
+                    server
+                    for server, latest in rows
+                    if self._accepts_new_config(
+                        server, server.managed_config_count, latest
                     )
-                    if self._accepts_new_config(server, managed, latest):
-                        available.append(server)
-                servers = available[offset : offset + limit if limit else None]
+                ][offset : offset + limit if limit else None]
+            else:
+                servers = await repos["servers"].list(
+                    limit=limit, offset=offset, **filters
+                )
             return [Server.from_orm(s) for s in servers]
 
     async def create(
@@ -128,8 +136,7 @@ class ServerService:
                 for key in endpoint_fields
             )
             if endpoint_changed:
-                configs = await repos["configs"].list(server_id=server_id)
-                if any(is_managed_config(config) for config in configs):
+                if current.managed_config_count:
                     raise InvalidOperationError(
                         "Drain all VPN configs before changing the Manager endpoint"
                     )
@@ -138,7 +145,13 @@ class ServerService:
                 fields["manager_instance_id"] = None
             fields["version"] = getattr(current, "version", 1) + 1
             srv = await repos["servers"].update(server_id, **fields)
-            return Server.from_orm(srv) if srv else None
+            updated = Server.from_orm(srv) if srv else None
+        if endpoint_changed:
+            # Pooled keep-alive connections and breaker state describe the
+            # old endpoint.
+            await manager_clients.invalidate(server_id)
+            manager_circuits.forget(server_id)
+        return updated
 
     @staticmethod
     def _accepts_new_config(server, managed_configs: int, latest_status) -> bool:
@@ -149,7 +162,31 @@ class ServerService:
             server = await repos["servers"].get(id=server_id)
             if server is None:
                 return False
-            configs = await repos["configs"].list(server_id=server_id)
-            managed = sum(is_managed_config(config) for config in configs)
             latest = await latest_server_status(repos["servers"].session, server.id)
-            return self._accepts_new_config(server, managed, latest)
+            return self._accepts_new_config(server, server.managed_config_count, latest)
+
+    async def check_managed_config_counts(
+        self, *, repair: bool = False
+    ) -> list[ManagedConfigCountDrift]:
+        """Compare maintained counters with the configs, optionally rebuilding them.
+
+        The scan is one grouped query; each repair locks and recounts a single
+        server in its own short transaction.
+        """
+
+        async with self._uow() as repos:
+            mismatches = await repos["servers"].managed_config_count_mismatches()
+        drift: list[ManagedConfigCountDrift] = []
+        for server_id, stored, counted in mismatches:
+            if repair:
+                async with self._uow() as repos:
+                    recounted = await repos["servers"].recount_managed_configs(
+                        server_id
+                    )
+                if recounted is None:
+                    continue
+                stored, counted = recounted
+                if stored == counted:
+                    continue
+            drift.append(ManagedConfigCountDrift(server_id, stored, counted))
+        return drift
@@ -0,0 +1,295 @@
+"""Downsampling of fleet status samples into fixed UTC buckets.
+
+The admin poller stores one status snapshot per server and poll interval.
+Every run of the rollup job folds closed buckets into 5-minute rollups from
+the raw samples, hourly rollups from the 5-minute ones and daily rollups from
+the hourly ones, then deletes whatever has outlived its resolution's
+retention. A level never runs ahead of the finer one it is built from, and a
+sample is only pruned once its bucket has been rolled up. Each run handles a
+bounded number of buckets per level, so a backlog is caught up over several
+runs.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from core.config import settings
+
+RESOLUTIONS: dict[str, timedelta] = {
+    "5m": timedelta(minutes=5),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+_SOURCES = {"1h": "5m", "1d": "1h"}
+# Buckets per level and run; at the default 5-minute schedule a stalled
+# pipeline catches up twelve times faster than samples arrive.
+_BATCH_BUCKETS = 12
+# Room for a sample whose poll began just before its bucket closed.
+_GRACE = timedelta(minutes=1)
+# Points a history read may span before the next coarser resolution is used.
+HISTORY_MAX_POINTS = 1_000
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def bucket_floor(value: datetime, width: timedelta) -> datetime:
+    """Start of the UTC bucket of ``width`` that contains ``value``."""
+
+    return _EPOCH + ((_utc(value) - _EPOCH) // width) * width
+
+
+def status_retention(resolution: str) -> timedelta:
+    """How long samples (``raw``) or rollups of ``resolution`` are kept."""
+
+    if resolution == "raw":
+        return timedelta(hours=settings.admin_fleet_status_raw_retention_hours)
+    days = {
+        "5m": settings.admin_fleet_status_5m_retention_days,
+        "1h": settings.admin_fleet_status_hourly_retention_days,
+        "1d": settings.admin_fleet_status_daily_retention_days,
+    }[resolution]
+    return timedelta(days=days)
+
+
+def history_resolution(since: datetime, until: datetime, *, now: datetime) -> str:
+    """Finest resolution that still holds ``since`` and fits the range.
+
+    Raw samples count as one point per poll interval. A range older than
+    every retention window is served from daily rollups, the longest kept.
+    """
+
+    widths = {
+        "raw": timedelta(seconds=settings.admin_fleet_poll_interval_seconds),
+        **RESOLUTIONS,
+    }
+    for resolution, width in widths.items():
+        if (
+            _utc(since) >= _utc(now) - status_retention(resolution)
+            and (_utc(until) - _utc(since)) / width <= HISTORY_MAX_POINTS
+        ):
+            return resolution
+    return "1d"
+
+
+@dataclass(frozen=True, slots=True)
+class StatusRollupResult:
+    buckets: dict[str, int]
+    pruned: dict[str, int]
+
+
+def _sample_lookback() -> timedelta:
+    # Samples just before a 5-minute window seed its counter deltas and flaps.
+    return max(
+        RESOLUTIONS["5m"],
+        timedelta(seconds=2 * settings.admin_fleet_poll_interval_seconds),
+    )
+
+
+def _empty_bucket(server_id: int, bucket_start: datetime) -> dict[str, Any]:
+    return {
+        "server_id": server_id,
+        "bucket_start": bucket_start,
+        "samples": 0,
+        "reachable_samples": 0,
+        "ready_samples": 0,
+        "readiness_flaps": 0,
+        "session_samples": 0,
+        "sessions_sum": 0,
+        "sessions_min": None,
+        "sessions_max": None,
+        "bytes_received": 0,
+        "bytes_sent": 0,
+    }
+
+
+def _sample_ready(sample) -> bool:
+    # Matches the observed health of a snapshot: a Manager that leaves out
+    # readiness or data-plane state is not counted as down for it.
+    if not sample.success:
+        return False
+    if sample.ready is not None and not sample.ready:
+        return False
+    return sample.plane_status is None or sample.plane_status == "up"
+
+
+def _counter_delta(current, previous) -> int:
+    if current is None or previous is None:
+        return 0
+    current, previous = int(current), int(previous)
+    # A counter that went backwards was reset by a data-plane restart.
+    return current - previous if current >= previous else current
+
+
+def _merge_min(left: int | None, right: int | None) -> int | None:
+    if left is None or right is None:
+        return right if left is None else left
+    return min(left, right)
+
+
+def _merge_max(left: int | None, right: int | None) -> int | None:
+    if left is None or right is None:
+        return right if left is None else left
+    return max(left, right)
+
+
+class StatusRollupService:
+    def __init__(
+        self, uow: Callable, *, clock: Callable[[], datetime] = _utcnow
+    ) -> None:
+        self._uow = uow
+        self._clock = clock
+
+    async def roll_up(self) -> StatusRollupResult:
+        """Roll up closed buckets at every resolution and apply retention."""
+
+        now = _utc(self._clock())
+        buckets: dict[str, int] = {}
+        through: dict[str, datetime] = {}
+        async with self._uow() as repos:
+            statuses = repos["server_statuses"]
+            limit = now - _GRACE
+            for resolution in RESOLUTIONS:
+                limit, buckets[resolution] = await self._roll_up_level(
+                    statuses, resolution, limit
+                )
+                through[resolution] = limit
+
+            # Data feeding a coarser level is kept until that level has it.
+            pruned = {
+                "raw": await statuses.prune_samples(
+                    min(
+                        now - status_retention("raw"),
+                        through["5m"] - _sample_lookback(),
+                    )
+                ),
+                "5m": await statuses.prune_rollups(
+                    "5m", min(now - status_retention("5m"), through["1h"])
+                ),
+                "1h": await statuses.prune_rollups(
+                    "1h", min(now - status_retention("1h"), through["1d"])
+                ),
+                "1d": await statuses.prune_rollups("1d", now - status_retention("1d")),
+            }
+        return StatusRollupResult(buckets=buckets, pruned=pruned)
+
+    async def _roll_up_level(
+        self, statuses, resolution: str, limit: datetime
+    ) -> tuple[datetime, int]:
+        """Roll up one batch below ``limit``; return how far the level is done."""
+
+        width = RESOLUTIONS[resolution]
+        target = bucket_floor(limit, width)
+        last = await statuses.last_rollup_start(resolution)
+        since = None if last is None else _utc(last) + width
+        # Jump over periods without data instead of walking them bucket by
+        # bucket.
+        if resolution == "5m":
+            first = await statuses.first_sample_at(since)
+        else:
+            first = await statuses.first_rollup_start(_SOURCES[resolution], since)
+        if first is None:
+            return target, 0
+        start = bucket_floor(first, width)
+        if start >= target:
+            return target, 0
+        end = min(target, start + width * _BATCH_BUCKETS)
+        if resolution == "5m":
+            rows = self._aggregate_samples(
+                await statuses.samples(start - _sample_lookback(), end), start, width
+            )
+        else:
+            rows = self._aggregate_rollups(
+                await statuses.rollups(_SOURCES[resolution], start, end), width
+            )
+        await statuses.replace_rollups(resolution, start, end, rows)
+        return end, len(rows)
+
+    @staticmethod
+    def _aggregate_samples(
+        samples: Sequence, start: datetime, width: timedelta
+    ) -> list[dict[str, Any]]:
+        buckets: dict[tuple[int, datetime], dict[str, Any]] = {}
+        previous_ready: dict[int, bool] = {}
+        counters: dict[int, tuple[Any, Any]] = {}
+        for sample in samples:
+            server_id = sample.server_id
+            ready = _sample_ready(sample)
+            collected_at = _utc(sample.collected_at)
+            if collected_at >= start:
+                key = (server_id, bucket_floor(collected_at, width))
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = _empty_bucket(*key)
+                bucket["samples"] += 1
+                bucket["reachable_samples"] += int(bool(sample.success))
+                bucket["ready_samples"] += int(ready)
+                if server_id in previous_ready and previous_ready[server_id] != ready:
+                    bucket["readiness_flaps"] += 1
+                if sample.success and sample.online_sessions is not None:
+                    sessions = int(sample.online_sessions)
+                    bucket["session_samples"] += 1
+                    bucket["sessions_sum"] += sessions
+                    bucket["sessions_min"] = _merge_min(
+                        bucket["sessions_min"], sessions
+                    )
+                    bucket["sessions_max"] = _merge_max(
+                        bucket["sessions_max"], sessions
+                    )
+                if sample.success:
+                    received, sent = counters.get(server_id, (None, None))
+                    bucket["bytes_received"] += _counter_delta(
+                        sample.bytes_received, received
+                    )
+                    bucket["bytes_sent"] += _counter_delta(sample.bytes_sent, sent)
+            previous_ready[server_id] = ready
+            if sample.success:
+                received, sent = counters.get(server_id, (None, None))
+                counters[server_id] = (
+                    (
+                        received
+                        if sample.bytes_received is None
+                        else sample.bytes_received
+                    ),
+                    sent if sample.bytes_sent is None else sample.bytes_sent,
+                )
+        return list(buckets.values())
+
+    @staticmethod
+    def _aggregate_rollups(rollups: Sequence, width: timedelta) -> list[dict[str, Any]]:
+        buckets: dict[tuple[int, datetime], dict[str, Any]] = {}
+        for rollup in rollups:
+            key = (rollup.server_id, bucket_floor(rollup.bucket_start, width))
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = _empty_bucket(*key)
+            for field in (
+                "samples",
+                "reachable_samples",
+                "ready_samples",
+                "readiness_flaps",
+                "session_samples",
+                "sessions_sum",
+                "bytes_received",
+                "bytes_sent",
+            ):
+                bucket[field] += getattr(rollup, field)
+            bucket["sessions_min"] = _merge_min(
+                bucket["sessions_min"], rollup.sessions_min
+            )
+            bucket["sessions_max"] = _merge_max(
+                bucket["sessions_max"], rollup.sessions_max
+            )
+        return list(buckets.values())
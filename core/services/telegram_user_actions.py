@@ -256,6 +256,7 @@ def _callback_action(callback: dict[str, Any]) -> tuple[str, dict[str, object]]:
     config_patterns = (
         (r"cfg:(\d+)", "vpn.config_view"),
         (r"server:(\d+)", "vpn.config_server_select"),
+        (r"loc:(\d+)", "vpn.config_server_select"),
         (r"sus:(\d+)", "vpn.config_suspend"),
         (r"uns:(\d+)", "vpn.config_resume"),
         (r"del:(\d+)", "vpn.config_delete_request"),
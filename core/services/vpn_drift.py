@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Callable, Sequence
-from dataclasses import dataclass
-from typing import Literal
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Literal, cast
 
 from core.config import settings
 from core.domain import VPNState
@@ -79,6 +80,15 @@ class _HubConfigState:
     actual_state: str
 
 
+@dataclass(frozen=True, slots=True)
+class _RemoteState:
+    """The part of a Manager client state that drift findings depend on."""
+
+    state: str
+    manageable: bool
+    issues: tuple[str, ...]
+
+
 class VPNDriftService:
     """Audit Manager state and stage only explicitly approved safe repairs.
 
@@ -94,10 +104,12 @@ class VPNDriftService:
         *,
         config_service: ConfigService | None = None,
         gateway_factory: Callable[..., APIGateway] | None = None,
+        clock: Callable[[], datetime] | None = None,
     ) -> None:
         self._uow = uow
         self._config_service = config_service or ConfigService(uow)
         self._gateway_factory = gateway_factory or APIGateway
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
 
     async def audit_server(
         self,
@@ -105,28 +117,100 @@ class VPNDriftService:
         *,
         etag: str | None = None,
     ) -> VPNDriftReport:
-        """Return drift findings, or an unchanged marker after Manager 304."""
+        """Return drift findings; ``unchanged`` when ``etag`` is still current.
+
+        The last audited inventory, the Hub states it was compared with and
+        the findings are stored per server (``vpn_inventory_snapshot``). The
+        inventory is requested with the stored ETag, so an unchanged Manager
+        answers 304 and the stored copy is used. Only configs whose
+        ``updated_at`` moved since the last audit are reloaded, and findings
+        are recomputed only for client names whose remote or Hub side changed.
+        Every ``VPN_DRIFT_FULL_AUDIT_SECONDS`` the audit starts from scratch.
+        Configs and operations are never written.
+        """
+
+        now = self._now()
+        target, snapshot = await self._load_audit_state(server_id)
+        full = snapshot is None or (
+            self._aware(snapshot.full_audit_at)
+            <= now - timedelta(seconds=settings.vpn_drift_full_audit_seconds)
+        )
 
-        target, configs = await self._load_hub_state(server_id)
-        inventory = await self._fetch_inventory(target, etag=etag)
-        remote_unchanged = inventory is None
-        if inventory is None:
-            # A Manager ETag covers only remote inventory. Hub desired/actual
-            # state was loaded fresh above and may have changed since the
-            # caller cached that ETag, so a 304 can never justify an empty
-            # drift report. Fetch the cached representation again without the
-            # condition and compare it with current Hub state.
-            inventory = await self._fetch_inventory(target)
-            if inventory is None:  # pragma: no cover - unconditional HTTP invariant
-                raise InvalidOperationError(
-                    "Manager returned not-modified without a conditional request"
+        fetched = await self._fetch_inventory(
+            target, etag=None if full else snapshot.etag
+        )
+        if fetched is None and snapshot is None:  # pragma: no cover - HTTP invariant
+            raise InvalidOperationError(
+                "Manager returned not-modified without a conditional request"
+            )
+        if fetched is None:
+            revision, current_etag = snapshot.revision, snapshot.etag
+            clients = self._stored_clients(snapshot.clients)
+            remote_changed: set[str] = set()
+        else:
+            revision, current_etag = fetched.revision, fetched.etag
+            clients = {
+                client.name: _RemoteState(
+                    state=client.state,
+                    manageable=client.manageable,
+                    issues=client.issues,
                 )
+                for client in fetched.clients
+            }
+            previous = {} if full else self._stored_clients(snapshot.clients)
+            remote_changed = {
+                name
+                for name in clients.keys() | previous.keys()
+                if clients.get(name) != previous.get(name)
+            }
+
+        if full:
+            hub, watermark = await self._load_hub_configs(server_id)
+            hub_changed = set(hub)
+            findings: dict[str, VPNDriftFinding] = {}
+        else:
+            hub, watermark, hub_changed = await self._hub_changes(server_id, snapshot)
+            findings = self._stored_findings(snapshot.findings)
+
+        for name in remote_changed | hub_changed:
+            finding = self._finding_for(
+                server_id, hub.get(name), clients.get(name), name=name
+            )
+            if finding is None:
+                findings.pop(name, None)
+            else:
+                findings[name] = finding
+
+        values: dict[str, object] = {
+            "revision": revision,
+            "etag": current_etag,
+            "hub_watermark": watermark,
+        }
+        if full:
+            values["full_audit_at"] = now
+        if remote_changed:
+            values["clients"] = {
+                name: [remote.state, remote.manageable, list(remote.issues)]
+                for name, remote in clients.items()
+            }
+        if hub_changed:
+            values["hub_configs"] = {
+                name: [config.id, config.desired_state, config.actual_state]
+                for name, config in hub.items()
+            }
+        if remote_changed or hub_changed:
+            values["findings"] = {
+                name: asdict(finding) for name, finding in findings.items()
+            }
+        async with self._uow() as repos:
+            await repos["vpn_inventories"].save(server_id, **values)
+
         return VPNDriftReport(
             server_id=server_id,
-            inventory_revision=inventory.revision,
-            inventory_etag=inventory.etag,
-            unchanged=remote_unchanged,
-            findings=self._findings(server_id, configs, inventory),
+            inventory_revision=revision,
+            inventory_etag=current_etag,
+            unchanged=etag is not None and etag == current_etag,
+            findings=self._ordered(findings.values()),
         )
 
     async def repair_server(
@@ -245,9 +329,133 @@ class VPNDriftService:
             target.ip,
             target.port,
             target.api_key,
+            server_id=target.id,
         ) as gateway:
             return await gateway.get_client_inventory(etag=etag)
 
+    async def _load_audit_state(self, server_id: int):
+        if isinstance(server_id, bool) or not isinstance(server_id, int):
+            raise InvalidOperationError("VPN server ID is invalid")
+        async with self._uow() as repos:
+            server = await repos["servers"].get(id=server_id)
+            if server is None:
+                raise ServerNotFoundError(f"Server {server_id} not found")
+            snapshot = await repos["vpn_inventories"].get_for_server(server_id)
+            target = _ServerTarget(
+                id=server.id,
+                ip=server.ip,
+                port=server.port,
+                api_key=server.api_key,
+            )
+        return target, snapshot
+
+    async def _load_hub_configs(
+        self, server_id: int
+    ) -> tuple[dict[str, _HubConfigState], datetime | None]:
+        async with self._uow() as repos:
+            rows = await repos["configs"].list_drift_states(server_id)
+        return {row.name: self._hub_state(row) for row in rows}, self._watermark(
+            rows, None
+        )
+
+    async def _hub_changes(
+        self, server_id: int, snapshot
+    ) -> tuple[dict[str, _HubConfigState], datetime | None, set[str]]:
+        """Apply configs changed since the snapshot's watermark to its Hub map.
+
+        ``updated_at`` is set when a write happens but becomes visible only
+        at commit, so rows are re-read from an overlap window before the
+        watermark. New rows are always inside that window; a row count below
+        the merged map therefore means configs were deleted or moved away.
+        """
+
+        hub = {
+            name: _HubConfigState(
+                id=config_id, name=name, desired_state=desired, actual_state=actual
+            )
+            for name, (config_id, desired, actual) in snapshot.hub_configs.items()
+        }
+        previous_watermark = self._aware(snapshot.hub_watermark)
+        since = None
+        if previous_watermark is not None:
+            since = previous_watermark - timedelta(
+                seconds=settings.vpn_drift_hub_overlap_seconds
+            )
+        changed: set[str] = set()
+        async with self._uow() as repos:
+            rows = await repos["configs"].list_drift_states(
+                server_id, changed_since=since
+            )
+            for row in rows:
+                state = self._hub_state(row)
+                if hub.get(row.name) != state:
+                    hub[row.name] = state
+                    changed.add(row.name)
+            if await repos["configs"].count_for_server(server_id) != len(hub):
+                remaining = await repos["configs"].ids_for_server(server_id)
+                for name, config in list(hub.items()):
+                    if config.id not in remaining:
+                        del hub[name]
+                        changed.add(name)
+        return hub, self._watermark(rows, previous_watermark), changed
+
+    @staticmethod
+    def _hub_state(row) -> _HubConfigState:
+        return _HubConfigState(
+            id=row.id,
+            name=row.name,
+            desired_state=row.desired_state,
+            actual_state=row.actual_state,
+        )
+
+    @classmethod
+    def _watermark(cls, rows: Sequence, previous: datetime | None) -> datetime | None:
+        stamps = [cls._aware(row.updated_at) for row in rows if row.updated_at]
+        if previous is not None:
+            stamps.append(previous)
+        return max(stamps, default=None)
+
+    @staticmethod
+    def _stored_clients(value: Mapping[str, list]) -> dict[str, _RemoteState]:
+        return {
+            name: _RemoteState(state=state, manageable=manageable, issues=tuple(issues))
+            for name, (state, manageable, issues) in value.items()
+        }
+
+    @staticmethod
+    def _stored_findings(value: Mapping[str, dict]) -> dict[str, VPNDriftFinding]:
+        return {
+            name: VPNDriftFinding(**{**item, "details": tuple(item["details"])})
+            for name, item in value.items()
+        }
+
+    @staticmethod
+    def _ordered(findings) -> tuple[VPNDriftFinding, ...]:
+        """Hub configs by ID first, then Manager-only clients by name."""
+
+        return tuple(
+            sorted(
+                findings,
+                key=lambda item: (
+                    item.config_id is None,
+                    item.config_id or 0,
+                    item.name,
+                ),
+            )
+        )
+
+    def _now(self) -> datetime:
+        value = self._clock()
+        return cast(datetime, self._aware(value))
+
+    @staticmethod
+    def _aware(value: datetime | None) -> datetime | None:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
     @classmethod
     def _findings(
         cls,
@@ -264,37 +472,59 @@ class VPNDriftService:
                 findings.append(finding)
 
         for name in sorted(remote_by_name):
-            remote = remote_by_name[name]
-            if remote.state in {"active", "suspended"}:
-                reason: DriftReason = "remote_only_live"
-                severity: DriftSeverity = "critical"
-            elif remote.state in {"revoked", "expired"}:
-                reason = "remote_only_inert"
-                severity = "info"
-            else:
-                reason = "remote_only_inconsistent"
-                severity = "warning"
             findings.append(
-                VPNDriftFinding(
-                    server_id=server_id,
-                    config_id=None,
-                    name=name,
-                    reason=reason,
-                    severity=severity,
-                    desired_state=None,
-                    hub_actual_state=None,
-                    manager_state=remote.state,
-                    repairable=False,
-                    details=remote.issues,
-                )
+                cls._remote_only_finding(server_id, name, remote_by_name[name])
             )
         return tuple(findings)
 
+    @classmethod
+    def _finding_for(
+        cls,
+        server_id: int,
+        config: _HubConfigState | None,
+        remote: _RemoteState | None,
+        *,
+        name: str,
+    ) -> VPNDriftFinding | None:
+        if config is not None:
+            return cls._config_finding(server_id, config, remote)
+        if remote is not None:
+            return cls._remote_only_finding(server_id, name, remote)
+        return None
+
+    @staticmethod
+    def _remote_only_finding(
+        server_id: int,
+        name: str,
+        remote: ManagerClientState | _RemoteState,
+    ) -> VPNDriftFinding:
+        if remote.state in {"active", "suspended"}:
+            reason: DriftReason = "remote_only_live"
+            severity: DriftSeverity = "critical"
+        elif remote.state in {"revoked", "expired"}:
+            reason = "remote_only_inert"
+            severity = "info"
+        else:
+            reason = "remote_only_inconsistent"
+            severity = "warning"
+        return VPNDriftFinding(
+            server_id=server_id,
+            config_id=None,
+            name=name,
+            reason=reason,
+            severity=severity,
+            desired_state=None,
+            hub_actual_state=None,
+            manager_state=remote.state,
+            repairable=False,
+            details=remote.issues,
+        )
+
     @staticmethod
     def _config_finding(
         server_id: int,
         config: _HubConfigState,
-        remote: ManagerClientState | None,
+        remote: ManagerClientState | _RemoteState | None,
     ) -> VPNDriftFinding | None:
         common = {
             "server_id": server_id,
@@ -0,0 +1,94 @@
+"""Compare the per-user and set-based periodic charging engines.
+
+Each measurement seeds a fresh schema with ``N`` users owning one or two
+active configs and times one ``BillingRepo.charge_period`` transaction. Use a
+disposable database: the schema is dropped and recreated for every run.
+
+    python scripts/benchmark_billing.py --database-url postgresql+asyncpg://... \
+        --users 10000 100000
+"""
+
+import os
+import sys
+
+# Add the root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from core.db.repo.billing import BillingRepo
+from scripts.benchmark_support import (
+    PERIOD_START,
+    benchmark_database_url,
+    disposable_database,
+    seed_users,
+)
+
+
+async def _measure(database_url: str, users: int, *, bulk: bool) -> dict:
+    async with disposable_database(database_url) as (_engine, maker):
+        await seed_users(
+            maker,
+            users,
+            balance=lambda index: Decimal(index % 200),
+            configs=lambda index: 1 + index % 2,
+        )
+
+        started = time.perf_counter()
+        async with maker() as session, session.begin():
+            charged = await BillingRepo(session).charge_period(
+                period_key=f"benchmark:{users}",
+                period_start=PERIOD_START,
+                period_end=PERIOD_START + timedelta(hours=1),
+                cost_per_config="1.00",
+                bulk=bulk,
+            )
+        elapsed = time.perf_counter() - started
+        return {
+            "engine": "bulk" if bulk else "per_user",
+            "users": users,
+            "charged": len(charged),
+            "seconds": round(elapsed, 3),
+            "users_per_second": round(len(charged) / elapsed, 1),
+        }
+
+
+async def run(database_url: str, sizes: list[int], engines: list[str]) -> None:
+    for users in sizes:
+        for engine_name in engines:
+            result = await _measure(database_url, users, bulk=engine_name == "bulk")
+            print(json.dumps(result), flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("POSTGRES_TEST_URL"),
+        help="Disposable database URL; defaults to POSTGRES_TEST_URL or SQLite.",
+    )
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument(
+        "--engine",
+        choices=("per_user", "bulk"),
+        action="append",
+        help="Engine to measure; repeat to compare (default: both).",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(
+            benchmark_database_url(args.database_url),
+            args.users,
+            args.engine or ["per_user", "bulk"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""Benchmark the billing and ledger hot paths on synthetic data.
+
+Seeds a disposable database with ``--users`` accounts, their active configs,
+ledger history and captured provider payments, then drives each scenario with
+``--concurrency`` workers. Every scenario reports throughput, p50/p99 latency
+and SQL statements per operation in one JSON document; pass an earlier
+document as ``--baseline`` to add ratios against another commit. Use a
+disposable database: the schema is dropped and recreated for every run.
+
+    python scripts/benchmark_hot_paths.py --database-url postgresql+asyncpg://... \
+        --users 100000 --concurrency 32 --output before.json
+    python scripts/benchmark_hot_paths.py --database-url postgresql+asyncpg://... \
+        --users 100000 --concurrency 32 --baseline before.json
+"""
+
+import os
+import sys
+
+# Add the root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from functools import partial
+from uuid import uuid4
+
+from sqlalchemy import event, func, insert, select
+
+from core.db.models import LedgerEntry, LedgerKind, ProviderPayment
+from core.db.repo.billing import BillingRepo
+from core.db.unit_of_work import uow
+from core.services.accounting import AccountingService
+from scripts.benchmark_support import (
+    PERIOD_START,
+    SEED_BATCH_SIZE,
+    benchmark_database_url,
+    disposable_database,
+    seed_users,
+)
+
+SCENARIOS = (
+    "charge_period",
+    "apply_balance_change",
+    "record_provider_payment",
+    "list_balance_history",
+)
+
+_statements: ContextVar[list[int] | None] = ContextVar("statements", default=None)
+
+
+def _count_statement(*_args) -> None:
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+async def _seed(maker, args) -> list[int]:
+    """Create the synthetic tenant and return the seeded user IDs."""
+
+    rng = random.Random(args.seed)
+
+    async def ledger_history(session, ids: list[int]) -> None:
+        if not args.ledger_entries_per_user:
+            return
+        await session.execute(
+            insert(LedgerEntry),
+            [
+                {
+                    "user_id": user_id,
+                    "amount": Decimal("-1.00"),
+                    "balance_after": Decimal("0.00"),
+                    "kind": LedgerKind.PERIODIC_CHARGE.value,
+                    "idempotency_key": f"benchmark:seed:{user_id}:{entry}",
+                    "details": {},
+                }
+                for user_id in ids
+                for entry in range(args.ledger_entries_per_user)
+            ],
+        )
+
+    user_ids = await seed_users(
+        maker,
+        args.users,
+        balance=lambda _index: Decimal(rng.randint(0, 50_000)) / 100,
+        configs=lambda _index: args.configs_per_user,
+        each_batch=ledger_history,
+    )
+
+    for offset in range(0, args.payments, SEED_BATCH_SIZE):
+        count = min(SEED_BATCH_SIZE, args.payments - offset)
+        owners = [rng.choice(user_ids) for _ in range(count)]
+        intents = [str(uuid4()) for _ in range(count)]
+        async with maker() as session, session.begin():
+            entry_ids = (
+                await session.scalars(
+                    insert(LedgerEntry).returning(
+                        LedgerEntry.id, sort_by_parameter_order=True
+                    ),
+                    [
+                        {
+                            "user_id": user_id,
+                            "amount": Decimal("100.00"),
+                            "balance_after": Decimal("100.00"),
+                            "kind": LedgerKind.PROVIDER_PAYMENT.value,
+                            "idempotency_key": f"provider-payment:telegram:{intent}",
+                            "details": {},
+                        }
+                        for user_id, intent in zip(owners, intents, strict=True)
+                    ],
+                )
+            ).all()
+            await session.execute(
+                insert(ProviderPayment),
+                [
+                    {
+                        "intent_id": intent,
+                        "user_id": user_id,
+                        "provider": "telegram",
+                        "provider_payment_id": f"benchmark-{intent}",
+                        "amount": Decimal("100.00"),
+                        "currency": "RUB",
+                        "payload": f"topup:{intent}",
+                        "status": "credited",
+                        "ledger_entry_id": entry_id,
+                        "credited_at": PERIOD_START,
+                    }
+                    for user_id, intent, entry_id in zip(
+                        owners, intents, entry_ids, strict=True
+                    )
+                ],
+            )
+    return user_ids
+
+
+async def _drive(operation, *, operations: int, concurrency: int) -> dict:
+    """Run ``operation(index)`` ``operations`` times on ``concurrency`` workers."""
+
+    latencies: list[float] = []
+    statements: list[int] = []
+    errors = 0
+    pending = iter(range(operations))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in pending:
+            counter = [0]
+            token = _statements.set(counter)
+            started = time.perf_counter()
+            try:
+                await operation(index)
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+                statements.append(counter[0])
+            finally:
+                _statements.reset(token)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summary(latencies, statements, errors, time.perf_counter() - started)
+
+
+def _summary(
+    latencies: list[float], statements: list[int], errors: int, elapsed: float
+) -> dict:
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p99 = cuts[49], cuts[98]
+    else:
+        p50 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "operations": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "latency_ms": {
+            "p50": round(p50 * 1000, 3),
+            "p99": round(p99 * 1000, 3),
+            "max": round(max(latencies, default=0) * 1000, 3),
+        },
+        "queries_per_operation": {
+            "mean": round(statistics.fmean(statements), 2) if statements else 0,
+            "max": max(statements, default=0),
+        },
+    }
+
+
+async def _scenario(name: str, maker, user_ids: list[int], args) -> dict:
+    rng = random.Random(f"{args.seed}:{name}")
+    run_id = uuid4().hex[:12]
+
+    if name == "charge_period":
+
+        async def operation(index: int) -> None:
+            start = PERIOD_START + timedelta(hours=index)
+            async with maker() as session, session.begin():
+                await BillingRepo(session).charge_period(
+                    period_key=f"benchmark:{run_id}:{index}",
+                    period_start=start,
+                    period_end=start + timedelta(hours=1),
+                    cost_per_config="1.00",
+                    bulk=args.charge_engine == "bulk",
+                )
+
+        # Periods are claimed one at a time, so they never overlap.
+        return await _drive(operation, operations=args.charge_runs, concurrency=1)
+
+    if name == "apply_balance_change":
+
+        async def operation(index: int) -> None:
+            async with maker() as session, session.begin():
+                await BillingRepo(session).apply_balance_change(
+                    user_id=rng.choice(user_ids),
+                    amount="1.00",
+                    kind=LedgerKind.MANUAL_TOP_UP,
+                    idempotency_key=f"benchmark:{run_id}:top-up:{index}",
+                    allow_negative_balance=False,
+                )
+
+    elif name == "record_provider_payment":
+        intents: list[tuple[int, str]] = []
+        async with maker() as session, session.begin():
+            repo = BillingRepo(session)
+            for _ in range(args.operations):
+                user_id = rng.choice(user_ids)
+                payment = await repo.create_payment_intent(
+                    user_id=user_id,
+                    provider="telegram",
+                    amount="100.00",
+                    currency="RUB",
+                )
+                intents.append((user_id, payment.intent_id))
+
+        async def operation(index: int) -> None:
+            user_id, intent_id = intents[index]
+            async with maker() as session, session.begin():
+                await BillingRepo(session).record_provider_payment(
+                    user_id=user_id,
+                    provider="telegram",
+                    provider_payment_id=f"benchmark:{run_id}:{index}",
+                    amount="100.00",
+                    currency="RUB",
+                    payload=f"topup:{intent_id}",
+                    intent_id=intent_id,
+                )
+
+    elif name == "list_balance_history":
+        accounting = AccountingService(partial(uow, maker))
+
+        async def operation(index: int) -> None:
+            await accounting.list_balance_history(
+                rng.choice(user_ids), limit=8, offset=rng.choice((0, 0, 8, 40))
+            )
+
+    else:
+        raise ValueError(f"Unknown scenario {name}")
+
+    return await _drive(
+        operation, operations=args.operations, concurrency=args.concurrency
+    )
+
+
+def _compare(result: dict, baseline: dict) -> dict:
+    """Return current/baseline ratios; above 1.0 is faster for throughput."""
+
+    ratios = {}
+    for name, current in result["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+
+        def ratio(current_value, previous_value):
+            if not previous_value:
+                return None
+            return round(current_value / previous_value, 3)
+
+        ratios[name] = {
+            "throughput": ratio(
+                current["throughput_per_second"], previous["throughput_per_second"]
+            ),
+            "p50": ratio(current["latency_ms"]["p50"], previous["latency_ms"]["p50"]),
+            "p99": ratio(current["latency_ms"]["p99"], previous["latency_ms"]["p99"]),
+            "queries": ratio(
+                current["queries_per_operation"]["mean"],
+                previous["queries_per_operation"]["mean"],
+            ),
+        }
+    return {"commit": baseline.get("meta", {}).get("commit"), "ratios": ratios}
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(database_url: str, args) -> dict:
+    options = {}
+    if database_url.startswith("sqlite"):
+        # SQLite serializes writers; wait instead of failing under concurrency.
+        options["connect_args"] = {"timeout": 60}
+    else:
+        options.update(pool_size=args.concurrency, max_overflow=0)
+    async with disposable_database(database_url, **options) as (engine, maker):
+        event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+        seeded = time.perf_counter()
+        user_ids = await _seed(maker, args)
+        seed_seconds = time.perf_counter() - seeded
+        async with maker() as session:
+            ledger_rows = await session.scalar(select(func.count(LedgerEntry.id)))
+
+        result = {
+            "meta": {
+                "commit": _commit(),
+                "dialect": engine.dialect.name,
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "users": args.users,
+                "configs_per_user": args.configs_per_user,
+                "ledger_entries": ledger_rows,
+                "payments": args.payments,
+                "concurrency": args.concurrency,
+                "operations": args.operations,
+                "charge_engine": args.charge_engine,
+                "seed_seconds": round(seed_seconds, 3),
+            },
+            "scenarios": {},
+        }
+        for name in args.scenario or SCENARIOS:
+            result["scenarios"][name] = await _scenario(name, maker, user_ids, args)
+            print(
+                json.dumps({"scenario": name, **result["scenarios"][name]}),
+                file=sys.stderr,
+                flush=True,
+            )
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("POSTGRES_TEST_URL"),
+        help="Disposable database URL; defaults to POSTGRES_TEST_URL or SQLite.",
+    )
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--configs-per-user", type=int, default=1)
+    parser.add_argument("--ledger-entries-per-user", type=int, default=20)
+    parser.add_argument("--payments", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--operations",
+        type=int,
+        default=2_000,
+        help="Operations per concurrent scenario.",
+    )
+    parser.add_argument(
+        "--charge-runs",
+        type=int,
+        default=3,
+        help="Consecutive billing periods charged by the charge_period scenario.",
+    )
+    parser.add_argument("--charge-engine", choices=("per_user", "bulk"), default="bulk")
+    parser.add_argument(
+        "--scenario",
+        choices=SCENARIOS,
+        action="append",
+        help="Scenario to run; repeat to select several (default: all).",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare with.")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(benchmark_database_url(args.database_url), args))
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            result["baseline"] = _compare(result, json.load(handle))
+
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report, flush=True)
+
+
+if __name__ == "__main__":
+    main()
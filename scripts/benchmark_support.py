@@ -0,0 +1,119 @@
+"""Disposable database and synthetic tenant shared by the benchmark scripts."""
+
+import os
+import tempfile
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+import core.db.models  # noqa
+from core.db import Base
+from core.db.models import Server, User, VPN_Config
+
+SEED_BATCH_SIZE = 5_000
+PERIOD_START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def benchmark_database_url(database_url: str | None) -> str:
+    """Return ``database_url``, or a fresh SQLite file when none was given."""
+
+    if database_url:
+        return database_url
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3")
+    return f"sqlite+aiosqlite:///{path}"
+
+
+@asynccontextmanager
+async def disposable_database(
+    database_url: str, **engine_options
+) -> AsyncIterator[tuple[AsyncEngine, async_sessionmaker]]:
+    """Yield an engine and session factory on a freshly recreated schema.
+
+    The schema is dropped again on exit, so only point this at a database
+    that holds nothing worth keeping.
+    """
+
+    engine = create_async_engine(database_url, echo=False, **engine_options)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+        yield engine, async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+async def seed_users(
+    maker: async_sessionmaker,
+    users: int,
+    *,
+    balance: Callable[[int], Decimal],
+    configs: Callable[[int], int],
+    each_batch: Callable[[AsyncSession, list[int]], Awaitable[None]] | None = None,
+) -> list[int]:
+    """Insert one server and ``users`` accounts with their active configs.
+
+    ``balance`` and ``configs`` map the zero-based account index to its
+    balance and active config count. ``each_batch`` may add further rows for
+    every batch of new user IDs inside the batch's transaction. Returns the
+    user IDs in insertion order.
+    """
+
+    async with maker() as session, session.begin():
+        server = Server(
+            name="benchmark",
+            ip="127.0.0.1",
+            port=8080,
+            host="vpn.benchmark",
+            monthly_cost=Decimal("0.00"),
+            location="benchmark",
+            api_key="benchmark",
+        )
+        session.add(server)
+        await session.flush()
+        server_id = server.id
+
+    user_ids: list[int] = []
+    for offset in range(0, users, SEED_BATCH_SIZE):
+        batch = range(offset, min(offset + SEED_BATCH_SIZE, users))
+        async with maker() as session, session.begin():
+            ids = (
+                await session.scalars(
+                    insert(User).returning(User.id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "tg_id": 10_000_000 + index,
+                            "referral_code": f"benchmark-{index}",
+                            "balance": balance(index),
+                        }
+                        for index in batch
+                    ],
+                )
+            ).all()
+            rows = [
+                {
+                    "name": f"benchmark-{user_id}-{slot}",
+                    "server_id": server_id,
+                    "owner_id": user_id,
+                    "display_name": "Benchmark",
+                }
+                for index, user_id in zip(batch, ids, strict=True)
+                for slot in range(configs(index))
+            ]
+            if rows:
+                await session.execute(insert(VPN_Config), rows)
+            if each_batch is not None:
+                await each_batch(session, list(ids))
+        user_ids.extend(ids)
+    return user_ids
@@ -0,0 +1,374 @@
+"""In-memory OpenVPN Manager for local load and failure testing.
+
+Speaks the Manager API the Hub uses: ``GET /status`` with inventory counts
+and capabilities, ``GET /clients`` with ETag/If-None-Match, per-client state,
+config download, create, suspend, unsuspend, revoke, the blocked list and the
+bulk mutation routes. Mutations replay their first response for a repeated
+``Idempotency-Key``. Every request can be delayed and can fail with an
+injected 503 or 429 (with ``Retry-After``) at a configurable rate, mutations
+of chosen clients can always fail with 503, and the inventory can be
+pre-seeded with any number of clients.
+
+Run one on a port and point a test server at it:
+
+    python scripts/fake_manager.py --port 8080 --api-key secret \
+        --clients 50000 --latency-ms 20 --error-rate 0.01 --throttle-rate 0.02
+
+``scripts/load_manager_fleet.py`` starts many of them in-process.
+"""
+
+import os
+import sys
+
+# Add the root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+MANAGER_VERSION = "1.3.0"
+BULK_ACTIONS = ("suspend", "unsuspend", "revoke")
+
+
+@dataclass(frozen=True, slots=True)
+class FakeManagerOptions:
+    api_key: str = "secret"
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after_seconds: int = 1
+    config_bytes: int = 4096
+    bulk: bool = True
+    unavailable_clients: frozenset[str] = frozenset()
+    seed: int | str | None = None
+
+
+@dataclass(slots=True)
+class _Client:
+    name: str
+    state: str = "active"
+
+    def payload(self) -> dict:
+        revoked = self.state == "revoked"
+        return {
+            "name": self.name,
+            "state": self.state,
+            "certificate_status": "revoked" if revoked else "valid",
+            "index_statuses": ["R"] if revoked else ["V"],
+            "suspended": self.state == "suspended",
+            "config_present": not revoked,
+            "config_complete": not revoked,
+            "certificate_present": True,
+            "private_key_present": not revoked,
+            "manageable": True,
+            "issues": [],
+        }
+
+
+class FakeManager:
+    """One fake Manager node; ``app`` is the ASGI application serving it."""
+
+    def __init__(
+        self,
+        options: FakeManagerOptions | None = None,
+        *,
+        clients: Iterable[str] = (),
+    ) -> None:
+        self.options = options or FakeManagerOptions()
+        self.instance_id = str(uuid.uuid4())
+        self.clients = {name: _Client(name) for name in clients}
+        self.requests: Counter[str] = Counter()
+        self.injected: Counter[str] = Counter()
+        self._random = random.Random(self.options.seed)
+        self._version = 0
+        self._inventory_cache: tuple[int, bytes] | None = None
+        self._idempotent: dict[str, tuple[int, dict]] = {}
+        self.app = Starlette(
+            routes=[
+                Route("/status", self._status, methods=["GET"]),
+                Route("/clients", self._inventory, methods=["GET"]),
+                Route("/clients", self._create, methods=["POST"]),
+                Route("/clients/blocked", self._blocked, methods=["GET"]),
+                Route("/clients/bulk/{action}", self._bulk, methods=["POST"]),
+                Route("/clients/{name}/state", self._state, methods=["GET"]),
+                Route("/clients/{name}/config", self._config, methods=["GET"]),
+                Route("/clients/{name}/suspend", self._mutate, methods=["POST"]),
+                Route("/clients/{name}/unsuspend", self._mutate, methods=["POST"]),
+                Route("/clients/{name}", self._mutate, methods=["DELETE"]),
+            ],
+        )
+        self.app.add_middleware(_FaultMiddleware, manager=self)
+
+    @property
+    def revision(self) -> str:
+        return f"fake-{self.instance_id[:8]}-{self._version}"
+
+    def counts(self) -> dict[str, int]:
+        states = Counter(client.state for client in self.clients.values())
+        counts = {
+            state: states.get(state, 0)
+            for state in (
+                "active",
+                "suspended",
+                "revoked",
+                "expired",
+                "incomplete",
+                "orphaned",
+                "unknown",
+            )
+        }
+        return {"total": len(self.clients), **counts}
+
+    def _apply(self, action: str, name: str) -> int:
+        if name in self.options.unavailable_clients:
+            return 503
+        client = self.clients.get(name)
+        if client is None or client.state == "revoked":
+            return 404
+        client.state = {
+            "suspend": "suspended",
+            "unsuspend": "active",
+            "revoke": "revoked",
+        }[action]
+        self._version += 1
+        return 200
+
+    async def _status(self, request: Request) -> Response:
+        now = datetime.now(timezone.utc)
+        expires = {
+            "status": "valid",
+            "expires_at": (now + timedelta(days=365)).isoformat(),
+            "remaining_seconds": 365 * 86400,
+        }
+        counts = self.counts()
+        return JSONResponse(
+            {
+                "manager_version": MANAGER_VERSION,
+                "instance_id": self.instance_id,
+                "observed_at": now.isoformat(),
+                "readiness": {"ready": True, "errors": []},
+                "inventory": {
+                    "availability": "available",
+                    "revision": self.revision,
+                    "collected_at": now.isoformat(),
+                    "age_seconds": 0,
+                    "counts": counts,
+                },
+                "data_plane": {
+                    "status": "up",
+                    "online_sessions": counts["active"],
+                    "bytes_received": 0,
+                    "bytes_sent": 0,
+                    "status_file_age_seconds": 0,
+                },
+                "pki": {"server_certificate": expires, "crl": expires},
+                "capabilities": ["bulk_mutations"] if self.options.bulk else [],
+            }
+        )
+
+    async def _inventory(self, request: Request) -> Response:
+        etag = f'"{self.revision}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        # Large inventories are rendered once per revision, as a real
+        # Manager serving from its collected snapshot would.
+        if self._inventory_cache is None or self._inventory_cache[0] != self._version:
+            clients = [client.payload() for client in self.clients.values()]
+            body = json.dumps(
+                {"revision": self.revision, "count": len(clients), "clients": clients}
+            ).encode()
+            self._inventory_cache = (self._version, body)
+        return Response(
+            self._inventory_cache[1],
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
+
+    async def _create(self, request: Request) -> Response:
+        name = (await request.json()).get("name")
+        if not isinstance(name, str) or not name:
+            return JSONResponse({"detail": "name is required"}, status_code=422)
+        client = self.clients.get(name)
+        if client is not None and client.state != "revoked":
+            return JSONResponse({"detail": "client exists"}, status_code=409)
+        self.clients[name] = _Client(name)
+        self._version += 1
+        return JSONResponse({"config_path": f"/etc/openvpn/clients/{name}.ovpn"})
+
+    async def _blocked(self, request: Request) -> Response:
+        blocked = [
+            client.name
+            for client in self.clients.values()
+            if client.state == "suspended"
+        ]
+        return JSONResponse({"blocked_clients": blocked})
+
+    async def _bulk(self, request: Request) -> Response:
+        action = request.path_params["action"]
+        if not self.options.bulk or action not in BULK_ACTIONS:
+            return JSONResponse({"detail": "Not Found"}, status_code=404)
+        names = (await request.json()).get("clients", [])
+        results = [
+            {"name": name, "status_code": self._apply(action, name)} for name in names
+        ]
+        return JSONResponse({"results": results})
+
+    async def _state(self, request: Request) -> Response:
+        client = self.clients.get(request.path_params["name"])
+        if client is None:
+            return JSONResponse({"detail": "Not Found"}, status_code=404)
+        return JSONResponse(client.payload())
+
+    async def _config(self, request: Request) -> Response:
+        client = self.clients.get(request.path_params["name"])
+        if client is None or client.state == "revoked":
+            return JSONResponse({"detail": "Not Found"}, status_code=404)
+        header = f"# fake profile for {client.name}\nclient\n".encode()
+        padding = b"#" * max(0, self.options.config_bytes - len(header) - 1)
+        return Response(header + padding + b"\n", media_type="application/x-openvpn")
+
+    async def _mutate(self, request: Request) -> Response:
+        if request.method == "DELETE":
+            action = "revoke"
+        else:
+            action = request.url.path.rsplit("/", 1)[1]
+        status_code = self._apply(action, request.path_params["name"])
+        return JSONResponse({}, status_code=status_code)
+
+
+class _FaultMiddleware:
+    """Authenticate, delay, inject failures and replay idempotent mutations."""
+
+    def __init__(self, app, *, manager: FakeManager) -> None:
+        self.app = app
+        self.manager = manager
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        manager, options = self.manager, self.manager.options
+        request = Request(scope)
+        manager.requests[f"{request.method} {_route(request.url.path)}"] += 1
+        delay = options.latency_ms + manager._random.uniform(
+            0, options.latency_jitter_ms
+        )
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        response: Response | None = None
+        if request.headers.get("x-api-key") != options.api_key:
+            response = JSONResponse({"detail": "Unauthorized"}, status_code=401)
+        elif manager._random.random() < options.throttle_rate:
+            manager.injected["throttled"] += 1
+            response = JSONResponse(
+                {"detail": "Too Many Requests"},
+                status_code=429,
+                headers={"Retry-After": str(options.retry_after_seconds)},
+            )
+        elif manager._random.random() < options.error_rate:
+            manager.injected["failed"] += 1
+            response = JSONResponse({"detail": "Unavailable"}, status_code=503)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        key = request.headers.get("idempotency-key")
+        if key is None or request.method == "GET":
+            await self.app(scope, receive, send)
+            return
+        replay = manager._idempotent.get(key)
+        if replay is not None:
+            manager.injected["replayed"] += 1
+            await JSONResponse(replay[1], status_code=replay[0])(scope, receive, send)
+            return
+
+        captured: dict = {"status": 500, "body": b""}
+
+        async def capture(message) -> None:
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                captured["body"] += message.get("body", b"")
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        if captured["status"] < 500:
+            manager._idempotent[key] = (
+                captured["status"],
+                json.loads(captured["body"] or b"{}"),
+            )
+
+
+def _route(path: str) -> str:
+    """Collapse client names so request counters stay bounded."""
+
+    parts = path.rstrip("/").split("/")
+    if (
+        len(parts) >= 3
+        and parts[1] == "clients"
+        and parts[2]
+        not in (
+            "blocked",
+            "bulk",
+        )
+    ):
+        parts[2] = "{name}"
+    return "/".join(parts) or "/"
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--api-key", default="secret")
+    parser.add_argument(
+        "--clients", type=int, default=0, help="pre-seeded active clients"
+    )
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 ratio")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 ratio")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--config-bytes", type=int, default=4096)
+    parser.add_argument("--no-bulk", action="store_true")
+    parser.add_argument("--seed", default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    import uvicorn
+
+    args = _parse_args(argv)
+    manager = FakeManager(
+        FakeManagerOptions(
+            api_key=args.api_key,
+            latency_ms=args.latency_ms,
+            latency_jitter_ms=args.latency_jitter_ms,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            retry_after_seconds=args.retry_after,
+            config_bytes=args.config_bytes,
+            bulk=not args.no_bulk,
+            seed=args.seed,
+        ),
+        clients=(f"fake-{index}" for index in range(args.clients)),
+    )
+    uvicorn.run(manager.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+"""Drive the Manager-facing control plane against a fleet of fake Managers.
+
+Starts ``--servers`` in-process fake Managers (``scripts/fake_manager.py``) on
+loopback ports, seeds a disposable database with one server row per fake and
+``--clients-per-server`` configs that each have a due suspend operation, then
+runs the selected scenarios over real HTTP:
+
+* ``reconcile`` pages the durable operation queue with
+  ``ConfigService.reconcile`` until it drains or ``--drain-seconds`` elapse;
+* ``drift`` audits every server ``--rounds`` times with
+  ``VPNDriftService.audit_server``, reusing each inventory ETag;
+* ``poller`` runs ``AdminFleetService.poll_server_statuses`` ``--rounds`` times.
+
+Each scenario reports throughput, p50/p95/p99/p99.9 latency of its own unit of
+work and of the individual Manager requests (retries and throttling
+included), plus the faults the fakes injected. Use a disposable database: the
+schema is dropped and recreated for every run.
+
+    python scripts/load_manager_fleet.py --servers 20 --clients-per-server 5000 \
+        --latency-ms 15 --latency-jitter-ms 60 --error-rate 0.01 \
+        --throttle-rate 0.02 --output fleet.json
+"""
+
+import os
+import sys
+
+# Add the root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from decimal import Decimal
+from functools import partial
+
+import uvicorn
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import core.db as db
+import core.db.models  # noqa
+import core.services.api_gateway as api_gateway
+from admin.fleet_service import AdminFleetService
+from core.config import settings
+from core.db import Base
+from core.db.models import Server, User, VPN_Config, VPNOperation
+from core.db.models.config import shift_managed_config_counts
+from core.db.unit_of_work import uow
+from core.domain import VPNOperationKind, VPNOperationStatus, VPNState
+from core.services import ConfigService
+from core.services.vpn_drift import VPNDriftService
+from scripts.fake_manager import FakeManager, FakeManagerOptions
+
+SCENARIOS = ("reconcile", "drift", "poller")
+SEED_BATCH_SIZE = 5_000
+API_KEY = "load-test"
+_UNSETTLED = (
+    VPNOperationStatus.PENDING.value,
+    VPNOperationStatus.RUNNING.value,
+    VPNOperationStatus.FAILED.value,
+)
+
+_manager_requests: list[tuple[str, float]] | None = None
+
+
+def _record_manager_request(original, **fields) -> None:
+    if _manager_requests is not None:
+        _manager_requests.append((fields["outcome"], fields["duration_seconds"]))
+    original(**fields)
+
+
+async def _start_fleet(args) -> tuple[list[tuple[FakeManager, int]], list]:
+    """Serve one fake Manager per server on an ephemeral loopback port."""
+
+    fleet, servers = [], []
+    for index in range(args.servers):
+        manager = FakeManager(
+            FakeManagerOptions(
+                api_key=API_KEY,
+                latency_ms=args.latency_ms,
+                latency_jitter_ms=args.latency_jitter_ms,
+                error_rate=args.error_rate,
+                throttle_rate=args.throttle_rate,
+                retry_after_seconds=args.retry_after,
+                seed=f"{args.seed}:{index}",
+            ),
+            clients=[
+                *(_config_name(index, slot) for slot in range(args.clients_per_server)),
+                *(f"load-{index}-remote-{slot}" for slot in range(args.remote_only)),
+            ],
+        )
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(
+            uvicorn.Config(
+                manager.app, log_level="warning", lifespan="off", access_log=False
+            )
+        )
+        task = asyncio.create_task(server.serve(sockets=[sock]))
+        fleet.append((manager, sock.getsockname()[1]))
+        servers.append((server, task))
+    while not all(server.started for server, _ in servers):
+        await asyncio.sleep(0.01)
+    return fleet, servers
+
+
+async def _stop_fleet(servers: list) -> None:
+    for server, _ in servers:
+        server.should_exit = True
+    await asyncio.gather(*(task for _, task in servers), return_exceptions=True)
+
+
+def _config_name(server_index: int, slot: int) -> str:
+    return f"load-{server_index}-{slot}"
+
+
+async def _seed(maker, fleet, args) -> list[int]:
+    """Create one ready server per fake and the suspend backlog; return IDs."""
+
+    now = datetime.now(timezone.utc)
+    async with maker() as session, session.begin():
+        user = User(tg_id=20_000_000, referral_code="load-fleet")
+        session.add(user)
+        rows = [
+            Server(
+                name=f"load-{index}",
+                ip="127.0.0.1",
+                port=port,
+                host=f"vpn{index}.load.test",
+                monthly_cost=Decimal("0.00"),
+                location="load",
+                api_key=API_KEY,
+                manager_instance_id=manager.instance_id,
+            )
+            for index, (manager, port) in enumerate(fleet)
+        ]
+        session.add_all(rows)
+        await session.flush()
+        user_id, server_ids = user.id, [row.id for row in rows]
+
+    for index, server_id in enumerate(server_ids):
+        for offset in range(0, args.clients_per_server, SEED_BATCH_SIZE):
+            slots = range(
+                offset, min(offset + SEED_BATCH_SIZE, args.clients_per_server)
+            )
+            async with maker() as session, session.begin():
+                operations = {
+                    slot: f"00000000-0000-4000-8000-{index:04d}{slot:08d}"
+                    for slot in slots
+                }
+                config_ids = (
+                    await session.scalars(
+                        insert(VPN_Config).returning(
+                            VPN_Config.id, sort_by_parameter_order=True
+                        ),
+                        [
+                            {
+                                "name": _config_name(index, slot),
+                                "server_id": server_id,
+                                "owner_id": user_id,
+                                "display_name": "Load",
+                                "desired_state": VPNState.SUSPENDED.value,
+                                "actual_state": VPNState.ACTIVE.value,
+                                "operation_id": operations[slot],
+                            }
+                            for slot in slots
+                        ],
+                    )
+                ).all()
+                await session.execute(
+                    insert(VPNOperation),
+                    [
+                        {
+                            "operation_id": operations[slot],
+                            "config_id": config_id,
+                            "config_name": _config_name(index, slot),
+                            "server_id": server_id,
+                            "owner_id": user_id,
+                            "kind": VPNOperationKind.SUSPEND.value,
+                            "payload": {},
+                            "next_attempt_at": now,
+                        }
+                        for slot, config_id in zip(slots, config_ids, strict=True)
+                    ],
+                )
+                # Bulk inserts bypass the ORM flush that maintains the counter.
+                await session.run_sync(
+                    shift_managed_config_counts, {server_id: len(config_ids)}
+                )
+    return server_ids
+
+
+def _percentiles(samples: list[float]) -> dict:
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=1000, method="inclusive")
+        p50, p95, p99, p999 = cuts[499], cuts[949], cuts[989], cuts[998]
+    else:
+        p50 = p95 = p99 = p999 = samples[0] if samples else 0.0
+    return {
+        "p50": round(p50 * 1000, 3),
+        "p95": round(p95 * 1000, 3),
+        "p99": round(p99 * 1000, 3),
+        "p99.9": round(p999 * 1000, 3),
+        "max": round(max(samples, default=0) * 1000, 3),
+    }
+
+
+async def _scenario(name: str, maker, server_ids: list[int], args) -> dict:
+    """Run one scenario; return its units of work, latencies and errors."""
+
+    latencies: list[float] = []
+    outcomes: Counter[str] = Counter()
+
+    async def timed(unit) -> object:
+        started = time.perf_counter()
+        try:
+            result = await unit()
+        except Exception as exc:
+            outcomes[f"error:{type(exc).__name__}"] += 1
+            return None
+        latencies.append(time.perf_counter() - started)
+        return result
+
+    if name == "reconcile":
+        service = ConfigService(partial(uow, maker))
+        deadline = time.monotonic() + args.drain_seconds
+        while True:
+            page = await timed(
+                lambda: service.reconcile(
+                    limit=args.page_size,
+                    concurrency=args.concurrency,
+                    per_server_concurrency=args.per_server_concurrency,
+                )
+            )
+            for status in (page or {}).values():
+                outcomes[status.split(":", 1)[0]] += 1
+            if page:
+                continue
+            async with maker() as session:
+                unsettled = await session.scalar(
+                    select(func.count(VPNOperation.id)).where(
+                        VPNOperation.status.in_(_UNSETTLED)
+                    )
+                )
+            if not unsettled or time.monotonic() >= deadline:
+                outcomes["unsettled"] = unsettled or 0
+                break
+            await asyncio.sleep(0.5)
+        return {
+            "units": "pages",
+            "operations": outcomes[VPNOperationStatus.SUCCEEDED.value],
+            "outcomes": outcomes,
+            "latencies": latencies,
+        }
+
+    if name == "drift":
+        service = VPNDriftService(partial(uow, maker))
+        semaphore = asyncio.Semaphore(args.concurrency)
+        etags: dict[int, str | None] = {}
+
+        async def audit(server_id: int) -> None:
+            async with semaphore:
+                report = await timed(
+                    lambda: service.audit_server(server_id, etag=etags.get(server_id))
+                )
+            if report is not None:
+                etags[server_id] = report.inventory_etag
+                outcomes["unchanged" if report.unchanged else "changed"] += 1
+                outcomes["findings"] += len(report.findings)
+
+        for _ in range(args.rounds):
+            await asyncio.gather(*(audit(server_id) for server_id in server_ids))
+        return {"units": "audits", "outcomes": outcomes, "latencies": latencies}
+
+    if name == "poller":
+        service = AdminFleetService()
+        for _ in range(args.rounds):
+            counts = await timed(service.poll_server_statuses)
+            outcomes.update(counts or {})
+        return {"units": "polls", "outcomes": outcomes, "latencies": latencies}
+
+    raise ValueError(f"Unknown scenario {name}")
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(database_url: str, args) -> dict:
+    global _manager_requests
+
+    options = {"echo": False}
+    if database_url.startswith("sqlite"):
+        # SQLite serializes writers; wait instead of failing under concurrency.
+        options["connect_args"] = {"timeout": 60}
+    else:
+        options.update(pool_size=args.concurrency + 4, max_overflow=8)
+    engine = create_async_engine(database_url, **options)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    # The fleet poller opens sessions through the module-level factory.
+    db.async_session = maker
+    original = api_gateway.observe_manager_request
+    api_gateway.observe_manager_request = partial(_record_manager_request, original)
+    fleet, servers = await _start_fleet(args)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+        seeded = time.perf_counter()
+        server_ids = await _seed(maker, fleet, args)
+        seed_seconds = time.perf_counter() - seeded
+
+        result = {
+            "meta": {
+                "commit": _commit(),
+                "dialect": engine.dialect.name,
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "servers": args.servers,
+                "clients_per_server": args.clients_per_server,
+                "remote_only": args.remote_only,
+                "latency_ms": args.latency_ms,
+                "latency_jitter_ms": args.latency_jitter_ms,
+                "error_rate": args.error_rate,
+                "throttle_rate": args.throttle_rate,
+                "concurrency": args.concurrency,
+                "seed_seconds": round(seed_seconds, 3),
+            },
+            "scenarios": {},
+        }
+        for name in args.scenario or SCENARIOS:
+            _manager_requests = []
+            injected_before = sum((manager.injected for manager, _ in fleet), Counter())
+            started = time.perf_counter()
+            outcome = await _scenario(name, maker, server_ids, args)
+            elapsed = time.perf_counter() - started
+            requests, _manager_requests = _manager_requests, None
+            injected = (
+                sum((manager.injected for manager, _ in fleet), Counter())
+                - injected_before
+            )
+            latencies = outcome["latencies"]
+            result["scenarios"][name] = {
+                "units": outcome["units"],
+                "completed": len(latencies),
+                "seconds": round(elapsed, 3),
+                "throughput_per_second": (
+                    round(len(latencies) / elapsed, 2) if elapsed else 0
+                ),
+                "latency_ms": _percentiles(latencies),
+                "outcomes": dict(outcome["outcomes"]),
+                "operations_per_second": (
+                    round(outcome.get("operations", len(latencies)) / elapsed, 1)
+                    if elapsed
+                    else 0
+                ),
+                "manager_requests": {
+                    "count": len(requests),
+                    "per_second": round(len(requests) / elapsed, 1) if elapsed else 0,
+                    "outcomes": dict(Counter(outcome for outcome, _ in requests)),
+                    "latency_ms": _percentiles([duration for _, duration in requests]),
+                },
+                "injected_faults": dict(injected),
+            }
+            print(
+                json.dumps({"scenario": name, **result["scenarios"][name]}),
+                file=sys.stderr,
+                flush=True,
+            )
+        return result
+    finally:
+        api_gateway.observe_manager_request = original
+        await _stop_fleet(servers)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("POSTGRES_TEST_URL"),
+        help="Disposable database URL; defaults to POSTGRES_TEST_URL or SQLite.",
+    )
+    parser.add_argument("--servers", type=int, default=8)
+    parser.add_argument("--clients-per-server", type=int, default=1_000)
+    parser.add_argument(
+        "--remote-only",
+        type=int,
+        default=0,
+        help="Extra Manager-only clients per server, to grow inventories.",
+    )
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 ratio.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 ratio.")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--per-server-concurrency",
+        type=int,
+        default=settings.vpn_reconcile_per_server_concurrency,
+    )
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument(
+        "--drain-seconds",
+        type=float,
+        default=60.0,
+        help="How long reconcile keeps waiting for retried operations.",
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=5, help="Drift and poller repetitions."
+    )
+    parser.add_argument(
+        "--scenario",
+        choices=SCENARIOS,
+        action="append",
+        help="Scenario to run; repeat to select several (default: all).",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(), "load.sqlite3")
+        database_url = f"sqlite+aiosqlite:///{path}"
+    report = json.dumps(asyncio.run(run(database_url, args)), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report, flush=True)
+
+
+if __name__ == "__main__":
+    main()
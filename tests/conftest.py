@@ -39,7 +39,9 @@ async def engine():
 
 @pytest_asyncio.fixture()
 def sessionmaker(engine, monkeypatch):
-    maker = async_sessionmaker(engine, expire_on_commit=False)
+    maker = async_sessionmaker(
+        engine, expire_on_commit=False, sync_session_class=db.HubSession
+    )
     monkeypatch.setattr(db_uow, "async_session", maker, raising=False)
     monkeypatch.setattr(db, "async_session", maker, raising=False)
     monkeypatch.setattr(db, "engine", engine, raising=False)
@@ -50,3 +52,24 @@ def sessionmaker(engine, monkeypatch):
 async def session(sessionmaker):
     async with sessionmaker() as session:
         yield session
+
+
+@pytest.fixture(autouse=True)
+def reset_manager_clients():
+    from core.services.config_downloads import config_downloads
+    from core.services.manager_breakers import manager_circuits
+    from core.services.manager_capabilities import manager_capabilities
+    from core.services.manager_clients import manager_clients
+    from core.services.manager_throttle import manager_throttle
+
+    manager_clients.reset()
+    manager_circuits.reset()
+    manager_throttle.reset()
+    manager_capabilities.reset()
+    config_downloads.reset()
+    yield
+    manager_clients.reset()
+    manager_circuits.reset()
+    manager_throttle.reset()
+    manager_capabilities.reset()
+    config_downloads.reset()
@@ -18,6 +18,8 @@ async def mark_server_ready(server_id: int) -> None:
         server.lifecycle_state = "active"
         server.accepts_new_configs = True
         server.manager_instance_id = READY_MANAGER_INSTANCE_ID
+        server.health_state = "healthy"
+        server.health_checked_at = datetime.now(timezone.utc)
         repos["servers"].session.add(
             VPNServerStatus(
                 server_id=server_id,
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import sqlalchemy as sa
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+MIGRATION_PATH = (
+    Path(__file__).parents[1]
+    / "alembic"
+    / "versions"
+    / "c3e5a7b9d1f2_admin_action_leases_and_entries.py"
+)
+
+
+def _migration_module():
+    spec = importlib.util.spec_from_file_location(
+        "admin_action_entries_migration", MIGRATION_PATH
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_admin_action_entry_migration_moves_audit_progress_sqlite():
+    migration = _migration_module()
+    assert migration.down_revision == "f2a4c6e8b0d1"
+    engine = sa.create_engine("sqlite+pysqlite:///:memory:")
+    metadata = sa.MetaData()
+    sa.Table("server", metadata, sa.Column("id", sa.Integer(), primary_key=True))
+    action = sa.Table(
+        "admin_action",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(64), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=False),
+    )
+    metadata.create_all(engine)
+    servers = [
+        {
+            "sequence": 1,
+            "server_id": 1,
+            "name": "Amsterdam",
+            "status": "succeeded",
+            "finding_count": 2,
+            "critical_count": 1,
+            "findings": [],
+        },
+        {
+            "sequence": 2,
+            "server_id": 9,
+            "name": "Removed",
+            "status": "failed",
+            "error_code": "APITransportError",
+            "finding_count": 0,
+            "critical_count": 0,
+            "findings": [],
+        },
+    ]
+    with engine.begin() as connection:
+        connection.execute(sa.insert(sa.table("server", sa.column("id"))), {"id": 1})
+        connection.execute(
+            sa.insert(action),
+            [
+                {
+                    "id": 1,
+                    "kind": "fleet_audit_drift",
+                    "result": {"servers_total": 2, "completed": 2, "servers": servers},
+                },
+                {"id": 2, "kind": "refresh_status", "result": {"servers": "kept"}},
+            ],
+        )
+
+    with engine.begin() as connection:
+        migration.op = Operations(MigrationContext.configure(connection))
+        migration.upgrade()
+        assert {
+            column["name"]
+            for column in sa.inspect(connection).get_columns("admin_action")
+        } >= {"lease_token", "lease_expires_at", "attempts"}
+        entries = connection.execute(
+            sa.text(
+                "SELECT admin_action_id, sequence, server_id, status, finding_count "
+                "FROM admin_action_entry ORDER BY sequence"
+            )
+        ).all()
+        # An entry of a server that no longer exists keeps its data only.
+        assert entries == [(1, 1, 1, "succeeded", 2), (1, 2, None, "failed", 0)]
+        results = dict(
+            connection.execute(sa.select(action.c.id, action.c.result)).all()
+        )
+        assert results == {
+            1: {"servers_total": 2, "completed": 2},
+            2: {"servers": "kept"},
+        }
+
+        migration.downgrade()
+        inspector = sa.inspect(connection)
+        assert "admin_action_entry" not in inspector.get_table_names()
+        assert "lease_token" not in {
+            column["name"] for column in inspector.get_columns("admin_action")
+        }
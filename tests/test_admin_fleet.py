@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
@@ -7,10 +8,17 @@ import bcrypt
 import httpx
 import pytest
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import func, select
+from sqlalchemy import event, func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from starlette.requests import Request
 
-from admin.fleet_schemas import AdminServerActionRequest, AdminServerUpdate
+import core.db as db
+import core.db.unit_of_work as db_uow
+from admin.fleet_schemas import (
+    AdminFleetDriftAuditRequest,
+    AdminServerActionRequest,
+    AdminServerUpdate,
+)
 from admin.fleet_service import (
     AdminFleetService,
     FleetIdempotencyConflict,
@@ -18,17 +26,29 @@ from admin.fleet_service import (
 )
 from admin.routers import admin_v1_fleet
 from admin.security import AdminPrincipal, AdminRole, login_rate_limiter
+from core.config import settings
+from core.db import Base
 from core.db.models import (
     AdminAction,
     AdminAuditEvent,
     AdminUser,
     Server,
     VPNServerStatus,
+    VPNServerStatusRollup,
 )
 from core.db.unit_of_work import uow
 from core.domain import AdminActionStatus
-from core.exceptions import InvalidOperationError, ServerNotFoundError
-from core.services import ServerService
+from core.exceptions import (
+    APITransportError,
+    InvalidOperationError,
+    ServerNotFoundError,
+)
+from core.services import (
+    FleetDriftAuditService,
+    ServerService,
+    StatusRollupService,
+    UserService,
+)
 from core.services.api_gateway import (
     APIGateway,
     ManagerClientInventory,
@@ -41,6 +61,8 @@ from core.services.api_gateway import (
     ManagerPKIStatus,
     ManagerReadiness,
 )
+from core.services.fleet_drift_audit import FLEET_DRIFT_AUDIT_MAX_ATTEMPTS
+from core.services.status_rollups import history_resolution
 
 
 def _request() -> Request:
@@ -293,6 +315,341 @@ async def test_inventory_refresh_does_not_replace_latest_health_snapshot(session
     assert latest["inventory_revision"] == "sha256:inventory"
 
 
+@pytest.mark.asyncio
+async def test_fleet_drift_audit_streams_servers_as_they_finish(monkeypatch, tmp_path):
+    # The stream reads while the job writes, which needs one connection per
+    # session rather than the shared in-memory connection.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fleet.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(db, "async_session", sessionmaker)
+    monkeypatch.setattr(db_uow, "async_session", sessionmaker)
+    monkeypatch.setattr(settings, "admin_fleet_drift_stream_poll_seconds", 0.01)
+    principal = await _admin(sessionmaker)
+    fast = await _server()
+    slow = await ServerService(uow).create(
+        name="Frankfurt",
+        ip="slow-manager.test",
+        port=16290,
+        host="de.example.test",
+        location="DE",
+        api_key="slow-manager-key",
+        cost=Decimal("12.00"),
+    )
+    broken = await ServerService(uow).create(
+        name="Warsaw",
+        ip="broken-manager.test",
+        port=16290,
+        host="pl.example.test",
+        location="PL",
+        api_key="broken-manager-key",
+        cost=Decimal("12.00"),
+    )
+    release_slow = asyncio.Event()
+
+    class SlowGateway(FleetGateway):
+        async def get_client_inventory(self, *, etag=None):
+            await release_slow.wait()
+            return await super().get_client_inventory(etag=etag)
+
+    class BrokenGateway(FleetGateway):
+        async def get_client_inventory(self, *, etag=None):
+            raise APITransportError("Manager unavailable")
+
+    gateways = {fast.id: FleetGateway(), slow.id: SlowGateway()}
+    queued = []
+    service = AdminFleetService(enqueue_drift_audit=queued.append)
+    worker = FleetDriftAuditService(
+        uow,
+        gateway_factory=lambda *args, server_id, **kwargs: gateways.get(
+            server_id, BrokenGateway()
+        ),
+    )
+
+    started = await service.start_drift_audit(
+        request=_request(),
+        principal=principal,
+        client_key="fleet-drift-key",
+        command=AdminFleetDriftAuditRequest(reason="weekly drift review"),
+    )
+    assert started["status"] == "pending"
+    assert started["server_id"] is None
+    assert started["result"]["servers_total"] == 3
+    assert queued == [started["action_id"]]
+    job = asyncio.create_task(worker.run(started["action_id"]))
+
+    events = service.stream_drift_audit(started["action_id"])
+    received = [await anext(events), await anext(events)]
+    # The unreachable and the fast Manager are reported while the slow one is
+    # still being read.
+    assert {data["server_id"] for _, _, data in received} == {fast.id, broken.id}
+    by_server = {data["server_id"]: data for _, _, data in received}
+    assert by_server[broken.id]["status"] == "failed"
+    assert by_server[broken.id]["error_code"] == "APITransportError"
+    assert by_server[fast.id]["critical_count"] == 1
+    assert by_server[fast.id]["findings"][0]["reason"] == "remote_only_live"
+
+    release_slow.set()
+    rest = [item async for item in events]
+    assert await job is True
+    assert [(event, sequence) for event, sequence, _ in rest] == [
+        ("server", 3),
+        ("done", None),
+    ]
+    assert rest[0][2]["server_id"] == slow.id
+    assert rest[1][2] == {
+        "status": "succeeded",
+        "servers_total": 3,
+        "completed": 3,
+        "failed": 1,
+        "finding_count": 2,
+        "critical_count": 2,
+    }
+
+    # A reconnecting stream resumes after the last received sequence.
+    resumed = [
+        item async for item in service.stream_drift_audit(started["action_id"], after=2)
+    ]
+    assert [sequence for _, sequence, _ in resumed] == [3, None]
+
+    replay = await service.start_drift_audit(
+        request=_request(),
+        principal=principal,
+        client_key="fleet-drift-key",
+        command=AdminFleetDriftAuditRequest(reason="weekly drift review"),
+    )
+    assert replay["replayed"] is True
+    assert replay["result"]["completed"] == 3
+    assert queued == [started["action_id"]]
+    # The action keeps totals only; the findings live in the entries.
+    assert "servers" not in replay["result"]
+    async with sessionmaker() as session:
+        outcomes = (
+            await session.scalars(
+                select(AdminAuditEvent.action).where(
+                    AdminAuditEvent.action.like("fleet.audit_drift%")
+                )
+            )
+        ).all()
+    assert sorted(outcomes) == ["fleet.audit_drift", "fleet.audit_drift.completed"]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_abandoned_fleet_drift_audit_is_taken_over_or_failed(
+    monkeypatch, tmp_path
+):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fleet.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(db, "async_session", sessionmaker)
+    monkeypatch.setattr(db_uow, "async_session", sessionmaker)
+    monkeypatch.setattr(settings, "admin_fleet_drift_stream_poll_seconds", 0.01)
+    principal = await _admin(sessionmaker)
+    first = await _server()
+    second = await ServerService(uow).create(
+        name="Frankfurt",
+        ip="second-manager.test",
+        port=16290,
+        host="de.example.test",
+        location="DE",
+        api_key="second-manager-key",
+        cost=Decimal("12.00"),
+    )
+
+    class StuckGateway(FleetGateway):
+        async def get_client_inventory(self, *, etag=None):
+            await asyncio.Event().wait()
+
+    gateways = {first.id: FleetGateway(), second.id: StuckGateway()}
+    worker = FleetDriftAuditService(
+        uow,
+        gateway_factory=lambda *args, server_id, **kwargs: gateways[server_id],
+    )
+    service = AdminFleetService(enqueue_drift_audit=lambda action_id: None)
+    started = await service.start_drift_audit(
+        request=_request(),
+        principal=principal,
+        client_key="fleet-takeover-key",
+        command=AdminFleetDriftAuditRequest(reason="takeover"),
+    )
+    action_id = started["action_id"]
+
+    job = asyncio.create_task(worker.run(action_id))
+    events = service.stream_drift_audit(action_id)
+    assert (await anext(events))[1] == 1
+    # A stopped worker hands the audit back instead of failing it.
+    job.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await job
+    async with sessionmaker() as session:
+        action = await session.scalar(
+            select(AdminAction).where(AdminAction.action_id == action_id)
+        )
+    assert (action.status, action.lease_token, action.attempts) == (
+        "running",
+        None,
+        1,
+    )
+
+    assert await worker.recover_abandoned() == [action_id]
+    # Queued again with a fresh pick-up deadline, so the next sweep skips it.
+    assert await worker.recover_abandoned() == []
+
+    gateways[second.id] = FleetGateway()
+    assert await worker.run(action_id) is True
+    # The successor audits only the server that has no entry yet.
+    assert gateways[first.id].inventory_calls == 1
+    rest = [item async for item in events]
+    assert [(event, sequence) for event, sequence, _ in rest] == [
+        ("server", 2),
+        ("done", None),
+    ]
+    assert rest[0][2]["server_id"] == second.id
+    assert rest[1][2]["status"] == "succeeded"
+    assert rest[1][2]["completed"] == 2
+    assert await worker.run(action_id) is False
+
+    exhausted = await service.start_drift_audit(
+        request=_request(),
+        principal=principal,
+        client_key="fleet-exhausted-key",
+        command=AdminFleetDriftAuditRequest(reason="exhausted"),
+    )
+    async with sessionmaker() as session, session.begin():
+        await session.execute(
+            update(AdminAction)
+            .where(AdminAction.action_id == exhausted["action_id"])
+            .values(
+                attempts=FLEET_DRIFT_AUDIT_MAX_ATTEMPTS,
+                lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+            )
+        )
+    assert await worker.recover_abandoned() == []
+    assert await worker.run(exhausted["action_id"]) is False
+    failed = await service.get_action(exhausted["action_id"])
+    assert failed["status"] == "failed"
+    assert failed["error_code"] == "stale_action_recovered"
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_server_listing_uses_constant_queries(engine, sessionmaker):
+    service = AdminFleetService(gateway_factory=lambda *args, **kwargs: FleetGateway())
+    owner = await UserService(uow).register(91_001)
+
+    async def add_servers(count: int) -> None:
+        for _ in range(count):
+            server = await _server()
+            async with uow() as repos:
+                for state in ("active", "suspended", "revoked"):
+                    await repos["configs"].create(
+                        server.id,
+                        owner.id,
+                        f"listing-{server.id}-{state}",
+                        state,
+                        desired_state=state,
+                        actual_state=state,
+                    )
+                session = repos["servers"].session
+                await session.execute(
+                    update(Server)
+                    .where(Server.id == server.id)
+                    .values(
+                        health_state="healthy",
+                        health_checked_at=datetime.now(timezone.utc),
+                    )
+                )
+                for kind in ("status", "inventory", "status"):
+                    session.add(
+                        VPNServerStatus(
+                            server_id=server.id,
+                            kind=kind,
+                            success=True,
+                            snapshot={},
+                            inventory_revision=f"{kind}-{server.id}",
+                        )
+                    )
+
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    async def listing_queries(**filters) -> tuple[int, dict]:
+        statements.clear()
+        event.listen(engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            page = await service.list_servers(limit=50, **filters)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", _record)
+        return len(statements), page
+
+    await add_servers(2)
+    small, _ = await listing_queries()
+    await add_servers(10)
+    large, page = await listing_queries()
+    filtered, healthy = await listing_queries(health_state="healthy")
+
+    assert small == large == filtered == 3
+    assert page["total"] == 12
+    first = page["items"][0]
+    assert first["configs_count"] == 2
+    assert first["active_configs"] == 1
+    assert first["suspended_configs"] == 1
+    assert first["inventory_revision"] == f"inventory-{first['id']}"
+    assert healthy["total"] == 12
+
+
+@pytest.mark.asyncio
+async def test_poller_maintains_health_column_for_sql_filters(
+    monkeypatch, sessionmaker
+):
+    # Every test session shares one SQLite connection, so concurrent poll
+    # transactions would interleave on it.
+    monkeypatch.setattr(settings, "admin_fleet_poll_concurrency", 1)
+    healthy = await _server()
+    unreachable = await _server()
+
+    class DownGateway(FleetGateway):
+        async def get_status(self):
+            raise APITransportError("Manager unavailable")
+
+    service = AdminFleetService(
+        gateway_factory=lambda *args, server_id, **kwargs: (
+            DownGateway() if server_id == unreachable.id else FleetGateway()
+        )
+    )
+    async with sessionmaker() as session:
+        before = (await session.get(Server, healthy.id)).updated_at
+
+    assert await service.poll_server_statuses() == {
+        "checked": 2,
+        "succeeded": 1,
+        "failed": 1,
+    }
+
+    async with sessionmaker() as session:
+        rows = {row.id: row for row in (await session.scalars(select(Server))).all()}
+    assert rows[healthy.id].health_state == "healthy"
+    assert rows[unreachable.id].health_state == "unreachable"
+    # A poll is an observation, not an edit of the server.
+    assert rows[healthy.id].updated_at == before
+    for state, expected in {
+        "healthy": [healthy.id],
+        "unhealthy": [unreachable.id],
+        "unreachable": [unreachable.id],
+        "stale": [],
+        "unknown": [],
+    }.items():
+        page = await service.list_servers(health_state=state)
+        assert [item["id"] for item in page["items"]] == expected, state
+        if state != "unhealthy":  # the unhealthy filter also covers unreachable
+            assert [item["health"] for item in page["items"]] == [state] * len(expected)
+
+
 @pytest.mark.asyncio
 async def test_old_status_is_stale_and_health_filter_paginates_after_filtering(
     monkeypatch, sessionmaker
@@ -318,6 +675,11 @@ async def test_old_status_is_stale_and_health_filter_paginates_after_filtering(
             select(VPNServerStatus).where(VPNServerStatus.kind == "status")
         )
         row.collected_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+        await session.execute(
+            update(Server)
+            .where(Server.id == server.id)
+            .values(health_checked_at=row.collected_at)
+        )
 
     latest = await service.get_latest_status(server.id)
     page = await service.list_servers(health_state="stale", limit=1, offset=0)
@@ -328,6 +690,141 @@ async def test_old_status_is_stale_and_health_filter_paginates_after_filtering(
     assert empty_page["total"] == 1 and empty_page["items"] == []
 
 
+def _sample(server_id: int, minute: int, start: datetime) -> VPNServerStatus:
+    received = 1000 * minute if minute < 90 else 1000 * (minute - 90)
+    return VPNServerStatus(
+        server_id=server_id,
+        kind="status",
+        success=minute != 7,
+        snapshot=(
+            {}
+            if minute == 7
+            else {
+                "readiness": {"ready": minute not in {20, 21, 22}},
+                "data_plane": {
+                    "status": "up",
+                    "online_sessions": minute % 10,
+                    "bytes_received": received,
+                    "bytes_sent": 10 * minute,
+                },
+            }
+        ),
+        collected_at=start + timedelta(minutes=minute),
+    )
+
+
+@pytest.mark.asyncio
+async def test_status_rollups_downsample_prune_and_serve_by_range(
+    monkeypatch, sessionmaker
+):
+    server = await _server()
+    start = datetime(2026, 7, 14, 9, tzinfo=timezone.utc)
+    async with sessionmaker() as session, session.begin():
+        session.add_all(_sample(server.id, minute, start) for minute in range(120))
+        session.add(
+            VPNServerStatus(
+                server_id=server.id,
+                kind="inventory",
+                snapshot={"revision": "sha256:inventory"},
+                inventory_revision="sha256:inventory",
+                collected_at=start,
+            )
+        )
+    monkeypatch.setattr(settings, "admin_fleet_status_raw_retention_hours", 1)
+    now = start + timedelta(hours=2, minutes=2)
+    rollups = StatusRollupService(uow, clock=lambda: now)
+
+    # A run rolls up at most an hour of 5-minute buckets; raw samples are kept
+    # until their buckets, and the next window's baseline, are rolled up.
+    first = await rollups.roll_up()
+    assert first.buckets == {"5m": 12, "1h": 1, "1d": 0}
+    assert first.pruned["raw"] == 55
+    second = await rollups.roll_up()
+    assert second.buckets == {"5m": 12, "1h": 1, "1d": 0}
+    assert second.pruned["raw"] == 7
+    assert (await rollups.roll_up()).buckets == {"5m": 0, "1h": 0, "1d": 0}
+
+    service = AdminFleetService(gateway_factory=lambda *args, **kwargs: None)
+    five_minutes = await service.status_history(
+        server.id,
+        kind=None,
+        limit=2,
+        offset=22,
+        period_from=start,
+        period_to=start + timedelta(hours=2),
+        resolution="5m",
+    )
+    assert five_minutes["total"] == 24
+    assert [
+        (
+            item["samples"],
+            item["reachable_samples"],
+            item["readiness_flaps"],
+            item["sessions_min"],
+            item["sessions_max"],
+            item["bytes_received"],
+        )
+        for item in five_minutes["items"]
+    ] == [(5, 4, 2, 5, 9, 5000), (5, 5, 0, 0, 4, 4000)]
+
+    hourly = await service.status_history(
+        server.id,
+        kind=None,
+        limit=10,
+        offset=0,
+        period_from=start + timedelta(minutes=30),
+        resolution="1h",
+    )
+    assert hourly["resolution"] == "1h"
+    later, earlier = hourly["items"]
+    assert earlier["bucket_start"] == start.isoformat()
+    assert earlier["uptime_ratio"] == round(56 / 60, 4)
+    assert earlier["readiness_flaps"] == 4
+    assert earlier["sessions_avg"] == round(263 / 59, 2)
+    assert (earlier["bytes_received"], earlier["bytes_sent"]) == (59_000, 590)
+    # The counter reset at minute 90 is not reported as a negative delta.
+    assert (later["bytes_received"], later["bytes_sent"]) == (59_000, 600)
+    assert later["uptime_ratio"] == 1.0 and later["readiness_flaps"] == 0
+
+    next_day = StatusRollupService(uow, clock=lambda: now + timedelta(days=1))
+    assert (await next_day.roll_up()).buckets == {"5m": 0, "1h": 0, "1d": 1}
+    async with sessionmaker() as session:
+        daily = await session.scalar(
+            select(VPNServerStatusRollup).where(
+                VPNServerStatusRollup.resolution == "1d"
+            )
+        )
+        kinds = (
+            await session.scalars(
+                select(VPNServerStatus.kind).order_by(VPNServerStatus.kind)
+            )
+        ).all()
+    assert (daily.samples, daily.ready_samples, daily.readiness_flaps) == (
+        120,
+        116,
+        4,
+    )
+    assert daily.bytes_received == 118_000
+    # The newest snapshot of each kind survives retention for fleet reads.
+    assert kinds == ["inventory", "status"]
+    latest = await service.get_latest_status(server.id)
+    assert latest["inventory_revision"] == "sha256:inventory"
+
+
+def test_history_resolution_follows_range_and_retention():
+    now = datetime(2026, 7, 14, 12, tzinfo=timezone.utc)
+
+    assert history_resolution(now - timedelta(hours=6), now, now=now) == "raw"
+    assert history_resolution(now - timedelta(days=2), now, now=now) == "5m"
+    assert (
+        history_resolution(now - timedelta(days=3), now - timedelta(days=2), now=now)
+        == "5m"
+    )
+    assert history_resolution(now - timedelta(days=30), now, now=now) == "1h"
+    assert history_resolution(now - timedelta(days=200), now, now=now) == "1d"
+    assert history_resolution(now - timedelta(days=5000), now, now=now) == "1d"
+
+
 @pytest.mark.asyncio
 async def test_recover_stale_running_action_marks_it_failed_and_audits(
     monkeypatch, sessionmaker
@@ -351,10 +848,32 @@ async def test_recover_stale_running_action_marks_it_failed_and_audits(
             created_at=old,
         )
         session.add(action)
+        # A long fleet audit is judged by its lease, not its start time: the
+        # live one stays, the one nobody took over for a window is failed.
+        for key, lease_expires_at in (
+            ("c", datetime.now(timezone.utc) + timedelta(minutes=1)),
+            ("d", old),
+        ):
+            session.add(
+                AdminAction(
+                    actor_user_id=principal.user_id,
+                    kind="fleet_audit_drift",
+                    status=AdminActionStatus.RUNNING.value,
+                    idempotency_key_hash=key * 64,
+                    request_hash="b" * 64,
+                    reason="long fleet audit",
+                    payload={},
+                    result={},
+                    started_at=old,
+                    created_at=old,
+                    lease_token=f"lease-{key}",
+                    lease_expires_at=lease_expires_at,
+                )
+            )
         await session.flush()
         action_id = action.action_id
 
-    assert await AdminFleetService().recover_stale_actions() == 1
+    assert await AdminFleetService().recover_stale_actions() == 2
     async with sessionmaker() as session:
         recovered = await session.scalar(
             select(AdminAction).where(AdminAction.action_id == action_id)
@@ -367,6 +886,14 @@ async def test_recover_stale_running_action_marks_it_failed_and_audits(
             )
         )
         assert event.details["admin_action_id"] == action_id
+        audits = (
+            await session.execute(
+                select(AdminAction.lease_token, AdminAction.status)
+                .where(AdminAction.kind == "fleet_audit_drift")
+                .order_by(AdminAction.id)
+            )
+        ).all()
+        assert audits == [("lease-c", "running"), (None, "failed")]
 
 
 @pytest.mark.asyncio
@@ -841,6 +1368,10 @@ async def test_fleet_api_rbac_csrf_write_only_key_and_action(monkeypatch, sessio
         "_gateway_factory",
         lambda *args, **kwargs: gateway,
     )
+    queued_audits = []
+    monkeypatch.setattr(
+        admin_v1_fleet.fleet, "_enqueue_drift_audit", queued_audits.append
+    )
     from admin.app import app
 
     async with AsyncClient(
@@ -898,3 +1429,41 @@ async def test_fleet_api_rbac_csrf_write_only_key_and_action(monkeypatch, sessio
         status_response = await client.get(f"/api/admin/v1/servers/{body['id']}/status")
         assert status_response.status_code == 200
         assert status_response.json()["manager_ready"] is True
+        history_path = f"/api/admin/v1/servers/{body['id']}/status/history"
+        history = await client.get(history_path, params={"kind": "status"})
+        assert history.status_code == 200
+        assert history.json()["resolution"] == "raw"
+        assert history.json()["total"] == 1
+        reversed_period = await client.get(
+            history_path,
+            params={"from": "2026-07-14T00:00:00Z", "to": "2026-07-13T00:00:00Z"},
+        )
+        assert reversed_period.status_code == 400
+        rollup_kind = await client.get(
+            history_path, params={"kind": "status", "resolution": "1h"}
+        )
+        assert rollup_kind.status_code == 400
+
+        monkeypatch.setattr(settings, "admin_fleet_drift_stream_poll_seconds", 0.01)
+        audit = await client.post(
+            "/api/admin/v1/servers/drift-audits",
+            headers={"X-CSRF-Token": csrf, "Idempotency-Key": "api-fleet-drift"},
+            json={"reason": "API fleet drift audit"},
+        )
+        assert audit.status_code == 202
+        assert queued_audits == [audit.json()["action_id"]]
+        worker = FleetDriftAuditService(
+            uow, gateway_factory=lambda *args, **kwargs: gateway
+        )
+        assert await worker.run(audit.json()["action_id"]) is True
+        stream = await client.get(
+            f"/api/admin/v1/servers/drift-audits/{audit.json()['action_id']}/events"
+        )
+        assert stream.headers["content-type"].startswith("text/event-stream")
+        assert stream.text.startswith("event: server\nid: 1\ndata: {")
+        assert "event: done" in stream.text
+        assert "never-return-this" not in stream.text
+        missing = await client.get(
+            f"/api/admin/v1/servers/drift-audits/{action.json()['action_id']}/events"
+        )
+        assert missing.status_code == 404
@@ -15,6 +15,7 @@ from starlette.requests import Request
 
 from admin.request_context import RequestContextMiddleware
 from admin.routers import admin_v1_configs, admin_v1_system, admin_v1_users
+from admin.routers.admin_v1_analytics import router as analytics_router
 from admin.routers.admin_v1_configs import router as configs_router
 from admin.routers.admin_v1_system import router as system_router
 from admin.routers.admin_v1_users import router as users_router
@@ -687,6 +688,52 @@ async def test_analytics_definitions_and_timezone_bucket_boundaries(sessionmaker
         )
 
 
+@pytest.mark.asyncio
+async def test_billing_forecast_api_is_finance_only_and_read_only(sessionmaker):
+    finance, _ = await _admin_principal(sessionmaker, role=AdminRole.FINANCE)
+    support, _ = await _admin_principal(sessionmaker, role=AdminRole.SUPPORT)
+    owner = await UserService(uow).register(75_001, balance=Decimal("3.00"))
+    server = await ServerService(uow).create(
+        name="forecast-api",
+        ip="127.0.0.1",
+        port=8080,
+        host="forecast.example.test",
+        location="local",
+        api_key="secret",
+        cost=0,
+    )
+    async with uow() as repos:
+        await repos["configs"].create(server.id, owner.id, "forecast-api", "API")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=_test_app(finance, analytics_router)),
+        base_url="https://admin.test",
+    ) as client:
+        response = await client.get(
+            "/api/admin/v1/analytics/billing/forecast",
+            params={"periods": 3, "per_config_cost": "1.50", "billing_interval": 86400},
+        )
+        invalid = await client.get(
+            "/api/admin/v1/analytics/billing/forecast", params={"periods": 0}
+        )
+    async with AsyncClient(
+        transport=ASGITransport(app=_test_app(support, analytics_router)),
+        base_url="https://admin.test",
+    ) as client:
+        forbidden = await client.get("/api/admin/v1/analytics/billing/forecast")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["tariff"] == {"per_config_cost": "1.50", "billing_interval": 86400}
+    assert payload["total_charged"] == "3.00"
+    assert payload["total_suspended"] == 1
+    assert [item["suspended_users"] for item in payload["items"]] == [0, 1, 0]
+    assert payload["items"][1]["negative_balance_total"] == "0.00"
+    assert invalid.status_code == 422
+    assert forbidden.status_code == 403
+    assert (await UserService(uow).get(owner.id)).balance == Decimal("3.00")
+
+
 @pytest.mark.asyncio
 async def test_config_action_api_is_csrf_protected_and_audited(
     monkeypatch,
@@ -8,6 +8,7 @@ import pytest
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from core.config import settings
 from core.db import Base
 from core.db.models.config import VPN_Config
 from core.db.models.ledger import LedgerEntry, LedgerKind
@@ -299,6 +300,8 @@ async def test_referral_capture_and_periodic_billing_use_deadlock_safe_lock_orde
     engine = create_async_engine(POSTGRES_TEST_URL, echo=False)
     maker = async_sessionmaker(engine, expire_on_commit=False)
     monkeypatch.setattr("core.db.unit_of_work.async_session", maker)
+    # The interleaving below is coordinated per charged user movement.
+    monkeypatch.setattr(settings, "billing_bulk_charge_enabled", False)
     try:
         async with engine.begin() as connection:
             await connection.run_sync(Base.metadata.drop_all)
@@ -394,3 +397,58 @@ async def test_referral_capture_and_periodic_billing_use_deadlock_safe_lock_orde
         async with engine.begin() as connection:
             await connection.run_sync(Base.metadata.drop_all)
         await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_referral_reconcilers_claim_disjoint_pages(monkeypatch):
+    engine = create_async_engine(POSTGRES_TEST_URL, echo=False)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr("core.db.unit_of_work.async_session", maker)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+
+        billing = BillingService(uow, per_config_cost="1.00")
+        monkeypatch.setattr(settings, "referral_rewards_enabled", False)
+        for index in range(4):
+            user = await UserService(uow).register(9301 + index)
+            intent = await billing.create_payment_intent(
+                user_id=user.id, amount="100.00", currency="RUB"
+            )
+            await billing.record_provider_payment(
+                user_id=user.id,
+                provider="telegram",
+                provider_payment_id=f"reconcile-split-{index}",
+                amount="100.00",
+                currency="RUB",
+                payload=intent.payload,
+                intent_id=intent.intent_id,
+            )
+
+        async with maker() as first, first.begin():
+            first_page = await BillingRepo(first).claim_unsettled_referral_payments(
+                limit=2
+            )
+            async with maker() as second, second.begin():
+                # The first page stays locked; the second reconciler moves on
+                # without waiting for it.
+                second_page = await asyncio.wait_for(
+                    BillingRepo(second).claim_unsettled_referral_payments(limit=2),
+                    timeout=2,
+                )
+                async with maker() as third, third.begin():
+                    # Everything is held, so the backlog is exhausted for now.
+                    third_page = await BillingRepo(
+                        third
+                    ).claim_unsettled_referral_payments(limit=2)
+
+        assert len(first_page) == len(second_page) == 2
+        assert not {payment.id for payment in first_page} & {
+            payment.id for payment in second_page
+        }
+        assert third_page == []
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 import pytest
-from sqlalchemy import func, select
+from sqlalchemy import event, func, select, update
 
 from core.config import settings
+from core.db.models.billing_run import BillingRun, BillingRunShard
 from core.db.models.ledger import LedgerKind
 from core.db.models.notification_outbox import NotificationOutbox
 from core.db.models.payment import ProviderPayment
+from core.db.models.pending_config_refund import PendingConfigRefund
+from core.db.models.vpn_operation import VPNOperation
 from core.db.repo.billing import BillingRepo, to_money
+from core.db.repo.config import ConfigRepo
 from core.db.unit_of_work import uow
 from core.domain import VPNOperationStatus, VPNState
 from core.exceptions import (
@@ -20,7 +25,12 @@ from core.exceptions import (
     InsufficientBalanceError,
     InvalidOperationError,
 )
-from core.services import BillingService, ServerService, UserService
+from core.services import (
+    BillingForecastService,
+    BillingService,
+    ServerService,
+    UserService,
+)
 from tests.fleet_test_support import mark_server_ready
 
 
@@ -532,6 +542,432 @@ async def test_periodic_charge_claims_stable_period_once(sessionmaker):
     assert (await UserService(uow).get(user.id)).balance == Decimal("8.00")
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bulk", [False, True])
+async def test_charge_period_engines_write_identical_ledger(sessionmaker, bulk):
+    _, server = await _user_and_server()
+    balances = [Decimal("5.00"), Decimal("0.50"), Decimal("0.00")]
+    owners = []
+    for index, balance in enumerate(balances):
+        owner = await UserService(uow).register(88_000 + index, balance=balance)
+        owners.append(owner)
+        async with uow() as repos:
+            for config_index in range(index + 1):
+                await repos["configs"].create(
+                    server.id,
+                    owner.id,
+                    f"engine-{index}-{config_index}",
+                    "Engine",
+                )
+
+    start = datetime(2026, 7, 12, 12, tzinfo=timezone.utc)
+    async with uow() as repos:
+        results = await repos["billing"].charge_period(
+            period_key="engine-period",
+            period_start=start,
+            period_end=start + timedelta(hours=1),
+            cost_per_config="1.25",
+            bulk=bulk,
+        )
+        assert [result.user.id for result in results] == [o.id for o in owners]
+        assert [result.amount for result in results] == [
+            Decimal("1.25"),
+            Decimal("2.50"),
+            Decimal("3.75"),
+        ]
+        assert [result.user.balance for result in results] == [
+            Decimal("3.75"),
+            Decimal("-2.00"),
+            Decimal("-3.75"),
+        ]
+
+    async with uow() as repos:
+        for owner, result in zip(owners, results, strict=True):
+            assert (await repos["users"].get(id=owner.id)).balance == (
+                result.user.balance
+            )
+            entry = (await repos["billing"].list_ledger_entries(owner.id))[0]
+            assert entry.id == result.ledger_entry.id
+            assert entry.kind == LedgerKind.PERIODIC_CHARGE.value
+            assert entry.idempotency_key == f"billing:engine-period:user:{owner.id}"
+            assert entry.amount == -result.amount
+            assert entry.balance_after == result.user.balance
+            assert entry.details["config_count"] == owners.index(owner) + 1
+        run = await repos["billing"].session.scalar(select(BillingRun))
+        assert run.status == "completed"
+        assert run.charged_users == 3
+        assert run.total_amount == Decimal("7.50")
+
+
+@pytest.mark.asyncio
+async def test_billing_forecast_projects_charges_suspensions_and_debt(sessionmaker):
+    _, server = await _user_and_server()
+    for tg_id, balance, configs in (
+        (88_100, Decimal("5.00"), 1),
+        (88_101, Decimal("0.50"), 2),
+        (88_102, Decimal("0.00"), 3),
+        (88_103, Decimal("12.00"), 1),
+    ):
+        owner = await UserService(uow).register(tg_id, balance=balance)
+        async with uow() as repos:
+            for index in range(configs):
+                await repos["configs"].create(
+                    server.id, owner.id, f"forecast-{tg_id}-{index}", "Forecast"
+                )
+
+    service = BillingForecastService(
+        uow, clock=lambda: datetime(2026, 7, 12, 12, 15, tzinfo=timezone.utc)
+    )
+    forecast = await service.forecast(
+        periods=4, per_config_cost="1.25", billing_period_seconds=3600
+    )
+
+    assert (forecast.active_users, forecast.active_configs) == (4, 7)
+    assert [
+        (
+            period.charged_users,
+            period.charged_configs,
+            period.charged_amount,
+            period.suspended_users,
+            period.negative_balance_users,
+            period.negative_balance_total,
+        )
+        for period in forecast.periods
+    ] == [
+        (4, 7, Decimal("8.75"), 2, 2, Decimal("-5.75")),
+        (2, 2, Decimal("2.50"), 0, 2, Decimal("-5.75")),
+        (2, 2, Decimal("2.50"), 0, 2, Decimal("-5.75")),
+        (2, 2, Decimal("2.50"), 1, 2, Decimal("-5.75")),
+    ]
+    assert forecast.periods[0].period_start == datetime(
+        2026, 7, 12, 13, tzinfo=timezone.utc
+    )
+    assert forecast.total_charged == Decimal("16.25")
+    assert forecast.total_suspended == 3
+
+    free = await service.forecast(periods=2, per_config_cost="0")
+    assert [period.suspended_users for period in free.periods] == [0, 0]
+    assert free.total_charged == Decimal("0.00")
+    with pytest.raises(InvalidOperationError, match="horizon"):
+        await service.forecast(periods=0)
+
+    # The forecast is read-only: the first projected period matches a real
+    # charge run that only happens afterwards.
+    async with uow() as repos:
+        assert await repos["billing"].session.scalar(select(BillingRun)) is None
+        charged = await repos["billing"].charge_period(
+            period_key="forecast-check",
+            period_start=forecast.periods[0].period_start,
+            period_end=forecast.periods[0].period_end,
+            cost_per_config="1.25",
+        )
+    assert sum(result.amount for result in charged) == Decimal("8.75")
+    assert sum(result.user.balance <= 0 for result in charged) == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_charge_skips_and_validates_existing_period_keys(sessionmaker):
+    user, server = await _user_and_server(balance=Decimal("10.00"))
+    async with uow() as repos:
+        await repos["configs"].create(server.id, user.id, "bulk-replay", "Replay")
+        await repos["billing"].apply_balance_change(
+            user_id=user.id,
+            amount="-1.00",
+            kind=LedgerKind.PERIODIC_CHARGE,
+            idempotency_key=f"billing:replay_%:user:{user.id}",
+            allow_negative_balance=True,
+        )
+
+    start = datetime(2026, 7, 12, 12, tzinfo=timezone.utc)
+    async with uow() as repos:
+        assert (
+            await repos["billing"].charge_period(
+                period_key="replay_%",
+                period_start=start,
+                period_end=start + timedelta(hours=1),
+                cost_per_config="1.00",
+                bulk=True,
+            )
+            == []
+        )
+    assert (await UserService(uow).get(user.id)).balance == Decimal("9.00")
+
+    async with uow() as repos:
+        await repos["billing"].apply_balance_change(
+            user_id=user.id,
+            amount="-1.00",
+            kind=LedgerKind.PERIODIC_CHARGE,
+            idempotency_key=f"billing:mismatch:user:{user.id}",
+            allow_negative_balance=True,
+        )
+    with pytest.raises(InvalidOperationError, match="different balance movement"):
+        async with uow() as repos:
+            await repos["billing"].charge_period(
+                period_key="mismatch",
+                period_start=start + timedelta(hours=1),
+                period_end=start + timedelta(hours=2),
+                cost_per_config="3.00",
+                bulk=True,
+            )
+    assert (await UserService(uow).get(user.id)).balance == Decimal("8.00")
+
+
+@pytest.mark.asyncio
+async def test_bulk_charge_probes_only_the_locked_owners_keys(
+    monkeypatch, engine, sessionmaker
+):
+    monkeypatch.setattr("core.db.repo.billing.PERIOD_CHARGE_LOOKUP_BATCH", 2)
+    _, server = await _user_and_server()
+    owners = []
+    for index in range(3):
+        owner = await UserService(uow).register(88_000 + index, balance="10.00")
+        owners.append(owner)
+        async with uow() as repos:
+            await repos["configs"].create(server.id, owner.id, f"probe-{index}", "P")
+    async with uow() as repos:
+        # A charge of another period must neither be read nor block this one.
+        await repos["billing"].apply_balance_change(
+            user_id=owners[0].id,
+            amount="-1.00",
+            kind=LedgerKind.PERIODIC_CHARGE,
+            idempotency_key=f"billing:other:user:{owners[0].id}",
+            allow_negative_balance=False,
+        )
+
+    lookups = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "idempotency_key IN" in (
+            statement
+        ):
+            lookups.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        start = datetime(2026, 7, 12, 12, tzinfo=timezone.utc)
+        async with uow() as repos:
+            charged = await repos["billing"].charge_period(
+                period_key="probe",
+                period_start=start,
+                period_end=start + timedelta(hours=1),
+                cost_per_config="1.00",
+                bulk=True,
+            )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    assert sorted(result.user.id for result in charged) == [o.id for o in owners]
+    assert len(lookups) == 2
+    assert not any("LIKE" in statement for statement in lookups)
+
+
+@pytest.mark.asyncio
+async def test_each_billing_shard_probes_only_its_owners_charge_keys(
+    monkeypatch, engine, sessionmaker
+):
+    monkeypatch.setattr(settings, "billing_shard_size", 1)
+    _, server = await _user_and_server()
+    owners = []
+    for index in range(3):
+        owner = await UserService(uow).register(87_000 + index, balance="10.00")
+        owners.append(owner)
+        async with uow() as repos:
+            await repos["configs"].create(server.id, owner.id, f"probe-{index}", "P")
+
+    probed = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "idempotency_key IN" in (
+            statement
+        ):
+            probed.append([p for p in parameters if str(p).startswith("billing:")])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        charged = await BillingService(
+            uow,
+            per_config_cost="1.00",
+            billing_period_seconds=3600,
+            clock=lambda: datetime(2026, 7, 12, 12, 15, tzinfo=timezone.utc),
+        ).charge_all()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    assert len(charged) == 3
+    # One statement per shard, bound to that shard's single owner only.
+    assert [len(keys) for keys in probed] == [1, 1, 1]
+    assert [keys[0].rsplit(":", 1)[1] for keys in probed] == [
+        str(owner.id) for owner in owners
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sharded_billing_run_resumes_after_a_failed_shard(
+    monkeypatch, sessionmaker
+):
+    monkeypatch.setattr(settings, "billing_shard_size", 1)
+    _, server = await _user_and_server()
+    owners = []
+    for index in range(3):
+        owner = await UserService(uow).register(89_000 + index, balance="10.00")
+        owners.append(owner)
+        async with uow() as repos:
+            await repos["configs"].create(
+                server.id, owner.id, f"shard-{index}", "Shard"
+            )
+
+    original_charge = BillingRepo.charge_billing_shard
+    calls = []
+
+    async def crash_second_shard(self, shard, **kwargs):
+        calls.append(shard.shard_index)
+        if len(calls) == 2:
+            raise RuntimeError("worker crashed")
+        return await original_charge(self, shard, **kwargs)
+
+    monkeypatch.setattr(BillingRepo, "charge_billing_shard", crash_second_shard)
+    billing = BillingService(
+        uow,
+        per_config_cost="1.00",
+        billing_period_seconds=3600,
+        clock=lambda: datetime(2026, 7, 12, 12, 15, tzinfo=timezone.utc),
+    )
+    with pytest.raises(RuntimeError, match="worker crashed"):
+        await billing.charge_all()
+
+    async with uow() as repos:
+        session = repos["billing"].session
+        run = await session.scalar(select(BillingRun))
+        assert run.status == "running"
+        shards = (
+            await session.scalars(
+                select(BillingRunShard).order_by(BillingRunShard.shard_index)
+            )
+        ).all()
+        assert [shard.status for shard in shards] == [
+            "completed",
+            "pending",
+            "pending",
+        ]
+        assert shards[0].first_user_id is None
+        assert shards[-1].last_user_id is None
+        assert await repos["billing"].list_unfinished_billing_periods() == [
+            run.period_key
+        ]
+
+    # Replaying the same period resumes instead of claiming it again.
+    assert await billing.start_billing_period() == run.period_key
+    resumed = await billing.resume_billing_periods()
+    assert sorted(user.id for user in resumed) == [o.id for o in owners[1:]]
+    assert calls == [0, 1, 1, 2]
+    assert await billing.charge_all() == {}
+
+    for owner in owners:
+        assert (await UserService(uow).get(owner.id)).balance == Decimal("9.00")
+    async with uow() as repos:
+        run = await repos["billing"].session.scalar(
+            select(BillingRun).execution_options(populate_existing=True)
+        )
+        assert run.status == "completed"
+        assert run.charged_users == 3
+        assert run.total_amount == Decimal("3.00")
+        assert await repos["billing"].list_unfinished_billing_periods() == []
+
+
+@pytest.mark.asyncio
+async def test_billing_suspensions_are_planned_as_a_set_and_fan_out_per_server(
+    monkeypatch, sessionmaker
+):
+    monkeypatch.setattr(settings, "billing_suspend_concurrency", 8)
+    monkeypatch.setattr(settings, "billing_suspend_per_server_concurrency", 2)
+    _, first_server = await _user_and_server()
+    second_server = await ServerService(uow).create(
+        name="billing-test-2",
+        ip="127.0.0.2",
+        port=8080,
+        host="vpn2.test",
+        location="local",
+        api_key="secret",
+        cost=0,
+    )
+    await mark_server_ready(second_server.id)
+    exhausted = []
+    for index in range(6):
+        owner = await UserService(uow).register(88_000 + index, balance="1.00")
+        exhausted.append(owner)
+        async with uow() as repos:
+            for server in (first_server, second_server):
+                await repos["configs"].create(
+                    server.id, owner.id, f"set-{index}-{server.id}", "Set"
+                )
+    solvent = await UserService(uow).register(88_100, balance="10.00")
+    async with uow() as repos:
+        kept = await repos["configs"].create(
+            first_server.id, solvent.id, "set-solvent", "Set"
+        )
+
+    in_flight: dict[str, int] = {}
+    peaks: dict[str, int] = {}
+    overall_peak = 0
+
+    class SlowGateway(BillingGateway):
+        def __init__(self, ip: str) -> None:
+            super().__init__()
+            self.ip = ip
+
+        async def suspend_client(self, *args, **kwargs):
+            nonlocal overall_peak
+            in_flight[self.ip] = in_flight.get(self.ip, 0) + 1
+            peaks[self.ip] = max(peaks.get(self.ip, 0), in_flight[self.ip])
+            overall_peak = max(overall_peak, sum(in_flight.values()))
+            await asyncio.sleep(0.01)
+            in_flight[self.ip] -= 1
+
+    monkeypatch.setattr(
+        "core.services.config.APIGateway",
+        lambda ip, *args, **kwargs: SlowGateway(ip),
+    )
+    observed = []
+    monkeypatch.setattr(
+        "core.services.billing_components.observe_billing_suspensions",
+        lambda *args: observed.append(args),
+    )
+    planned_batches = []
+    original_list = ConfigRepo.list_owners_for_update
+
+    async def record_batch(self, owner_ids):
+        planned_batches.append(sorted(owner_ids))
+        return await original_list(self, owner_ids)
+
+    monkeypatch.setattr(ConfigRepo, "list_owners_for_update", record_batch)
+
+    charged = await BillingService(
+        uow,
+        per_config_cost="0.50",
+        billing_period_seconds=3600,
+        clock=lambda: datetime(2026, 7, 12, 12, 15, tzinfo=timezone.utc),
+    ).charge_all()
+
+    assert len(charged) == 7
+    assert planned_batches == [[owner.id for owner in exhausted]]
+    assert peaks == {"127.0.0.1": 2, "127.0.0.2": 2}
+    assert overall_peak == 4
+    assert len(observed) == 1
+    planned, suspended, lag = observed[0]
+    assert (planned, suspended) == (12, 12)
+    assert lag >= 0
+    async with uow() as repos:
+        configs = await repos["configs"].list_owners_for_update(
+            [owner.id for owner in exhausted] + [solvent.id]
+        )
+    for cfg in configs:
+        expected = VPNState.ACTIVE if cfg.id == kept.id else VPNState.SUSPENDED
+        assert (cfg.desired_state, cfg.actual_state) == (
+            expected.value,
+            expected.value,
+        )
+
+
 @pytest.mark.asyncio
 async def test_overlapping_billing_schedule_is_rejected(sessionmaker):
     user, server = await _user_and_server(balance=Decimal("10.00"))
@@ -580,6 +1016,55 @@ async def test_billing_notice_is_committed_to_postgres_outbox(sessionmaker):
     assert "сутки" in item.text
 
 
+@pytest.mark.asyncio
+async def test_bulk_outbox_insert_is_one_statement_per_batch_and_skips_conflicts(
+    monkeypatch, sessionmaker, engine
+):
+    monkeypatch.setattr("core.db.repo.billing.NOTIFICATION_OUTBOX_INSERT_BATCH", 3)
+    async with uow() as repos:
+        await repos["billing"].add_notification_outbox(
+            dedupe_key="bulk-outbox:1", chat_id=1, text="already queued"
+        )
+
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO notification_outbox"):
+            inserts.append(executemany)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_inserts)
+    try:
+        async with uow() as repos:
+            inserted = await repos["billing"].add_notification_outbox_many(
+                [
+                    (f"bulk-outbox:{index}", index, f"notice {index}")
+                    for index in range(5)
+                ]
+            )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_inserts)
+
+    assert inserted == 4
+    assert inserts == [False, False]
+    async with uow() as repos:
+        rows = (
+            await repos["billing"].session.scalars(
+                select(NotificationOutbox).order_by(NotificationOutbox.dedupe_key)
+            )
+        ).all()
+    assert [(row.dedupe_key, row.text, row.status) for row in rows] == [
+        ("bulk-outbox:0", "notice 0", "pending"),
+        ("bulk-outbox:1", "already queued", "pending"),
+        ("bulk-outbox:2", "notice 2", "pending"),
+        ("bulk-outbox:3", "notice 3", "pending"),
+        ("bulk-outbox:4", "notice 4", "pending"),
+    ]
+    assert all(row.next_attempt_at is not None for row in rows)
+    with pytest.raises(InvalidOperationError):
+        async with uow() as repos:
+            await repos["billing"].add_notification_outbox_many([("ok", 1, "")])
+
+
 @pytest.mark.asyncio
 async def test_outbox_republishes_until_consumer_settles(monkeypatch, sessionmaker):
     monkeypatch.setattr(settings, "notification_visibility_timeout", 30)
@@ -772,6 +1257,60 @@ async def test_rejected_non_provision_operation_never_refunds_creation(
     assert (await UserService(uow).get(user.id)).balance == Decimal("10.00")
 
 
+@pytest.mark.asyncio
+async def test_refund_pass_only_visits_queued_rejections(monkeypatch, sessionmaker):
+    user, server = await _user_and_server(balance=Decimal("20.00"))
+    billing = BillingService(uow, per_config_cost="1.00")
+    gateway = BillingGateway("transport")
+    monkeypatch.setattr(
+        "core.services.config.APIGateway", lambda *args, **kwargs: gateway
+    )
+    with pytest.raises(APITransportError):
+        await billing.create_paid_config(
+            server_id=server.id,
+            owner_id=user.id,
+            name="queued-refund",
+            display_name="Queued",
+            creation_cost="10.00",
+        )
+    async with uow() as repos:
+        session = repos["billing"].session
+        assert await session.scalar(select(func.count(PendingConfigRefund.id))) == 0
+        # Rejected history that is not queued is never scanned again.
+        await session.execute(
+            update(VPNOperation)
+            .where(VPNOperation.config_name == "queued-refund")
+            .values(status=VPNOperationStatus.REJECTED.value)
+        )
+    assert await billing.reconcile_pending_config_operations() == ({}, 0)
+
+    async with uow() as repos:
+        await repos["billing"].session.execute(
+            update(VPNOperation)
+            .where(VPNOperation.config_name == "queued-refund")
+            .values(
+                status=VPNOperationStatus.RUNNING.value,
+                lease_token="lease",
+            )
+        )
+        operation = await repos["billing"].session.scalar(
+            select(VPNOperation).where(VPNOperation.config_name == "queued-refund")
+        )
+        assert await repos["vpn_operations"].mark_rejected(
+            operation.operation_id,
+            "rejected",
+            lease_token="lease",
+            now=datetime.now(timezone.utc),
+        )
+
+    _, refunded = await billing.reconcile_pending_config_operations()
+    assert refunded == 1
+    assert (await UserService(uow).get(user.id)).balance == Decimal("20.00")
+    async with uow() as repos:
+        session = repos["billing"].session
+        assert await session.scalar(select(func.count(PendingConfigRefund.id))) == 0
+
+
 @pytest.mark.asyncio
 async def test_insufficient_reservation_rolls_back_staged_provision(sessionmaker):
     user, server = await _user_and_server(balance=Decimal("5.00"))
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+MIGRATION_PATH = (
+    Path(__file__).parents[1]
+    / "alembic"
+    / "versions"
+    / "b5c8e2f4a610_billing_run_shards.py"
+)
+
+
+def _migration_module():
+    spec = importlib.util.spec_from_file_location(
+        "billing_run_shards_migration", MIGRATION_PATH
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_billing_shard_migration_round_trips_and_guards_pending_runs_sqlite():
+    migration = _migration_module()
+    assert migration.down_revision == "e9f1a2b3c4d5"
+    engine = sa.create_engine("sqlite+pysqlite:///:memory:")
+    metadata = sa.MetaData()
+    sa.Table("billing_run", metadata, sa.Column("id", sa.Integer(), primary_key=True))
+    metadata.create_all(engine)
+    shard = sa.table(
+        "billing_run_shard",
+        sa.column("id"),
+        sa.column("billing_run_id"),
+        sa.column("shard_index"),
+        sa.column("first_user_id"),
+        sa.column("last_user_id"),
+        sa.column("status"),
+    )
+
+    with engine.begin() as connection:
+        migration.op = Operations(MigrationContext.configure(connection))
+        migration.upgrade()
+        connection.execute(
+            sa.insert(shard).values(
+                id=1, billing_run_id=1, shard_index=0, last_user_id=10
+            )
+        )
+        with pytest.raises(IntegrityError):
+            with connection.begin_nested():
+                connection.execute(
+                    sa.insert(shard).values(id=2, billing_run_id=1, shard_index=0)
+                )
+        with pytest.raises(IntegrityError):
+            with connection.begin_nested():
+                connection.execute(
+                    sa.insert(shard).values(
+                        id=3,
+                        billing_run_id=1,
+                        shard_index=1,
+                        first_user_id=11,
+                        last_user_id=5,
+                    )
+                )
+
+        with pytest.raises(RuntimeError, match="billing shard downgrade"):
+            migration.downgrade()
+        connection.execute(sa.update(shard).values(status="completed"))
+        migration.downgrade()
+        assert "billing_run_shard" not in sa.inspect(connection).get_table_names()
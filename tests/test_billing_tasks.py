@@ -1,8 +1,14 @@
+import asyncio
 import importlib
+import signal
 import types
 
 import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
 
+from core.config import settings
+from core.db.models.notification_outbox import NotificationOutbox
 from core.db.unit_of_work import uow
 from core.services import BillingService, ServerService, UserService
 from tests.fleet_test_support import mark_server_ready
@@ -53,8 +59,9 @@ async def test_charge_and_notify(monkeypatch, sessionmaker):
         def __init__(self, *a, **kw):
             pass
 
-        async def enqueue(self, chat_id, text, *, notification_id=None):
-            sent.append((chat_id, text))
+        async def enqueue_many(self, items):
+            sent.extend((chat_id, text) for _id, chat_id, text in items)
+            return [True] * len(items)
 
     monkeypatch.setattr(billing_tasks, "NotificationService", DummyService)
 
@@ -202,3 +209,307 @@ def test_scheduler_registers_referral_reconciliation(monkeypatch):
     assert referral_job["func"] is scheduler_module.reconcile_referral_rewards
     assert referral_job["interval"] == 300
     assert referral_job["repeat"] is None
+
+    count_job = next(
+        job for job in scheduled if job["id"] == "check_managed_config_counts_job"
+    )
+    assert count_job["func"] is scheduler_module.check_managed_config_counts
+    assert count_job["interval"] == 3600
+
+    rollup_job = next(
+        job for job in scheduled if job["id"] == "roll_up_server_status_job"
+    )
+    assert rollup_job["func"] is scheduler_module.roll_up_server_status
+    assert rollup_job["interval"] == 300
+
+    audit_job = next(
+        job for job in scheduled if job["id"] == "recover_fleet_drift_audits_job"
+    )
+    assert audit_job["func"] is scheduler_module.recover_fleet_drift_audits
+    assert audit_job["interval"] == 60
+
+
+@pytest.mark.asyncio
+async def test_fleet_drift_audit_recovery_queues_abandoned_audits(monkeypatch):
+    import billing_daemon.billing_tasks as billing_tasks
+
+    enqueued = []
+
+    class DummyAuditService:
+        def __init__(self, unit_of_work):
+            pass
+
+        async def recover_abandoned(self):
+            return ["audit-1", "audit-2"]
+
+    monkeypatch.setattr(billing_tasks, "FleetDriftAuditService", DummyAuditService)
+    monkeypatch.setattr(billing_tasks, "enqueue_fleet_drift_audit", enqueued.append)
+
+    assert await billing_tasks._recover_fleet_drift_audits_async() == 2
+    assert enqueued == ["audit-1", "audit-2"]
+
+
+@pytest.mark.asyncio
+async def test_charge_job_fans_out_shard_helpers(monkeypatch):
+    import billing_daemon.billing_tasks as billing_tasks
+
+    calls = []
+    enqueued = []
+
+    class DummyBillingService:
+        def __init__(self, unit_of_work, *, per_config_cost):
+            pass
+
+        async def resume_billing_periods(self):
+            calls.append("resume")
+
+        async def start_billing_period(self):
+            calls.append("start")
+            return "period-key"
+
+        async def charge_billing_shards(self, period_key):
+            calls.append(("shards", period_key))
+
+    class DummyQueue:
+        def __init__(self, name, *, connection):
+            assert name == "billing"
+
+        def enqueue(self, func, *args):
+            enqueued.append((func, args))
+
+    async def dummy_publish():
+        calls.append("publish")
+
+    monkeypatch.setattr(billing_tasks, "BillingService", DummyBillingService)
+    monkeypatch.setattr(billing_tasks, "Queue", DummyQueue)
+    monkeypatch.setattr(billing_tasks.Redis, "from_url", lambda url: object())
+    monkeypatch.setattr(
+        billing_tasks, "_publish_notification_outbox_async", dummy_publish
+    )
+    monkeypatch.setattr(billing_tasks.settings, "maintenance_mode", False)
+    monkeypatch.setattr(billing_tasks.settings, "billing_enabled", True)
+    monkeypatch.setattr(billing_tasks.settings, "billing_shard_workers", 3)
+
+    assert await billing_tasks._charge_all_and_notify_async() is True
+    assert calls == ["resume", "start", ("shards", "period-key"), "publish"]
+    assert enqueued == [
+        (billing_tasks.charge_billing_shards, ("period-key",)),
+        (billing_tasks.charge_billing_shards, ("period-key",)),
+    ]
+
+
+def test_persistent_job_runtime_reuses_loop_pools_and_clients(monkeypatch, tmp_path):
+    import billing_daemon.billing_tasks as billing_tasks
+    from billing_daemon import job_runtime
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    observed = []
+    monkeypatch.setattr(
+        job_runtime,
+        "observe_job_runtime",
+        lambda name, **kwargs: observed.append((name, kwargs)),
+    )
+    monkeypatch.setattr(billing_tasks, "get_current_job", lambda: None)
+    monkeypatch.setattr(
+        billing_tasks, "observe_background_job", lambda *args, **kwargs: None
+    )
+
+    class DummyService:
+        closed = 0
+
+        async def aclose(self):
+            DummyService.closed += 1
+
+    monkeypatch.setattr(billing_tasks, "NotificationService", DummyService)
+    loops = []
+    services = []
+
+    async def job():
+        loops.append(asyncio.get_running_loop())
+        services.append(billing_tasks._notification_service())
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        return True
+
+    with job_runtime.JobRuntime(engine) as runtime:
+        assert job_runtime.current_runtime() is runtime
+        assert billing_tasks._run_observed_job("first", job) is True
+        assert billing_tasks._run_observed_job("second", job) is True
+
+    assert job_runtime.current_runtime() is None
+    assert loops[0] is loops[1] and loops[0].is_closed()
+    assert services[0] is services[1] and DummyService.closed == 1
+    assert [
+        (name, stats["checkouts"], stats["connects"]) for name, stats in observed
+    ] == [
+        ("first", 1, 1),
+        ("second", 1, 0),
+    ]
+
+
+def test_persistent_job_runtime_cancels_an_interrupted_job(monkeypatch, tmp_path):
+    from billing_daemon import job_runtime
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.setattr(job_runtime, "observe_job_runtime", lambda *a, **kw: None)
+    cancelled = []
+
+    async def hung_job():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with job_runtime.JobRuntime(engine) as runtime:
+        # RQ enforces job timeouts with SIGALRM raising in the main thread.
+        def timeout(*_args):
+            raise TimeoutError("timeout")
+
+        previous = signal.signal(signal.SIGALRM, timeout)
+        signal.setitimer(signal.ITIMER_REAL, 0.05)
+        try:
+            with pytest.raises(TimeoutError):
+                runtime.run("hung", hung_job)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+        assert cancelled == [True]
+        assert runtime.run("next", lambda: asyncio.sleep(0, result="ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_outbox_publisher_drains_in_adaptive_batches(monkeypatch, sessionmaker):
+    import fakeredis.aioredis
+
+    from billing_daemon.outbox_publisher import OutboxPublisher
+    from core.services.notifications import NotificationService
+
+    monkeypatch.setattr(settings, "notifications_enabled", True)
+    async with uow() as repos:
+        for index in range(50):
+            await repos["billing"].add_notification_outbox(
+                dedupe_key=f"adaptive:{index}", chat_id=index, text="notice"
+            )
+
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    publisher = OutboxPublisher(
+        uow, NotificationService(redis_client), min_batch=4, max_batch=16
+    )
+    limits = []
+    original = publisher.publish_batch
+
+    async def record(limit):
+        limits.append(limit)
+        return await original(limit)
+
+    monkeypatch.setattr(publisher, "publish_batch", record)
+
+    assert await publisher.drain() == 50
+    assert limits == [4, 8, 16, 16, 16]
+    assert publisher.batch_size == 8
+    assert await redis_client.llen("notifications") == 50
+    async with uow() as repos:
+        assert await repos["billing"].claim_notification_outbox() == []
+    assert await publisher.drain() == 0
+
+
+@pytest.mark.asyncio
+async def test_outbox_publisher_retries_the_whole_batch_when_redis_fails(
+    monkeypatch, sessionmaker
+):
+    from billing_daemon.outbox_publisher import OutboxPublisher
+
+    monkeypatch.setattr(settings, "notifications_enabled", True)
+    async with uow() as repos:
+        for index in range(3):
+            await repos["billing"].add_notification_outbox(
+                dedupe_key=f"redis-down:{index}", chat_id=index, text="notice"
+            )
+
+    class BrokenNotifications:
+        async def enqueue_many(self, items):
+            raise ConnectionError("redis down")
+
+    publisher = OutboxPublisher(uow, BrokenNotifications(), min_batch=10)
+    assert await publisher.publish_batch(10) == 3
+    async with uow() as repos:
+        rows = (
+            await repos["billing"].session.scalars(
+                select(NotificationOutbox).order_by(NotificationOutbox.id)
+            )
+        ).all()
+    assert [(row.status, row.attempts) for row in rows] == [("pending", 1)] * 3
+    assert all("redis down" in row.last_error for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_outbox_listener_reconnects_after_losing_its_connection(monkeypatch):
+    from billing_daemon import outbox_publisher
+
+    monkeypatch.setattr(outbox_publisher, "LISTEN_RETRY_MIN_SECONDS", 0)
+    events = []
+    monkeypatch.setattr(outbox_publisher, "observe_outbox_listener", events.append)
+
+    class Driver:
+        def __init__(self):
+            self.listeners = []
+            self.terminations = []
+
+        def add_termination_listener(self, callback):
+            self.terminations.append(callback)
+
+        def remove_termination_listener(self, callback):
+            self.terminations.remove(callback)
+
+        async def add_listener(self, channel, callback):
+            self.listeners.append(channel)
+
+        async def remove_listener(self, channel, callback):
+            self.listeners.remove(channel)
+
+    class Connection:
+        def __init__(self):
+            self.driver = Driver()
+            self.invalidated = False
+            self.closed = False
+
+        async def get_raw_connection(self):
+            return types.SimpleNamespace(driver_connection=self.driver)
+
+        async def invalidate(self):
+            self.invalidated = True
+
+        async def close(self):
+            self.closed = True
+
+    class Engine:
+        def __init__(self):
+            self.attempts = 0
+            self.connections = []
+
+        async def connect(self):
+            self.attempts += 1
+            if self.attempts == 1:
+                raise ConnectionError("database starting up")
+            self.connections.append(Connection())
+            return self.connections[-1]
+
+    engine, wakeup = Engine(), asyncio.Event()
+    async with outbox_publisher._OutboxListener(engine, wakeup):
+        await asyncio.wait_for(wakeup.wait(), timeout=1)
+        first = engine.connections[0]
+        assert first.driver.listeners == [outbox_publisher.NOTIFICATION_OUTBOX_CHANNEL]
+
+        wakeup.clear()
+        for callback in first.driver.terminations:
+            callback(first.driver)
+        # The replacement subscription drains whatever was missed meanwhile.
+        await asyncio.wait_for(wakeup.wait(), timeout=1)
+        assert first.invalidated and first.closed
+        assert len(engine.connections) == 2
+
+    second = engine.connections[1]
+    assert second.closed and not second.invalidated
+    assert second.driver.listeners == []
+    assert events == ["failed", "connected", "lost", "connected"]
@@ -166,19 +166,22 @@ async def test_create_config_presents_monthly_price_without_hourly_microcharge(
 ):
     class State:
         selected = None
+        data: dict = {}
 
         async def set_state(self, value):
             self.selected = value
 
+        async def update_data(self, **kwargs):
+            self.data = {**self.data, **kwargs}
+
     async def register(*args, **kwargs):
         return SimpleNamespace(id=1)
 
-    async def list_servers(*, available_only=False):
-        assert available_only is True
-        return [SimpleNamespace(id=7, location="🇳🇱", name="Amsterdam")]
+    async def locations():
+        return ["🇳🇱 Amsterdam"]
 
     monkeypatch.setattr(configs, "get_or_create_user", register)
-    monkeypatch.setattr(configs.server_service, "list", list_servers)
+    monkeypatch.setattr(configs.placement_engine, "locations", locations)
     monkeypatch.setattr(configs.settings, "maintenance_mode", False)
     monkeypatch.setattr(configs.settings, "provisioning_enabled", True)
     monkeypatch.setattr(configs.settings, "config_creation_cost", Decimal("10.00"))
@@ -200,6 +203,11 @@ async def test_create_config_presents_monthly_price_without_hourly_microcharge(
     assert "0,07 ₽" not in text
     assert "раз в час" not in text
     assert state.selected == CreateConfig.choosing_server
+    markup = message.calls[-1][1]["reply_markup"]
+    assert [
+        button.callback_data for row in markup.inline_keyboard for button in row
+    ] == ["loc:1"]
+    assert state.data == {"locations": ["🇳🇱 Amsterdam"]}
 
 
 @pytest.mark.asyncio
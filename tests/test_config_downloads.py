@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import httpx
+import pytest
+
+from core.config import settings
+from core.db.unit_of_work import uow
+from core.exceptions import ConfigNotFoundError
+from core.services import ConfigService, ServerService, UserService
+from core.services.api_gateway import APIGateway
+from core.services.config_downloads import ConfigDownloadCache, config_downloads
+from core.services.manager_clients import ManagerClientRegistry
+from scripts.fake_manager import FakeManager
+from tests.fleet_test_support import mark_server_ready
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_encrypts_expires_and_evicts_by_size(monkeypatch):
+    clock = Clock()
+    cache = ConfigDownloadCache(clock=clock)
+    profile = b"<key>private</key>" * 10
+
+    cache.put(1, "op-1", profile)
+    assert profile not in cache._entries[1].token
+    assert cache.get(1, "op-1") == profile
+    # A new provision operation never sees the previous profile.
+    assert cache.get(1, "op-2") is None
+    assert cache.size_bytes == 0
+
+    cache.put(1, "op-1", profile)
+    clock.now += settings.vpn_config_cache_ttl_seconds
+    assert cache.get(1, "op-1") is None
+
+    entry_size = len(ConfigDownloadCache._fernet().encrypt(profile))
+    monkeypatch.setattr(settings, "vpn_config_cache_max_bytes", entry_size * 2)
+    for config_id in (1, 2):
+        cache.put(config_id, "op", profile)
+    assert cache.get(1, "op") == profile
+    cache.put(3, "op", profile)
+    assert [cache.get(config_id, "op") is not None for config_id in (1, 2, 3)] == [
+        True,
+        False,
+        True,
+    ]
+    assert cache.size_bytes == entry_size * 2
+
+    monkeypatch.setattr(settings, "vpn_config_cache_enabled", False)
+    assert cache.get(1, "op") is None
+
+
+@pytest.mark.asyncio
+async def test_repeat_downloads_skip_the_manager_until_revoked(
+    monkeypatch, sessionmaker
+):
+    manager = FakeManager()
+    pool = ManagerClientRegistry(
+        transport_factory=lambda verify: httpx.ASGITransport(app=manager.app)
+    )
+    monkeypatch.setattr(
+        "core.services.config.APIGateway",
+        lambda *args, **kw: APIGateway(*args, pool=pool, retries=0, **kw),
+    )
+    user = await UserService(uow).register(83001)
+    server = await ServerService(uow).create(
+        name="downloads",
+        ip="127.0.0.1",
+        port=8080,
+        host="vpn.downloads.test",
+        location="local",
+        api_key="secret",
+        cost=0,
+    )
+    await mark_server_ready(server.id)
+    service = ConfigService(uow)
+    cfg = await service.create_config(
+        server_id=server.id, owner_id=user.id, name="dl-83001", display_name="Phone"
+    )
+
+    profile = await service.download_config(cfg.id)
+    assert await service.download_config(cfg.id) == profile
+    await service.suspend_config(cfg.id)
+    manager.options = replace(manager.options, error_rate=1.0)
+    # A Manager hiccup no longer reaches the user once the profile is cached.
+    assert await service.download_config(cfg.id) == profile
+    assert manager.requests["GET /clients/{name}/config"] == 1
+
+    manager.options = replace(manager.options, error_rate=0.0)
+    await service.revoke_config(cfg.id)
+    assert config_downloads.size_bytes == 0
+    with pytest.raises(ConfigNotFoundError):
+        await service.download_config(cfg.id)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from core.db.unit_of_work import uow
+from core.exceptions import APIAuthenticationError, APIRateLimitError
+from core.services import ServerService, UserService
+from core.services.api_gateway import APIGateway
+from core.services.manager_clients import ManagerClientRegistry
+from core.services.vpn_drift import VPNDriftService
+from scripts.fake_manager import FakeManager, FakeManagerOptions
+
+
+def _pool(manager: FakeManager) -> ManagerClientRegistry:
+    return ManagerClientRegistry(
+        transport_factory=lambda verify: httpx.ASGITransport(app=manager.app)
+    )
+
+
+def _gateway(manager: FakeManager, api_key: str = "secret", **kwargs) -> APIGateway:
+    return APIGateway(
+        "127.0.0.1", 8080, api_key, server_id=1, pool=_pool(manager), **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_gateway_speaks_the_fake_manager_contract():
+    manager = FakeManager(clients=["alice", "bob", "carol"])
+
+    async with _gateway(manager) as api:
+        status = await api.get_status()
+        assert status.inventory.counts.total == 3
+        assert "bulk_mutations" in status.capabilities
+
+        inventory = await api.get_client_inventory()
+        assert inventory.count == 3
+        assert await api.get_client_inventory(etag=inventory.etag) is None
+
+        results = await api.bulk_mutate("suspend", ["alice", "zed"])
+        assert results["alice"].succeeded
+        assert results["zed"].status_code == 404
+        assert (await api.get_client_state("alice")).suspended
+        assert await api.list_blocked() == ["alice"]
+
+        await api.revoke_client("bob", operation_id="op-1")
+        # A retried mutation replays the first response, not a fresh 404.
+        await api.revoke_client("bob", operation_id="op-1")
+        assert (await api.get_client_state("bob")).state == "revoked"
+        assert len(await api.download_config("carol")) == manager.options.config_bytes
+
+        changed = await api.get_client_inventory(etag=inventory.etag)
+        assert changed.revision != inventory.revision
+
+    with pytest.raises(APIAuthenticationError):
+        async with _gateway(manager, api_key="wrong") as api:
+            await api.get_status()
+
+    throttled = FakeManager(FakeManagerOptions(throttle_rate=1.0))
+    with pytest.raises(APIRateLimitError):
+        async with _gateway(throttled, retries=0) as api:
+            await api.get_status()
+    assert throttled.injected["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_drift_audit_against_a_fake_fleet_node(sessionmaker):
+    user = await UserService(uow).register(82001)
+    server = await ServerService(uow).create(
+        name="fake",
+        ip="127.0.0.1",
+        port=8080,
+        host="vpn.fake.test",
+        location="local",
+        api_key="secret",
+        cost=0,
+    )
+    async with uow() as repos:
+        for name in ("fake-0", "fake-1"):
+            await repos["configs"].create(server.id, user.id, name, "Fake")
+    manager = FakeManager(clients=["fake-0", "fake-1", "stray"])
+    pool = _pool(manager)
+    service = VPNDriftService(
+        uow,
+        gateway_factory=lambda *args, **kwargs: APIGateway(*args, pool=pool, **kwargs),
+    )
+
+    report = await service.audit_server(server.id)
+    assert [(item.name, item.reason) for item in report.findings] == [
+        ("stray", "remote_only_live")
+    ]
+
+    again = await service.audit_server(server.id, etag=report.inventory_etag)
+    assert again.unchanged
+    assert again.findings == report.findings
+    assert manager.requests["GET /clients"] == 2
@@ -5,7 +5,8 @@ from decimal import Decimal
 
 import pytest
 from pydantic import ValidationError
-from sqlalchemy import select
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from starlette.requests import Request
 
 from admin.fleet_schemas import (
@@ -25,7 +26,12 @@ from core.db.models import (
 from core.db.unit_of_work import uow
 from core.domain import VPNState
 from core.exceptions import InvalidOperationError
-from core.services import ConfigService, ServerService, UserService
+from core.services import (
+    ConfigService,
+    PlacementEngine,
+    ServerService,
+    UserService,
+)
 
 INSTANCE_ID = "56c1ab62-0c42-4f03-83c6-4c8e6c43e29b"
 
@@ -333,3 +339,237 @@ async def test_healthy_matching_server_is_eligible_until_capacity_is_really_free
         config = await session.get(VPN_Config, config_id)
         config.actual_state = VPNState.REVOKED.value
     assert await servers.accepts_new_config(server.id) is True
+
+
+@pytest.mark.asyncio
+async def test_managed_config_counter_tracks_writes_and_is_repaired(
+    engine, sessionmaker
+):
+    server = await _server(sessionmaker, max_configs=3)
+    await _status(sessionmaker, server.id)
+    user = await UserService(uow).register(70400)
+    servers = ServerService(uow)
+
+    async def counter() -> int:
+        async with sessionmaker() as session:
+            return await session.scalar(
+                select(Server.managed_config_count).where(Server.id == server.id)
+            )
+
+    revoked = VPNState.REVOKED.value
+    async with uow() as repos:
+        first = await repos["configs"].create(server.id, user.id, "count-1", "One")
+        await repos["configs"].create(
+            server.id,
+            user.id,
+            "count-gone",
+            "Gone",
+            desired_state=revoked,
+            actual_state=revoked,
+        )
+        second = await repos["configs"].create(server.id, user.id, "count-2", "Two")
+    assert await counter() == 2
+
+    async with uow() as repos:
+        await repos["configs"].suspend(first.id)
+        await repos["configs"].begin_transition(
+            first.id, desired_state=revoked, operation_id="count-revoke"
+        )
+    # A revoke intent keeps consuming capacity until Manager converges.
+    assert await counter() == 2
+    async with uow() as repos:
+        await repos["configs"].complete_transition(
+            first.id, operation_id="count-revoke", actual_state=revoked
+        )
+    assert await counter() == 1
+    async with uow() as repos:
+        # Reactivating the suspended, since revoked, config reclaims capacity.
+        await repos["configs"].unsuspend_all(user.id)
+    assert await counter() == 2
+    async with uow() as repos:
+        await repos["configs"].delete_if_operation(first.id, operation_id="other")
+        await repos["configs"].delete(name="count-gone")
+    assert await counter() == 2
+
+    async with sessionmaker() as session, session.begin():
+        config = await session.get(VPN_Config, second.id)
+        config.desired_state = revoked
+        config.actual_state = revoked
+    assert await counter() == 1
+    async with sessionmaker() as session, session.begin():
+        await session.delete(await session.get(VPN_Config, first.id))
+    assert await counter() == 0
+
+    async with sessionmaker() as session, session.begin():
+        await session.execute(
+            update(Server).where(Server.id == server.id).values(managed_config_count=5)
+        )
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        # Placement trusts the counter; it never scans the server's configs.
+        assert await servers.accepts_new_config(server.id) is False
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+    assert not any("FROM vpn_config" in statement for statement in statements)
+
+    drift = await servers.check_managed_config_counts()
+    assert [(item.server_id, item.stored, item.counted) for item in drift] == [
+        (server.id, 5, 0)
+    ]
+    assert await counter() == 5
+    await servers.check_managed_config_counts(repair=True)
+    assert await counter() == 0
+    assert await servers.check_managed_config_counts() == []
+    assert await servers.accepts_new_config(server.id) is True
+
+
+@pytest.mark.asyncio
+async def test_suspend_cycle_leaves_the_managed_config_counter_alone(
+    engine, sessionmaker
+):
+    server = await _server(sessionmaker, max_configs=3)
+    user = await UserService(uow).register(70401)
+    async with uow() as repos:
+        config = await repos["configs"].create(server.id, user.id, "idle-1", "One")
+
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        async with uow() as repos:
+            await repos["configs"].suspend(config.id)
+        async with uow() as repos:
+            await repos["configs"].unsuspend_all(user.id)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+    # Neither state can leave the managed set, so no server row is touched.
+    assert not any(
+        statement.lstrip().upper().startswith("UPDATE SERVER")
+        for statement in statements
+    )
+    async with sessionmaker() as session:
+        assert (
+            await session.scalar(
+                select(Server.managed_config_count).where(Server.id == server.id)
+            )
+            == 1
+        )
+
+
+@pytest.mark.asyncio
+async def test_managed_config_counter_hook_is_scoped_to_hub_sessions(
+    engine, sessionmaker
+):
+    server = await _server(sessionmaker, max_configs=3)
+    user = await UserService(uow).register(70402)
+    plain = async_sessionmaker(engine, expire_on_commit=False)
+    async with plain() as session, session.begin():
+        session.add(
+            VPN_Config(
+                name="plain-1",
+                server_id=server.id,
+                owner_id=user.id,
+                display_name="Plain",
+            )
+        )
+    async with plain() as session:
+        assert (
+            await session.scalar(
+                select(Server.managed_config_count).where(Server.id == server.id)
+            )
+            == 0
+        )
+
+    async with uow() as repos:
+        await repos["configs"].create(server.id, user.id, "hub-1", "Hub")
+    async with plain() as session:
+        assert (
+            await session.scalar(
+                select(Server.managed_config_count).where(Server.id == server.id)
+            )
+            == 1
+        )
+
+
+@pytest.mark.asyncio
+async def test_placement_engine_picks_weighted_least_load_from_a_cached_map(
+    engine, sessionmaker
+):
+    ticks = [1000.0]
+    placement = PlacementEngine(uow, clock=lambda: ticks[0])
+    specs = {
+        "heavy": dict(location="NL", placement_weight=Decimal("2"), managed=2),
+        "small": dict(location="NL", max_configs=2, managed=0),
+        "unchecked": dict(location="DE", managed=0),
+        "closed": dict(location="FR", managed=0, lifecycle_state="disabled"),
+        "aging": dict(location="PL", managed=0),
+    }
+    ids: dict[str, int] = {}
+    async with sessionmaker() as session, session.begin():
+        for name, spec in specs.items():
+            server = Server(
+                name=name,
+                ip=f"{name}.test",
+                port=16290,
+                host=f"{name}.vpn.test",
+                location=spec["location"],
+                api_key="secret",
+                lifecycle_state=spec.get("lifecycle_state", "active"),
+                accepts_new_configs=True,
+                max_configs=spec.get("max_configs", 10),
+                placement_weight=spec.get("placement_weight", Decimal("1")),
+                managed_config_count=spec["managed"],
+                manager_instance_id=INSTANCE_ID,
+            )
+            session.add(server)
+            await session.flush()
+            ids[name] = server.id
+    for name in ("heavy", "small", "closed"):
+        await _status(sessionmaker, ids[name])
+    await _status(
+        sessionmaker,
+        ids["aging"],
+        collected_at=datetime.now(timezone.utc) - timedelta(seconds=295),
+    )
+
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        assert await placement.locations() == ["NL", "PL"]
+        loaded = len(statements)
+        picks = [await placement.choose("NL") for _ in range(5)]
+        assert await placement.choose("DE") is None
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+    assert loaded == 1
+    assert len(statements) == loaded
+    # heavy: 2 configs at weight 2; small: empty but only two slots.
+    assert picks == [
+        ids["small"],
+        ids["heavy"],
+        ids["small"],
+        ids["heavy"],
+        ids["heavy"],
+    ]
+
+    # A status that ages out while cached stops proving readiness.
+    ticks[0] += 10
+    assert await placement.locations() == ["NL"]
+    placement.discard(ids["heavy"])
+    assert await placement.choose() is None
+
+    # A reload forgets local picks and reads the committed counters again.
+    ticks[0] += 10
+    assert await placement.choose() == ids["small"]
@@ -221,6 +221,50 @@ async def test_paid_config_delivery_replay_reuses_purchase_identity(monkeypatch)
     assert calls[0][1] == "telegram:create-config:update:9001"
 
 
+@pytest.mark.asyncio
+async def test_location_choice_places_once_and_replays_on_that_server(monkeypatch):
+    msg = DummyMessage("my vpn")
+    state = DummyStateRename()
+    state.data = {"location": "NL"}
+    bot = FlakyDocumentBot()
+    picks = iter([7, 8])
+    calls = []
+
+    async def fake_get_user(tg_id, username=None):
+        return types.SimpleNamespace(id=1)
+
+    async def fake_choose(location):
+        assert location == "NL"
+        return next(picks)
+
+    async def fake_create_config(**kwargs):
+        calls.append(kwargs["server_id"])
+        return types.SimpleNamespace(id=5)
+
+    async def fake_download_config(cfg_id):
+        return b"data"
+
+    monkeypatch.setattr(handlers.configs, "get_or_create_user", fake_get_user)
+    monkeypatch.setattr(handlers.configs.placement_engine, "choose", fake_choose)
+    monkeypatch.setattr(
+        handlers.billing_service, "create_paid_config", fake_create_config
+    )
+    monkeypatch.setattr(
+        handlers.config_service, "download_config", fake_download_config
+    )
+    monkeypatch.setattr(handlers, "FSInputFile", DummyFSInputFile)
+    update = types.SimpleNamespace(update_id=9002)
+
+    with pytest.raises(RuntimeError, match="delivery interrupted"):
+        await handlers.got_name(msg, state, bot, update)
+    await handlers.got_name(msg, state, bot, update)
+
+    # The retried update must not pick again: the purchase is bound to node 7.
+    assert calls == [7, 7]
+    assert state.data["server_id"] == 7
+    assert state.cleared is True
+
+
 class DummyMessageReply:
     def __init__(self):
         self.chat = types.SimpleNamespace(id=123)
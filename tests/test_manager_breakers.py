@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from admin.fleet_service import AdminFleetService
+from core.config import settings
+from core.db.unit_of_work import uow
+from core.exceptions import APICircuitOpenError, APIServerError
+from core.observability.snapshot import render_prometheus_metrics
+from core.services import ServerService
+from core.services.api_gateway import APIGateway
+from core.services.manager_breakers import (
+    ManagerCircuitBreaker,
+    ManagerCircuitRegistry,
+    manager_circuits,
+)
+from core.services.manager_throttle import ManagerRequestThrottle
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeClient:
+    def __init__(self, outcomes) -> None:
+        self.outcomes = list(outcomes)
+        self.requests = 0
+
+    async def request(self, method, url, **kwargs):
+        self.requests += 1
+        outcome = self.outcomes.pop(0)
+        request = httpx.Request(method, f"http://vpn.example.test{url}")
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json={"blocked_clients": []}, request=request)
+
+
+async def _no_sleep(_delay):
+    return None
+
+
+def test_breaker_opens_probes_once_and_backs_off():
+    clock = Clock()
+    breaker = ManagerCircuitBreaker(
+        failure_threshold=2, open_seconds=10, max_open_seconds=25, clock=clock
+    )
+
+    for _ in range(2):
+        breaker.acquire()
+        breaker.record_failure()
+    assert breaker.snapshot().state == "open"
+    with pytest.raises(APICircuitOpenError) as caught:
+        breaker.acquire()
+    assert caught.value.retry_after == 10
+    assert caught.value.attempts == 0
+
+    clock.now += 10
+    breaker.acquire()
+    assert breaker.snapshot().state == "half_open"
+    with pytest.raises(APICircuitOpenError):
+        breaker.acquire()
+
+    breaker.record_failure()
+    snapshot = breaker.snapshot()
+    assert (snapshot.state, snapshot.open_seconds) == ("open", 20)
+    clock.now += 20
+    breaker.acquire()
+    breaker.record_failure()
+    assert breaker.snapshot().open_seconds == 25
+
+    clock.now += 25
+    breaker.acquire()
+    breaker.release()
+    breaker.acquire()
+    breaker.record_success()
+    snapshot = breaker.snapshot()
+    assert snapshot.state == "closed"
+    assert (snapshot.consecutive_failures, snapshot.open_seconds) == (0, 10)
+
+
+@pytest.mark.asyncio
+async def test_gateway_fails_fast_once_the_circuit_opens(monkeypatch):
+    monkeypatch.setattr(settings, "vpn_manager_breaker_failure_threshold", 3)
+    circuits = ManagerCircuitRegistry()
+    request = httpx.Request("GET", "http://vpn.example.test/clients/blocked")
+
+    def gateway(server_id, outcomes):
+        api = APIGateway(
+            "vpn.example.test",
+            8080,
+            "secret",
+            server_id=server_id,
+            circuits=circuits,
+            retries=6,
+            sleep=_no_sleep,
+        )
+        api._client = FakeClient(outcomes)
+        return api
+
+    # 429 means the Manager is alive and shedding load: the streak restarts.
+    flaky = gateway(
+        9, [httpx.ConnectError("refused", request=request), 503, 429, 502, 500, 504]
+    )
+    with pytest.raises(APICircuitOpenError) as caught:
+        await flaky.list_blocked()
+    assert flaky._client.requests == 6
+    assert caught.value.attempts == 6
+    assert circuits.snapshot(9).state == "open"
+
+    with pytest.raises(APICircuitOpenError) as caught:
+        await flaky.list_blocked()
+    assert flaky._client.requests == 6
+    assert caught.value.attempts == 0
+
+    healthy = gateway(10, [200])
+    assert await healthy.list_blocked() == []
+    assert circuits.state_counts() == {"closed": 1, "open": 1, "half_open": 0}
+
+    monkeypatch.setattr(settings, "vpn_manager_breaker_enabled", False)
+    unguarded = APIGateway("vpn.example.test", 8080, "secret", server_id=9, retries=0)
+    unguarded._client = FakeClient([500])
+    with pytest.raises(APIServerError):
+        await unguarded.list_blocked()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_spending_a_throttle_token():
+    circuits = ManagerCircuitRegistry()
+    breaker = circuits.get(11)
+    for _ in range(settings.vpn_manager_breaker_failure_threshold):
+        breaker.record_failure()
+    throttle = ManagerRequestThrottle(sleep=_no_sleep)
+    reserved = []
+    original_reserve = throttle._reserve
+
+    def reserve(server):
+        reserved.append(server)
+        return original_reserve(server)
+
+    throttle._reserve = reserve
+    api = APIGateway(
+        "vpn.example.test",
+        8080,
+        "secret",
+        server_id=11,
+        circuits=circuits,
+        throttle=throttle,
+        retries=0,
+    )
+    api._client = FakeClient([])
+
+    with pytest.raises(APICircuitOpenError):
+        await api.list_blocked()
+    assert reserved == []
+    assert api._client.requests == 0
+
+
+@pytest.mark.asyncio
+async def test_circuit_state_is_exported_and_shown_in_the_fleet_view(sessionmaker):
+    server = await ServerService(uow).create(
+        name="breaker",
+        ip="10.0.0.9",
+        port=8080,
+        host="vpn.breaker.test",
+        location="Test",
+        api_key="secret",
+        cost=0,
+    )
+    breaker = manager_circuits.get(server.id)
+    for _ in range(settings.vpn_manager_breaker_failure_threshold):
+        breaker.record_failure()
+
+    payload = await AdminFleetService().get_server(server.id)
+    circuit = payload["manager_circuit"]
+    assert circuit["scope"] == "admin_process"
+    assert circuit["state"] == "open"
+    assert circuit["consecutive_failures"] == (
+        settings.vpn_manager_breaker_failure_threshold
+    )
+    assert (
+        0
+        < circuit["retry_after_seconds"]
+        <= (settings.vpn_manager_breaker_open_seconds)
+    )
+
+    metrics = await render_prometheus_metrics(redis_is_ready=True)
+    assert 'vpn_hub_manager_circuits{state="open"} 1' in metrics
+    assert 'vpn_hub_manager_circuits{state="closed"} 0' in metrics
+
+    await ServerService(uow).update(server.id, api_key="rotated")
+    assert manager_circuits.snapshot(server.id).state == "closed"
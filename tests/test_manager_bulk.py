@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections import Counter
+
+import httpx
+import pytest
+
+from core.config import settings
+from core.db.unit_of_work import uow
+from core.domain import VPNOperationStatus, VPNState
+from core.exceptions import APIProtocolError
+from core.services import ConfigService, ServerService, UserService
+from core.services.api_gateway import APIGateway
+from core.services.manager_clients import ManagerClientRegistry
+from scripts.fake_manager import FakeManager, FakeManagerOptions
+from tests.fleet_test_support import mark_server_ready
+
+
+@pytest.fixture
+def fake_manager(monkeypatch):
+    monkeypatch.setattr(settings, "vpn_manager_tls_enabled", False)
+
+    def install(clients, **options) -> FakeManager:
+        manager = FakeManager(FakeManagerOptions(**options), clients=clients)
+        registry = ManagerClientRegistry(
+            transport_factory=lambda verify: httpx.ASGITransport(app=manager.app)
+        )
+        monkeypatch.setattr(
+            "core.services.config.APIGateway",
+            lambda *args, **kw: APIGateway(*args, pool=registry, retries=0, **kw),
+        )
+        return manager
+
+    return install
+
+
+async def _active_configs(tg_id: int, count: int):
+    user = await UserService(uow).register(tg_id)
+    server = await ServerService(uow).create(
+        name=f"bulk-{tg_id}",
+        ip="127.0.0.1",
+        port=8080,
+        host="vpn.bulk.test",
+        location="local",
+        api_key="secret",
+        cost=0,
+    )
+    await mark_server_ready(server.id)
+    async with uow() as repos:
+        for index in range(count):
+            await repos["configs"].create(
+                server.id, user.id, f"bulk-{tg_id}-{index}", "Bulk"
+            )
+    return user
+
+
+async def _operations(user_id: int):
+    async with uow() as repos:
+        configs = await repos["configs"].list(owner_id=user_id)
+        operations = await repos["vpn_operations"].list_by_operation_ids(
+            [cfg.operation_id for cfg in configs]
+        )
+    by_id = {operation.operation_id: operation for operation in operations}
+    return {cfg.name: (cfg, by_id[cfg.operation_id]) for cfg in configs}
+
+
+@pytest.mark.asyncio
+async def test_suspend_all_sends_one_bulk_request_and_fences_each_item(
+    fake_manager, sessionmaker
+):
+    user = await _active_configs(81001, 3)
+    names = [f"bulk-81001-{index}" for index in range(3)]
+    manager = fake_manager(names, unavailable_clients=frozenset({"bulk-81001-2"}))
+
+    assert await ConfigService(uow).suspend_all(user.id) == 2
+
+    assert manager.requests == Counter(
+        {"GET /status": 1, "POST /clients/bulk/suspend": 1}
+    )
+    assert [manager.clients[name].state for name in names] == [
+        "suspended",
+        "suspended",
+        "active",
+    ]
+    rows = await _operations(user.id)
+    for name in ("bulk-81001-0", "bulk-81001-1"):
+        cfg, operation = rows[name]
+        assert operation.status == VPNOperationStatus.SUCCEEDED.value
+        assert cfg.actual_state == VPNState.SUSPENDED.value
+    cfg, operation = rows["bulk-81001-2"]
+    assert operation.status == VPNOperationStatus.FAILED.value
+    assert operation.attempts == 1
+    assert cfg.actual_state == VPNState.ACTIVE.value
+
+    # The capability set is cached, so the next batch skips GET /status.
+    manager.requests.clear()
+    assert await ConfigService(uow).unsuspend_all(user.id) == 2
+    assert manager.requests == Counter({"POST /clients/bulk/unsuspend": 1})
+
+
+@pytest.mark.asyncio
+async def test_manager_without_bulk_capability_gets_per_client_calls(
+    fake_manager, sessionmaker
+):
+    user = await _active_configs(81002, 3)
+    names = [f"bulk-81002-{index}" for index in range(3)]
+    manager = fake_manager(names, bulk=False)
+
+    assert await ConfigService(uow).suspend_all(user.id) == 3
+
+    assert manager.requests == Counter(
+        {"GET /status": 1, "POST /clients/{name}/suspend": 3}
+    )
+    assert {manager.clients[name].state for name in names} == {"suspended"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_results_must_cover_exactly_the_requested_clients():
+    request = httpx.Request("POST", "http://vpn.example.test/clients/bulk/revoke")
+
+    class Client:
+        async def request(self, method, url, **kwargs):
+            results = [{"name": "alice", "status_code": 404}]
+            return httpx.Response(200, json={"results": results}, request=request)
+
+    gateway = APIGateway("vpn.example.test", 8080, "secret", retries=0)
+    gateway._client = Client()
+
+    results = await gateway.bulk_mutate("revoke", ["alice"])
+    assert results["alice"].status_code == 404
+    assert not results["alice"].succeeded
+    with pytest.raises(APIProtocolError):
+        await gateway.bulk_mutate("revoke", ["alice", "bob"])
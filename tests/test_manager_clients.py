@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from core.config import settings
+from core.db.unit_of_work import uow
+from core.services import ServerService
+from core.services.api_gateway import APIGateway
+from core.services.manager_clients import ManagerClientRegistry, manager_clients
+
+
+async def _keep_alive_manager():
+    """Serve ``/clients/blocked`` over HTTP/1.1 keep-alive and count sockets."""
+
+    connections = []
+    body = json.dumps({"blocked_clients": ["alice"]}).encode()
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1], connections
+
+
+@pytest.mark.asyncio
+async def test_gateways_of_one_server_share_a_keep_alive_connection(monkeypatch):
+    monkeypatch.setattr(settings, "vpn_manager_tls_enabled", False)
+    monkeypatch.setattr(settings, "vpn_manager_tls_port", None)
+    registry = ManagerClientRegistry()
+    server, port, connections = await _keep_alive_manager()
+    try:
+        for _ in range(3):
+            gateway = APIGateway(
+                "127.0.0.1", port, "secret", server_id=7, pool=registry
+            )
+            async with gateway as api:
+                assert await api.list_blocked() == ["alice"]
+
+        stats = registry.stats()
+        assert (stats.hits, stats.misses, stats.connects) == (2, 1, 1)
+        assert stats.tls_handshakes == 0
+        assert len(connections) == 1
+
+        rotated = APIGateway("127.0.0.1", port, "rotated", server_id=7, pool=registry)
+        async with rotated as api:
+            await api.list_blocked()
+
+        stats = registry.stats()
+        assert (stats.misses, stats.evictions, stats.clients) == (2, 1, 1)
+        assert len(connections) == 2
+
+        assert await registry.invalidate(7) == 1
+        assert registry.stats().clients == 0
+    finally:
+        await registry.aclose()
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_retired_client_closes_after_its_in_flight_lease(monkeypatch):
+    monkeypatch.setattr(settings, "vpn_manager_tls_enabled", False)
+    registry = ManagerClientRegistry()
+    gateway = APIGateway("vpn.example.test", 8080, "secret", pool=registry)
+
+    async with gateway:
+        client = gateway._client
+        assert await registry.invalidate("vpn.example.test:8080") == 1
+        assert client.is_closed is False
+
+    assert client.is_closed is True
+
+
+def test_tls_context_is_cached_until_material_changes(monkeypatch, tmp_path):
+    ca_path = tmp_path / "ca.crt"
+    ca_path.write_text("ca")
+    created = []
+
+    def create_context(*, cafile=None):
+        created.append(cafile)
+        return object()
+
+    monkeypatch.setattr(
+        "core.services.api_gateway.ssl.create_default_context", create_context
+    )
+    registry = ManagerClientRegistry()
+
+    def gateway(pool):
+        return APIGateway(
+            "vpn.example.test",
+            8443,
+            "secret",
+            tls_enabled=True,
+            mtls_required=False,
+            ca_cert_path=str(ca_path),
+            client_cert_path="",
+            client_key_path="",
+            pool=pool,
+        )
+
+    first, second = gateway(registry), gateway(registry)
+    assert first._tls_context is second._tls_context
+    assert len(created) == 1
+
+    stat = ca_path.stat()
+    ca_path.write_text("rotated")
+    os.utime(ca_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert gateway(registry)._tls_context is not first._tls_context
+    assert len(created) == 2
+
+    monkeypatch.setattr(settings, "vpn_manager_client_pool_enabled", False)
+    gateway(None)
+    assert len(created) == 3
+
+
+@pytest.mark.asyncio
+async def test_endpoint_update_invalidates_pooled_clients(monkeypatch, sessionmaker):
+    invalidated = []
+
+    async def invalidate(server):
+        invalidated.append(server)
+        return 0
+
+    monkeypatch.setattr(manager_clients, "invalidate", invalidate)
+    service = ServerService(uow)
+    server = await service.create(
+        name="pooled",
+        ip="10.0.0.1",
+        port=8080,
+        host="vpn.pooled.test",
+        location="Test",
+        api_key="secret",
+        cost=0,
+    )
+
+    await service.update(server.id, location="Elsewhere")
+    assert invalidated == []
+
+    await service.update(server.id, api_key="rotated")
+    assert invalidated == [server.id]
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from core.config import settings
+from core.exceptions import APIProtocolError, APIServerError
+from core.services.api_gateway import APIGateway
+from core.services.manager_throttle import ManagerRequestThrottle
+
+
+class GatedClient:
+    """Hold every request until ``release`` is set and count concurrency."""
+
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.release = asyncio.Event()
+        self.requests: list[tuple[str, str, dict]] = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await self.release.wait()
+        finally:
+            self.in_flight -= 1
+        return httpx.Response(
+            self.status_code,
+            json={"blocked_clients": ["alice"]},
+            request=httpx.Request(method, f"http://vpn.example.test{url}"),
+        )
+
+
+def _gateway(client, throttle, **kwargs) -> APIGateway:
+    gateway = APIGateway(
+        "vpn.example.test", 8080, "secret", server_id=3, throttle=throttle, **kwargs
+    )
+    gateway._client = client
+    return gateway
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_reads_share_one_request():
+    throttle = ManagerRequestThrottle()
+    client = GatedClient()
+    readers = [_gateway(client, throttle) for _ in range(5)]
+
+    tasks = [asyncio.create_task(api.list_blocked()) for api in readers]
+    inventory = asyncio.create_task(
+        _gateway(client, throttle).get_client_inventory(etag='"r1"')
+    )
+    await _settle()
+    assert len(client.requests) == 2
+
+    client.release.set()
+    assert await asyncio.gather(*tasks) == [["alice"]] * 5
+    with pytest.raises(APIProtocolError):
+        await inventory  # the fake payload is not an inventory
+
+    # Coalescing only spans requests that are in flight together.
+    assert await readers[0].list_blocked() == ["alice"]
+    assert len(client.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesced_failure_reaches_every_caller_and_cancel_hands_over():
+    throttle = ManagerRequestThrottle()
+    client = GatedClient(status_code=500)
+    tasks = [
+        asyncio.create_task(_gateway(client, throttle, retries=0).list_blocked())
+        for _ in range(3)
+    ]
+    await _settle()
+    client.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert len(client.requests) == 1
+    assert all(isinstance(result, APIServerError) for result in results)
+
+    client = GatedClient()
+    leader = asyncio.create_task(_gateway(client, throttle).list_blocked())
+    await _settle()
+    follower = asyncio.create_task(_gateway(client, throttle).list_blocked())
+    await _settle()
+    leader.cancel()
+    await _settle()
+    client.release.set()
+    assert await follower == ["alice"]
+    assert len(client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_writes_are_capped_per_server_and_rate_limited(monkeypatch):
+    monkeypatch.setattr(settings, "vpn_manager_max_concurrent_requests", 2)
+    throttle = ManagerRequestThrottle()
+    client = GatedClient()
+    tasks = [
+        asyncio.create_task(_gateway(client, throttle).suspend_client(f"c{index}"))
+        for index in range(5)
+    ]
+    await _settle()
+    assert len(client.requests) == 2
+    client.release.set()
+    await asyncio.gather(*tasks)
+    assert client.peak == 2
+
+    monkeypatch.setattr(settings, "vpn_manager_rate_limit_per_second", 10.0)
+    monkeypatch.setattr(settings, "vpn_manager_rate_limit_burst", 2)
+    sleeps: list[float] = []
+
+    async def record_sleep(delay):
+        sleeps.append(delay)
+
+    limited = ManagerRequestThrottle(clock=lambda: 100.0, sleep=record_sleep)
+    for _ in range(4):
+        async with limited.slot(3):
+            pass
+    assert sleeps == pytest.approx([0.1, 0.2])
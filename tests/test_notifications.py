@@ -163,3 +163,27 @@ async def test_malformed_notification_moves_to_failed_queue():
     assert await service.reserve() is None
     assert await redis_client.llen("notifications:processing") == 0
     assert await redis_client.llen("notifications:failed") == 1
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_publishes_a_batch_once_and_respects_markers():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    service = NotificationService(redis_client)
+
+    assert await service.enqueue(1, "first", notification_id="outbox:1") is True
+    assert await service.enqueue_many(
+        [("outbox:1", 1, "first"), ("outbox:2", 2, "second"), ("outbox:3", 3, "x")]
+    ) == [False, True, True]
+    assert await service.enqueue_many([("outbox:2", 2, "second")]) == [False]
+    assert await service.enqueue(3, "x", notification_id="outbox:3") is False
+
+    assert await redis_client.llen("notifications") == 3
+    assert await redis_client.ttl("notifications:enqueued:outbox:2") > 0
+    reserved = [await service.reserve() for _ in range(3)]
+    assert [item.notification_id for item in reserved] == [
+        "outbox:1",
+        "outbox:2",
+        "outbox:3",
+    ]
+    with pytest.raises(ValueError):
+        await service.enqueue_many([("outbox:4", 4, "a"), ("outbox:4", 4, "b")])
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+MIGRATION_PATH = (
+    Path(__file__).parents[1]
+    / "alembic"
+    / "versions"
+    / "c7d2e8f1a904_pending_config_refunds.py"
+)
+
+
+def _migration_module():
+    spec = importlib.util.spec_from_file_location(
+        "pending_config_refunds_migration", MIGRATION_PATH
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_refund_queue_migration_backfills_only_unrefunded_rejections_sqlite():
+    migration = _migration_module()
+    assert migration.down_revision == "b5c8e2f4a610"
+    engine = sa.create_engine("sqlite+pysqlite:///:memory:")
+    metadata = sa.MetaData()
+    operation = sa.Table(
+        "vpn_operation",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("operation_id", sa.String(36)),
+        sa.Column("kind", sa.String(32)),
+        sa.Column("status", sa.String(32)),
+    )
+    ledger = sa.Table(
+        "ledger_entry",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(32)),
+        sa.Column("amount", sa.Numeric(18, 2)),
+        sa.Column("idempotency_key", sa.String(160)),
+        sa.Column("reference_type", sa.String(32)),
+        sa.Column("reference_id", sa.String(160)),
+    )
+    metadata.create_all(engine)
+    queue = sa.table("pending_config_refund", sa.column("operation_id"))
+
+    with engine.begin() as connection:
+        connection.execute(
+            sa.insert(operation),
+            [
+                {"operation_id": "owed", "kind": "provision", "status": "rejected"},
+                {"operation_id": "paid", "kind": "provision", "status": "rejected"},
+                {"operation_id": "live", "kind": "provision", "status": "succeeded"},
+            ],
+        )
+        connection.execute(
+            sa.insert(ledger),
+            [
+                {
+                    "kind": "config_reservation",
+                    "amount": -5,
+                    "idempotency_key": f"config-reservation:{operation_id}",
+                    "reference_type": "vpn_operation",
+                    "reference_id": operation_id,
+                }
+                for operation_id in ("owed", "paid", "live")
+            ]
+            + [
+                {
+                    "kind": "config_refund",
+                    "amount": 5,
+                    "idempotency_key": "config-refund:config-reservation:paid",
+                    "reference_type": "vpn_operation",
+                    "reference_id": "paid",
+                }
+            ],
+        )
+
+        migration.op = Operations(MigrationContext.configure(connection))
+        migration.upgrade()
+        assert list(connection.scalars(sa.select(queue.c.operation_id))) == ["owed"]
+        assert "ix_ledger_entry_reference" in {
+            index["name"]
+            for index in sa.inspect(connection).get_indexes("ledger_entry")
+        }
+
+        with pytest.raises(RuntimeError, match="refund queue downgrade"):
+            migration.downgrade()
+        connection.execute(sa.delete(queue))
+        migration.downgrade()
+        assert "pending_config_refund" not in sa.inspect(connection).get_table_names()
@@ -3,7 +3,7 @@ from __future__ import annotations
 from decimal import Decimal
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, select
 
 from core.config import Settings, settings
 from core.db.models.config import VPN_Config
@@ -499,3 +499,60 @@ async def test_catch_up_rejects_inconsistent_existing_reward_ledger(sessionmaker
     assert payment.referral_settlement_status == "invalid_accounting"
     assert payment.referral_settled_at is not None
     assert len(rewards) == 1
+
+
+@pytest.mark.asyncio
+async def test_catch_up_settles_a_page_with_bulk_reward_writes(
+    monkeypatch, engine, sessionmaker
+):
+    root_id, inviter_id, first_payer_id = await _referral_chain(9101, 9102, 9103)
+    async with uow() as repos:
+        second_payer = await repos["users"].add(
+            User(tg_id=9104, balance=Decimal("0.00"), referred_by_id=inviter_id)
+        )
+    billing = BillingService(uow, per_config_cost="1.00")
+    monkeypatch.setattr(settings, "referral_rewards_enabled", False)
+    for index, payer_id in enumerate((first_payer_id, second_payer.id, first_payer_id)):
+        await _capture(
+            billing, user_id=payer_id, amount="100.00", key=f"bulk-catch-up-{index}"
+        )
+    monkeypatch.setattr(settings, "referral_rewards_enabled", True)
+    monkeypatch.setattr(settings, "referral_reconcile_batch_size", 2)
+
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        assert await billing.reconcile_referral_rewards() == 3
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    # Two pages, each crediting its beneficiaries with one executemany.
+    balance_updates = [s for s in statements if "SET balance=" in s]
+    assert len(balance_updates) == 2
+    assert (await UserService(uow).get(inviter_id)).balance == Decimal("15.00")
+    assert (await UserService(uow).get(root_id)).balance == Decimal("3.00")
+    async with uow() as repos:
+        session = repos["users"].session
+        payments = (
+            await session.scalars(select(ProviderPayment).order_by(ProviderPayment.id))
+        ).all()
+        entries = (
+            await session.scalars(
+                select(LedgerEntry)
+                .where(LedgerEntry.user_id == inviter_id)
+                .order_by(LedgerEntry.id)
+            )
+        ).all()
+    assert {payment.referral_settlement_status for payment in payments} == {"rewarded"}
+    assert [entry.balance_after for entry in entries] == [
+        Decimal("5.00"),
+        Decimal("10.00"),
+        Decimal("15.00"),
+    ]
+    assert entries[0].idempotency_key == (
+        f"referral-reward:v1:provider-payment:{payments[0].id}:level:1"
+    )
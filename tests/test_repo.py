@@ -108,6 +108,9 @@ async def test_uow(monkeypatch, engine):
             "vpn_operations",
             "telegram_updates",
             "telegram_user_actions",
+            "vpn_inventories",
+            "server_statuses",
+            "admin_actions",
         }
         await repos["users"].add(User(tg_id=1))
 
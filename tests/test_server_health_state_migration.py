@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import importlib.util
+from datetime import datetime, timezone
+from pathlib import Path
+
+import sqlalchemy as sa
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+MIGRATION_PATH = (
+    Path(__file__).parents[1]
+    / "alembic"
+    / "versions"
+    / "e8a1c3f5b7d9_server_health_state.py"
+)
+
+
+def _migration_module():
+    spec = importlib.util.spec_from_file_location(
+        "server_health_state_migration", MIGRATION_PATH
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_health_state_migration_backfills_newest_status_sqlite():
+    migration = _migration_module()
+    assert migration.down_revision == "a3f5c7e9b1d2"
+    engine = sa.create_engine("sqlite+pysqlite:///:memory:")
+    metadata = sa.MetaData()
+    server = sa.Table(
+        "server",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("manager_instance_id", sa.String(36)),
+    )
+    status = sa.Table(
+        "vpn_server_status",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("server_id", sa.Integer()),
+        sa.Column("kind", sa.String(16)),
+        sa.Column("success", sa.Boolean()),
+        sa.Column("snapshot", sa.JSON()),
+        sa.Column("manager_instance_id", sa.String(36)),
+        sa.Column("collected_at", sa.DateTime(timezone=True)),
+    )
+    metadata.create_all(engine)
+    earlier = datetime(2026, 10, 1, 12, 0)
+    later = datetime(2026, 10, 1, 12, 1)
+    ready = {"readiness": {"ready": True}, "data_plane": {"status": "up"}}
+
+    with engine.begin() as connection:
+        connection.execute(
+            sa.insert(server),
+            [
+                {"id": 1, "manager_instance_id": "node-1"},
+                {"id": 2, "manager_instance_id": "node-2"},
+                {"id": 3, "manager_instance_id": None},
+            ],
+        )
+        connection.execute(
+            sa.insert(status),
+            [
+                # Server 1 recovered; server 2 went down after an inventory read.
+                {
+                    "server_id": 1,
+                    "kind": "status",
+                    "success": False,
+                    "snapshot": {},
+                    "collected_at": earlier,
+                },
+                {
+                    "server_id": 1,
+                    "kind": "status",
+                    "success": True,
+                    "snapshot": ready,
+                    "manager_instance_id": "node-1",
+                    "collected_at": later,
+                },
+                {
+                    "server_id": 2,
+                    "kind": "status",
+                    "success": False,
+                    "snapshot": {},
+                    "collected_at": earlier,
+                },
+                {
+                    "server_id": 2,
+                    "kind": "inventory",
+                    "success": True,
+                    "snapshot": {},
+                    "collected_at": later,
+                },
+            ],
+        )
+
+        migration.op = Operations(MigrationContext.configure(connection))
+        migration.upgrade()
+        health = sa.table(
+            "server",
+            sa.column("id"),
+            sa.column("health_state"),
+            sa.column("health_checked_at", sa.DateTime(timezone=True)),
+        )
+        rows = connection.execute(
+            sa.select(
+                health.c.id, health.c.health_state, health.c.health_checked_at
+            ).order_by(health.c.id)
+        ).all()
+        assert [(row.id, row.health_state) for row in rows] == [
+            (1, "healthy"),
+            (2, "unreachable"),
+            (3, "unknown"),
+        ]
+        assert rows[0].health_checked_at.replace(tzinfo=None) == later
+        assert rows[2].health_checked_at is None
+
+        migration.downgrade()
+        columns = {
+            column["name"] for column in sa.inspect(connection).get_columns("server")
+        }
+        assert columns == {"id", "manager_instance_id"}
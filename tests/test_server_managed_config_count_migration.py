@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import sqlalchemy as sa
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+MIGRATION_PATH = (
+    Path(__file__).parents[1]
+    / "alembic"
+    / "versions"
+    / "b7d9f1a3c5e2_server_managed_config_count.py"
+)
+
+
+def _migration_module():
+    spec = importlib.util.spec_from_file_location(
+        "server_managed_config_count_migration", MIGRATION_PATH
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_managed_config_count_migration_backfills_sqlite():
+    migration = _migration_module()
+    assert migration.down_revision == "e8a1c3f5b7d9"
+    engine = sa.create_engine("sqlite+pysqlite:///:memory:")
+    metadata = sa.MetaData()
+    server = sa.Table(
+        "server",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(128)),
+    )
+    config = sa.Table(
+        "vpn_config",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("server_id", sa.Integer()),
+        sa.Column("desired_state", sa.String(32)),
+        sa.Column("actual_state", sa.String(32)),
+    )
+    metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        connection.execute(
+            sa.insert(server),
+            [{"id": 1, "name": "busy"}, {"id": 2, "name": "empty"}],
+        )
+        connection.execute(
+            sa.insert(config),
+            [
+                {"server_id": 1, "desired_state": "active", "actual_state": "active"},
+                # A pending revoke still occupies capacity; a converged one not.
+                {"server_id": 1, "desired_state": "revoked", "actual_state": "active"},
+                {"server_id": 1, "desired_state": "revoked", "actual_state": "revoked"},
+            ],
+        )
+
+        migration.op = Operations(MigrationContext.configure(connection))
+        migration.upgrade()
+        counted = sa.table("server", sa.column("id"), sa.column("managed_config_count"))
+        rows = connection.execute(
+            sa.select(counted.c.id, counted.c.managed_config_count).order_by(
+                counted.c.id
+            )
+        ).all()
+        assert [tuple(row) for row in rows] == [(1, 2), (2, 0)]
+
+        migration.downgrade()
+        columns = {
+            column["name"] for column in sa.inspect(connection).get_columns("server")
+        }
+        assert columns == {"id", "name"}
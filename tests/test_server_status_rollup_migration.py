@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import sqlalchemy as sa
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+MIGRATION_PATH = (
+    Path(__file__).parents[1]
+    / "alembic"
+    / "versions"
+    / "f2a4c6e8b0d1_server_status_rollups.py"
+)
+
+
+def _migration_module():
+    spec = importlib.util.spec_from_file_location(
+        "server_status_rollups_migration", MIGRATION_PATH
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_status_rollup_migration_round_trip_sqlite():
+    migration = _migration_module()
+    assert migration.down_revision == "b7d9f1a3c5e2"
+    engine = sa.create_engine("sqlite+pysqlite:///:memory:")
+    metadata = sa.MetaData()
+    sa.Table("server", metadata, sa.Column("id", sa.Integer(), primary_key=True))
+    metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        migration.op = Operations(MigrationContext.configure(connection))
+        migration.upgrade()
+        inspector = sa.inspect(connection)
+        assert "vpn_server_status_rollup" in inspector.get_table_names()
+        assert {
+            index["name"] for index in inspector.get_indexes("vpn_server_status_rollup")
+        } == {"ix_vpn_server_status_rollup_resolution_bucket"}
+        assert [
+            constraint["column_names"]
+            for constraint in inspector.get_unique_constraints(
+                "vpn_server_status_rollup"
+            )
+        ] == [["server_id", "resolution", "bucket_start"]]
+
+        migration.downgrade()
+        inspector = sa.inspect(connection)
+        assert "vpn_server_status_rollup" not in inspector.get_table_names()
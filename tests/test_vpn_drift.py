@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+
 import pytest
 
 from core.config import settings
@@ -157,12 +159,69 @@ async def test_audit_is_read_only_and_reports_safe_and_unsafe_drift(sessionmaker
 
 
 @pytest.mark.asyncio
-async def test_etag_304_still_compares_fresh_hub_state(sessionmaker):
-    server, _ = await create_hub_state(name="etag-client")
+async def test_etag_304_reuses_stored_inventory_with_fresh_hub_state(sessionmaker):
+    server, config = await create_hub_state(name="etag-client")
+    gateway = InventoryGateway(
+        [inventory(manager_client("etag-client", "suspended")), None]
+    )
+    service = VPNDriftService(
+        uow,
+        gateway_factory=lambda *args, **kwargs: gateway,
+    )
+
+    first = await service.audit_server(server.id)
+    assert [finding.reason for finding in first.findings] == ["remote_state_mismatch"]
+
+    async with uow() as repos:
+        await repos["configs"].suspend(config.id)
+
+    report = await service.audit_server(server.id, etag=first.inventory_etag)
+
+    # The Manager answered 304 to the stored ETag; the Hub change since the
+    # first audit is still applied to the stored inventory.
+    assert report.unchanged is True
+    assert report.findings == ()
+    assert gateway.etags == [None, '"sha256:reviewed"']
+
+
+@pytest.mark.asyncio
+async def test_overlapping_audits_of_a_new_server_both_store_a_snapshot(
+    sessionmaker,
+):
+    server, _config = await create_hub_state(name="overlap-client")
+    gateway = InventoryGateway(inventory(manager_client("overlap-client", "active")))
+    service = VPNDriftService(uow, gateway_factory=lambda *args, **kwargs: gateway)
+
+    # A scheduled and an admin-triggered audit racing on an unseen server.
+    reports = await asyncio.gather(
+        service.audit_server(server.id), service.audit_server(server.id)
+    )
+
+    assert [report.findings for report in reports] == [(), ()]
+    async with uow() as repos:
+        snapshots = await repos["vpn_inventories"].list(server_id=server.id)
+    assert [snapshot.revision for snapshot in snapshots] == ["sha256:reviewed"]
+
+
+@pytest.mark.asyncio
+async def test_incremental_audit_matches_a_full_recompute(sessionmaker, monkeypatch):
+    server, kept = await create_hub_state(name="kept")
+    async with uow() as repos:
+        dropped = await repos["configs"].create(
+            server.id, kept.owner_id, "dropped", "Dropped"
+        )
     gateway = InventoryGateway(
         [
-            None,
-            inventory(manager_client("etag-client", "suspended")),
+            inventory(
+                manager_client("kept", "active"),
+                manager_client("dropped", "active"),
+                manager_client("stray", "revoked"),
+            ),
+            inventory(
+                manager_client("kept", "suspended"),
+                manager_client("dropped", "active"),
+                revision="sha256:next",
+            ),
         ]
     )
     service = VPNDriftService(
@@ -170,11 +229,30 @@ async def test_etag_304_still_compares_fresh_hub_state(sessionmaker):
         gateway_factory=lambda *args, **kwargs: gateway,
     )
 
-    report = await service.audit_server(server.id, etag='"sha256:old"')
+    first = await service.audit_server(server.id)
+    assert [(item.name, item.reason) for item in first.findings] == [
+        ("stray", "remote_only_inert")
+    ]
 
-    assert report.unchanged is True
-    assert [finding.reason for finding in report.findings] == ["remote_state_mismatch"]
-    assert gateway.etags == ['"sha256:old"', None]
+    async with uow() as repos:
+        await repos["configs"].delete(id=dropped.id)
+
+    incremental = await service.audit_server(server.id, etag=first.inventory_etag)
+    assert incremental.unchanged is False
+    assert [(item.name, item.reason) for item in incremental.findings] == [
+        ("kept", "remote_state_mismatch"),
+        ("dropped", "remote_only_live"),
+    ]
+
+    monkeypatch.setattr(settings, "vpn_drift_full_audit_seconds", 0)
+    gateway.snapshot = inventory(
+        manager_client("kept", "suspended"),
+        manager_client("dropped", "active"),
+        revision="sha256:next",
+    )
+    full = await service.audit_server(server.id)
+    assert full.findings == incremental.findings
+    assert gateway.etags == [None, '"sha256:reviewed"', None]
 
 
 @pytest.mark.asyncio
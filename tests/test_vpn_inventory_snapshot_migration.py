@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import sqlalchemy as sa
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+MIGRATION_PATH = (
+    Path(__file__).parents[1]
+    / "alembic"
+    / "versions"
+    / "a3f5c7e9b1d2_vpn_inventory_snapshots.py"
+)
+
+
+def _migration_module():
+    spec = importlib.util.spec_from_file_location(
+        "vpn_inventory_snapshots_migration", MIGRATION_PATH
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_inventory_snapshot_migration_round_trip_sqlite():
+    migration = _migration_module()
+    assert migration.down_revision == "c7d2e8f1a904"
+    engine = sa.create_engine("sqlite+pysqlite:///:memory:")
+    metadata = sa.MetaData()
+    sa.Table("server", metadata, sa.Column("id", sa.Integer(), primary_key=True))
+    sa.Table(
+        "vpn_config",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("server_id", sa.Integer()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        migration.op = Operations(MigrationContext.configure(connection))
+        migration.upgrade()
+        inspector = sa.inspect(connection)
+        assert "vpn_inventory_snapshot" in inspector.get_table_names()
+        assert "ix_vpn_config_server_id_updated_at" in {
+            index["name"] for index in inspector.get_indexes("vpn_config")
+        }
+
+        migration.downgrade()
+        inspector = sa.inspect(connection)
+        assert "vpn_inventory_snapshot" not in inspector.get_table_names()
+        assert inspector.get_indexes("vpn_config") == []
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 
 import pytest
+from sqlalchemy import event
 
 from core.config import settings
 from core.db.unit_of_work import uow
 from core.domain import VPNOperationKind, VPNOperationStatus, VPNState
-from core.exceptions import APINotFoundError, APITransportError
+from core.exceptions import (
+    APICircuitOpenError,
+    APINotFoundError,
+    APITransportError,
+)
 from core.services import ConfigService, ServerService, UserService
 from tests.fleet_test_support import mark_server_ready
 
@@ -51,6 +57,8 @@ class LifecycleGateway:
     def _maybe_fail(self) -> None:
         if self.behavior == "transport":
             raise APITransportError("ambiguous timeout")
+        if self.behavior == "circuit_open":
+            raise APICircuitOpenError("VPN Manager circuit is open", retry_after=30)
 
 
 async def _user_and_server(tg_id: int = 70001):
@@ -382,3 +390,278 @@ async def test_batch_publishes_all_intents_before_first_remote_call(
         rows = await repos["configs"].list(owner_id=user.id)
     assert {row.id for row in rows} == {first.id, second.id}
     assert all(row.actual_state == VPNState.SUSPENDED.value for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_fans_out_per_server_and_reports_queue_depth(
+    monkeypatch, sessionmaker
+):
+    now = datetime(2026, 7, 12, 12, 0, tzinfo=timezone.utc)
+    release = asyncio.Event()
+    in_flight: dict[str, int] = {}
+    peak: dict[str, int] = {}
+    calls: list[str] = []
+
+    class SlowManagerGateway(LifecycleGateway):
+        def __init__(self, ip: str) -> None:
+            super().__init__()
+            self.ip = ip
+
+        async def suspend_client(self, name, *, operation_id=None):
+            in_flight[self.ip] = in_flight.get(self.ip, 0) + 1
+            peak[self.ip] = max(peak.get(self.ip, 0), in_flight[self.ip])
+            try:
+                if self.ip == "10.0.0.1":
+                    await release.wait()
+                calls.append(self.ip)
+            finally:
+                in_flight[self.ip] -= 1
+
+    monkeypatch.setattr(
+        "core.services.config.APIGateway",
+        lambda ip, *args, **kwargs: SlowManagerGateway(ip),
+    )
+    observed = {}
+    monkeypatch.setattr(
+        "core.services.config_executor.observe_vpn_reconcile",
+        lambda server_id, **kwargs: observed.__setitem__(server_id, kwargs),
+    )
+    user = await UserService(uow).register(70_101)
+    servers = []
+    for index, ip in enumerate(("10.0.0.1", "10.0.0.2")):
+        server = await ServerService(uow).create(
+            name=f"fan-out-{index}",
+            ip=ip,
+            port=8080,
+            host=f"vpn-{index}.test",
+            location="local",
+            api_key="secret",
+            cost=0,
+        )
+        await mark_server_ready(server.id)
+        servers.append(server)
+    async with uow() as repos:
+        for server, configs in zip(servers, (3, 2), strict=True):
+            for index in range(configs):
+                operation_id = (
+                    f"00000000-0000-4000-8000-0000000{server.id:02d}{index:03d}"
+                )
+                cfg = await repos["configs"].create(
+                    server.id,
+                    user.id,
+                    f"fan-out-{server.id}-{index}",
+                    "Fan-out",
+                    desired_state=VPNState.SUSPENDED.value,
+                    actual_state=VPNState.ACTIVE.value,
+                    operation_id=operation_id,
+                )
+                await repos["vpn_operations"].create(
+                    operation_id=operation_id,
+                    config_id=cfg.id,
+                    config_name=cfg.name,
+                    server_id=server.id,
+                    owner_id=user.id,
+                    kind=VPNOperationKind.SUSPEND.value,
+                    next_attempt_at=now,
+                )
+
+    service = ConfigService(uow, clock=lambda: now)
+    page = asyncio.create_task(
+        service.reconcile(concurrency=4, per_server_concurrency=1)
+    )
+    for _ in range(200):
+        if calls.count("10.0.0.2") == 2:
+            break
+        await asyncio.sleep(0.01)
+    # The healthy server converged while the slow one still holds its slot.
+    assert calls == ["10.0.0.2", "10.0.0.2"]
+    assert not page.done()
+    release.set()
+    results = await page
+
+    assert list(results.values()) == [VPNOperationStatus.SUCCEEDED.value] * 5
+    assert peak == {"10.0.0.1": 1, "10.0.0.2": 1}
+    slow, healthy = (server.id for server in servers)
+    assert observed[slow]["outcomes"] == {"succeeded": 3}
+    assert observed[slow]["queue_depth"] == 3
+    assert observed[healthy]["queue_depth"] == 2
+    assert observed[slow]["busy_seconds"] > observed[healthy]["busy_seconds"]
+
+
+async def _suspend_intents(server, user, count: int, now: datetime) -> list[int]:
+    config_ids = []
+    async with uow() as repos:
+        for index in range(count):
+            operation_id = f"00000000-0000-4000-8003-{server.id:04d}{index:08d}"
+            cfg = await repos["configs"].create(
+                server.id,
+                user.id,
+                f"grouped-{server.id}-{index}",
+                "Grouped",
+                desired_state=VPNState.SUSPENDED.value,
+                actual_state=VPNState.ACTIVE.value,
+                operation_id=operation_id,
+            )
+            await repos["vpn_operations"].create(
+                operation_id=operation_id,
+                config_id=cfg.id,
+                config_name=cfg.name,
+                server_id=server.id,
+                owner_id=user.id,
+                kind=VPNOperationKind.SUSPEND.value,
+                next_attempt_at=now,
+            )
+            config_ids.append(cfg.id)
+    return config_ids
+
+
+@pytest.mark.asyncio
+async def test_reconcile_claims_one_page_and_group_commits_completions(
+    monkeypatch, engine, sessionmaker
+):
+    now = datetime(2026, 7, 12, 12, 0, tzinfo=timezone.utc)
+    gateway = LifecycleGateway()
+    monkeypatch.setattr(
+        "core.services.config.APIGateway", lambda *args, **kwargs: gateway
+    )
+    user, server = await _user_and_server()
+    config_ids = await _suspend_intents(server, user, 6, now)
+    async with uow() as repos:
+        orphan = await repos["vpn_operations"].create(
+            operation_id="00000000-0000-4000-8004-000000000001",
+            config_id=None,
+            config_name="orphan",
+            server_id=server.id,
+            owner_id=user.id,
+            kind=VPNOperationKind.SUSPEND.value,
+            next_attempt_at=now,
+        )
+
+    commits = []
+
+    def record_commit(connection):
+        commits.append(connection)
+
+    event.listen(engine.sync_engine, "commit", record_commit)
+    try:
+        results = await ConfigService(uow, clock=lambda: now).reconcile(
+            per_server_concurrency=6
+        )
+    finally:
+        event.remove(engine.sync_engine, "commit", record_commit)
+
+    assert results == {
+        config_id: VPNOperationStatus.SUCCEEDED.value for config_id in config_ids
+    }
+    # One transaction leases the page, one records all six outcomes.
+    assert len(commits) == 2
+    assert len(gateway.calls) == 6
+    async with uow() as repos:
+        rows = await repos["configs"].list(owner_id=user.id)
+        swept = await repos["vpn_operations"].get(operation_id=orphan.operation_id)
+    assert {row.actual_state for row in rows} == {VPNState.SUSPENDED.value}
+    assert swept.status == VPNOperationStatus.SUPERSEDED.value
+
+
+@pytest.mark.asyncio
+async def test_claim_many_supersedes_at_most_one_page_per_call(sessionmaker):
+    now = datetime(2026, 7, 12, 12, 0, tzinfo=timezone.utc)
+    user, server = await _user_and_server()
+    async with uow() as repos:
+        for index in range(3):
+            await repos["vpn_operations"].create(
+                operation_id=f"00000000-0000-4000-8005-00000000000{index}",
+                config_id=None,
+                config_name=f"orphan-{index}",
+                server_id=server.id,
+                owner_id=user.id,
+                kind=VPNOperationKind.SUSPEND.value,
+                next_attempt_at=now,
+            )
+
+    statuses = []
+    for _ in range(2):
+        async with uow() as repos:
+            claimed = await repos["vpn_operations"].claim_many(
+                lease_token="lease", now=now, lease_for=timedelta(minutes=1), limit=2
+            )
+            assert claimed == []
+        async with uow() as repos:
+            operations = await repos["vpn_operations"].list(owner_id=user.id)
+        statuses.append(
+            sum(op.status == VPNOperationStatus.SUPERSEDED.value for op in operations)
+        )
+    assert statuses == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_failed_completion_group_falls_back_to_one_transaction_each(
+    monkeypatch, sessionmaker
+):
+    now = datetime(2026, 7, 12, 12, 0, tzinfo=timezone.utc)
+    gateway = LifecycleGateway()
+    monkeypatch.setattr(
+        "core.services.config.APIGateway", lambda *args, **kwargs: gateway
+    )
+    user, server = await _user_and_server()
+    config_ids = await _suspend_intents(server, user, 3, now)
+    service = ConfigService(uow, clock=lambda: now)
+    complete_group = service._complete_group
+    sizes = []
+
+    async def fail_groups(group):
+        sizes.append(len(group))
+        if len(group) > 1:
+            raise RuntimeError("deadlock detected")
+        return await complete_group(group)
+
+    monkeypatch.setattr(service, "_complete_group", fail_groups)
+    results = await service.reconcile(per_server_concurrency=3)
+
+    assert sizes == [3, 1, 1, 1]
+    assert list(results.values()) == [VPNOperationStatus.SUCCEEDED.value] * 3
+    async with uow() as repos:
+        rows = await repos["configs"].list(owner_id=user.id)
+    assert {row.id for row in rows} == set(config_ids)
+    assert {row.actual_state for row in rows} == {VPNState.SUSPENDED.value}
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_defers_operations_without_consuming_attempts(
+    monkeypatch, sessionmaker
+):
+    monkeypatch.setattr(settings, "vpn_operation_max_attempts", 1)
+    now = [datetime(2026, 7, 12, 12, 0, tzinfo=timezone.utc)]
+    gateway = LifecycleGateway("circuit_open")
+    monkeypatch.setattr(
+        "core.services.config.APIGateway", lambda *args, **kwargs: gateway
+    )
+    user, server = await _user_and_server()
+    config_ids = await _suspend_intents(server, user, 2, now[0])
+    service = ConfigService(uow, clock=lambda: now[0])
+
+    for _ in range(2):
+        results = await service.reconcile(per_server_concurrency=2)
+        assert results == {
+            config_id: "deferred:circuit_open" for config_id in config_ids
+        }
+        async with uow() as repos:
+            rows = await repos["vpn_operations"].list_by_operation_ids(
+                [
+                    (await repos["configs"].get(id=config_id)).operation_id
+                    for config_id in config_ids
+                ]
+            )
+        for row in rows:
+            assert row.status == VPNOperationStatus.PENDING.value
+            assert row.attempts == 0
+            assert row.lease_token is None
+            assert row.last_error.startswith("APICircuitOpenError")
+            delay = _as_utc(row.next_attempt_at) - now[0]
+            assert timedelta(seconds=30) <= delay <= timedelta(seconds=60)
+        now[0] += timedelta(seconds=60)
+
+    async with uow() as repos:
+        configs = await repos["configs"].list(owner_id=user.id)
+    assert {cfg.actual_state for cfg in configs} == {VPNState.ACTIVE.value}
+    assert {cfg.last_error for cfg in configs} == {None}